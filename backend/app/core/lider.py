@@ -0,0 +1,93 @@
+# backend/app/core/lider.py
+"""
+Elección del worker que corre las tareas periódicas compartidas, y el hilo
+que corre cada tarea periódica (TareaPeriodica).
+
+Con varios workers (PUBSUB_SOCKET, ver pubsub) los cálculos que escriben
+en la base para todos (tendencias, estadísticas de la comunidad, refresco
+de perfiles, barrido de blobs) tienen que correr una sola vez, no una por
+worker. Lo hace el que tiene el flock sobre <PUBSUB_SOCKET>.lider.lock, el
+mismo mecanismo con el que pubsub elige el hub: el primero que lo pide lo
+toma y lo suelta solo al morir. Los demás lo vuelven a pedir en cada vuelta
+de sus bucles, así que si el líder se cae otro toma su lugar en el próximo
+intervalo. Sin PUBSUB_SOCKET hay un solo worker y siempre es líder.
+
+Los índices en memoria (companeros_service, recomendaciones_service) y el
+volcado de contadores usan TareaPeriodica sin solo_lider: cada proceso
+necesita su propia copia.
+"""
+import fcntl
+import os
+import threading
+from typing import IO, Callable, Optional
+
+_lock = threading.Lock()
+_archivo: Optional[IO] = None
+
+
+def tomar_flock(ruta: str) -> Optional[IO]:
+    """El archivo con el flock exclusivo tomado, o None si lo tiene otro proceso"""
+    archivo = open(ruta, "a")
+    try:
+        fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        archivo.close()
+        return None
+    return archivo
+
+
+def es_lider() -> bool:
+    """Si este proceso corre las tareas periódicas (toma el lugar si está libre)"""
+    global _archivo
+    ruta = os.getenv("PUBSUB_SOCKET")
+    if not ruta:
+        return True
+    with _lock:
+        if _archivo is None:
+            _archivo = tomar_flock(f"{ruta}.lider.lock")
+        return _archivo is not None
+
+
+class TareaPeriodica:
+    """
+    Hilo daemon que corre funcion cada intervalo segundos hasta detener().
+
+    Con solo_lider la corre únicamente el worker líder (los demás vuelven a
+    preguntar en cada vuelta); con inmediata la primera vuelta no espera el
+    intervalo. Un error se imprime y el hilo sigue.
+    """
+
+    def __init__(self, nombre: str, funcion: Callable[[], object], intervalo: float,
+                 mensaje_error: str, solo_lider: bool = False, inmediata: bool = True):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.intervalo = intervalo
+        self.mensaje_error = mensaje_error
+        self.solo_lider = solo_lider
+        self.inmediata = inmediata
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Arrancar el hilo (una sola vez, aunque se llame desde varios hilos)"""
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+                    self._hilo.start()
+
+    def _bucle(self):
+        if not self.inmediata and self._detener.wait(self.intervalo):
+            return
+        while True:
+            try:
+                if not self.solo_lider or es_lider():
+                    self.funcion()
+            except Exception as e:
+                print(f"⚠️ {self.mensaje_error}: {e}")
+            if self._detener.wait(self.intervalo):
+                return
+
+    def detener(self):
+        self._detener.set()
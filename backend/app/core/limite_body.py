@@ -0,0 +1,63 @@
+# backend/app/core/limite_body.py
+from typing import Dict
+
+from fastapi import HTTPException
+
+
+class BodyDemasiadoGrande(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=413, detail="El archivo supera el tamaño máximo permitido")
+
+
+class LimiteTamanioBody:
+    """
+    Middleware ASGI que corta los POST demasiado grandes antes de parsear el multipart.
+
+    FastAPI lee y parsea el body completo antes de llamar al endpoint, así que
+    el límite del endpoint llega tarde para un upload enorme. Acá se rechaza
+    por Content-Length sin leer nada, y si el cliente no lo manda (chunked)
+    se cuentan los bytes a medida que llegan.
+    """
+
+    def __init__(self, app, limites: Dict[str, int]):
+        self.app = app
+        self.limites = limites  # {ruta exacta: bytes máximos del body}
+
+    async def __call__(self, scope, receive, send):
+        limite = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limite = self.limites.get(scope["path"])
+        if limite is None:
+            await self.app(scope, receive, send)
+            return
+
+        largo = dict(scope["headers"]).get(b"content-length")
+        if largo and largo.isdigit() and int(largo) > limite:
+            await self._rechazar(send)
+            return
+
+        recibidos = 0
+
+        async def receive_limitado():
+            nonlocal recibidos
+            mensaje = await receive()
+            if mensaje["type"] == "http.request":
+                recibidos += len(mensaje.get("body", b""))
+                if recibidos > limite:
+                    # HTTPException: FastAPI la deja pasar tal cual al parsear el body
+                    raise BodyDemasiadoGrande()
+            return mensaje
+
+        await self.app(scope, receive_limitado, send)
+
+    @staticmethod
+    async def _rechazar(send):
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b'{"detail":"El archivo supera el tama\\u00f1o m\\u00e1ximo permitido"}',
+        })
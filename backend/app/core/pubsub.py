@@ -0,0 +1,299 @@
+# backend/app/core/pubsub.py
+"""
+Publicación/suscripción en memoria para los eventos en vivo (chat, presencia).
+
+Cada suscriptor tiene una cola acotada en el event loop del servidor;
+publicar solo hace put_nowait en las colas del canal, sin tocar la base.
+Un suscriptor lento no frena a los demás: si su cola se llena se vacía y
+recibe DESBORDE, la señal para que recupere lo perdido desde la base con
+su último cursor.
+
+El broker por defecto (BrokerLocal) entrega dentro del proceso. Con varios
+workers en la misma máquina, PUBSUB_SOCKET=/ruta/al/socket activa
+BrokerSocket: uno de los workers hace de hub sobre un socket unix y
+reenvía cada evento a todos (incluido el que lo publicó). configurar()
+permite enchufar cualquier otro broker con la misma interfaz.
+
+Invalidaciones replica sobre un canal las invalidaciones de los índices en
+memoria que tiene cada worker (companeros_service, recomendaciones_service).
+"""
+import asyncio
+import json
+import os
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from app.core.lider import tomar_flock
+
+MAX_PENDIENTES = 256
+MAX_BUFFER_WORKER = 4 * 1024 * 1024  # bytes sin leer antes de cortar a un worker
+MAX_LINEA = 1024 * 1024  # bytes por evento en el socket (límite de readline)
+ESPERA_RECONEXION = 1.0  # segundos
+
+# Marca en la cola: se perdieron eventos, hay que releer desde la base
+DESBORDE = None
+
+
+class BrokerLocal:
+    """Entrega los eventos a los suscriptores del mismo proceso"""
+
+    def __init__(self):
+        self._suscriptores: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    async def iniciar(self):
+        pass
+
+    async def detener(self):
+        pass
+
+    async def publicar(self, canal: str, evento: dict):
+        self.publicar_local(canal, evento)
+
+    def publicar_local(self, canal: str, evento: dict):
+        """Entregar solo a los suscriptores de este proceso"""
+        for cola in list(self._suscriptores.get(canal, ())):
+            try:
+                cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                self._desbordar(cola)
+
+    def desbordar_todos(self):
+        """Avisar a todos los suscriptores que pudieron perder eventos"""
+        for suscriptores in list(self._suscriptores.values()):
+            for cola in list(suscriptores):
+                self._desbordar(cola)
+
+    @staticmethod
+    def _desbordar(cola: asyncio.Queue):
+        while not cola.empty():
+            cola.get_nowait()
+        cola.put_nowait(DESBORDE)
+
+    @asynccontextmanager
+    async def suscribir(self, canal: str) -> AsyncIterator[asyncio.Queue]:
+        cola = asyncio.Queue(MAX_PENDIENTES)
+        self._suscriptores[canal].add(cola)
+        try:
+            yield cola
+        finally:
+            suscriptores = self._suscriptores.get(canal)
+            if suscriptores is not None:
+                suscriptores.discard(cola)
+                if not suscriptores:
+                    del self._suscriptores[canal]
+
+    def cantidad_suscriptores(self, canal: str) -> int:
+        return len(self._suscriptores.get(canal, ()))
+
+
+class BrokerSocket(BrokerLocal):
+    """Comparte los eventos entre los workers de una máquina por un socket unix
+
+    El hub se elige con un flock sobre <ruta>.lock: lo toma el primer worker
+    que lo consigue y lo suelta solo al morir. Los demás se conectan como
+    clientes; si el hub se cae, reintentan la elección y uno lo reemplaza.
+    Cada evento viaja como una línea JSON {"c": canal, "e": evento} de hasta
+    MAX_LINEA bytes; uno más grande se entrega solo en el proceso. Mientras
+    no hay conexión con el hub se entrega solo en el proceso, y al volver
+    todos los suscriptores reciben DESBORDE para releer lo perdido.
+    """
+
+    def __init__(self, ruta: str):
+        super().__init__()
+        self.ruta = ruta
+        self._lock = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._workers: Set[asyncio.StreamWriter] = set()  # Conectados al hub (si lo somos)
+        self._hub: Optional[asyncio.StreamWriter] = None  # Conexión al hub (si no lo somos)
+        self._tarea: Optional[asyncio.Task] = None
+
+    @property
+    def es_hub(self) -> bool:
+        return self._servidor is not None
+
+    async def iniciar(self):
+        if self._tarea is None:
+            self._tarea = asyncio.get_running_loop().create_task(self._mantener_conexion())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+        for writer in list(self._workers) + [self._hub]:
+            if writer is not None:
+                writer.close()
+        if self._servidor is not None:
+            self._servidor.close()
+            self._servidor = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    async def publicar(self, canal: str, evento: dict):
+        linea = self._linea(canal, evento)
+        if len(linea) > MAX_LINEA:
+            # Los demás lo cortarían y perderían la conexión: mejor que no les llegue
+            print(f"⚠️ pubsub: evento de {len(linea)} bytes en {canal}, se entrega solo en el proceso")
+            self.publicar_local(canal, evento)
+        elif self.es_hub:
+            self._reenviar(linea)
+            self.publicar_local(canal, evento)
+        elif self._hub is not None and not self._hub.is_closing():
+            # El hub lo devuelve a todos, también a este proceso
+            self._hub.write(linea)
+        else:
+            self.publicar_local(canal, evento)
+
+    @staticmethod
+    def _linea(canal: str, evento: dict) -> bytes:
+        return json.dumps({"c": canal, "e": evento}, ensure_ascii=False).encode() + b"\n"
+
+    def _reenviar(self, linea: bytes):
+        for writer in list(self._workers):
+            if writer.transport.get_write_buffer_size() > MAX_BUFFER_WORKER:
+                # Un worker que no lee no frena a los demás: se lo corta y se reconecta
+                writer.close()
+                self._workers.discard(writer)
+                continue
+            writer.write(linea)
+
+    async def _mantener_conexion(self):
+        while True:
+            try:
+                if self._tomar_hub():
+                    await self._servir()
+                    return  # El hub vive mientras viva el proceso
+                await self._escuchar_hub()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ pubsub: sin conexión con el hub ({e})")
+            self._hub = None
+            await asyncio.sleep(ESPERA_RECONEXION)
+
+    def _tomar_hub(self) -> bool:
+        self._lock = tomar_flock(f"{self.ruta}.lock")
+        return self._lock is not None
+
+    async def _servir(self):
+        if os.path.exists(self.ruta):
+            os.unlink(self.ruta)  # Socket de un hub anterior que murió
+        self._servidor = await asyncio.start_unix_server(
+            self._atender_worker, path=self.ruta, limit=MAX_LINEA
+        )
+        self.desbordar_todos()
+
+    async def _atender_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._workers.add(writer)
+        try:
+            while linea := await reader.readline():
+                self._reenviar(linea)
+                datos = json.loads(linea)
+                self.publicar_local(datos["c"], datos["e"])
+        finally:
+            self._workers.discard(writer)
+            writer.close()
+
+    async def _escuchar_hub(self):
+        reader, writer = await asyncio.open_unix_connection(self.ruta, limit=MAX_LINEA)
+        self._hub = writer
+        self.desbordar_todos()
+        try:
+            while linea := await reader.readline():
+                datos = json.loads(linea)
+                self.publicar_local(datos["c"], datos["e"])
+        finally:
+            writer.close()
+
+
+broker = BrokerLocal()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def configurar(nuevo_broker):
+    """Reemplazar el broker (antes de que el servidor acepte conexiones)"""
+    global broker
+    broker = nuevo_broker
+
+
+def configurar_desde_entorno():
+    """BrokerSocket si está PUBSUB_SOCKET (varios workers), si no el local"""
+    ruta = os.getenv("PUBSUB_SOCKET")
+    if ruta:
+        configurar(BrokerSocket(ruta))
+
+
+async def iniciar():
+    global _loop
+    _loop = asyncio.get_running_loop()
+    await broker.iniciar()
+
+
+async def detener():
+    await broker.detener()
+
+
+async def publicar(canal: str, evento: dict):
+    await broker.publicar(canal, evento)
+
+
+def difundir(canal: str, evento: dict):
+    """publicar() desde código sincrónico (rutas def, hilos): se encola en el event loop
+
+    Sin servidor corriendo (scripts) no hace nada: no hay a quién avisar.
+    """
+    if _loop is not None and not _loop.is_closed():
+        asyncio.run_coroutine_threadsafe(publicar(canal, evento), _loop)
+
+
+def publicar_local(canal: str, evento: dict):
+    broker.publicar_local(canal, evento)
+
+
+def suscribir(canal: str):
+    return broker.suscribir(canal)
+
+
+class Invalidaciones:
+    """
+    Invalidaciones de un índice en memoria que cada worker arma por su cuenta.
+
+    Quien invalida la aplica en su índice y la difunde; escuchar() aplica
+    con aplicar(evento) las que llegan de los otros workers (las propias
+    vuelven por el hub y se ignoran). Ante DESBORDE se perdieron avisos y se
+    llama a descartar() para que el índice se rearme entero.
+    """
+
+    def __init__(self, canal: str, aplicar: Callable[[dict], None], descartar: Callable[[], None]):
+        self.canal = canal
+        self.aplicar = aplicar
+        self.descartar = descartar
+        self._worker = uuid.uuid4().hex[:12]
+        self._tarea: Optional[asyncio.Task] = None
+
+    def difundir(self, **datos):
+        """Avisar a los otros workers (desde código sincrónico, ver difundir())"""
+        difundir(self.canal, {"worker": self._worker, **datos})
+
+    async def escuchar(self):
+        """Empezar a aplicar las de los demás (startup, después de iniciar())"""
+        if self._tarea is None:
+            listo = asyncio.Event()
+            self._tarea = asyncio.get_running_loop().create_task(self._escuchar(listo))
+            await listo.wait()
+
+    async def _escuchar(self, listo: asyncio.Event):
+        async with suscribir(self.canal) as cola:
+            listo.set()
+            while True:
+                evento = await cola.get()
+                if evento is DESBORDE:
+                    self.descartar()
+                elif evento.get("worker") != self._worker:
+                    self.aplicar(evento)
+
+    def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
@@ -0,0 +1,138 @@
+# backend/app/core/respuesta_archivo.py
+"""
+Respuesta de archivo con soporte de Range, ETag y envío zero-copy.
+
+La FileResponse de Starlette (0.27) no atiende Range: un visor como PDF.js
+termina bajando el archivo entero y una descarga cortada no se puede
+retomar. Acá se resuelven If-None-Match (304), If-Range y un rango único
+(206 / 416). Si el servidor ASGI ofrece las extensiones
+http.response.pathsend o http.response.zerocopy, el cuerpo lo envía el
+kernel (sendfile); si no, se lee por bloques con aiofiles.
+"""
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import aiofiles
+from fastapi import Request, Response
+
+TAMANIO_BLOQUE = 64 * 1024
+_RE_RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _coincide_etag(cabecera: Optional[str], etag: str) -> bool:
+    if not cabecera:
+        return False
+    if cabecera.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: W/"x" equivale a "x"
+    limpio = etag.removeprefix("W/")
+    return any(e.strip().removeprefix("W/") == limpio for e in cabecera.split(","))
+
+
+def _rango_pedido(cabecera: Optional[str], tamanio: int) -> Optional[Tuple[int, int]]:
+    """(inicio, fin) inclusivo del Range pedido; None = archivo completo; ValueError = insatisfacible"""
+    if not cabecera:
+        return None
+    m = _RE_RANGO.match(cabecera.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None  # Multi-rango o sintaxis desconocida: se responde el archivo entero (RFC 9110)
+
+    if m.group(1):
+        inicio = int(m.group(1))
+        fin = int(m.group(2)) if m.group(2) else tamanio - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        inicio = max(0, tamanio - int(m.group(2)))
+        fin = tamanio - 1
+
+    fin = min(fin, tamanio - 1)
+    if inicio >= tamanio or inicio > fin:
+        raise ValueError("Rango insatisfacible")
+    return inicio, fin
+
+
+class _CuerpoArchivo(Response):
+    """Envía los bytes [inicio, fin] del archivo sin cargarlo en memoria"""
+
+    def __init__(self, ruta: str, inicio: int, fin: int, tamanio: int, status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.ruta = ruta
+        self.inicio = inicio
+        self.fin = fin
+        self.tamanio = tamanio
+        self.headers["content-length"] = str(fin - inicio + 1)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        extensiones = scope.get("extensions") or {}
+        cantidad = self.fin - self.inicio + 1
+        if "http.response.pathsend" in extensiones and cantidad == self.tamanio:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.ruta)})
+            return
+        if "http.response.zerocopy" in extensiones:
+            with open(self.ruta, "rb") as archivo:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": archivo,
+                    "offset": self.inicio,
+                    "count": cantidad,
+                    "more_body": False,
+                })
+            return
+
+        async with aiofiles.open(self.ruta, "rb") as archivo:
+            await archivo.seek(self.inicio)
+            restante = cantidad
+            while restante > 0:
+                bloque = await archivo.read(min(TAMANIO_BLOQUE, restante))
+                if not bloque:
+                    break
+                restante -= len(bloque)
+                await send({"type": "http.response.body", "body": bloque, "more_body": restante > 0})
+        if restante > 0:
+            # El archivo se achicó mientras se enviaba: cerrar el cuerpo igual
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def responder(request: Request, ruta: str, nombre: str, etag: str, cache_control: str,
+              inline: bool = False) -> Response:
+    """Respuesta 200/206/304/416 para servir ruta como descarga de nombre (inline: para mostrar en la página)"""
+    tamanio = os.path.getsize(ruta)
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+
+    if _coincide_etag(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+    headers["content-type"] = media_type
+    disposicion = "inline" if inline else "attachment"
+    headers["content-disposition"] = f"{disposicion}; filename*=utf-8''{quote(nombre)}"
+
+    # If-Range: el rango solo vale si el archivo sigue siendo el mismo (ETag fuerte)
+    cabecera_rango = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if cabecera_rango and if_range and (etag.startswith("W/") or if_range.strip() != etag):
+        cabecera_rango = None
+
+    try:
+        rango = _rango_pedido(cabecera_rango, tamanio)
+    except ValueError:
+        headers.pop("content-type")
+        headers.pop("content-disposition")
+        headers["content-range"] = f"bytes */{tamanio}"
+        return Response(status_code=416, headers=headers)
+
+    if rango is None:
+        return _CuerpoArchivo(ruta, 0, max(tamanio - 1, -1), tamanio, 200, headers)
+
+    inicio, fin = rango
+    headers["content-range"] = f"bytes {inicio}-{fin}/{tamanio}"
+    return _CuerpoArchivo(ruta, inicio, fin, tamanio, 206, headers)
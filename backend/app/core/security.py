@@ -1,19 +1,28 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+import hashlib
+import secrets
+import uuid
 from jose import jwt, JWTError
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.models import Usuario
+from app.models.models import TokenFeed, Usuario
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+oauth2_scheme_opcional = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 # Configuración básica
 SECRET_KEY = "TU_CLAVE_SECRETA_SUPER_SEGURA_AQUÍ"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 1 día
+STREAM_TOKEN_EXPIRE_MINUTES = 15  # solo se mira al conectar el stream
+
+# Alcances de los tokens que viajan en la URL (?token=): nunca el de sesión
+ALCANCE_CALENDARIO = "calendario"
+ALCANCE_MENSAJES = "mensajes"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -30,15 +39,91 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+    return _usuario_desde_token(db, token)
+
+def create_stream_token(usuario_id: str):
+    """JWT corto que solo sirve para abrir los streams de mensajes (EventSource no manda headers)"""
+    expire = datetime.utcnow() + timedelta(minutes=STREAM_TOKEN_EXPIRE_MINUTES)
+    return jwt.encode(
+        {"sub": usuario_id, "alcance": ALCANCE_MENSAJES, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM
+    )
+
+def _hash_token_feed(token: str):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def crear_token_feed(db: Session, usuario_id: str, alcance: str = ALCANCE_CALENDARIO):
+    """Token nuevo para el feed (revoca el anterior del mismo alcance); se guarda solo el hash, sin commit"""
+    revocar_token_feed(db, usuario_id, alcance)
+    token = secrets.token_urlsafe(32)
+    db.add(TokenFeed(
+        id=f"tfeed_{uuid.uuid4().hex[:10]}",
+        usuario_id=usuario_id,
+        alcance=alcance,
+        token_hash=_hash_token_feed(token),
+        fecha_creacion=datetime.now()
+    ))
+    return token
+
+def revocar_token_feed(db: Session, usuario_id: str, alcance: str = ALCANCE_CALENDARIO):
+    """Borrar el token del feed (sin commit); True si había uno"""
+    borrados = db.query(TokenFeed).filter(
+        TokenFeed.usuario_id == usuario_id, TokenFeed.alcance == alcance
+    ).delete(synchronize_session=False)
+    return borrados > 0
+
+def get_current_user_calendario(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Query(None),
+    bearer: Optional[str] = Depends(oauth2_scheme_opcional)
+):
+    """Como get_current_user, pero acepta en ?token= el token del feed de calendario"""
+    if bearer:
+        return _usuario_desde_token(db, bearer)
+    return _usuario_desde_token_feed(db, token, ALCANCE_CALENDARIO)
+
+def get_current_user_stream(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Query(None),
+    bearer: Optional[str] = Depends(oauth2_scheme_opcional)
+):
+    """Como get_current_user, pero acepta en ?token= el token corto de los streams"""
+    if bearer:
+        return _usuario_desde_token(db, bearer)
+    return _usuario_desde_token(db, token, ALCANCE_MENSAJES)
+
+def _usuario_desde_token_feed(db: Session, token: Optional[str], alcance: str):
+    if not token:
+        raise _credenciales_invalidas()
+    fila = db.query(TokenFeed).filter(
+        TokenFeed.token_hash == _hash_token_feed(token), TokenFeed.alcance == alcance
+    ).first()
+    user = db.query(Usuario).filter(Usuario.id == fila.usuario_id).first() if fila else None
+    if user is None:
+        raise _credenciales_invalidas()
+
+    # Los clientes de calendario consultan cada pocos minutos: una escritura por hora alcanza
+    ahora = datetime.now()
+    if fila.ultimo_uso is None or fila.ultimo_uso < ahora - timedelta(hours=1):
+        fila.ultimo_uso = ahora
+        db.commit()
+    return user
+
+def _credenciales_invalidas():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar el acceso",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _usuario_desde_token(db: Session, token: Optional[str], alcance: Optional[str] = None):
+    credentials_exception = _credenciales_invalidas()
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        # Un token con alcance solo sirve para lo suyo, y el de sesión para todo lo demás
+        if user_id is None or payload.get("alcance") != alcance:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./academica.db"
 
@@ -12,4 +13,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def insertar_con_conflicto(db: Session):
+    """insert() del dialecto de la sesión, el que tiene on_conflict_do_update (SQLite o PostgreSQL)"""
+    return (postgresql if db.get_bind().dialect.name == "postgresql" else sqlite).insert
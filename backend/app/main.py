@@ -1,13 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from app.core.limite_body import LimiteTamanioBody
+from app.core import pubsub
+from app.services import (
+    almacenamiento_service, companeros_service, contadores_service, estadisticas_comunidad_service,
+    perfil_service, presencia_service, recomendaciones_service, tendencias_service
+)
+from app.services.almacenamiento_service import MAX_TAMANIO_APUNTE
+from app.services.calendario_import_service import MAX_TAMANIO_CALENDARIO
 from app.routes import materias
 from app.routes import auth
 from app.routes import social
 
 
-# Crear las tablas al iniciar
-Base.metadata.create_all(bind=engine)
+# El esquema lo maneja Alembic: correr `alembic upgrade head` antes de levantar
+# el servidor. Al iniciar no se refleja ni se crea ninguna tabla, así cada
+# worker arranca sin inspeccionar la base.
 
 app = FastAPI(
     title="Track Académico RPG API",
@@ -15,6 +23,16 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Uploads: el body se corta antes de parsearse (margen para los campos del
+# formulario). Se registra antes que CORS para que el 413 también lleve sus headers
+app.add_middleware(
+    LimiteTamanioBody,
+    limites={
+        "/api/social/apuntes": MAX_TAMANIO_APUNTE + 64 * 1024,
+        "/api/calendario/importar-pdf": MAX_TAMANIO_CALENDARIO + 64 * 1024,
+    }
+)
+
 # Configuración de CORS para que React pueda conectarse
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +46,58 @@ app.include_router(materias.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(social.router, prefix="/api/social", tags=["Social"])
 
+@app.on_event("startup")
+def iniciar_tendencias():
+    # Los rankings del feed se recalculan en segundo plano, no por request
+    tendencias_service.iniciar()
+
+@app.on_event("startup")
+def iniciar_estadisticas_comunidad():
+    # La foto de la comunidad (y su serie diaria) se calcula cada pocos minutos
+    estadisticas_comunidad_service.iniciar()
+
+@app.on_event("startup")
+def iniciar_perfiles():
+    # Las tarjetas de perfil invalidadas o viejas se recalculan en segundo plano
+    perfil_service.iniciar()
+
+@app.on_event("startup")
+def iniciar_barrido_blobs():
+    # Blobs que liberar() salteó o que quedaron sin apunte se borran cada tanto
+    almacenamiento_service.iniciar()
+
+@app.on_event("startup")
+def iniciar_recomendaciones():
+    # Índices en memoria: usuario x materia (compañeros) e integrantes de grupos
+    companeros_service.iniciar()
+    recomendaciones_service.iniciar()
+
+@app.on_event("startup")
+async def iniciar_eventos_en_vivo():
+    # Chat y presencia: con PUBSUB_SOCKET los workers comparten los eventos
+    pubsub.configurar_desde_entorno()
+    await pubsub.iniciar()
+    await presencia_service.iniciar()
+    # Los índices en memoria de cada worker se enteran de lo que invalidan los demás
+    await companeros_service.escuchar_invalidaciones()
+    await recomendaciones_service.escuchar_invalidaciones()
+
+@app.on_event("shutdown")
+def volcar_contadores():
+    # Las descargas acumuladas en memoria no se pierden al apagar
+    contadores_service.detener()
+    tendencias_service.detener()
+    recomendaciones_service.detener()
+    companeros_service.detener()
+    perfil_service.detener()
+    estadisticas_comunidad_service.detener()
+    almacenamiento_service.detener()
+
+@app.on_event("shutdown")
+async def detener_eventos_en_vivo():
+    presencia_service.detener()
+    await pubsub.detener()
+
 @app.get("/")
 def read_root():
     return {
@@ -30,7 +30,8 @@ usuarios_grupos = Table(
     Column('usuario_id', String(50), ForeignKey('usuarios.id'), primary_key=True),
     Column('rol', String(50), default='integrante'),
     Column('fecha_union', DateTime, default=func.now()),
-    Column('estado', String(50), default='activo')
+    Column('estado', String(50), default='activo'),
+    Index('idx_grupos_integrantes_usuario', 'usuario_id')
 )
 
 # Tabla intermedia para profesores y materias
@@ -51,7 +52,9 @@ apuntes_calificaciones = Table(
     Column('usuario_id', String(50), ForeignKey('usuarios.id'), primary_key=True),
     Column('calificacion', Integer, nullable=False),
     Column('comentario', Text),
-    Column('fecha', DateTime, default=func.now())
+    Column('fecha', DateTime, default=func.now()),
+    # Ventana reciente para las tendencias
+    Index('idx_calificaciones_fecha', 'fecha')
 )
 
 # Tabla intermedia para asistentes a sesiones de grupo
@@ -140,6 +143,21 @@ class Usuario(Base):
     estadisticas = relationship("EstadisticaUsuario", back_populates="usuario", uselist=False)
 
 
+class TokenFeed(Base):
+    __tablename__ = "tokens_feed"
+
+    id = Column(String(50), primary_key=True)
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    alcance = Column(String(20), nullable=False)  # calendario
+    token_hash = Column(String(64), unique=True, nullable=False)  # sha256 del token, nunca el token
+    fecha_creacion = Column(DateTime, nullable=False)
+    ultimo_uso = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'alcance', name='uq_token_feed_usuario_alcance'),
+    )
+
+
 class Materia(Base):
     __tablename__ = "materias"
 
@@ -219,7 +237,8 @@ class InscripcionMateria(Base):
 
     __table_args__ = (
         UniqueConstraint('usuario_id', 'materia_id', 'intento', name='uq_inscripcion_usuario_materia_intento'),
-        Index('idx_inscripciones_usuario', 'usuario_id'),
+        # Cubre también los filtros solo por usuario_id (prefijo)
+        Index('idx_inscripciones_usuario_materia_estado', 'usuario_id', 'materia_id', 'estado'),
         Index('idx_inscripciones_materia', 'materia_id'),
         Index('idx_inscripciones_estado', 'estado'),
     )
@@ -259,10 +278,14 @@ class Nota(Base):
     fecha_creacion = Column(DateTime, default=func.now())
 
     __table_args__ = (
-        Index('idx_notas_usuario', 'usuario_id'),
         Index('idx_notas_materia', 'materia_id'),
         Index('idx_notas_fecha', 'fecha'),
         Index('idx_notas_tipo', 'tipo_evaluacion'),
+        Index('idx_notas_inscripcion', 'inscripcion_id'),
+        # Cubre también los filtros solo por usuario_id (prefijo)
+        Index('idx_notas_usuario_fecha', 'usuario_id', 'fecha'),
+        # Promedio del dashboard: usuario + influye_promedio + nota >= 0
+        Index('idx_notas_usuario_promedio', 'usuario_id', 'influye_promedio', 'nota'),
     )
     
     # Relaciones
@@ -292,8 +315,8 @@ class SesionEstudio(Base):
     fecha_creacion = Column(DateTime, default=func.now())
 
     __table_args__ = (
-        Index('idx_sesiones_usuario', 'usuario_id'),
         Index('idx_sesiones_fecha', 'fecha'),
+        Index('idx_sesiones_usuario_fecha', 'usuario_id', 'fecha'),
     )
     
     # Relaciones
@@ -322,6 +345,10 @@ class FlashCard(Base):
     estado = Column(String(50), default='activa')
     fecha_creacion = Column(DateTime, default=func.now())
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_flashcards_usuario_revision', 'usuario_id', 'proxima_revision'),
+    )
     
     # Relaciones
     usuario = relationship("Usuario", back_populates="flashcards")
@@ -371,6 +398,7 @@ class Clase(Base):
 
     __table_args__ = (
         UniqueConstraint('inscripcion_id', 'numero_clase', name='uq_clase_inscripcion_numero'),
+        Index('idx_clases_inscripcion_checkpoint_fecha', 'inscripcion_id', 'es_checkpoint', 'fecha'),
     )
     
     # Relación
@@ -393,12 +421,40 @@ class EventoPlanificacion(Base):
     prioridad = Column(Integer, default=2)
     completado = Column(Boolean, default=False)
     fecha_creacion = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index('idx_eventos_usuario_fecha', 'usuario_id', 'fecha'),
+    )
     
     # Relaciones
     usuario = relationship("Usuario", back_populates="eventos_planificacion")
     materia = relationship("Materia", back_populates="eventos_planificacion")
 
 
+# Importación de calendario en PDF (calendario_import_service): el progreso
+# vive en la base para que el polling funcione desde cualquier worker
+class ImportacionCalendario(Base):
+    __tablename__ = "importaciones_calendario"
+
+    id = Column(String(50), primary_key=True)
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    archivo = Column(String(255), nullable=False)
+    estado = Column(String(20), nullable=False, default='pendiente')  # pendiente, procesando, completado, error
+    paginas_totales = Column(Integer, default=0, nullable=False)
+    paginas_procesadas = Column(Integer, default=0, nullable=False)
+    progreso = Column(Integer, default=0, nullable=False)
+    eventos_detectados = Column(Integer, default=0, nullable=False)
+    eventos_creados = Column(Integer, default=0, nullable=False)
+    notas_creadas = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    fecha_inicio = Column(DateTime, nullable=False)
+    fecha_fin = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_importaciones_calendario_fecha_fin', 'fecha_fin'),
+    )
+
+
 class Profesor(Base):
     __tablename__ = "profesores"
 
@@ -480,8 +536,8 @@ class LogroDesbloqueado(Base):
 
     __table_args__ = (
         UniqueConstraint('logro_id', 'usuario_id', name='uq_logro_usuario'),
-        Index('idx_logros_desbloqueados_usuario', 'usuario_id'),
-        Index('idx_logros_desbloqueados_logro', 'logro_id'),
+        # Índice cubriente para "qué logros tiene el usuario" (SELECT logro_id WHERE usuario_id = ?)
+        Index('idx_logros_desbloqueados_usuario_logro', 'usuario_id', 'logro_id'),
     )
     
     # Relaciones
@@ -531,6 +587,9 @@ class GrupoEstudio(Base):
 
     __table_args__ = (
         Index('idx_grupos_creador', 'creador_id'),
+        # Listado de grupos por última actividad (keyset sobre fecha_actualizacion, id)
+        Index('idx_grupos_actividad', 'fecha_actualizacion', 'id'),
+        Index('idx_grupos_materia_actividad', 'materia_id', 'fecha_actualizacion', 'id'),
     )
     
     # Relaciones
@@ -555,12 +614,50 @@ class SesionGrupo(Base):
     asistentes = Column(Integer, default=0)
     satisfaccion = Column(Integer, default=0)
     fecha_creacion = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Sesiones de los grupos en un rango de fechas (agenda del grupo)
+        Index('idx_sesiones_grupo_grupo_fecha', 'grupo_id', 'fecha'),
+    )
     
     # Relaciones
     grupo = relationship("GrupoEstudio", back_populates="sesiones")
     asistentes_rel = relationship("Usuario", secondary=sesiones_grupo_asistentes, backref="sesiones_asistidas")
 
 
+# Chat de grupo: solo se agregan filas (nunca se editan); el id creciente es el cursor
+class MensajeGrupo(Base):
+    __tablename__ = "mensajes_grupo"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    grupo_id = Column(String(50), ForeignKey("grupos_estudio.id"), nullable=False)
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    contenido = Column(Text, nullable=False)
+    tipo = Column(String(20), default='texto')
+    recurso_url = Column(String(500))
+    fecha = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_mensajes_grupo_grupo_id', 'grupo_id', 'id'),
+    )
+
+
+# Chat privado: conversacion = los dos usuario_id ordenados ("a|b")
+class MensajePrivado(Base):
+    __tablename__ = "mensajes_privados"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    conversacion = Column(String(101), nullable=False)
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    receptor_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    contenido = Column(Text, nullable=False)
+    fecha = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_mensajes_privados_conversacion_id', 'conversacion', 'id'),
+    )
+
+
 class ApunteCompartido(Base):
     __tablename__ = "apuntes_compartidos"
 
@@ -572,17 +669,30 @@ class ApunteCompartido(Base):
     contenido = Column(Text)
     formato = Column(String(50), default='texto')
     url_archivo = Column(String(500))
+    # Blob en uploads/blobs (ver almacenamiento_service); varios apuntes pueden compartirlo
+    archivo_sha256 = Column(String(64))
+    archivo_tamanio = Column(Integer)
+    # Vista previa de PDFs (ver vista_previa_service); NULL = todavía no se generó
+    paginas = Column(Integer)
+    tiene_miniatura = Column(Boolean, default=False)
     compartido_publicamente = Column(Boolean, default=False)
     veces_descargado = Column(Integer, default=0)
     veces_visto = Column(Integer, default=0)
     calificacion_promedio = Column(Float, default=0.0)
     total_calificaciones = Column(Integer, default=0)
+    # Agregado incremental y promedio bayesiano (ver calificaciones_service); sin votos vale el prior
+    suma_calificaciones = Column(Integer, default=0)
+    puntaje_ranking = Column(Float, default=3.0)
     fecha_compartido = Column(DateTime, default=func.now())
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now())
     activo = Column(Boolean, default=True)
 
     __table_args__ = (
         Index('idx_apuntes_usuario', 'usuario_id'),
+        Index('idx_apuntes_archivo_sha256', 'archivo_sha256'),
+        # Orden del muro (GET /social/apuntes), general y por materia
+        Index('idx_apuntes_ranking', 'compartido_publicamente', 'puntaje_ranking', 'veces_descargado'),
+        Index('idx_apuntes_materia_ranking', 'materia_id', 'compartido_publicamente', 'puntaje_ranking', 'veces_descargado'),
     )
     
     # Relaciones
@@ -591,12 +701,68 @@ class ApunteCompartido(Base):
     calificaciones = relationship("Usuario", secondary=apuntes_calificaciones, backref="apuntes_calificados")
 
 
+# Descargas de un apunte por día (las suma contadores_service al volcar)
+class DescargaDiaria(Base):
+    __tablename__ = "apuntes_descargas_diarias"
+
+    apunte_id = Column(String(50), ForeignKey("apuntes_compartidos.id"), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_descargas_diarias_fecha', 'fecha'),
+    )
+
+
+# Ranking precalculado por tendencias_service (unas decenas de filas por tipo)
+class Tendencia(Base):
+    __tablename__ = "tendencias"
+
+    tipo = Column(String(20), primary_key=True)  # apunte, materia, tag, materia_popular, usuario_activo
+    clave = Column(String(100), primary_key=True)
+    etiqueta = Column(String(200))
+    puntaje = Column(Float, nullable=False)
+    cantidad = Column(Integer, default=0)
+    fecha_calculo = Column(DateTime, nullable=False)
+
+
+# Foto diaria de la comunidad (estadisticas_comunidad_service): una fila por
+# carrera y día, más carrera_id 'todas'; la del día se reescribe en cada cálculo
+class EstadisticaComunidad(Base):
+    __tablename__ = "estadisticas_comunidad"
+
+    carrera_id = Column(String(50), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    usuarios = Column(Integer, default=0, nullable=False)
+    usuarios_activos = Column(Integer, default=0, nullable=False)  # con login en la última semana
+    grupos = Column(Integer, default=0, nullable=False)
+    grupos_activos = Column(Integer, default=0, nullable=False)
+    apuntes = Column(Integer, default=0, nullable=False)  # públicos
+    tutorias = Column(Integer, default=0, nullable=False)  # completadas
+    agradecimientos = Column(Integer, default=0, nullable=False)
+    fecha_calculo = Column(DateTime, nullable=False)
+
+
+# Tarjeta de perfil público precalculada por perfil_service (una fila por usuario).
+# Las escrituras suben version; la tarjeta está al día si version_calculada == version
+class PerfilPublico(Base):
+    __tablename__ = "perfiles_publicos"
+
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), primary_key=True)
+    datos = Column(Text)  # JSON listo para responder
+    etag = Column(String(40))
+    version = Column(Integer, default=0, server_default='0', nullable=False)
+    version_calculada = Column(Integer, default=-1, server_default='-1', nullable=False)
+    fecha_calculo = Column(DateTime)
+
+
 class Tutoria(Base):
     __tablename__ = "tutorias"
 
     id = Column(String(50), primary_key=True)
     tutor_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
-    estudiante_id = Column(String(50), ForeignKey("usuarios.id"), nullable=False)
+    # NULL mientras la tutoría está publicada y nadie la tomó (estado 'disponible')
+    estudiante_id = Column(String(50), ForeignKey("usuarios.id"))
     materia_id = Column(String(50), ForeignKey("materias.id"), nullable=False)
     titulo = Column(String(200), nullable=False)
     descripcion = Column(Text)
@@ -620,6 +786,8 @@ class Tutoria(Base):
     __table_args__ = (
         Index('idx_tutorias_tutor', 'tutor_id'),
         Index('idx_tutorias_estudiante', 'estudiante_id'),
+        # Búsqueda de tutorías disponibles de una materia en un rango de fechas
+        Index('idx_tutorias_materia_estado_fecha', 'materia_id', 'estado', 'fecha'),
     )
     
     # Relaciones
@@ -644,6 +812,23 @@ class Agradecimiento(Base):
     receptor = relationship("Usuario", foreign_keys=[receptor_id], back_populates="agradecimientos_receptor")
     materia = relationship("Materia", back_populates="agradecimientos")
 
+    __table_args__ = (
+        # Feeds de recibidos y enviados con paginación keyset por (fecha, id)
+        Index('idx_agradecimientos_receptor_fecha', 'receptor_id', 'fecha', 'id'),
+        Index('idx_agradecimientos_emisor_fecha', 'emisor_id', 'fecha', 'id'),
+    )
+
+
+# Agradecimientos por usuario y tipo: los suma agradecimientos_service en la
+# misma transacción que el agradecimiento; logros y perfil los leen sin contar filas
+class AgradecimientoContador(Base):
+    __tablename__ = "agradecimientos_contadores"
+
+    usuario_id = Column(String(50), ForeignKey("usuarios.id"), primary_key=True)
+    tipo = Column(String(50), primary_key=True)
+    recibidos = Column(Integer, default=0, server_default='0', nullable=False)
+    enviados = Column(Integer, default=0, server_default='0', nullable=False)
+
 
 # ============================
 # MODELOS PARA LOGROS NEGATIVOS/DESAFÍOS
@@ -765,6 +950,18 @@ class EstadisticaUsuario(Base):
     mejor_promedio_cuatri = Column(Float, default=0.0)
     racha_actual_dias = Column(Integer, default=0)
     mejor_racha_dias = Column(Integer, default=0)
+    # Contadores sociales: se suman en la misma transacción que la escritura que
+    # los cambia (estadisticas_service) y los logros los leen sin contar filas
+    grupos_integrante = Column(Integer, default=0, server_default='0', nullable=False)
+    apuntes_compartidos = Column(Integer, default=0, server_default='0', nullable=False)
+    tutorias_dadas = Column(Integer, default=0, server_default='0', nullable=False)
+    sesiones_grupo_organizadas = Column(Integer, default=0, server_default='0', nullable=False)
+    sesiones_grupo_asistidas = Column(Integer, default=0, server_default='0', nullable=False)
+    tutorias_exitosas = Column(Integer, default=0, server_default='0', nullable=False)
+    # Reputación como tutor: promedio bayesiano de calificacion_tutor (tutorias_service)
+    tutorias_calificadas = Column(Integer, default=0, server_default='0', nullable=False)
+    suma_calificaciones_tutor = Column(Integer, default=0, server_default='0', nullable=False)
+    reputacion_tutor = Column(Float, default=3.0, server_default='3.0', nullable=False)
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relación
@@ -1,6 +1,11 @@
 # backend/app/routes/materias.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    insert, update, select, union_all, bindparam, case, func,
+    literal, cast, type_coerce, null, String, Time
+)
 from app.database import get_db
 from app.models.models import (
     Materia, InscripcionMateria, Nota, Profesor, Clase, 
@@ -9,14 +14,25 @@ from app.models.models import (
     Usuario, Carrera, MazoFlashCard
 )
 from app.services.logros_service import LogroService  # Importar el servicio de logros
-from pydantic import BaseModel
+from app.services import calendario_import_service, companeros_service, perfil_service
+from pydantic import BaseModel, ValidationError
 from typing import Optional, List
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 import uuid
-from app.core.security import get_current_user
+import csv
+import io
+import hashlib
+import aiofiles
+from app.core.security import crear_token_feed, get_current_user, get_current_user_calendario, revocar_token_feed
 
 router = APIRouter()
 
+# Tamaño de bloque para guardar en disco los PDF de calendario
+CHUNK_IMPORTACION = 1024 * 1024
+
+# Días hacia atrás que incluye por defecto el feed .ics
+DIAS_HISTORIAL_ICS = 180
+
 # --- SCHEMAS ACTUALIZADOS (sin usuario_id) ---
 class NotaCreate(BaseModel):
     inscripcion_id: str
@@ -117,10 +133,216 @@ def verificar_logros_usuario(db: Session, usuario_id: str):
         logros_desbloqueados = LogroService.verificar_y_desbloquear_logros(db, usuario_id)
         if logros_desbloqueados:
             print(f"🎉 Nuevos logros desbloqueados para usuario {usuario_id}: {logros_desbloqueados}")
-        return logros_desbloqueados
     except Exception as e:
         print(f"⚠️ Error verificando logros: {e}")
-        return []
+        db.rollback()
+        logros_desbloqueados = []
+
+    # Inscripciones, notas, sesiones y logros: todo lo que pasa por acá cambia el perfil público
+    perfil_service.invalidar(db, usuario_id)
+    db.commit()
+    return logros_desbloqueados
+
+# --- FUNCIONES AUXILIARES PARA IMPORTACIÓN MASIVA ---
+def _leer_csv(archivo: UploadFile, schema) -> list:
+    """Parsear un CSV subido y validar cada fila contra el schema indicado"""
+    try:
+        texto = archivo.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El CSV debe estar codificado en UTF-8")
+
+    filas = []
+    for numero_fila, fila in enumerate(csv.DictReader(io.StringIO(texto)), start=2):
+        # Las celdas vacías se toman como "no informado" para usar el default del schema
+        valores = {
+            k.strip(): v.strip() for k, v in fila.items()
+            if k and isinstance(v, str) and v.strip() != ""
+        }
+        try:
+            filas.append(schema(**valores))
+        except ValidationError as e:
+            error = e.errors()[0]
+            campo = ".".join(str(loc) for loc in error["loc"])
+            raise HTTPException(
+                status_code=400,
+                detail=f"Fila {numero_fila} inválida ({campo}): {error['msg']}"
+            )
+    return filas
+
+def _inscripciones_del_usuario(db: Session, usuario_id: str, inscripcion_ids: set) -> dict:
+    """Validar en una sola consulta IN que todas las inscripciones pertenezcan al usuario"""
+    inscripciones = db.query(InscripcionMateria).filter(
+        InscripcionMateria.id.in_(inscripcion_ids),
+        InscripcionMateria.usuario_id == usuario_id
+    ).all()
+    por_id = {i.id: i for i in inscripciones}
+
+    faltantes = sorted(inscripcion_ids - por_id.keys())
+    if faltantes:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Inscripciones no encontradas: {', '.join(faltantes)}"
+        )
+    return por_id
+
+def _importar_notas(db: Session, usuario_id: str, data: List[NotaCreate]):
+    """Insertar un lote de notas en una única transacción"""
+    if not data:
+        raise HTTPException(status_code=400, detail="No se recibieron notas para importar")
+
+    inscripciones = _inscripciones_del_usuario(db, usuario_id, {n.inscripcion_id for n in data})
+    ahora = datetime.now()
+
+    filas = []
+    finales_aprobados = {}  # inscripcion_id -> nota final aprobada más reciente del lote
+    for n in data:
+        aprobada = n.nota >= 4 if n.nota >= 0 else False
+        filas.append({
+            "id": f"nota_{uuid.uuid4().hex[:10]}",
+            "inscripcion_id": n.inscripcion_id,
+            "usuario_id": usuario_id,
+            "materia_id": inscripciones[n.inscripcion_id].materia_id,
+            "tipo_evaluacion": n.tipo_evaluacion,
+            "numero_evaluacion": n.numero_evaluacion,
+            "titulo": n.titulo,
+            "nota": n.nota,
+            "fecha": n.fecha,
+            "es_parcial": n.es_parcial,
+            "es_final": n.es_final,
+            "es_tp": n.es_tp,
+            "es_recuperatorio": n.es_recuperatorio,
+            "influye_promedio": n.influye_promedio,
+            "aprobada": aprobada,
+            "cuatrimestre": n.cuatrimestre,
+            "observaciones": n.observaciones,
+            "fecha_creacion": ahora
+        })
+
+        if n.es_final and aprobada:
+            previa = finales_aprobados.get(n.inscripcion_id)
+            if previa is None or n.fecha >= previa.fecha:
+                finales_aprobados[n.inscripcion_id] = n
+
+    # Un único INSERT ejecutado con executemany
+    db.execute(insert(Nota.__table__), filas)
+
+    # Un único UPDATE (executemany) para las inscripciones que quedan aprobadas
+    if finales_aprobados:
+        tabla = InscripcionMateria.__table__
+        db.execute(
+            update(tabla).where(tabla.c.id == bindparam("b_id")).values(
+                estado="aprobada",
+                fecha_aprobacion=bindparam("b_fecha"),
+                nota_final=bindparam("b_nota"),
+                estado_final=bindparam("b_estado_final"),
+                fecha_actualizacion=ahora
+            ),
+            [
+                {
+                    "b_id": insc_id,
+                    "b_fecha": n.fecha,
+                    "b_nota": n.nota,
+                    "b_estado_final": "promocionado" if n.nota >= 7 else "aprobado"
+                } for insc_id, n in finales_aprobados.items()
+            ]
+        )
+
+    db.commit()
+    if finales_aprobados:
+        companeros_service.invalidar_usuario(usuario_id)
+
+    # VERIFICAR LOGROS una sola vez al final del lote
+    logros_desbloqueados = verificar_logros_usuario(db, usuario_id)
+
+    return {
+        "status": "ok",
+        "total_importadas": len(filas),
+        "ids": [f["id"] for f in filas],
+        "inscripciones_aprobadas": list(finales_aprobados.keys()),
+        "logros_desbloqueados": logros_desbloqueados
+    }
+
+def _importar_clases(db: Session, usuario_id: str, data: List[ClaseCreate]):
+    """Insertar un lote de clases en una única transacción"""
+    if not data:
+        raise HTTPException(status_code=400, detail="No se recibieron clases para importar")
+
+    inscripcion_ids = {c.inscripcion_id for c in data}
+    _inscripciones_del_usuario(db, usuario_id, inscripcion_ids)
+
+    # Números de clase repetidos dentro del propio lote
+    claves = [(c.inscripcion_id, c.numero_clase) for c in data]
+    if len(set(claves)) != len(claves):
+        raise HTTPException(status_code=400, detail="El lote contiene números de clase repetidos")
+
+    # Números de clase que ya existen en la base (una sola consulta)
+    existentes = set(db.query(Clase.inscripcion_id, Clase.numero_clase).filter(
+        Clase.inscripcion_id.in_(inscripcion_ids),
+        Clase.numero_clase.in_({c.numero_clase for c in data})
+    ).all())
+    repetidas = [f"{i}#{n}" for i, n in claves if (i, n) in existentes]
+    if repetidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Ya existen clases con esos números: {', '.join(repetidas)}"
+        )
+
+    filas = []
+    agregados = {}  # inscripcion_id -> [clases completadas, mayor número de clase]
+    ahora = datetime.now()
+    for c in data:
+        filas.append({
+            "id": f"clase_{uuid.uuid4().hex[:10]}",
+            "inscripcion_id": c.inscripcion_id,
+            "numero_clase": c.numero_clase,
+            "titulo": c.titulo,
+            "descripcion": c.descripcion,
+            "fecha": c.fecha,
+            "hora_inicio": c.hora_inicio,
+            "hora_fin": c.hora_fin,
+            "duracion_minutos": c.duracion_minutos,
+            "es_checkpoint": c.es_checkpoint,
+            "tipo_checkpoint": c.tipo_checkpoint,
+            "asistio": c.asistio,
+            "participacion": c.participacion,
+            "completada": c.completada,
+            "resumen": c.resumen,
+            "notas": c.notas,
+            "fecha_creacion": ahora
+        })
+        agg = agregados.setdefault(c.inscripcion_id, [0, 0])
+        agg[0] += 1 if c.completada else 0
+        agg[1] = max(agg[1], c.numero_clase)
+
+    db.execute(insert(Clase.__table__), filas)
+
+    # Progreso y total de clases se actualizan en la base (sin leer-modificar-escribir en Python)
+    tabla = InscripcionMateria.__table__
+    db.execute(
+        update(tabla).where(tabla.c.id == bindparam("b_id")).values(
+            progreso_clases=func.coalesce(tabla.c.progreso_clases, 0) + bindparam("b_completadas"),
+            total_clases=case(
+                (func.coalesce(tabla.c.total_clases, 0) < bindparam("b_max_numero"), bindparam("b_max_numero")),
+                else_=tabla.c.total_clases
+            )
+        ),
+        [
+            {"b_id": insc_id, "b_completadas": completadas, "b_max_numero": max_numero}
+            for insc_id, (completadas, max_numero) in agregados.items()
+        ]
+    )
+
+    db.commit()
+
+    # VERIFICAR LOGROS una sola vez al final del lote
+    logros_desbloqueados = verificar_logros_usuario(db, usuario_id)
+
+    return {
+        "status": "ok",
+        "total_importadas": len(filas),
+        "ids": [f["id"] for f in filas],
+        "logros_desbloqueados": logros_desbloqueados
+    }
 
 # --- RUTAS DE MATERIAS Y DASHBOARD ---
 
@@ -328,6 +550,7 @@ def crear_inscripcion(
     db.add(nueva_insc)
     db.commit()
     db.refresh(nueva_insc)
+    companeros_service.invalidar_usuario(usuario_id)
     
     # VERIFICAR LOGROS después de crear inscripción
     verificar_logros_usuario(db, usuario_id)
@@ -392,6 +615,8 @@ def update_inscripcion(
     
     insc.fecha_actualizacion = datetime.now()
     db.commit()
+    if 'estado' in data:
+        companeros_service.invalidar_usuario(usuario_id)
     
     # VERIFICAR LOGROS después de actualizar inscripción
     verificar_logros_usuario(db, usuario_id)
@@ -423,6 +648,7 @@ def eliminar_inscripcion(
     # Eliminar la inscripción
     db.delete(insc)
     db.commit()
+    companeros_service.invalidar_usuario(usuario_id)
     
     # VERIFICAR LOGROS después de eliminar inscripción
     verificar_logros_usuario(db, usuario_id)
@@ -513,6 +739,8 @@ def crear_nota(
         inscripcion.estado_final = "promocionado" if data.nota >= 7 else "aprobado"
     
     db.commit()
+    if data.es_final and aprobada and data.nota >= 4:
+        companeros_service.invalidar_usuario(usuario_id)
     db.refresh(nueva_nota)
     
     # VERIFICAR LOGROS después de crear nota
@@ -526,6 +754,24 @@ def crear_nota(
     
     return response
 
+@router.post("/notas/bulk")
+def crear_notas_bulk(
+    data: List[NotaCreate],
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Importar muchas notas de una vez para el usuario autenticado"""
+    return _importar_notas(db, current_user.id, data)
+
+@router.post("/notas/bulk/csv")
+def crear_notas_bulk_csv(
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Importar notas desde un CSV (una fila por nota, columnas = campos de NotaCreate)"""
+    return _importar_notas(db, current_user.id, _leer_csv(archivo, NotaCreate))
+
 @router.patch("/notas/{nota_id}")
 def actualizar_nota(
     nota_id: str, 
@@ -570,6 +816,8 @@ def actualizar_nota(
                 inscripcion.estado_final = "promocionado" if nota.nota >= 7 else "aprobado"
     
     db.commit()
+    if 'nota' in update_data and nota.es_final and nota.aprobada:
+        companeros_service.invalidar_usuario(usuario_id)
     db.refresh(nota)
     
     # VERIFICAR LOGROS después de actualizar nota (solo si cambió la nota)
@@ -713,6 +961,24 @@ def crear_clase(
     
     return nueva_clase
 
+@router.post("/clases/bulk")
+def crear_clases_bulk(
+    data: List[ClaseCreate],
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Importar muchas clases de una vez para el usuario autenticado"""
+    return _importar_clases(db, current_user.id, data)
+
+@router.post("/clases/bulk/csv")
+def crear_clases_bulk_csv(
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Importar clases desde un CSV (una fila por clase, columnas = campos de ClaseCreate)"""
+    return _importar_clases(db, current_user.id, _leer_csv(archivo, ClaseCreate))
+
 @router.patch("/clases/{clase_id}")
 def actualizar_clase(
     clase_id: str, 
@@ -956,6 +1222,63 @@ def create_sesion(
 
 # --- RUTAS DE CALENDARIO ---
 
+def _consulta_eventos_calendario(usuario_id: str, fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    """UNION ALL de las tres fuentes del calendario, proyectando solo las columnas necesarias"""
+    # Cada rama filtra por (usuario, fecha) para usar los índices compuestos de su tabla
+    rango_notas = [Nota.usuario_id == usuario_id]
+    rango_clases = [InscripcionMateria.usuario_id == usuario_id, Clase.es_checkpoint == True]
+    rango_eventos = [EventoPlanificacion.usuario_id == usuario_id]
+
+    if fecha_inicio:
+        rango_notas.append(Nota.fecha >= fecha_inicio)
+        rango_clases.append(Clase.fecha >= fecha_inicio)
+        rango_eventos.append(EventoPlanificacion.fecha >= fecha_inicio)
+
+    if fecha_fin:
+        rango_notas.append(Nota.fecha <= fecha_fin)
+        rango_clases.append(Clase.fecha <= fecha_fin)
+        rango_eventos.append(EventoPlanificacion.fecha <= fecha_fin)
+
+    # Notas (exámenes)
+    notas = select(
+        literal("nota_").concat(Nota.id).label("id"),
+        Nota.fecha.label("fecha"),
+        literal("examen").label("tipo"),
+        Nota.titulo.label("titulo"),
+        Nota.materia_id.label("materia_id"),
+        literal("#ef4444").label("color"),  # Rojo para exámenes
+        Nota.hora.label("hora_inicio"),
+        type_coerce(null(), Time).label("hora_fin")
+    ).where(*rango_notas)
+
+    # Clases checkpoint (materia_id sale del join, sin cargar la inscripción)
+    clases = select(
+        literal("clase_").concat(Clase.id),
+        Clase.fecha,
+        literal("checkpoint"),
+        Clase.titulo,
+        InscripcionMateria.materia_id,
+        literal("#3b82f6"),  # Azul para checkpoints
+        Clase.hora_inicio,
+        Clase.hora_fin
+    ).join(
+        InscripcionMateria, Clase.inscripcion_id == InscripcionMateria.id
+    ).where(*rango_clases)
+
+    # Eventos de planificación
+    eventos = select(
+        literal("evento_").concat(cast(EventoPlanificacion.id, String)),
+        EventoPlanificacion.fecha,
+        EventoPlanificacion.tipo,
+        EventoPlanificacion.titulo,
+        EventoPlanificacion.materia_id,
+        EventoPlanificacion.color,
+        EventoPlanificacion.hora_inicio,
+        EventoPlanificacion.hora_fin
+    ).where(*rango_eventos)
+
+    return union_all(notas, clases, eventos).order_by("fecha", "hora_inicio")
+
 @router.get("/calendario/eventos")
 def get_eventos_calendario(
     fecha_inicio: Optional[date] = None,
@@ -964,78 +1287,166 @@ def get_eventos_calendario(
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtener eventos para el calendario del usuario autenticado"""
-    usuario_id = current_user.id
-    
-    # Obtener notas (exámenes)
-    query_notas = db.query(Nota).filter(Nota.usuario_id == usuario_id)
-    
-    # Obtener clases checkpoint
-    query_clases = db.query(Clase).join(
-        InscripcionMateria, Clase.inscripcion_id == InscripcionMateria.id
-    ).filter(
-        InscripcionMateria.usuario_id == usuario_id,
-        Clase.es_checkpoint == True
-    )
-    
-    # Obtener eventos de planificación
-    query_eventos = db.query(EventoPlanificacion).filter(
-        EventoPlanificacion.usuario_id == usuario_id
-    )
-    
-    # Aplicar filtros de fecha si se proporcionan
-    if fecha_inicio:
-        query_notas = query_notas.filter(Nota.fecha >= fecha_inicio)
-        query_clases = query_clases.filter(Clase.fecha >= fecha_inicio)
-        query_eventos = query_eventos.filter(EventoPlanificacion.fecha >= fecha_inicio)
-    
-    if fecha_fin:
-        query_notas = query_notas.filter(Nota.fecha <= fecha_fin)
-        query_clases = query_clases.filter(Clase.fecha <= fecha_fin)
-        query_eventos = query_eventos.filter(EventoPlanificacion.fecha <= fecha_fin)
-    
-    notas = query_notas.all()
-    clases = query_clases.all()
-    eventos = query_eventos.all()
-    
-    # Formatear eventos de notas
-    ev_notas = [
-        {
-            "id": f"nota_{n.id}",
-            "fecha": n.fecha,
-            "tipo": "examen",
-            "titulo": n.titulo,
-            "materia_id": n.materia_id,
-            "color": "#ef4444"  # Rojo para exámenes
-        } for n in notas
-    ]
-    
-    # Formatear eventos de clases checkpoint
-    ev_clases = [
-        {
-            "id": f"clase_{c.id}",
-            "fecha": c.fecha,
-            "tipo": "checkpoint",
-            "titulo": c.titulo,
-            "materia_id": c.inscripcion.materia_id if c.inscripcion else None,
-            "color": "#3b82f6"  # Azul para checkpoints
-        } for c in clases
-    ]
-    
-    # Formatear eventos de planificación
-    ev_planificacion = [
-        {
-            "id": f"evento_{e.id}",
-            "fecha": e.fecha,
-            "tipo": e.tipo,
-            "titulo": e.titulo,
-            "materia_id": e.materia_id,
-            "color": e.color,
-            "hora_inicio": e.hora_inicio,
-            "hora_fin": e.hora_fin
-        } for e in eventos
+    filas = db.execute(
+        _consulta_eventos_calendario(current_user.id, fecha_inicio, fecha_fin)
+    ).mappings().all()
+
+    return [dict(f) for f in filas]
+
+def _escapar_ics(texto: str) -> str:
+    return (texto or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _plegar_ics(linea: str) -> str:
+    """Cortar líneas a 75 octetos como pide RFC 5545"""
+    partes = []
+    actual = ""
+    for caracter in linea:
+        if len((actual + caracter).encode("utf-8")) > 75:
+            partes.append(actual)
+            actual = " " + caracter
+        else:
+            actual += caracter
+    partes.append(actual)
+    return "\r\n".join(partes)
+
+def _generar_ics(filas) -> str:
+    """Armar un VCALENDAR con un VEVENT por fila del calendario"""
+    dtstamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    lineas = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Track Academico RPG//Calendario//ES",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Track Académico",
     ]
-    
-    return ev_notas + ev_clases + ev_planificacion
+    for f in filas:
+        lineas += ["BEGIN:VEVENT", f"UID:{f['id']}@track-academico", f"DTSTAMP:{dtstamp}"]
+        if f["hora_inicio"]:
+            inicio = datetime.combine(f["fecha"], f["hora_inicio"])
+            lineas.append(f"DTSTART:{inicio.strftime('%Y%m%dT%H%M%S')}")
+            if f["hora_fin"]:
+                fin = datetime.combine(f["fecha"], f["hora_fin"])
+                lineas.append(f"DTEND:{fin.strftime('%Y%m%dT%H%M%S')}")
+        else:
+            lineas.append(f"DTSTART;VALUE=DATE:{f['fecha'].strftime('%Y%m%d')}")
+        lineas += [
+            f"SUMMARY:{_escapar_ics(f['titulo'])}",
+            f"CATEGORIES:{_escapar_ics(f['tipo'])}",
+            "END:VEVENT"
+        ]
+    lineas.append("END:VCALENDAR")
+    return "\r\n".join(_plegar_ics(l) for l in lineas) + "\r\n"
+
+@router.get("/calendario/eventos.ics")
+def get_calendario_ics(
+    request: Request,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user_calendario)
+):
+    """Feed iCalendar del usuario (acepta ?token= de /calendario/feed-token para Google/Outlook)"""
+    # Por defecto el feed cubre el último semestre en adelante
+    fecha_inicio = fecha_inicio or (datetime.now().date() - timedelta(days=DIAS_HISTORIAL_ICS))
+
+    filas = db.execute(
+        _consulta_eventos_calendario(current_user.id, fecha_inicio, fecha_fin)
+    ).mappings().all()
+
+    # El ETag sale de los datos, así un 304 evita generar y enviar el .ics
+    huella = hashlib.sha1()
+    for f in filas:
+        huella.update(repr(tuple(f.values())).encode("utf-8"))
+    etag = f'"{huella.hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=_generar_ics(filas),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
+
+@router.post("/calendario/feed-token")
+def crear_feed_calendario(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Token nuevo para suscribirse al .ics; el anterior deja de funcionar. Se muestra una sola vez"""
+    token = crear_token_feed(db, current_user.id)
+    db.commit()
+    return {
+        "token": token,
+        "url": str(request.url_for("get_calendario_ics").include_query_params(token=token))
+    }
+
+@router.delete("/calendario/feed-token")
+def revocar_feed_calendario(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Revocar el token del feed: las suscripciones existentes dejan de actualizarse"""
+    if not revocar_token_feed(db, current_user.id):
+        raise HTTPException(status_code=404, detail="No hay un feed de calendario activo")
+    db.commit()
+    return {"message": "Feed de calendario revocado"}
+
+@router.post("/calendario/importar-pdf", status_code=202)
+async def importar_calendario_pdf(
+    file: UploadFile = File(...),
+    anio: Optional[int] = Form(None),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Importar un calendario académico en PDF; el parseo corre en segundo plano"""
+    nombre = file.filename or "calendario.pdf"
+    if not nombre.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="El calendario debe ser un archivo PDF")
+
+    importacion = await run_in_threadpool(calendario_import_service.nueva_importacion, current_user.id, nombre)
+
+    # Guardar el upload en disco por bloques, sin cargarlo entero en memoria ni
+    # bloquear el event loop; ante cualquier error la importación se descarta
+    iniciada = False
+    try:
+        async with aiofiles.open(calendario_import_service.ruta_archivo(importacion["id"]), "wb") as destino:
+            primer_bloque = True
+            tamanio = 0
+            while bloque := await file.read(CHUNK_IMPORTACION):
+                if primer_bloque and not bloque.startswith(b"%PDF"):
+                    raise HTTPException(status_code=400, detail="El archivo no es un PDF válido")
+                primer_bloque = False
+                tamanio += len(bloque)
+                if tamanio > calendario_import_service.MAX_TAMANIO_CALENDARIO:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El calendario supera el máximo de "
+                               f"{calendario_import_service.MAX_TAMANIO_CALENDARIO // (1024 * 1024)} MB"
+                    )
+                await destino.write(bloque)
+        if primer_bloque:
+            raise HTTPException(status_code=400, detail="El archivo está vacío")
+
+        calendario_import_service.iniciar(importacion["id"], current_user.id, anio or datetime.now().year)
+        iniciada = True
+    finally:
+        if not iniciada:
+            await run_in_threadpool(calendario_import_service.descartar, importacion["id"])
+
+    return importacion
+
+@router.get("/calendario/importar-pdf/{importacion_id}")
+def estado_importacion_calendario(
+    importacion_id: str,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Consultar el progreso de una importación de calendario (para polling)"""
+    importacion = calendario_import_service.obtener_importacion(importacion_id, current_user.id)
+    if not importacion:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return importacion
 
 # --- RUTAS DE PLANIFICACIÓN ---
 
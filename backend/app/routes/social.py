@@ -1,21 +1,34 @@
 # backend/app/routes/social.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.models.models import (
     GrupoEstudio, Usuario, Materia, InscripcionMateria,
-    ApunteCompartido, SesionGrupo, usuarios_grupos,
-    Agradecimiento, Logro, LogroDesbloqueado
+    ApunteCompartido, SesionGrupo, usuarios_grupos, apuntes_calificaciones,
+    sesiones_grupo_asistentes, Tutoria, Logro, LogroDesbloqueado, DescargaDiaria
 )
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 import uuid
-from app.core.security import get_current_user
-from sqlalchemy import desc, func, or_
+from contextlib import nullcontext
+from app.core.security import (
+    STREAM_TOKEN_EXPIRE_MINUTES, create_stream_token, get_current_user, get_current_user_stream
+)
+from app.core import respuesta_archivo
+from app.services.logros_service import LogroService
+from app.services import (
+    agenda_grupo_service, agradecimientos_service, almacenamiento_service, busqueda_service,
+    calificaciones_service, chat_service, companeros_service, contadores_service,
+    estadisticas_comunidad_service, estadisticas_service, indexado_apuntes_service,
+    perfil_service, presencia_service, recomendaciones_service, tendencias_service,
+    tutorias_service, vista_previa_service
+)
+from sqlalchemy import String, and_, cast, desc, exists, func, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 import os
-import shutil
 
 
 router = APIRouter()
@@ -42,6 +55,42 @@ class ApunteCreate(BaseModel):
     compartido_publicamente: bool = True
     etiquetas: Optional[str] = None
 
+class AsistenciaUsuario(BaseModel):
+    usuario_id: str
+    asistio: bool = True
+    puntual: bool = True
+    participacion: int = 0
+
+class AsistenciaSesion(BaseModel):
+    asistencias: List[AsistenciaUsuario]
+
+class TutoriaCreate(BaseModel):
+    materia_id: str
+    titulo: str
+    descripcion: Optional[str] = None
+    fecha: date
+    hora_inicio: time
+    duracion_minutos: int = 60
+    modalidad: str = "virtual"
+    lugar: Optional[str] = None
+    remunerada: bool = False
+    monto: Optional[float] = None
+
+class TutoriaCompletar(BaseModel):
+    exito: bool = True
+    calificacion_estudiante: Optional[int] = None
+    feedback: Optional[str] = None
+
+class TutoriaCalificar(BaseModel):
+    calificacion: int
+    feedback: Optional[str] = None
+
+class AgradecimientoCreate(BaseModel):
+    receptor_id: str
+    tipo: str
+    descripcion: str
+    materia_id: Optional[str] = None
+
 class BusquedaUsuarios(BaseModel):
     query: str
     materia_id: Optional[str] = None
@@ -49,105 +98,97 @@ class BusquedaUsuarios(BaseModel):
 
 # ==================== RUTAS GRUPOS ====================
 
-# ==================== RUTAS GRUPOS (CORREGIDAS) ====================
-
-@router.get("/grupos/{grupo_id}")
-def obtener_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Obtener detalles de un grupo sin errores 500"""
-    grupo = db.query(GrupoEstudio).options(
-        joinedload(GrupoEstudio.materia),
-        joinedload(GrupoEstudio.creador)
-    ).filter(GrupoEstudio.id == grupo_id).first()
-    
-    if not grupo:
-        raise HTTPException(status_code=404, detail="Grupo no encontrado")
-    
-    # Obtener recursos de la materia del grupo
-    recursos = db.query(ApunteCompartido).filter(
-        ApunteCompartido.materia_id == grupo.materia_id,
-        ApunteCompartido.compartido_publicamente == True
-    ).limit(10).all()
-    
-    return {
-        "grupo": {
-            "id": grupo.id,
-            "nombre": grupo.nombre,
-            "descripcion": grupo.descripcion,
-            "materia_nombre": grupo.materia.nombre if grupo.materia else "General",
-            "integrantes_actuales": grupo.integrantes_actuales
-        },
-        "recursos_destacados": recursos
-    }
-
-# --- NUEVAS RUTAS: MENSAJERÍA DE GRUPO [Soluciona el 404] ---
-
-@router.get("/grupos/{grupo_id}/mensajes")
-def listar_mensajes_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Traer historial de mensajes del grupo"""
-    # Aquí deberías tener un modelo MensajeGrupo. Por ahora, devolvemos un array vacío funcional
-    # para que el frontend no rompa mientras creas la tabla de mensajes.
-    return [
-        {"id": 1, "contenido": "¡Bienvenidos al grupo!", "usuario_nombre": "Sistema", "fecha": datetime.now(), "usuario_id": "system"}
-    ]
+def _cursor_grupo(fecha: Optional[str], grupo_id: str) -> str:
+    return f"{fecha or ''}|{grupo_id}"
 
-@router.post("/grupos/{grupo_id}/mensajes")
-def enviar_mensaje_grupo(grupo_id: str, mensaje: MensajeCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Enviar un nuevo mensaje al grupo"""
-    return {"status": "enviado", "contenido": mensaje.contenido}
-    
 @router.get("/grupos")
 def listar_grupos(
     materia_id: Optional[str] = None,
     usuario_id: Optional[str] = None,
     activo: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Listar grupos con filtros"""
-    query = db.query(GrupoEstudio).options(
-        joinedload(GrupoEstudio.materia),
-        joinedload(GrupoEstudio.creador),
-        joinedload(GrupoEstudio.integrantes)
+    """Listar grupos con filtros, del más activo al menos; cursor = paginacion.cursor de la página anterior"""
+    integrantes = usuarios_grupos.c
+    eres_miembro = exists().where(
+        integrantes.grupo_id == GrupoEstudio.id,
+        integrantes.usuario_id == current_user.id
+    )
+    # El cursor lleva la fecha como está guardada (conviven formatos con y sin
+    # microsegundos) y se compara como texto, sin pasar por datetime
+    fecha_texto = cast(GrupoEstudio.fecha_actualizacion, String)
+
+    query = db.query(
+        GrupoEstudio, Materia.nombre, Usuario.nombre, Usuario.apellido,
+        eres_miembro.label("eres_miembro"), fecha_texto
+    ).outerjoin(
+        Materia, Materia.id == GrupoEstudio.materia_id
+    ).join(
+        Usuario, Usuario.id == GrupoEstudio.creador_id
     )
     
     if materia_id:
         query = query.filter(GrupoEstudio.materia_id == materia_id)
     
     if usuario_id:
-        # Grupos donde el usuario es integrante
-        from app.models.models import usuarios_grupos
-        query = query.join(
-            usuarios_grupos, GrupoEstudio.id == usuarios_grupos.c.grupo_id
-        ).filter(usuarios_grupos.c.usuario_id == usuario_id)
+        # Grupos donde el usuario es integrante (PK de la tabla intermedia, sin multiplicar filas)
+        query = query.filter(exists().where(
+            integrantes.grupo_id == GrupoEstudio.id,
+            integrantes.usuario_id == usuario_id
+        ))
     
     if activo is not None:
         query = query.filter(GrupoEstudio.activo == activo)
     
-    grupos = query.order_by(desc(GrupoEstudio.fecha_actualizacion)).all()
-    
-    # Enriquecer datos
-    resultado = []
-    for grupo in grupos:
-        grupo_dict = {
+    if cursor:
+        # Keyset: los siguientes a (fecha_actualizacion, id) de la última fila ya vista
+        fecha, _, grupo_id = cursor.rpartition("|")
+        if not grupo_id:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        fecha = literal(fecha, String)
+        query = query.filter(or_(
+            GrupoEstudio.fecha_actualizacion < fecha,
+            and_(GrupoEstudio.fecha_actualizacion == fecha, GrupoEstudio.id < grupo_id)
+        ))
+    
+    filas = query.order_by(
+        desc(GrupoEstudio.fecha_actualizacion), desc(GrupoEstudio.id)
+    ).limit(limit + 1).all()
+    has_more = len(filas) > limit
+    filas = filas[:limit]
+    
+    resultado = [
+        {
             "id": grupo.id,
             "nombre": grupo.nombre,
             "descripcion": grupo.descripcion,
             "materia_id": grupo.materia_id,
-            "materia_nombre": grupo.materia.nombre if grupo.materia else None,
-            "creador_nombre": f"{grupo.creador.nombre} {grupo.creador.apellido}",
+            "materia_nombre": materia_nombre,
+            "creador_nombre": f"{creador_nombre} {creador_apellido}",
             "integrantes_count": grupo.integrantes_actuales,
             "max_integrantes": grupo.max_integrantes,
             "activo": grupo.activo,
             "privado": grupo.privado,
-            "codigo_invitacion": grupo.codigo_invitacion,
+            "codigo_invitacion": grupo.codigo_invitacion if miembro else None,
             "fecha_creacion": grupo.fecha_creacion,
             "ultima_actividad": grupo.fecha_actualizacion,
-            "eres_miembro": current_user.id in [u.id for u in grupo.integrantes],
+            "eres_miembro": miembro,
             "eres_admin": current_user.id == grupo.creador_id
         }
-        resultado.append(grupo_dict)
+        for grupo, materia_nombre, creador_nombre, creador_apellido, miembro, _ in filas
+    ]
     
-    return resultado
+    return {
+        "grupos": resultado,
+        "paginacion": {
+            "limit": limit,
+            "has_more": has_more,
+            "cursor": _cursor_grupo(filas[-1][-1], filas[-1][0].id) if has_more else None
+        }
+    }
 
 @router.post("/grupos")
 def crear_grupo(
@@ -198,12 +239,14 @@ def crear_grupo(
             estado="activo"
         )
     )
+    estadisticas_service.sumar(db, current_user.id, grupos_integrante=1)
     
     db.commit()
-    db.refresh(nuevo_grupo)
+    recomendaciones_service.invalidar_grupo(grupo_id, current_user.id)
     
-    # Verificar logros
+    # Verificar logros (hace commit: el grupo se refresca después para devolverlo completo)
     verificar_logros_sociales(db, current_user.id)
+    db.refresh(nuevo_grupo)
     
     return {
         "message": "Grupo creado exitosamente",
@@ -211,7 +254,14 @@ def crear_grupo(
         "codigo_invitacion": codigo_invitacion
     }
 
-# ==================== RUTAS GRUPOS (CORREGIDAS) ====================
+@router.get("/grupos/recomendados")
+def grupos_recomendados(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Grupos abiertos con lugar, ordenados por afinidad con el usuario (índice en memoria)"""
+    return {"grupos": recomendaciones_service.recomendar(db, current_user.id, limit)}
 
 @router.get("/grupos/{grupo_id}")
 def obtener_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
@@ -230,32 +280,58 @@ def obtener_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Us
         ApunteCompartido.compartido_publicamente == True
     ).limit(10).all()
     
+    # La lista completa de integrantes solo se arma acá, no en el listado
+    integrantes = [
+        {
+            "id": usuario_id,
+            "nombre": f"{nombre} {apellido}",
+            "avatar_url": avatar_url,
+            "rol": rol,
+            "fecha_union": fecha_union
+        }
+        for usuario_id, nombre, apellido, avatar_url, rol, fecha_union in db.query(
+            Usuario.id, Usuario.nombre, Usuario.apellido, Usuario.avatar_url,
+            usuarios_grupos.c.rol, usuarios_grupos.c.fecha_union
+        ).join(
+            usuarios_grupos, usuarios_grupos.c.usuario_id == Usuario.id
+        ).filter(usuarios_grupos.c.grupo_id == grupo_id).order_by(usuarios_grupos.c.fecha_union)
+    ]
+    eres_miembro = any(i["id"] == current_user.id for i in integrantes)
+    
     return {
         "grupo": {
             "id": grupo.id,
             "nombre": grupo.nombre,
             "descripcion": grupo.descripcion,
+            "materia_id": grupo.materia_id,
             "materia_nombre": grupo.materia.nombre if grupo.materia else "General",
-            "integrantes_actuales": grupo.integrantes_actuales
+            "integrantes_actuales": grupo.integrantes_actuales,
+            "max_integrantes": grupo.max_integrantes,
+            "privado": grupo.privado,
+            "codigo_invitacion": grupo.codigo_invitacion if eres_miembro else None,
+            "eres_miembro": eres_miembro,
+            "eres_admin": current_user.id == grupo.creador_id
         },
+        "integrantes": integrantes,
         "recursos_destacados": recursos
     }
 
-# --- NUEVAS RUTAS: MENSAJERÍA DE GRUPO [Soluciona el 404] ---
-
-@router.get("/grupos/{grupo_id}/mensajes")
-def listar_mensajes_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Traer historial de mensajes del grupo"""
-    # Aquí deberías tener un modelo MensajeGrupo. Por ahora, devolvemos un array vacío funcional
-    # para que el frontend no rompa mientras creas la tabla de mensajes.
-    return [
-        {"id": 1, "contenido": "¡Bienvenidos al grupo!", "usuario_nombre": "Sistema", "fecha": datetime.now(), "usuario_id": "system"}
-    ]
-
-@router.post("/grupos/{grupo_id}/mensajes")
-def enviar_mensaje_grupo(grupo_id: str, mensaje: MensajeCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Enviar un nuevo mensaje al grupo"""
-    return {"status": "enviado", "contenido": mensaje.contenido}
+def _motivo_rechazo_union(db: Session, grupo_id: str, usuario_id: str,
+                          codigo_invitacion: Optional[str]) -> HTTPException:
+    """Por qué no se pudo ocupar el lugar (solo se consulta cuando falla el UPDATE)"""
+    grupo = db.query(GrupoEstudio).filter(GrupoEstudio.id == grupo_id).first()
+    if not grupo:
+        return HTTPException(status_code=404, detail="Grupo no encontrado")
+    if _es_miembro(db, grupo_id, usuario_id):
+        return HTTPException(status_code=400, detail="Ya eres miembro de este grupo")
+    if grupo.integrantes_actuales >= grupo.max_integrantes:
+        return HTTPException(status_code=400, detail="El grupo está lleno")
+    if grupo.privado and grupo.codigo_invitacion != codigo_invitacion:
+        return HTTPException(status_code=403, detail="Código de invitación inválido")
+    return HTTPException(
+        status_code=400,
+        detail="Debes estar inscrito en esta materia para unirte al grupo"
+    )
 
 @router.post("/grupos/{grupo_id}/unirse")
 def unirse_grupo(
@@ -264,65 +340,238 @@ def unirse_grupo(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Unirse a un grupo de estudio"""
-    grupo = db.query(GrupoEstudio).filter(GrupoEstudio.id == grupo_id).first()
-    
-    if not grupo:
-        raise HTTPException(status_code=404, detail="Grupo no encontrado")
-    
-    # Verificar si ya es miembro
-    from app.models.models import usuarios_grupos
-    ya_es_miembro = db.execute(
-        usuarios_grupos.select().where(
-            usuarios_grupos.c.grupo_id == grupo_id,
-            usuarios_grupos.c.usuario_id == current_user.id
+    """Unirse a un grupo de estudio
+
+    Una sola transacción: un UPDATE condicional ocupa el lugar (solo si hay
+    cupo, el código coincide y el usuario cursa la materia) y el INSERT
+    agrega al integrante. La base serializa los UPDATE, así que dos uniones
+    simultáneas no pueden pasarse del máximo; si el usuario ya era miembro,
+    la clave primaria (grupo_id, usuario_id) hace fallar el INSERT y el
+    rollback devuelve el lugar.
+    """
+    ocupado = db.execute(
+        update(GrupoEstudio)
+        .where(
+            GrupoEstudio.id == grupo_id,
+            GrupoEstudio.integrantes_actuales < GrupoEstudio.max_integrantes,
+            or_(
+                GrupoEstudio.privado.is_not(True),
+                GrupoEstudio.codigo_invitacion.is_not_distinct_from(codigo_invitacion)
+            ),
+            exists().where(
+                InscripcionMateria.usuario_id == current_user.id,
+                InscripcionMateria.materia_id == GrupoEstudio.materia_id
+            )
         )
-    ).first()
-    
-    if ya_es_miembro:
-        raise HTTPException(status_code=400, detail="Ya eres miembro de este grupo")
-    
-    # Verificar límite de integrantes
-    if grupo.integrantes_actuales >= grupo.max_integrantes:
-        raise HTTPException(status_code=400, detail="El grupo está lleno")
-    
-    # Verificar código de invitación si es privado
-    if grupo.privado and grupo.codigo_invitacion != codigo_invitacion:
-        raise HTTPException(status_code=403, detail="Código de invitación inválido")
-    
-    # Verificar que el usuario está cursando la materia
-    inscripcion = db.query(InscripcionMateria).filter(
-        InscripcionMateria.usuario_id == current_user.id,
-        InscripcionMateria.materia_id == grupo.materia_id
-    ).first()
-    
-    if not inscripcion:
-        raise HTTPException(
-            status_code=400,
-            detail="Debes estar inscrito en esta materia para unirte al grupo"
+        .values(
+            integrantes_actuales=GrupoEstudio.integrantes_actuales + 1,
+            fecha_actualizacion=datetime.now()
         )
-    
-    # Agregar usuario al grupo
-    db.execute(
-        usuarios_grupos.insert().values(
-            grupo_id=grupo_id,
-            usuario_id=current_user.id,
-            rol="integrante",
-            estado="activo"
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if not ocupado:
+        db.rollback()
+        raise _motivo_rechazo_union(db, grupo_id, current_user.id, codigo_invitacion)
+
+    try:
+        db.execute(
+            usuarios_grupos.insert().values(
+                grupo_id=grupo_id,
+                usuario_id=current_user.id,
+                rol="integrante",
+                estado="activo"
+            )
         )
-    )
-    
-    # Actualizar contador
-    grupo.integrantes_actuales += 1
-    grupo.fecha_actualizacion = datetime.now()
-    
-    db.commit()
+        estadisticas_service.sumar(db, current_user.id, grupos_integrante=1)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Ya eres miembro de este grupo")
+
+    recomendaciones_service.invalidar_grupo(grupo_id, current_user.id)
     
     # Verificar logros
     verificar_logros_sociales(db, current_user.id)
     
     return {"message": "Te has unido al grupo exitosamente"}
 
+# ==================== RUTAS MENSAJES ====================
+
+def _es_miembro(db: Session, grupo_id: str, usuario_id: str) -> bool:
+    return db.execute(
+        usuarios_grupos.select().where(
+            usuarios_grupos.c.grupo_id == grupo_id,
+            usuarios_grupos.c.usuario_id == usuario_id
+        )
+    ).first() is not None
+
+def _grupo_para_chat(db: Session, grupo_id: str, usuario_id: str, escribir: bool) -> bool:
+    """Si el usuario es integrante; 403 si no puede leer el chat (o escribir: solo integrantes)"""
+    grupo = db.query(GrupoEstudio).filter(GrupoEstudio.id == grupo_id).first()
+    if not grupo:
+        raise HTTPException(status_code=404, detail="Grupo no encontrado")
+
+    es_miembro = _es_miembro(db, grupo_id, usuario_id)
+    if not es_miembro and (escribir or grupo.privado):
+        raise HTTPException(status_code=403, detail="Solo los integrantes del grupo pueden participar del chat")
+    return es_miembro
+
+def _usuario_para_chat(db: Session, usuario_id: str, current_user: Usuario) -> str:
+    if usuario_id == current_user.id:
+        raise HTTPException(status_code=400, detail="No puedes chatear contigo mismo")
+    if not db.query(Usuario.id).filter(Usuario.id == usuario_id).first():
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return chat_service.conversacion(current_user.id, usuario_id)
+
+def _respuesta_sse(eventos) -> StreamingResponse:
+    return StreamingResponse(eventos, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # nginx: no acumular el stream
+    })
+
+@router.post("/mensajes/token-stream")
+def token_stream_mensajes(current_user: Usuario = Depends(get_current_user)):
+    """Token corto para abrir los streams (EventSource no manda headers y el de sesión no va en la URL)"""
+    return {"token": create_stream_token(current_user.id), "expira_en": STREAM_TOKEN_EXPIRE_MINUTES * 60}
+
+def _validar_mensaje(mensaje: MensajeCreate):
+    if not mensaje.contenido.strip():
+        raise HTTPException(status_code=400, detail="El mensaje está vacío")
+    if len(mensaje.contenido) > chat_service.MAX_CONTENIDO:
+        raise HTTPException(
+            status_code=400, detail=f"El mensaje supera los {chat_service.MAX_CONTENIDO} caracteres"
+        )
+    if mensaje.recurso_url and len(mensaje.recurso_url) > chat_service.MAX_RECURSO_URL:
+        raise HTTPException(status_code=400, detail="La URL del recurso es demasiado larga")
+
+@router.get("/grupos/{grupo_id}/mensajes")
+def listar_mensajes_grupo(
+    grupo_id: str,
+    antes: Optional[int] = None,
+    despues: Optional[int] = None,
+    limit: int = Query(chat_service.LIMITE_HISTORIAL, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Historial del grupo en orden cronológico; antes/despues son ids de mensaje (cursor)"""
+    _grupo_para_chat(db, grupo_id, current_user.id, escribir=False)
+    return chat_service.historial_grupo(db, grupo_id, antes, despues, limit)
+
+@router.post("/grupos/{grupo_id}/mensajes")
+async def enviar_mensaje_grupo(
+    grupo_id: str,
+    mensaje: MensajeCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Enviar un mensaje al grupo (se guarda por lotes y se entrega en vivo)"""
+    _validar_mensaje(mensaje)
+    await run_in_threadpool(_grupo_para_chat, db, grupo_id, current_user.id, True)
+    # La conexión vuelve al pool antes de esperar el lote: una ráfaga de envíos no lo agota
+    await run_in_threadpool(db.close)
+    return await chat_service.enviar_a_grupo(
+        grupo_id, current_user, mensaje.contenido, mensaje.tipo, mensaje.recurso_url
+    )
+
+@router.get("/grupos/{grupo_id}/mensajes/stream")
+def stream_mensajes_grupo(
+    grupo_id: str,
+    despues: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user_stream)
+):
+    """Mensajes nuevos, presencia y "escribiendo" por Server-Sent Events (?token= de /mensajes/token-stream)"""
+    es_miembro = _grupo_para_chat(db, grupo_id, current_user.id, escribir=False)
+    # Al reconectar, EventSource manda Last-Event-ID: se retoma desde ahí
+    ultimo_id = last_event_id if last_event_id is not None else despues
+    if ultimo_id is None:
+        ultimo_id = chat_service.ultimo_id_grupo(db, grupo_id)
+    # El stream puede durar horas: la sesión del request no debe quedar abierta
+    db.close()
+    nombre = f"{current_user.nombre} {current_user.apellido}"
+
+    async def eventos():
+        # Los integrantes figuran en línea mientras tengan el stream abierto
+        presente = (presencia_service.presente(grupo_id, current_user.id, nombre)
+                    if es_miembro else nullcontext())
+        with presente:
+            async for evento in chat_service.transmitir(
+                chat_service.canal_grupo(grupo_id), ultimo_id,
+                lambda sesion, desde: chat_service.historial_grupo(sesion, grupo_id, despues=desde),
+                inicio=lambda: [{"evento": "en_linea", "usuarios": presencia_service.en_linea(grupo_id)}]
+            ):
+                yield evento
+
+    return _respuesta_sse(eventos())
+
+@router.get("/grupos/{grupo_id}/presencia")
+async def presencia_grupo(
+    grupo_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Integrantes con el chat abierto ahora (del registro en memoria, no de ultimo_login)"""
+    await run_in_threadpool(_grupo_para_chat, db, grupo_id, current_user.id, False)
+    return {"usuarios": presencia_service.en_linea(grupo_id)}
+
+@router.post("/grupos/{grupo_id}/escribiendo", status_code=204)
+async def escribiendo_grupo(
+    grupo_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Avisar al resto del grupo que el usuario está escribiendo (no se guarda)"""
+    await run_in_threadpool(_grupo_para_chat, db, grupo_id, current_user.id, True)
+    await presencia_service.escribiendo(
+        grupo_id, current_user.id, f"{current_user.nombre} {current_user.apellido}"
+    )
+
+@router.get("/mensajes/privados/{usuario_id}")
+def listar_mensajes_privados(
+    usuario_id: str,
+    antes: Optional[int] = None,
+    despues: Optional[int] = None,
+    limit: int = Query(chat_service.LIMITE_HISTORIAL, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Conversación privada con otro usuario, paginada como la del grupo"""
+    conversacion = _usuario_para_chat(db, usuario_id, current_user)
+    return chat_service.historial_privado(db, conversacion, antes, despues, limit)
+
+@router.post("/mensajes/privados/{usuario_id}")
+async def enviar_mensaje_privado(
+    usuario_id: str,
+    mensaje: MensajeCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    _validar_mensaje(mensaje)
+    await run_in_threadpool(_usuario_para_chat, db, usuario_id, current_user)
+    await run_in_threadpool(db.close)
+    return await chat_service.enviar_privado(current_user, usuario_id, mensaje.contenido)
+
+@router.get("/mensajes/privados/{usuario_id}/stream")
+def stream_mensajes_privados(
+    usuario_id: str,
+    despues: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user_stream)
+):
+    conversacion = _usuario_para_chat(db, usuario_id, current_user)
+    ultimo_id = last_event_id if last_event_id is not None else despues
+    if ultimo_id is None:
+        ultimo_id = chat_service.ultimo_id_privado(db, conversacion)
+    db.close()
+
+    return _respuesta_sse(chat_service.transmitir(
+        chat_service.canal_privado(conversacion), ultimo_id,
+        lambda sesion, desde: chat_service.historial_privado(sesion, conversacion, despues=desde)
+    ))
+
 # ==================== RUTAS APUNTES ====================
 @router.get("/apuntes")
 def listar_apuntes(
@@ -348,41 +597,84 @@ def listar_apuntes(
     if destacados:
         query = query.filter(ApunteCompartido.calificacion_promedio >= 4.0)
     
-    total = query.count()
-    
+    # Promedio bayesiano: pocos votos no alcanzan para encabezar el muro (idx_apuntes_ranking).
+    # Un resultado de más para saber si hay otra página, sin COUNT sobre toda la tabla
     apuntes = query.order_by(
-        desc(ApunteCompartido.calificacion_promedio),
+        desc(ApunteCompartido.puntaje_ranking),
         desc(ApunteCompartido.veces_descargado)
-    ).offset(offset).limit(limit).all()
+    ).offset(offset).limit(limit + 1).all()
+    has_more = len(apuntes) > limit
     
-    # Calcular estadísticas
-    materias_populares = db.query(
-        Materia.nombre,
-        func.count(ApunteCompartido.id).label('total')
-    ).join(
-        ApunteCompartido, Materia.id == ApunteCompartido.materia_id
-    ).group_by(Materia.id).order_by(desc('total')).limit(5).all()
+    # Ranking precalculado (tendencias_service), no un GROUP BY por request
+    materias_populares = tendencias_service.obtener(db)["materia_popular"][:5]
     
     return {
-        "apuntes": apuntes,
-        "total": total,
+        "apuntes": apuntes[:limit],
         "materias_populares": [
-            {"materia": m[0], "total_apuntes": m[1]} for m in materias_populares
+            {"materia": m["etiqueta"], "total_apuntes": m["cantidad"]} for m in materias_populares
         ],
         "paginacion": {
             "limit": limit,
             "offset": offset,
-            "has_more": offset + limit < total
+            "has_more": has_more
+        }
+    }
+
+@router.get("/apuntes/buscar")
+def buscar_apuntes(
+    q: str,
+    materia_id: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """Buscar en título, descripción, contenido y texto de los PDF (índice FTS5)"""
+    if len(q.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Mínimo 2 caracteres")
+
+    # Un resultado de más para saber si hay otra página
+    resultados = busqueda_service.buscar_apuntes(db, q, materia_id, limit + 1, offset)
+    has_more = len(resultados) > limit
+    resultados = resultados[:limit]
+
+    ids = [apunte_id for apunte_id, _ in resultados]
+    por_id = {
+        a.id: a for a in db.query(ApunteCompartido).options(
+            joinedload(ApunteCompartido.usuario),
+            joinedload(ApunteCompartido.materia)
+        ).filter(ApunteCompartido.id.in_(ids)).all()
+    } if ids else {}
+
+    apuntes = []
+    for apunte_id, fragmento in resultados:
+        apunte = por_id[apunte_id]
+        apunte.fragmento = fragmento
+        apuntes.append(apunte)
+
+    return {
+        "apuntes": apuntes,
+        "paginacion": {
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more
         }
     }
 
-# Define donde se guardarán los archivos
-UPLOAD_DIR = "uploads"
+# Define donde se guardarán los archivos (los apuntes nuevos van a uploads/blobs)
+UPLOAD_DIR = almacenamiento_service.DIRECTORIO_UPLOADS
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+def _guardar_apunte(db: Session, apunte: ApunteCompartido) -> ApunteCompartido:
+    db.add(apunte)
+    estadisticas_service.sumar(db, apunte.usuario_id, apuntes_compartidos=1)
+    db.commit()
+    verificar_logros_sociales(db, apunte.usuario_id)
+    db.refresh(apunte)
+    return apunte
+
 @router.post("/apuntes")
-def compartir_apunte(
+async def compartir_apunte(
     materia_id: str = Form(...),
     titulo: str = Form(...),
     descripcion: str = Form(""),
@@ -394,16 +686,16 @@ def compartir_apunte(
 ):
     apunte_id = f"apunte_{uuid.uuid4().hex[:10]}"
     formato_final = "texto"
+    archivo_sha256, archivo_tamanio = None, None
     
     # LÓGICA DE ALMACENAMIENTO REAL
     if archivo:
-        formato_final = archivo.filename.split('.')[-1].lower()
-        # Creamos un nombre de archivo único para evitar que se pisen
-        file_path = os.path.join(UPLOAD_DIR, f"{apunte_id}.{formato_final}")
-        
-        # Guardamos el archivo binario en el disco
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(archivo.file, buffer)
+        # Escritura por bloques con aiofiles: no ocupa un hilo del pool ni carga el archivo en memoria.
+        # El formato sale de los magic bytes, no de la extensión del nombre.
+        try:
+            archivo_sha256, archivo_tamanio, formato_final = await almacenamiento_service.guardar_upload(archivo)
+        except almacenamiento_service.ArchivoInvalido as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
             
         # En la DB guardamos el "ID" o ruta para recuperarlo luego
         contenido_final = f"FILE:{apunte_id}.{formato_final}"
@@ -418,28 +710,121 @@ def compartir_apunte(
         descripcion=descripcion,
         contenido=contenido_final,
         formato=formato_final,
+        archivo_sha256=archivo_sha256,
+        archivo_tamanio=archivo_tamanio,
         compartido_publicamente=compartido_publicamente.lower() == "true",
         activo=True
     )
     
-    db.add(nuevo_apunte)
-    db.commit()
+    # La sesión es sincrónica: el commit va al threadpool para no frenar el event loop
+    nuevo_apunte = await run_in_threadpool(_guardar_apunte, db, nuevo_apunte)
+
+    # El texto del PDF se indexa para la búsqueda y la vista previa se genera, ambos en segundo plano
+    if archivo and formato_final == "pdf":
+        indexado_apuntes_service.encolar(
+            apunte_id, almacenamiento_service.ruta_blob(archivo_sha256), archivo_sha256
+        )
+        vista_previa_service.encolar(archivo_sha256)
+
     return {"message": "Archivo guardado físicamente", "apunte": nuevo_apunte}
 
+@router.delete("/apuntes/{apunte_id}")
+def eliminar_apunte(
+    apunte_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Eliminar un apunte propio; el archivo se borra si ningún otro apunte lo comparte"""
+    apunte = db.query(ApunteCompartido).filter(
+        ApunteCompartido.id == apunte_id,
+        ApunteCompartido.usuario_id == current_user.id
+    ).first()
+    if not apunte:
+        raise HTTPException(status_code=404, detail="Apunte no encontrado")
+
+    archivo_sha256 = apunte.archivo_sha256
+    db.execute(apuntes_calificaciones.delete().where(apuntes_calificaciones.c.apunte_id == apunte_id))
+    db.query(DescargaDiaria).filter(DescargaDiaria.apunte_id == apunte_id).delete(synchronize_session=False)
+    db.delete(apunte)
+    estadisticas_service.sumar(db, current_user.id, apuntes_compartidos=-1)
+    perfil_service.invalidar(db, current_user.id)
+    db.commit()
+
+    almacenamiento_service.liberar(db, archivo_sha256)
+    return {"message": "Apunte eliminado"}
+
 @router.get("/apuntes/descargar/{archivo_id}")
-def descargar_archivo(archivo_id: str):
-    file_path = os.path.join(UPLOAD_DIR, archivo_id)
+def descargar_archivo(archivo_id: str, request: Request, db: Session = Depends(get_db)):
+    """Descargar el archivo de un apunte (Range para retomar/visores, ETag del contenido)"""
+    contenido = f"FILE:{archivo_id}"
+    # Los apuntes subidos por la app se llaman {apunte_id}.{ext}: búsqueda por PK
+    apunte = db.query(ApunteCompartido).filter(
+        ApunteCompartido.id == archivo_id.rsplit(".", 1)[0]
+    ).first()
+    if not apunte or apunte.contenido != contenido:
+        apunte = db.query(ApunteCompartido).filter(ApunteCompartido.contenido == contenido).first()
+    if not apunte:
+        raise HTTPException(status_code=404, detail="El archivo físico no existe")
+
+    file_path = almacenamiento_service.ruta_archivo(apunte.archivo_sha256, apunte.contenido)
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="El archivo físico no existe")
-    
-    return FileResponse(path=file_path, filename=archivo_id)
 
-@router.get("/apuntes")
-def listar_apuntes(materia_id: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(ApunteCompartido).options(joinedload(ApunteCompartido.usuario), joinedload(ApunteCompartido.materia))
-    if materia_id:
-        query = query.filter(ApunteCompartido.materia_id == materia_id)
-    return {"apuntes": query.order_by(desc(ApunteCompartido.fecha_compartido)).all()}
+    if apunte.archivo_sha256:
+        # El blob nunca cambia para un apunte: ETag fuerte y caché larga
+        etag = f'"{apunte.archivo_sha256}"'
+        cache_control = "public, max-age=86400" if apunte.compartido_publicamente else "private, max-age=86400"
+    else:
+        # Archivo sin migrar a blobs: ETag débil por fecha y tamaño, y revalidar siempre
+        stat = os.stat(file_path)
+        etag = f'W/"{int(stat.st_mtime)}-{stat.st_size}"'
+        cache_control = "private, no-cache"
+
+    respuesta = respuesta_archivo.responder(request, file_path, archivo_id, etag, cache_control)
+
+    # Un visor que pide muchos rangos cuenta una sola vez (el que empieza en 0)
+    if respuesta.status_code in (200, 206) and respuesta.inicio == 0:
+        contadores_service.registrar_descarga(apunte.id)
+    return respuesta
+
+# La vista previa depende solo del contenido del blob: nunca cambia para una URL dada
+CACHE_VISTA_PREVIA = "max-age=31536000, immutable"
+
+def _apunte_con_vista_previa(db: Session, apunte_id: str) -> ApunteCompartido:
+    apunte = db.query(ApunteCompartido).filter(ApunteCompartido.id == apunte_id).first()
+    if not apunte or not apunte.archivo_sha256 or apunte.formato != "pdf":
+        raise HTTPException(status_code=404, detail="El apunte no tiene vista previa")
+    return apunte
+
+def _cache_vista_previa(apunte: ApunteCompartido) -> str:
+    visibilidad = "public" if apunte.compartido_publicamente else "private"
+    return f"{visibilidad}, {CACHE_VISTA_PREVIA}"
+
+@router.get("/apuntes/{apunte_id}/miniatura")
+def obtener_miniatura(apunte_id: str, request: Request, db: Session = Depends(get_db)):
+    """Miniatura JPEG de la primera página (sin auth, igual que la descarga: la pide un <img>)"""
+    apunte = _apunte_con_vista_previa(db, apunte_id)
+    ruta = vista_previa_service.ruta_miniatura(apunte.archivo_sha256)
+    if not os.path.exists(ruta):
+        raise HTTPException(status_code=404, detail="La miniatura todavía no está lista")
+
+    return respuesta_archivo.responder(
+        request, ruta, f"{apunte_id}.jpg", f'"{apunte.archivo_sha256}-miniatura"',
+        _cache_vista_previa(apunte), inline=True
+    )
+
+@router.get("/apuntes/{apunte_id}/vista-previa")
+def obtener_vista_previa(apunte_id: str, request: Request, db: Session = Depends(get_db)):
+    """Cantidad de páginas y metadatos del PDF"""
+    apunte = _apunte_con_vista_previa(db, apunte_id)
+    ruta = vista_previa_service.ruta_metadatos(apunte.archivo_sha256)
+    if not os.path.exists(ruta):
+        raise HTTPException(status_code=404, detail="La vista previa todavía no está lista")
+
+    return respuesta_archivo.responder(
+        request, ruta, f"{apunte_id}.json", f'"{apunte.archivo_sha256}-meta"',
+        _cache_vista_previa(apunte), inline=True
+    )
 
 @router.post("/apuntes/{apunte_id}/calificar")
 def calificar_apunte(
@@ -458,55 +843,36 @@ def calificar_apunte(
     if not apunte:
         raise HTTPException(status_code=404, detail="Apunte no encontrado")
     
-    # Verificar que no haya calificado antes
-    from app.models.models import apuntes_calificaciones
-    ya_calificado = db.execute(
-        apuntes_calificaciones.select().where(
-            apuntes_calificaciones.c.apunte_id == apunte_id,
-            apuntes_calificaciones.c.usuario_id == current_user.id
+    # La PK (apunte_id, usuario_id) rechaza la segunda calificación, aunque lleguen a la vez
+    try:
+        db.execute(
+            apuntes_calificaciones.insert().values(
+                apunte_id=apunte_id,
+                usuario_id=current_user.id,
+                calificacion=calificacion,
+                comentario=comentario,
+                fecha=datetime.now()
+            )
         )
-    ).first()
-    
-    if ya_calificado:
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Ya has calificado este apunte")
     
-    # Insertar calificación
-    db.execute(
-        apuntes_calificaciones.insert().values(
-            apunte_id=apunte_id,
-            usuario_id=current_user.id,
-            calificacion=calificacion,
-            comentario=comentario,
-            fecha=datetime.now()
-        )
-    )
-    
-    # Actualizar promedio del apunte
-    calificaciones = db.execute(
-        apuntes_calificaciones.select().where(
-            apuntes_calificaciones.c.apunte_id == apunte_id
-        )
-    ).fetchall()
-    
-    if calificaciones:
-        promedio = sum(c.calificacion for c in calificaciones) / len(calificaciones)
-        apunte.calificacion_promedio = round(promedio, 2)
-        apunte.total_calificaciones = len(calificaciones)
-    
+    # Promedio y puntaje se actualizan en el mismo UPDATE, sin releer las calificaciones
+    calificaciones_service.sumar_calificacion(db, apunte_id, calificacion)
+    # El ranking del apunte cambió: los destacados del autor pueden ser otros
+    perfil_service.invalidar(db, apunte.usuario_id)
     db.commit()
     
     # Otorgar agradecimiento al creador si la calificación es alta
     if calificacion >= 4 and apunte.usuario_id != current_user.id:
-        agradecimiento = Agradecimiento(
-            id=f"agra_{uuid.uuid4().hex[:10]}",
-            emisor_id=current_user.id,
-            receptor_id=apunte.usuario_id,
-            tipo="calificacion",
-            descripcion=f"Calificó tu apunte '{apunte.titulo}' con {calificacion} estrellas",
-            materia_id=apunte.materia_id
+        agradecimientos_service.registrar(
+            db, current_user.id, apunte.usuario_id, agradecimientos_service.TIPO_CALIFICACION,
+            f"Calificó tu apunte '{apunte.titulo}' con {calificacion} estrellas",
+            apunte.materia_id
         )
-        db.add(agradecimiento)
         db.commit()
+        verificar_logros_sociales(db, apunte.usuario_id)
     
     return {"message": "Calificación registrada exitosamente"}
 
@@ -518,170 +884,89 @@ def buscar_usuarios(
     db: Session = Depends(get_db), 
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Buscar usuarios por múltiples criterios de forma optimizada"""
+    """Buscar usuarios por nombre, apellido, legajo o email (índice FTS5, tolera errores de tipeo)"""
     if len(query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Mínimo 2 caracteres")
 
-    # 1. Buscamos las materias del usuario actual UNA SOLA VEZ fuera del loop para velocidad
-    materias_current_ids = [m.materia_id for m in db.query(InscripcionMateria.materia_id).filter(
-        InscripcionMateria.usuario_id == current_user.id
-    ).all()]
-
-    # 2. Ejecutamos la búsqueda (Aquí definimos 'usuarios')
-    # Buscamos por nombre, apellido, legajo o email
-    usuarios = db.query(Usuario).filter(
-        or_(
-            Usuario.nombre.ilike(f"%{query}%"),
-            Usuario.apellido.ilike(f"%{query}%"),
-            Usuario.legajo.ilike(f"%{query}%"),
-            Usuario.email.ilike(f"%{query}%")
-        ),
-        Usuario.id != current_user.id  # No nos buscamos a nosotros mismos
-    ).limit(10).all()
+    usuarios = busqueda_service.buscar_usuarios(db, query, excluir_id=current_user.id, limite=10)
 
-    resultado = []
-    for usuario in usuarios:
-        # Buscamos materias del candidato
-        materias_candidato_ids = [m.materia_id for m in db.query(InscripcionMateria.materia_id).filter(
-            InscripcionMateria.usuario_id == usuario.id
-        ).all()]
-        
-        # Intersección de sets para saber qué materias comparten
-        comunes_ids = list(set(materias_current_ids) & set(materias_candidato_ids))
-        
-        nombres_comunes = []
-        if comunes_ids:
-            # Traemos los nombres de las materias compartidas
-            materias_db = db.query(Materia.nombre).filter(Materia.id.in_(comunes_ids)).all()
-            nombres_comunes = [m[0] for m in materias_db]
-
-        resultado.append({
-            "id": usuario.id,
+    # Materias compartidas de todos los resultados en una sola consulta
+    comunes = busqueda_service.materias_comunes(db, current_user.id, [u.id for u in usuarios])
+
+    return [
+        {
+            "id": usuario.id,
             "nombre": usuario.nombre,
             "apellido": usuario.apellido,
             "legajo": usuario.legajo,
             "email": usuario.email,
             "avatar_url": usuario.avatar_url,
             "promedio": usuario.promedio_general,
-            "materias_comunes": nombres_comunes,
-            "total_materias_comunes": len(comunes_ids)
-        })
-    
-    return resultado
+            "materias_comunes": comunes[usuario.id],
+            "total_materias_comunes": len(comunes[usuario.id])
+        }
+        for usuario in usuarios
+    ]
+
+@router.get("/usuarios/companeros")
+def buscar_companeros(
+    materia_id: Optional[str] = None,
+    toda_la_universidad: bool = False,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Compañeros de estudio sugeridos: materias en común (Jaccard) y promedio parecido"""
+    return {
+        "companeros": companeros_service.buscar(
+            db, current_user.id, limite=limit, misma_carrera=not toda_la_universidad,
+            materia_id=materia_id
+        )
+    }
 
 @router.get("/usuarios/{usuario_id}/perfil")
 def obtener_perfil_usuario(
     usuario_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtener perfil público de un usuario"""
-    usuario = db.query(Usuario).options(
-        joinedload(Usuario.carrera)
-    ).filter(Usuario.id == usuario_id).first()
-    
-    if not usuario:
+    """Obtener perfil público de un usuario (tarjeta precalculada, con ETag)"""
+    tarjeta = perfil_service.obtener(db, usuario_id)
+    if not tarjeta:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    
-    # Obtener estadísticas académicas
-    aprobadas = db.query(InscripcionMateria).filter(
-        InscripcionMateria.usuario_id == usuario_id,
-        InscripcionMateria.estado == "aprobada"
-    ).count()
-    
-    cursando = db.query(InscripcionMateria).filter(
-        InscripcionMateria.usuario_id == usuario_id,
-        InscripcionMateria.estado == "cursando"
-    ).count()
-    
-    # Obtener logros desbloqueados
-    logros = db.query(LogroDesbloqueado).join(
-        Logro, LogroDesbloqueado.logro_id == Logro.id
-    ).filter(
-        LogroDesbloqueado.usuario_id == usuario_id
-    ).order_by(desc(LogroDesbloqueado.fecha_desbloqueo)).limit(5).all()
-    
-    # Obtener apuntes compartidos
-    apuntes = db.query(ApunteCompartido).filter(
-        ApunteCompartido.usuario_id == usuario_id,
-        ApunteCompartido.compartido_publicamente == True
-    ).order_by(desc(ApunteCompartido.calificacion_promedio)).limit(5).all()
-    
-    return {
-        "usuario": {
-            "id": usuario.id,
-            "nombre": usuario.nombre,
-            "apellido": usuario.apellido,
-            "legajo": usuario.legajo,
-            "carrera": usuario.carrera.nombre if usuario.carrera else None,
-            "avatar_url": usuario.avatar_url,
-            "promedio_general": usuario.promedio_general,
-            "creditos_aprobados": usuario.creditos_aprobados,
-            "fecha_ingreso": usuario.fecha_ingreso,
-            "ultimo_login": usuario.ultimo_login
-        },
-        "estadisticas": {
-            "materias_aprobadas": aprobadas,
-            "materias_cursando": cursando,
-            "total_horas_estudio": 0,  # Se podría calcular
-            "total_apuntes_compartidos": len(apuntes)
-        },
-        "logros_destacados": [
-            {
-                "nombre": l.logro.nombre,
-                "icono": l.logro.icono,
-                "fecha": l.fecha_desbloqueo
-            } for l in logros
-        ],
-        "apuntes_destacados": apuntes
-    }
+
+    contenido, etag = tarjeta
+    # Revalidar siempre: si la tarjeta no cambió, el 304 no lleva cuerpo
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if f'"{etag}"' in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=contenido, media_type="application/json", headers=headers)
 
 # ==================== RUTAS SESIONES GRUPO ====================
 
-@router.get("/grupos/{grupo_id}")
-def obtener_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Obtener detalles de un grupo sin errores 500"""
-    grupo = db.query(GrupoEstudio).options(
-        joinedload(GrupoEstudio.materia),
-        joinedload(GrupoEstudio.creador)
-    ).filter(GrupoEstudio.id == grupo_id).first()
-    
-    if not grupo:
-        raise HTTPException(status_code=404, detail="Grupo no encontrado")
-    
-    # Obtener recursos de la materia del grupo
-    recursos = db.query(ApunteCompartido).filter(
-        ApunteCompartido.materia_id == grupo.materia_id,
-        ApunteCompartido.compartido_publicamente == True
-    ).limit(10).all()
-    
-    return {
-        "grupo": {
-            "id": grupo.id,
-            "nombre": grupo.nombre,
-            "descripcion": grupo.descripcion,
-            "materia_nombre": grupo.materia.nombre if grupo.materia else "General",
-            "integrantes_actuales": grupo.integrantes_actuales
-        },
-        "recursos_destacados": recursos
-    }
+MAX_DIAS_SUGERENCIAS = 62  # Ventana máxima para buscar horarios libres
 
-# --- NUEVAS RUTAS: MENSAJERÍA DE GRUPO [Soluciona el 404] ---
+def _verificar_admin_grupo(db: Session, grupo_id: str, usuario_id: str, detalle: str):
+    membresia = db.execute(
+        usuarios_grupos.select().where(
+            usuarios_grupos.c.grupo_id == grupo_id,
+            usuarios_grupos.c.usuario_id == usuario_id,
+            usuarios_grupos.c.rol.in_(['admin', 'moderador'])
+        )
+    ).first()
+    if not membresia:
+        raise HTTPException(status_code=403, detail=detalle)
 
-@router.get("/grupos/{grupo_id}/mensajes")
-def listar_mensajes_grupo(grupo_id: str, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Traer historial de mensajes del grupo"""
-    # Aquí deberías tener un modelo MensajeGrupo. Por ahora, devolvemos un array vacío funcional
-    # para que el frontend no rompa mientras creas la tabla de mensajes.
-    return [
-        {"id": 1, "contenido": "¡Bienvenidos al grupo!", "usuario_nombre": "Sistema", "fecha": datetime.now(), "usuario_id": "system"}
-    ]
+def _sesion_del_grupo(db: Session, grupo_id: str, sesion_id: str) -> SesionGrupo:
+    sesion = db.query(SesionGrupo).filter(
+        SesionGrupo.id == sesion_id,
+        SesionGrupo.grupo_id == grupo_id
+    ).first()
+    if not sesion:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada")
+    return sesion
 
-@router.post("/grupos/{grupo_id}/mensajes")
-def enviar_mensaje_grupo(grupo_id: str, mensaje: MensajeCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    """Enviar un nuevo mensaje al grupo"""
-    return {"status": "enviado", "contenido": mensaje.contenido}
-    
 @router.post("/grupos/{grupo_id}/sesiones")
 def crear_sesion_grupo(
     grupo_id: str,
@@ -695,18 +980,16 @@ def crear_sesion_grupo(
     current_user: Usuario = Depends(get_current_user)
 ):
     """Crear una sesión de estudio grupal"""
-    # Verificar que el usuario es admin del grupo
-    from app.models.models import usuarios_grupos
-    membresia = db.execute(
-        usuarios_grupos.select().where(
-            usuarios_grupos.c.grupo_id == grupo_id,
-            usuarios_grupos.c.usuario_id == current_user.id,
-            usuarios_grupos.c.rol.in_(['admin', 'moderador'])
-        )
-    ).first()
+    _verificar_admin_grupo(db, grupo_id, current_user.id, "Solo administradores pueden crear sesiones")
     
-    if not membresia:
-        raise HTTPException(status_code=403, detail="Solo administradores pueden crear sesiones")
+    # Se avisa (sin impedirlo) quiénes ya tienen algo a esa hora
+    inicio = datetime.combine(fecha, hora_inicio)
+    ocupados = agenda_grupo_service.conflictos(
+        db, grupo_id, inicio, inicio + timedelta(minutes=duracion_minutos)
+    )
+    conflictos = db.query(Usuario.id, Usuario.nombre, Usuario.apellido).filter(
+        Usuario.id.in_(ocupados)
+    ).all() if ocupados else []
     
     sesion_id = f"sesion_{uuid.uuid4().hex[:10]}"
     
@@ -724,111 +1007,597 @@ def crear_sesion_grupo(
     )
     
     db.add(nueva_sesion)
+    # El logro "organizador" cuenta las sesiones de los grupos que creó cada usuario
+    creador_id = db.query(GrupoEstudio.creador_id).filter(GrupoEstudio.id == grupo_id).scalar()
+    estadisticas_service.sumar(db, creador_id, sesiones_grupo_organizadas=1)
     db.commit()
+    verificar_logros_sociales(db, creador_id)
     db.refresh(nueva_sesion)
     
     return {
         "message": "Sesión programada exitosamente",
-        "sesion": nueva_sesion
+        "sesion": nueva_sesion,
+        "conflictos": [
+            {"usuario_id": u.id, "nombre": f"{u.nombre} {u.apellido}"} for u in conflictos
+        ]
+    }
+
+@router.get("/grupos/{grupo_id}/sesiones/sugerencias")
+def sugerir_horarios_sesion(
+    grupo_id: str,
+    desde: date,
+    hasta: date,
+    duracion_minutos: int = Query(60, ge=15, le=8 * 60),
+    hora_desde: time = time(8, 0),
+    hora_hasta: time = time(22, 0),
+    max_ausentes: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Horarios libres para una sesión según las agendas de todos los integrantes"""
+    if hasta < desde or (hasta - desde).days > MAX_DIAS_SUGERENCIAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango debe ser de hasta {MAX_DIAS_SUGERENCIAS} días"
+        )
+    if hora_hasta <= hora_desde:
+        raise HTTPException(status_code=400, detail="hora_hasta debe ser posterior a hora_desde")
+    if not db.query(GrupoEstudio.id).filter(GrupoEstudio.id == grupo_id).first():
+        raise HTTPException(status_code=404, detail="Grupo no encontrado")
+    if not _es_miembro(db, grupo_id, current_user.id):
+        raise HTTPException(status_code=403, detail="Solo los integrantes pueden ver la agenda del grupo")
+
+    return {
+        "horarios": agenda_grupo_service.horarios_libres(
+            db, grupo_id, desde, hasta, duracion_minutos, hora_desde, hora_hasta,
+            max_ausentes=max_ausentes, limite=limit
+        )
+    }
+
+@router.get("/grupos/{grupo_id}/sesiones/{sesion_id}/asistencia")
+def listar_asistencia_sesion(
+    grupo_id: str,
+    sesion_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Asistencia registrada de una sesión (solo integrantes)"""
+    if not _es_miembro(db, grupo_id, current_user.id):
+        raise HTTPException(status_code=403, detail="Solo los integrantes pueden ver la asistencia")
+    sesion = _sesion_del_grupo(db, grupo_id, sesion_id)
+
+    asistentes = sesiones_grupo_asistentes.c
+    filas = db.query(
+        asistentes.usuario_id, asistentes.asistio, asistentes.puntual, asistentes.participacion,
+        Usuario.nombre, Usuario.apellido
+    ).join(Usuario, Usuario.id == asistentes.usuario_id).filter(
+        asistentes.sesion_id == sesion_id
+    ).all()
+
+    return {
+        "sesion_id": sesion.id,
+        "asistentes": sesion.asistentes,
+        "registros": [
+            {
+                "usuario_id": f.usuario_id,
+                "nombre": f"{f.nombre} {f.apellido}",
+                "asistio": f.asistio,
+                "puntual": f.puntual,
+                "participacion": f.participacion
+            }
+            for f in filas
+        ]
+    }
+
+@router.put("/grupos/{grupo_id}/sesiones/{sesion_id}/asistencia")
+def registrar_asistencia_sesion(
+    grupo_id: str,
+    sesion_id: str,
+    datos: AsistenciaSesion,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Registrar (o corregir) la asistencia de muchos integrantes de una vez
+
+    Todo en una transacción: un DELETE ... RETURNING saca los registros
+    anteriores de esos usuarios (y con ellos cuánto cambia cada uno), un
+    executemany inserta los nuevos, y los contadores de la sesión y de cada
+    usuario se suman en la base (x = x + delta), sin releer ni contar filas.
+    """
+    _verificar_admin_grupo(db, grupo_id, current_user.id, "Solo administradores pueden registrar asistencia")
+    _sesion_del_grupo(db, grupo_id, sesion_id)
+
+    # Si un usuario viene repetido, vale el último
+    registros = {r.usuario_id: r for r in datos.asistencias}
+    if not registros:
+        raise HTTPException(status_code=400, detail="No hay asistencias para registrar")
+
+    integrantes = set(db.execute(
+        select(usuarios_grupos.c.usuario_id).where(
+            usuarios_grupos.c.grupo_id == grupo_id,
+            usuarios_grupos.c.usuario_id.in_(registros)
+        )
+    ).scalars())
+    ajenos = sorted(set(registros) - integrantes)
+    if ajenos:
+        raise HTTPException(status_code=400, detail=f"No son integrantes del grupo: {', '.join(ajenos)}")
+
+    asistentes = sesiones_grupo_asistentes.c
+    anteriores = dict(db.execute(
+        sesiones_grupo_asistentes.delete().where(
+            asistentes.sesion_id == sesion_id,
+            asistentes.usuario_id.in_(registros)
+        ).returning(asistentes.usuario_id, asistentes.asistio)
+    ).all())
+    db.execute(sesiones_grupo_asistentes.insert(), [
+        {
+            "sesion_id": sesion_id,
+            "usuario_id": r.usuario_id,
+            "asistio": r.asistio,
+            "puntual": r.puntual,
+            "participacion": r.participacion
+        }
+        for r in registros.values()
+    ])
+
+    cambios = {
+        usuario_id: int(r.asistio) - int(bool(anteriores.get(usuario_id)))
+        for usuario_id, r in registros.items()
+    }
+    delta = sum(cambios.values())
+    if delta:
+        db.execute(
+            update(SesionGrupo).where(SesionGrupo.id == sesion_id)
+            .values(asistentes=func.coalesce(SesionGrupo.asistentes, 0) + delta)
+            .execution_options(synchronize_session=False)
+        )
+    estadisticas_service.sumar_a_varios(db, "sesiones_grupo_asistidas", cambios)
+    db.commit()
+
+    # comunidad lee sesiones_grupo_asistidas: solo puede desbloquearse si subió
+    for usuario_id, cambio in cambios.items():
+        if cambio > 0:
+            verificar_logros_sociales(db, usuario_id)
+
+    return {
+        "message": "Asistencia registrada",
+        "registrados": len(registros),
+        "asistentes": db.query(SesionGrupo.asistentes).filter(SesionGrupo.id == sesion_id).scalar()
+    }
+
+# ==================== RUTAS TUTORÍAS ====================
+
+MAX_DIAS_BUSQUEDA_TUTORIAS = 90
+
+def _tutoria(db: Session, tutoria_id: str) -> Tutoria:
+    tutoria = db.query(Tutoria).filter(Tutoria.id == tutoria_id).first()
+    if not tutoria:
+        raise HTTPException(status_code=404, detail="Tutoría no encontrada")
+    return tutoria
+
+def _serializar_tutoria(t: Tutoria) -> dict:
+    return {
+        "id": t.id,
+        "tutor_id": t.tutor_id,
+        "estudiante_id": t.estudiante_id,
+        "materia_id": t.materia_id,
+        "titulo": t.titulo,
+        "descripcion": t.descripcion,
+        "fecha": t.fecha,
+        "hora_inicio": t.hora_inicio,
+        "hora_fin": t.hora_fin,
+        "duracion_minutos": t.duracion_minutos,
+        "modalidad": t.modalidad,
+        "lugar": t.lugar,
+        "remunerada": t.remunerada,
+        "monto": float(t.monto) if t.monto is not None else None,
+        "estado": t.estado,
+        "exito": t.exito,
+        "calificacion_tutor": t.calificacion_tutor,
+        "calificacion_estudiante": t.calificacion_estudiante
+    }
+
+@router.post("/tutorias")
+def publicar_tutoria(
+    datos: TutoriaCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Publicar una tutoría disponible (solo de materias que el tutor aprobó)"""
+    if datos.fecha < date.today():
+        raise HTTPException(status_code=400, detail="La fecha de la tutoría ya pasó")
+    if datos.duracion_minutos <= 0:
+        raise HTTPException(status_code=400, detail="La duración debe ser positiva")
+
+    aprobada = db.query(InscripcionMateria.id).filter(
+        InscripcionMateria.usuario_id == current_user.id,
+        InscripcionMateria.materia_id == datos.materia_id,
+        InscripcionMateria.estado == "aprobada"
+    ).first()
+    if not aprobada:
+        raise HTTPException(status_code=400, detail="Solo puedes dar tutorías de materias aprobadas")
+
+    fin = datetime.combine(datos.fecha, datos.hora_inicio) + timedelta(minutes=datos.duracion_minutos)
+    tutoria = Tutoria(
+        id=f"tutoria_{uuid.uuid4().hex[:10]}",
+        tutor_id=current_user.id,
+        materia_id=datos.materia_id,
+        titulo=datos.titulo,
+        descripcion=datos.descripcion,
+        fecha=datos.fecha,
+        hora_inicio=datos.hora_inicio,
+        hora_fin=fin.time() if fin.date() == datos.fecha else None,
+        duracion_minutos=datos.duracion_minutos,
+        modalidad=datos.modalidad,
+        lugar=datos.lugar,
+        remunerada=datos.remunerada,
+        monto=datos.monto,
+        estado=tutorias_service.DISPONIBLE
+    )
+    db.add(tutoria)
+    db.commit()
+    db.refresh(tutoria)
+
+    return {"message": "Tutoría publicada", "tutoria": _serializar_tutoria(tutoria)}
+
+@router.get("/tutorias/buscar")
+def buscar_tutorias(
+    materia_id: str,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    hora_desde: Optional[time] = None,
+    hora_hasta: Optional[time] = None,
+    modalidad: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Tutorías disponibles de una materia en un rango, primero los tutores con mejor reputación"""
+    desde = max(desde or date.today(), date.today())
+    hasta = hasta or desde + timedelta(days=30)
+    if hasta < desde or (hasta - desde).days > MAX_DIAS_BUSQUEDA_TUTORIAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango debe ser de hasta {MAX_DIAS_BUSQUEDA_TUTORIAS} días"
+        )
+
+    filas = db.execute(tutorias_service.consulta_disponibles(
+        materia_id, desde, hasta, hora_desde, hora_hasta, modalidad, excluir_tutor=current_user.id
+    ).limit(limit)).mappings().all()
+
+    return {
+        "tutorias": [
+            {
+                **{k: v for k, v in f.items() if k not in ("tutor_nombre", "tutor_apellido", "monto")},
+                "monto": float(f["monto"]) if f["monto"] is not None else None,
+                "tutor_nombre": f"{f['tutor_nombre']} {f['tutor_apellido']}",
+                "reputacion": round(f["reputacion"], 2)
+            }
+            for f in filas
+        ]
+    }
+
+@router.get("/tutorias/mias")
+def mis_tutorias(
+    rol: str = Query("estudiante", pattern="^(tutor|estudiante)$"),
+    estado: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Tutorías que doy (rol=tutor) o que tomé (rol=estudiante)"""
+    columna = Tutoria.tutor_id if rol == "tutor" else Tutoria.estudiante_id
+    query = db.query(Tutoria).filter(columna == current_user.id)
+    if estado:
+        query = query.filter(Tutoria.estado == estado)
+    tutorias = query.order_by(desc(Tutoria.fecha), desc(Tutoria.hora_inicio)).limit(100).all()
+    return {"tutorias": [_serializar_tutoria(t) for t in tutorias]}
+
+@router.post("/tutorias/{tutoria_id}/aceptar")
+def aceptar_tutoria(
+    tutoria_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Tomar una tutoría disponible; si dos la piden a la vez, solo una lo consigue"""
+    if not tutorias_service.tomar(db, tutoria_id, current_user.id):
+        db.rollback()
+        tutoria = _tutoria(db, tutoria_id)
+        if tutoria.tutor_id == current_user.id:
+            raise HTTPException(status_code=400, detail="No puedes tomar tu propia tutoría")
+        raise HTTPException(status_code=409, detail="La tutoría ya no está disponible")
+    db.commit()
+    return {"message": "Tutoría confirmada", "tutoria": _serializar_tutoria(_tutoria(db, tutoria_id))}
+
+@router.post("/tutorias/{tutoria_id}/completar")
+def completar_tutoria(
+    tutoria_id: str,
+    datos: TutoriaCompletar,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """El tutor marca la tutoría como realizada (y si el estudiante logró su objetivo)"""
+    if datos.calificacion_estudiante is not None and not 1 <= datos.calificacion_estudiante <= 5:
+        raise HTTPException(status_code=400, detail="La calificación debe estar entre 1 y 5")
+    if not tutorias_service.completar(
+        db, tutoria_id, current_user.id, datos.exito, datos.calificacion_estudiante, datos.feedback
+    ):
+        db.rollback()
+        tutoria = _tutoria(db, tutoria_id)
+        if tutoria.tutor_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Solo el tutor puede completar la tutoría")
+        raise HTTPException(status_code=409, detail=f"La tutoría está {tutoria.estado}, no programada")
+    # Tutorías dadas y exitosas van en la tarjeta del tutor
+    perfil_service.invalidar(db, current_user.id)
+    db.commit()
+
+    # tutor, mentor_senior y comunidad leen los contadores recién sumados
+    verificar_logros_sociales(db, current_user.id)
+    return {"message": "Tutoría completada", "tutoria": _serializar_tutoria(_tutoria(db, tutoria_id))}
+
+@router.post("/tutorias/{tutoria_id}/calificar")
+def calificar_tutoria(
+    tutoria_id: str,
+    datos: TutoriaCalificar,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """El estudiante califica al tutor, una sola vez; actualiza su reputación"""
+    if not 1 <= datos.calificacion <= 5:
+        raise HTTPException(status_code=400, detail="La calificación debe estar entre 1 y 5")
+    tutor_id = tutorias_service.calificar(db, tutoria_id, current_user.id, datos.calificacion, datos.feedback)
+    if not tutor_id:
+        db.rollback()
+        tutoria = _tutoria(db, tutoria_id)
+        if tutoria.estudiante_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Solo el estudiante de la tutoría puede calificarla")
+        if tutoria.calificacion_tutor is not None:
+            raise HTTPException(status_code=400, detail="Ya calificaste esta tutoría")
+        raise HTTPException(status_code=409, detail="Solo se califican tutorías completadas")
+    # La reputación del tutor va en su tarjeta; no pasa por verificar_logros_sociales
+    perfil_service.invalidar(db, tutor_id)
+    db.commit()
+
+    estadisticas = estadisticas_service.obtener(db, tutor_id)
+    return {
+        "message": "Calificación registrada",
+        "reputacion_tutor": round(estadisticas.reputacion_tutor, 2),
+        "calificaciones": estadisticas.tutorias_calificadas
+    }
+
+@router.post("/tutorias/{tutoria_id}/cancelar")
+def cancelar_tutoria(
+    tutoria_id: str,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Cancelar una tutoría disponible o programada (el tutor o el estudiante)"""
+    if not tutorias_service.cancelar(db, tutoria_id, current_user.id):
+        db.rollback()
+        tutoria = _tutoria(db, tutoria_id)
+        if current_user.id not in (tutoria.tutor_id, tutoria.estudiante_id):
+            raise HTTPException(status_code=403, detail="No participas de esta tutoría")
+        raise HTTPException(status_code=409, detail=f"La tutoría ya está {tutoria.estado}")
+    db.commit()
+    return {"message": "Tutoría cancelada"}
+
+# ==================== RUTAS AGRADECIMIENTOS ====================
+
+@router.post("/agradecimientos")
+def enviar_agradecimiento(
+    datos: AgradecimientoCreate,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Agradecer a un compañero (explicación, ayuda, apunte, tutoría, motivación)"""
+    if datos.tipo not in agradecimientos_service.TIPOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tipo inválido; opciones: {', '.join(agradecimientos_service.TIPOS)}"
+        )
+    if not datos.descripcion.strip():
+        raise HTTPException(status_code=400, detail="El agradecimiento necesita una descripción")
+    if datos.receptor_id == current_user.id:
+        raise HTTPException(status_code=400, detail="No puedes agradecerte a ti mismo")
+    if not db.query(Usuario.id).filter(Usuario.id == datos.receptor_id).first():
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if agradecimientos_service.enviado_hoy(db, current_user.id, datos.receptor_id, datos.tipo):
+        raise HTTPException(
+            status_code=409, detail="Ya le enviaste un agradecimiento de este tipo hoy"
+        )
+
+    agradecimiento = agradecimientos_service.registrar(
+        db, current_user.id, datos.receptor_id, datos.tipo, datos.descripcion.strip(), datos.materia_id
+    )
+    db.commit()
+    respuesta = {
+        "id": agradecimiento.id,
+        "receptor_id": agradecimiento.receptor_id,
+        "tipo": agradecimiento.tipo,
+        "descripcion": agradecimiento.descripcion,
+        "materia_id": agradecimiento.materia_id,
+        "fecha": agradecimiento.fecha
+    }
+
+    # explicador (emisor) y mejor_compañero (receptor) leen los contadores recién sumados
+    verificar_logros_sociales(db, current_user.id)
+    verificar_logros_sociales(db, datos.receptor_id)
+    return {"message": "Agradecimiento enviado", "agradecimiento": respuesta}
+
+@router.get("/agradecimientos")
+def listar_agradecimientos(
+    rol: str = Query(agradecimientos_service.RECIBIDOS, pattern="^(recibidos|enviados)$"),
+    usuario_id: Optional[str] = None,
+    tipo: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Agradecimientos recibidos o enviados (propios o de otro usuario), del más nuevo; cursor = paginacion.cursor"""
+    usuario_id = usuario_id or current_user.id
+    if cursor and "|" not in cursor:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    filas = db.execute(
+        agradecimientos_service.consulta_feed(usuario_id, rol, cursor, tipo).limit(limit + 1)
+    ).mappings().all()
+    has_more = len(filas) > limit
+    filas = filas[:limit]
+
+    return {
+        "agradecimientos": [
+            {
+                "id": f["id"],
+                "tipo": f["tipo"],
+                "descripcion": f["descripcion"],
+                "materia_id": f["materia_id"],
+                "materia_nombre": f["materia_nombre"],
+                "fecha": f["fecha"],
+                # El emisor en "recibidos", el receptor en "enviados"
+                "usuario": {
+                    "id": f["usuario_id"],
+                    "nombre": f"{f['usuario_nombre']} {f['usuario_apellido']}",
+                    "avatar_url": f["usuario_avatar_url"]
+                }
+            }
+            for f in filas
+        ],
+        # Los totales por tipo van en la primera página
+        "contadores": None if cursor else agradecimientos_service.contadores(db, usuario_id),
+        "paginacion": {
+            "limit": limit,
+            "has_more": has_more,
+            "cursor": agradecimientos_service.armar_cursor(filas[-1]["fecha_cursor"], filas[-1]["id"])
+            if has_more else None
+        }
     }
 
 # ==================== FUNCIONES AUXILIARES ====================
+def _desbloquear(db: Session, logro_id: str, usuario_id: str, contexto: str):
+    logro = db.query(Logro).filter(Logro.id == logro_id).first()
+    if not logro:
+        return
+    desbloqueado = db.query(LogroDesbloqueado).filter(
+        LogroDesbloqueado.logro_id == logro.id,
+        LogroDesbloqueado.usuario_id == usuario_id
+    ).first()
+    if not desbloqueado:
+        db.add(LogroDesbloqueado(
+            id=f"ld_{uuid.uuid4().hex[:10]}",
+            logro_id=logro.id,
+            usuario_id=usuario_id,
+            datos_contexto=contexto
+        ))
+
 def verificar_logros_sociales(db: Session, usuario_id: str):
-    """Verificar logros relacionados con actividades sociales"""
+    """Verificar logros relacionados con actividades sociales (leyendo los contadores del usuario)"""
+    estadisticas = estadisticas_service.obtener(db, usuario_id)
+
     # Logro: Primer apunte compartido
-    apuntes_count = db.query(ApunteCompartido).filter(
-        ApunteCompartido.usuario_id == usuario_id
-    ).count()
-    
-    if apuntes_count == 1:
-        # Otorgar logro "Compartidor"
-        logro = db.query(Logro).filter(Logro.id == "logro_compartidor").first()
-        if logro:
-            desbloqueado = db.query(LogroDesbloqueado).filter(
-                LogroDesbloqueado.logro_id == logro.id,
-                LogroDesbloqueado.usuario_id == usuario_id
-            ).first()
-            
-            if not desbloqueado:
-                nuevo_desbloqueo = LogroDesbloqueado(
-                    id=f"ld_{uuid.uuid4().hex[:10]}",
-                    logro_id=logro.id,
-                    usuario_id=usuario_id,
-                    datos_contexto="Primer apunte compartido"
-                )
-                db.add(nuevo_desbloqueo)
-    
+    if estadisticas and estadisticas.apuntes_compartidos >= 1:
+        _desbloquear(db, "logro_compartidor", usuario_id, "Primer apunte compartido")
+
     # Logro: Únete a 3 grupos
-    from app.models.models import usuarios_grupos
-    grupos_count = db.execute(
-        usuarios_grupos.select().where(
-            usuarios_grupos.c.usuario_id == usuario_id
-        )
-    ).rowcount
-    
-    if grupos_count == 3:
-        logro = db.query(Logro).filter(Logro.id == "logro_social").first()
-        if logro:
-            desbloqueado = db.query(LogroDesbloqueado).filter(
-                LogroDesbloqueado.logro_id == logro.id,
-                LogroDesbloqueado.usuario_id == usuario_id
-            ).first()
-            
-            if not desbloqueado:
-                nuevo_desbloqueo = LogroDesbloqueado(
-                    id=f"ld_{uuid.uuid4().hex[:10]}",
-                    logro_id=logro.id,
-                    usuario_id=usuario_id,
-                    datos_contexto="Unido a 3 grupos de estudio"
-                )
-                db.add(nuevo_desbloqueo)
+    if estadisticas and estadisticas.grupos_integrante >= 3:
+        _desbloquear(db, "logro_social", usuario_id, "Unido a 3 grupos de estudio")
+
+    # El resto de los logros sociales: sus condiciones también leen contadores
+    for logro_id in ("organizador", "comunidad", "tutor", "mentor_senior", "mejor_compañero", "explicador"):
+        if LogroService.verificar_logro(logro_id, [], [], [], [], db, usuario_id):
+            _desbloquear(db, logro_id, usuario_id, None)
     
+    # Toda escritura social que llega acá cambia algo de la tarjeta de perfil
+    perfil_service.invalidar(db, usuario_id)
     db.commit()
 
+MAX_DIAS_HISTORIAL_COMUNIDAD = 730
+
 @router.get("/estadisticas/comunidad")
 def obtener_estadisticas_comunidad(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Obtener estadísticas generales de la comunidad"""
-    total_usuarios = db.query(Usuario).count()
-    total_grupos = db.query(GrupoEstudio).count()
-    total_apuntes = db.query(ApunteCompartido).filter(
-        ApunteCompartido.compartido_publicamente == True
-    ).count()
-    
-    # Materia con más apuntes
-    materia_popular = db.query(
-        Materia.nombre,
-        func.count(ApunteCompartido.id).label('total')
-    ).join(
-        ApunteCompartido, Materia.id == ApunteCompartido.materia_id
-    ).group_by(Materia.id).order_by(desc('total')).first()
-    
-    # Usuario más activo (más apuntes compartidos)
-    usuario_activo = db.query(
-        Usuario.nombre,
-        Usuario.apellido,
-        func.count(ApunteCompartido.id).label('total')
-    ).join(
-        ApunteCompartido, Usuario.id == ApunteCompartido.usuario_id
-    ).group_by(Usuario.id).order_by(desc('total')).first()
-    
+    """Obtener estadísticas generales de la comunidad (foto precalculada, total y por carrera)"""
+    foto = estadisticas_comunidad_service.obtener(db)
+    if foto is None:
+        # Base recién migrada y el primer cálculo todavía no terminó
+        estadisticas_comunidad_service.recalcular()
+        foto = estadisticas_comunidad_service.obtener(db)
+    total = foto["total"]
+    
+    # Materia con más apuntes, usuario más activo y tags: rankings precalculados
+    rankings = tendencias_service.obtener(db)
+    materia_popular = next(iter(rankings["materia_popular"]), None)
+    usuario_activo = next(iter(rankings["usuario_activo"]), None)
+    
+    # Iguales para todos y recalculadas cada pocos minutos
+    response.headers["Cache-Control"] = f"private, max-age={tendencias_service.TTL_CACHE}"
     return {
-        "total_usuarios": total_usuarios,
-        "total_grupos": total_grupos,
-        "total_apuntes": total_apuntes,
+        "total_usuarios": total["usuarios"],
+        "usuarios_activos": total["usuarios_activos"],
+        "total_grupos": total["grupos"],
+        "grupos_activos": total["grupos_activos"],
+        "total_apuntes": total["apuntes"],
+        "total_tutorias": total["tutorias"],
+        "total_agradecimientos": total["agradecimientos"],
+        "por_carrera": foto["por_carrera"],
+        "actualizado": foto["fecha_calculo"],
         "materia_popular": {
-            "nombre": materia_popular[0] if materia_popular else None,
-            "total_apuntes": materia_popular[1] if materia_popular else 0
+            "nombre": materia_popular["etiqueta"] if materia_popular else None,
+            "total_apuntes": materia_popular["cantidad"] if materia_popular else 0
         },
         "usuario_mas_activo": {
-            "nombre": f"{usuario_activo[0]} {usuario_activo[1]}" if usuario_activo else None,
-            "total_apuntes": usuario_activo[2] if usuario_activo else 0
+            "nombre": usuario_activo["etiqueta"] if usuario_activo else None,
+            "total_apuntes": usuario_activo["cantidad"] if usuario_activo else 0
         },
         "tendencias": [
-            {"tag": "#Finales_Algoritmos", "posts": 128},
-            {"tag": "#Resumenes_Fisica2", "posts": 85},
-            {"tag": "#TP_IngSoftware", "posts": 64}
+            {"tag": t["etiqueta"], "posts": t["cantidad"]} for t in rankings["tag"][:5]
+        ]
+    }
+
+@router.get("/estadisticas/comunidad/historial")
+def historial_estadisticas_comunidad(
+    response: Response,
+    dias: int = Query(90, ge=1, le=MAX_DIAS_HISTORIAL_COMUNIDAD),
+    carrera_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Serie diaria de las estadísticas de la comunidad (de una carrera o de todas) para gráficos"""
+    desde = date.today() - timedelta(days=dias - 1)
+    response.headers["Cache-Control"] = f"private, max-age={tendencias_service.TTL_CACHE}"
+    return {
+        "carrera_id": carrera_id,
+        "serie": estadisticas_comunidad_service.historial(
+            db, carrera_id or estadisticas_comunidad_service.TODAS, desde
+        )
+    }
+
+@router.get("/tendencias")
+def obtener_tendencias(
+    response: Response,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Apuntes, materias y tags en tendencia (puntaje con decaimiento temporal)"""
+    rankings = tendencias_service.obtener(db)
+    # Iguales para todos y recalculados cada pocos minutos
+    response.headers["Cache-Control"] = f"private, max-age={tendencias_service.TTL_CACHE}"
+    return {
+        "apuntes": [
+            {"apunte_id": a["clave"], "titulo": a["etiqueta"], "puntaje": round(a["puntaje"], 3)}
+            for a in rankings["apunte"][:limit]
+        ],
+        "materias": [
+            {"materia_id": m["clave"], "materia": m["etiqueta"], "posts": m["cantidad"],
+             "puntaje": round(m["puntaje"], 3)}
+            for m in rankings["materia"][:limit]
+        ],
+        "tags": [
+            {"tag": t["etiqueta"], "posts": t["cantidad"], "puntaje": round(t["puntaje"], 3)}
+            for t in rankings["tag"][:limit]
         ]
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,203 @@
+# backend/app/services/agenda_grupo_service.py
+"""
+Horarios libres de un grupo de estudio y choques con las agendas personales.
+
+La ocupación de cada integrante sale de una sola consulta (UNION ALL) sobre
+las mismas fuentes que el calendario, para todos los integrantes a la vez:
+    - eventos de planificación con hora
+    - exámenes (notas): DURACION_EXAMEN desde su hora, o el día entero si no tiene
+    - clases checkpoint con hora
+    - sesiones de cualquier grupo del que sea integrante
+
+Los intervalos de cada integrante se ordenan y se unen, y después una
+barrida (sweep line) sobre los extremos de todos, ordenados, cuenta quién
+está ocupado en cada tramo. Los tramos con a lo sumo max_ausentes ocupados
+se recortan a la franja diaria (hora_desde, hora_hasta) y quedan los que
+duran al menos la sesión pedida. Todo es O(n log n) en la cantidad de
+intervalos: un mes de un grupo de 10 son unos pocos cientos.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, literal, null, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    Clase, EventoPlanificacion, InscripcionMateria, Nota, SesionGrupo, usuarios_grupos
+)
+
+DURACION_EXAMEN = 120  # minutos, para exámenes con hora
+DURACION_SIN_FIN = 60  # minutos, eventos con hora de inicio y sin fin ni duración
+
+Intervalo = Tuple[datetime, datetime]
+
+
+# ==================== OCUPACIÓN ====================
+
+def integrantes(db: Session, grupo_id: str) -> List[str]:
+    return list(db.execute(
+        select(usuarios_grupos.c.usuario_id).where(usuarios_grupos.c.grupo_id == grupo_id)
+    ).scalars())
+
+
+def _consulta_ocupacion(usuarios: List[str], desde: date, hasta: date):
+    """(usuario, fecha, hora_inicio, hora_fin, minutos) de cada compromiso en el rango"""
+    otros_grupos = usuarios_grupos.alias("otros_grupos")
+
+    eventos = select(
+        EventoPlanificacion.usuario_id.label("usuario_id"),
+        EventoPlanificacion.fecha.label("fecha"),
+        EventoPlanificacion.hora_inicio.label("hora_inicio"),
+        EventoPlanificacion.hora_fin.label("hora_fin"),
+        type_coerce(null(), Integer).label("minutos")
+    ).where(
+        EventoPlanificacion.usuario_id.in_(usuarios),
+        EventoPlanificacion.fecha.between(desde, hasta),
+        EventoPlanificacion.hora_inicio.is_not(None)
+    )
+
+    # Examen sin hora: hora_inicio NULL ocupa el día entero
+    examenes = select(
+        Nota.usuario_id, Nota.fecha, Nota.hora, null(), literal(DURACION_EXAMEN)
+    ).where(Nota.usuario_id.in_(usuarios), Nota.fecha.between(desde, hasta))
+
+    clases = select(
+        InscripcionMateria.usuario_id, Clase.fecha, Clase.hora_inicio, Clase.hora_fin,
+        Clase.duracion_minutos
+    ).join(
+        InscripcionMateria, Clase.inscripcion_id == InscripcionMateria.id
+    ).where(
+        InscripcionMateria.usuario_id.in_(usuarios),
+        Clase.es_checkpoint == True,
+        Clase.fecha.between(desde, hasta),
+        Clase.hora_inicio.is_not(None)
+    )
+
+    sesiones = select(
+        otros_grupos.c.usuario_id, SesionGrupo.fecha, SesionGrupo.hora_inicio,
+        SesionGrupo.hora_fin, SesionGrupo.duracion_minutos
+    ).join(
+        otros_grupos, and_(
+            otros_grupos.c.grupo_id == SesionGrupo.grupo_id,
+            otros_grupos.c.usuario_id.in_(usuarios)
+        )
+    ).where(SesionGrupo.fecha.between(desde, hasta))
+
+    return union_all(eventos, examenes, clases, sesiones)
+
+
+def _intervalo(fecha: date, hora_inicio: Optional[time], hora_fin: Optional[time],
+               minutos: Optional[int]) -> Intervalo:
+    if hora_inicio is None:
+        inicio = datetime.combine(fecha, time.min)
+        return inicio, inicio + timedelta(days=1)
+    inicio = datetime.combine(fecha, hora_inicio)
+    if hora_fin is not None and hora_fin > hora_inicio:
+        return inicio, datetime.combine(fecha, hora_fin)
+    return inicio, inicio + timedelta(minutes=minutos or DURACION_SIN_FIN)
+
+
+def _unir(intervalos: List[Intervalo]) -> List[Intervalo]:
+    """Ordenar y unir los que se pisan o se tocan"""
+    unidos: List[list] = []
+    for inicio, fin in sorted(intervalos):
+        if unidos and inicio <= unidos[-1][1]:
+            unidos[-1][1] = max(unidos[-1][1], fin)
+        else:
+            unidos.append([inicio, fin])
+    return [(inicio, fin) for inicio, fin in unidos]
+
+
+def ocupacion(db: Session, usuarios: List[str], desde: date, hasta: date) -> Dict[str, List[Intervalo]]:
+    """Intervalos ocupados de cada usuario, ya ordenados y unidos"""
+    por_usuario: Dict[str, List[Intervalo]] = {u: [] for u in usuarios}
+    if usuarios:
+        for fila in db.execute(_consulta_ocupacion(usuarios, desde, hasta)):
+            por_usuario[fila.usuario_id].append(
+                _intervalo(fila.fecha, fila.hora_inicio, fila.hora_fin, fila.minutos)
+            )
+    return {u: _unir(intervalos) for u, intervalos in por_usuario.items()}
+
+
+# ==================== BARRIDA ====================
+
+def _tramos_disponibles(ocupados: Dict[str, List[Intervalo]], inicio: datetime, fin: datetime,
+                        max_ausentes: int) -> List[Tuple[datetime, datetime, set]]:
+    """Tramos maximales de [inicio, fin) con a lo sumo max_ausentes ocupados (y quiénes)"""
+    # Al mismo instante, primero las salidas: un intervalo que termina cuando otro empieza no se pisa
+    puntos = sorted(
+        (momento, delta, usuario_id)
+        for usuario_id, intervalos in ocupados.items()
+        for a, b in intervalos
+        if a < fin and b > inicio
+        for momento, delta in ((max(a, inicio), 1), (min(b, fin), -1))
+    )
+    tramos, activos = [], set()
+    abierto: Optional[list] = None  # [inicio, ausentes]
+    cursor = inicio
+    for momento, delta, usuario_id in puntos + [(fin, 0, None)]:
+        if momento > cursor:
+            # Se corta cuando cambian los ausentes: sumándolos, A ocupado y después B
+            # daría un tramo con {A, B} aunque max_ausentes sea 1
+            if abierto is not None and abierto[1] != activos:
+                tramos.append((abierto[0], cursor, abierto[1]))
+                abierto = None
+            if abierto is None and len(activos) <= max_ausentes:
+                abierto = [cursor, set(activos)]
+            cursor = momento
+        if delta > 0:
+            activos.add(usuario_id)
+        elif delta < 0:
+            activos.discard(usuario_id)
+    if abierto is not None:
+        tramos.append((abierto[0], cursor, abierto[1]))
+    return tramos
+
+
+def _recortar_por_dia(inicio: datetime, fin: datetime, hora_desde: time,
+                      hora_hasta: time) -> List[Intervalo]:
+    partes = []
+    dia = inicio.date()
+    while dia <= fin.date():
+        a = max(inicio, datetime.combine(dia, hora_desde))
+        b = min(fin, datetime.combine(dia, hora_hasta))
+        if b > a:
+            partes.append((a, b))
+        dia += timedelta(days=1)
+    return partes
+
+
+def horarios_libres(db: Session, grupo_id: str, desde: date, hasta: date, duracion_minutos: int,
+                    hora_desde: time, hora_hasta: time, max_ausentes: int = 0,
+                    limite: int = 20, ahora: Optional[datetime] = None) -> List[dict]:
+    """Franjas donde el grupo puede juntarse: primero las de más integrantes disponibles"""
+    usuarios = integrantes(db, grupo_id)
+    ocupados = ocupacion(db, usuarios, desde, hasta)
+
+    inicio = max(datetime.combine(desde, time.min), ahora or datetime.now())
+    fin = datetime.combine(hasta + timedelta(days=1), time.min)
+    duracion = timedelta(minutes=duracion_minutos)
+
+    franjas = []
+    for a, b, ausentes in _tramos_disponibles(ocupados, inicio, fin, max_ausentes):
+        for franja_inicio, franja_fin in _recortar_por_dia(a, b, hora_desde, hora_hasta):
+            if franja_fin - franja_inicio >= duracion:
+                franjas.append({
+                    "inicio": franja_inicio,
+                    "fin": franja_fin,
+                    "duracion_minutos": int((franja_fin - franja_inicio).total_seconds() // 60),
+                    "disponibles": len(usuarios) - len(ausentes),
+                    "ausentes": sorted(ausentes),
+                })
+
+    franjas.sort(key=lambda f: (-f["disponibles"], f["inicio"]))
+    return franjas[:limite]
+
+
+def conflictos(db: Session, grupo_id: str, inicio: datetime, fin: datetime) -> List[str]:
+    """Integrantes que ya tienen algo entre inicio y fin"""
+    ocupados = ocupacion(db, integrantes(db, grupo_id), inicio.date(), fin.date())
+    return sorted(
+        usuario_id for usuario_id, intervalos in ocupados.items()
+        if any(a < fin and b > inicio for a, b in intervalos)
+    )
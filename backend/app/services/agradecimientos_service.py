@@ -0,0 +1,145 @@
+# backend/app/services/agradecimientos_service.py
+"""
+Agradecimientos (kudos) entre estudiantes: alta, feeds y contadores.
+
+Un agradecimiento se escribe una sola vez, en la tabla agradecimientos, y
+los feeds se arman al leer (fan-out on read): "recibidos" y "enviados" de
+un usuario son un rango de los índices (receptor_id, fecha, id) y
+(emisor_id, fecha, id), paginados por keyset. No hay bandejas por usuario
+que mantener ni copias que borrar.
+
+Se acepta uno por día por emisor, receptor y tipo (enviado_hoy): repetirlos
+inflaría los contadores y los logros que dependen de ellos.
+
+Lo que sí se mantiene son los contadores por usuario y tipo
+(agradecimientos_contadores): registrar() suma recibidos al receptor y
+enviados al emisor con un único INSERT ... ON CONFLICT DO UPDATE en la
+transacción del llamador, igual que estadisticas_service. Los logros
+(mejor_compañero, explicador) y el perfil leen esas pocas filas por PK en
+lugar de contar la tabla.
+"""
+import uuid
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+from sqlalchemy import String, and_, cast, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.database import insertar_con_conflicto
+from app.models.models import Agradecimiento, AgradecimientoContador, Materia, Usuario
+
+# Los que puede mandar un usuario; "calificacion" lo genera calificar_apunte
+TIPOS = ("explicacion", "ayuda", "apunte", "tutoria", "motivacion")
+TIPO_CALIFICACION = "calificacion"
+
+RECIBIDOS = "recibidos"
+ENVIADOS = "enviados"
+
+
+# ==================== ALTA Y CONTADORES ====================
+
+def registrar(db: Session, emisor_id: str, receptor_id: str, tipo: str, descripcion: str,
+              materia_id: Optional[str] = None) -> Agradecimiento:
+    """Agregar el agradecimiento y sumar a los contadores de los dos (sin commit)"""
+    agradecimiento = Agradecimiento(
+        id=f"agra_{uuid.uuid4().hex[:10]}",
+        emisor_id=emisor_id,
+        receptor_id=receptor_id,
+        tipo=tipo,
+        descripcion=descripcion,
+        materia_id=materia_id,
+        fecha=datetime.now()
+    )
+    db.add(agradecimiento)
+
+    tabla = AgradecimientoContador.__table__
+    insert = insertar_con_conflicto(db)
+    sentencia = insert(tabla)
+    db.execute(
+        sentencia.on_conflict_do_update(
+            index_elements=["usuario_id", "tipo"],
+            set_={
+                "recibidos": tabla.c.recibidos + sentencia.excluded.recibidos,
+                "enviados": tabla.c.enviados + sentencia.excluded.enviados,
+            }
+        ),
+        [
+            {"usuario_id": receptor_id, "tipo": tipo, "recibidos": 1, "enviados": 0},
+            {"usuario_id": emisor_id, "tipo": tipo, "recibidos": 0, "enviados": 1},
+        ]
+    )
+    return agradecimiento
+
+
+def enviado_hoy(db: Session, emisor_id: str, receptor_id: str, tipo: str,
+                hoy: Optional[date] = None) -> bool:
+    """Si el emisor ya le mandó uno de ese tipo hoy (rango del índice (emisor_id, fecha, id))"""
+    desde = datetime.combine(hoy or date.today(), time.min)
+    return db.execute(
+        select(Agradecimiento.id).where(
+            Agradecimiento.emisor_id == emisor_id,
+            Agradecimiento.fecha >= desde,
+            Agradecimiento.receptor_id == receptor_id,
+            Agradecimiento.tipo == tipo,
+        ).limit(1)
+    ).first() is not None
+
+
+def contadores(db: Session, usuario_id: str) -> Dict[str, Dict[str, int]]:
+    """{tipo: {"recibidos": n, "enviados": m}} del usuario"""
+    filas = db.execute(
+        select(AgradecimientoContador.tipo, AgradecimientoContador.recibidos,
+               AgradecimientoContador.enviados)
+        .where(AgradecimientoContador.usuario_id == usuario_id)
+    )
+    return {tipo: {RECIBIDOS: recibidos, ENVIADOS: enviados} for tipo, recibidos, enviados in filas}
+
+
+def total(db: Session, usuario_id: str, rol: str, tipo: Optional[str] = None) -> int:
+    """Recibidos o enviados del usuario, de un tipo o de todos"""
+    return sum(
+        cuenta[rol] for t, cuenta in contadores(db, usuario_id).items()
+        if tipo is None or t == tipo
+    )
+
+
+# ==================== FEEDS ====================
+
+def armar_cursor(fecha: Optional[str], agradecimiento_id: str) -> str:
+    return f"{fecha or ''}|{agradecimiento_id}"
+
+
+def consulta_feed(usuario_id: str, rol: str, cursor: Optional[str] = None,
+                  tipo: Optional[str] = None):
+    """Agradecimientos recibidos o enviados, del más nuevo al más viejo, con la otra persona"""
+    propio, otro = (
+        (Agradecimiento.receptor_id, Agradecimiento.emisor_id) if rol == RECIBIDOS
+        else (Agradecimiento.emisor_id, Agradecimiento.receptor_id)
+    )
+    persona = aliased(Usuario)
+    # Como en el listado de grupos: la fecha viaja en el cursor tal como está
+    # guardada y se compara como texto
+    fecha_texto = cast(Agradecimiento.fecha, String)
+
+    consulta = select(
+        Agradecimiento.id, Agradecimiento.tipo, Agradecimiento.descripcion,
+        Agradecimiento.materia_id, Materia.nombre.label("materia_nombre"),
+        Agradecimiento.fecha, fecha_texto.label("fecha_cursor"),
+        otro.label("usuario_id"), persona.nombre.label("usuario_nombre"),
+        persona.apellido.label("usuario_apellido"), persona.avatar_url.label("usuario_avatar_url"),
+    ).join(
+        persona, persona.id == otro
+    ).outerjoin(
+        Materia, Materia.id == Agradecimiento.materia_id
+    ).where(propio == usuario_id)
+
+    if tipo:
+        consulta = consulta.where(Agradecimiento.tipo == tipo)
+    if cursor:
+        fecha, _, agradecimiento_id = cursor.rpartition("|")
+        fecha = literal(fecha, String)
+        consulta = consulta.where(or_(
+            Agradecimiento.fecha < fecha,
+            and_(Agradecimiento.fecha == fecha, Agradecimiento.id < agradecimiento_id)
+        ))
+    return consulta.order_by(Agradecimiento.fecha.desc(), Agradecimiento.id.desc())
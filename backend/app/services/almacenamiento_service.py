@@ -0,0 +1,260 @@
+# backend/app/services/almacenamiento_service.py
+"""
+Almacenamiento de archivos de apuntes direccionado por contenido.
+
+Cada archivo se guarda una sola vez con su SHA-256 como nombre, en
+uploads/blobs/ab/cd/abcd... (dos niveles de subdirectorios para que ningún
+directorio crezca sin límite). El hash se calcula mientras se escribe a un
+temporal y el temporal se mueve con os.replace, así nunca queda un blob a
+medio escribir con nombre definitivo.
+
+Las referencias se cuentan desde ApunteCompartido.archivo_sha256: un blob
+se borra cuando ya ningún apunte lo usa, junto con los archivos derivados
+que se guardan a su lado como <sha256>.<sufijo> (vistas previas).
+
+Sin locks entre workers: el upload que reusa un blob existente le
+actualiza la fecha de modificación y su apunte hace commit después, así
+que liberar() no borra blobs tocados hace menos de GRACIA_BLOB. Para que
+la verificación y el borrado no se crucen con ese upload, liberar() primero
+mueve el blob a un temporal y recién ahí mira la fecha: si lo tocaron, lo
+devuelve; si el upload llega tarde, no encuentra el blob y guarda el suyo.
+Lo que quede sin referencias (blobs salteados por la gracia, uploads que
+fallaron antes del commit, temporales de un proceso caído) lo barre el
+worker líder (core/lider) cada INTERVALO_BARRIDO.
+
+Los uploads HTTP usan guardar_upload (async, con aiofiles): el formato se
+detecta por los magic bytes del primer bloque, no por la extensión, y el
+tamaño se corta en MAX_TAMANIO_APUNTE.
+"""
+import glob
+import hashlib
+import os
+import re
+import time
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app.core import lider
+from app.database import SessionLocal
+from app.models.models import ApunteCompartido
+
+DIRECTORIO_UPLOADS = "uploads"
+DIRECTORIO_BLOBS = os.path.join(DIRECTORIO_UPLOADS, "blobs")
+DIRECTORIO_TEMPORAL = os.path.join(DIRECTORIO_BLOBS, "tmp")
+TAMANIO_CHUNK = 1024 * 1024
+MAX_TAMANIO_APUNTE = int(os.getenv("MAX_TAMANIO_APUNTE_MB", "25")) * 1024 * 1024
+GRACIA_BLOB = 15 * 60  # segundos: de confirmar() al commit del apunte sobra
+INTERVALO_BARRIDO = 6 * 60 * 60  # segundos
+
+_NOMBRE_BLOB = re.compile(r"[0-9a-f]{64}")
+
+
+# Firmas de los formatos aceptados (en orden: la primera que coincide gana)
+_FIRMAS = [
+    (b"%PDF-", "pdf"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"PK\x03\x04", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+]
+# Contenedores que comparten firma: la extensión solo elige entre los compatibles
+_EXTENSIONES_CONTENEDOR = {
+    "zip": {"docx", "xlsx", "pptx", "odt", "ods", "odp", "zip"},
+    "ole": {"doc", "xls", "ppt"},
+}
+_FORMATO_CONTENEDOR_DEFECTO = {"zip": "zip", "ole": "doc"}
+_EXTENSIONES_TEXTO = {"txt", "md", "csv", "tex", "py", "c", "cpp", "java", "js", "sql", "json"}
+
+
+class ArchivoInvalido(ValueError):
+    """Upload rechazado; status_code es el código HTTP a devolver"""
+
+    def __init__(self, mensaje: str, status_code: int = 400):
+        super().__init__(mensaje)
+        self.status_code = status_code
+
+
+def detectar_formato(cabecera: bytes, nombre: Optional[str]) -> Optional[str]:
+    """Formato real del archivo según sus primeros bytes (None si no es uno aceptado)"""
+    extension = (nombre or "").rsplit(".", 1)[-1].lower() if "." in (nombre or "") else ""
+
+    for firma, formato in _FIRMAS:
+        if cabecera.startswith(firma):
+            if formato in _EXTENSIONES_CONTENEDOR:
+                if extension in _EXTENSIONES_CONTENEDOR[formato]:
+                    return extension
+                return _FORMATO_CONTENEDOR_DEFECTO[formato]
+            return formato
+
+    # Texto plano: UTF-8 válido y sin bytes nulos (el bloque puede cortar un carácter al final)
+    if b"\x00" not in cabecera:
+        try:
+            cabecera.decode("utf-8")
+        except UnicodeDecodeError as e:
+            if e.start < len(cabecera) - 3:
+                return None
+        return extension if extension in _EXTENSIONES_TEXTO else "txt"
+    return None
+
+
+def ruta_blob(sha256: str) -> str:
+    return os.path.join(DIRECTORIO_BLOBS, sha256[:2], sha256[2:4], sha256)
+
+
+def ruta_archivo(archivo_sha256: str, contenido: str) -> str:
+    """Ruta en disco del archivo de un apunte (blob o, si no se migró, el nombre original en uploads/)"""
+    if archivo_sha256:
+        return ruta_blob(archivo_sha256)
+    return os.path.join(DIRECTORIO_UPLOADS, contenido[len("FILE:"):])
+
+
+def ruta_temporal() -> str:
+    """Temporal en el mismo filesystem que los blobs (os.replace es atómico ahí)"""
+    os.makedirs(DIRECTORIO_TEMPORAL, exist_ok=True)
+    return os.path.join(DIRECTORIO_TEMPORAL, uuid.uuid4().hex)
+
+
+def confirmar(ruta_tmp: str, sha256: str) -> str:
+    """Mover el temporal a su blob; si el contenido ya estaba guardado, descartarlo"""
+    destino = ruta_blob(sha256)
+    try:
+        # Tocar el blob lo protege de liberar() hasta que el apunte haga commit
+        os.utime(destino)
+    except FileNotFoundError:
+        # No existe, o liberar() se lo acaba de llevar: el temporal pasa a ser el blob
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(ruta_tmp, destino)
+    else:
+        os.remove(ruta_tmp)
+    return destino
+
+
+def guardar(origen: BinaryIO) -> Tuple[str, int]:
+    """Guardar el contenido de origen calculando el hash en el mismo recorrido -> (sha256, bytes)"""
+    hasher = hashlib.sha256()
+    tamanio = 0
+    tmp = ruta_temporal()
+    try:
+        with open(tmp, "wb") as destino:
+            while chunk := origen.read(TAMANIO_CHUNK):
+                hasher.update(chunk)
+                destino.write(chunk)
+                tamanio += len(chunk)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    sha256 = hasher.hexdigest()
+    confirmar(tmp, sha256)
+    return sha256, tamanio
+
+
+async def guardar_upload(upload: UploadFile, max_bytes: int = MAX_TAMANIO_APUNTE) -> Tuple[str, int, str]:
+    """Guardar un upload por bloques -> (sha256, bytes, formato detectado)
+
+    Un solo recorrido: cada bloque se valida, se agrega al hash y se escribe
+    al temporal con aiofiles. Se corta apenas el tamaño supera max_bytes o
+    si los primeros bytes no son de un formato aceptado.
+    """
+    hasher = hashlib.sha256()
+    tamanio = 0
+    formato = None
+    tmp = ruta_temporal()
+    try:
+        async with aiofiles.open(tmp, "wb") as destino:
+            while chunk := await upload.read(TAMANIO_CHUNK):
+                if formato is None:
+                    formato = detectar_formato(chunk, upload.filename)
+                    if formato is None:
+                        raise ArchivoInvalido("Formato de archivo no soportado", 415)
+                tamanio += len(chunk)
+                if tamanio > max_bytes:
+                    raise ArchivoInvalido(
+                        f"El archivo supera el máximo de {max_bytes // (1024 * 1024)} MB", 413
+                    )
+                hasher.update(chunk)
+                await destino.write(chunk)
+        if tamanio == 0:
+            raise ArchivoInvalido("El archivo está vacío")
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    sha256 = hasher.hexdigest()
+    confirmar(tmp, sha256)
+    return sha256, tamanio, formato
+
+
+def referencias(db: Session, sha256: str) -> int:
+    return db.query(ApunteCompartido.id).filter(ApunteCompartido.archivo_sha256 == sha256).count()
+
+
+def liberar(db: Session, sha256: str) -> bool:
+    """Borrar el blob si ningún apunte lo referencia (llamar después del commit)"""
+    if not sha256 or referencias(db, sha256) > 0:
+        return False
+    ruta = ruta_blob(sha256)
+    apartado = ruta_temporal()
+    try:
+        os.replace(ruta, apartado)
+    except FileNotFoundError:
+        return False
+    # El rename conserva la fecha: un upload que lo reusó antes ya la dejó al día,
+    # y uno que llegue después no encuentra el blob y guarda el suyo
+    if time.time() - os.stat(apartado).st_mtime < GRACIA_BLOB:
+        os.replace(apartado, ruta)
+        return False
+    for derivado in glob.glob(glob.escape(ruta) + ".*"):
+        os.remove(derivado)
+    os.remove(apartado)
+    return True
+
+
+# ==================== BARRIDO PERIÓDICO ====================
+
+def barrer() -> int:
+    """Borrar blobs sin referencias y temporales abandonados; devuelve cuántos blobs"""
+    ahora = time.time()
+    borrados = 0
+    db = SessionLocal()
+    try:
+        for directorio, subdirectorios, archivos in os.walk(DIRECTORIO_BLOBS):
+            if directorio == DIRECTORIO_TEMPORAL:
+                subdirectorios.clear()
+                for nombre in archivos:
+                    ruta = os.path.join(directorio, nombre)
+                    try:
+                        if ahora - os.stat(ruta).st_mtime > GRACIA_BLOB:
+                            os.remove(ruta)
+                    except FileNotFoundError:
+                        pass
+                continue
+            for nombre in archivos:
+                if _NOMBRE_BLOB.fullmatch(nombre) and liberar(db, nombre):
+                    borrados += 1
+        return borrados
+    finally:
+        db.close()
+
+
+_barrido = lider.TareaPeriodica(
+    "barrer-blobs", barrer, INTERVALO_BARRIDO,
+    "Error barriendo blobs sin referencias", solo_lider=True, inmediata=False
+)
+
+
+def iniciar():
+    """Arrancar el barrido periódico de blobs (startup del servidor)"""
+    _barrido.iniciar()
+
+
+def detener():
+    _barrido.detener()
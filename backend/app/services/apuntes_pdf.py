@@ -0,0 +1,76 @@
+# backend/app/services/apuntes_pdf.py
+"""
+Trabajo sobre los PDF subidos como apuntes.
+
+Igual que calendario_pdf_parser, estas funciones corren en procesos worker
+(ver pool_procesos) y no importan nada de la app.
+"""
+import os
+
+MAX_CARACTERES_TEXTO = 200_000  # Suficiente para buscar sin inflar el índice
+ANCHO_MINIATURA = 320  # px: nítida en la tarjeta del muro y de ~10-20 KB en JPEG
+CALIDAD_MINIATURA = 70
+
+
+def extraer_texto(ruta_pdf: str, max_caracteres: int = MAX_CARACTERES_TEXTO) -> str:
+    """Texto plano del PDF, página por página, hasta max_caracteres"""
+    from pypdf import PdfReader
+
+    partes = []
+    total = 0
+    for pagina in PdfReader(ruta_pdf).pages:
+        texto = " ".join((pagina.extract_text() or "").split())
+        if not texto:
+            continue
+        partes.append(texto)
+        total += len(texto) + 1
+        if total >= max_caracteres:
+            break
+    return "\n".join(partes)[:max_caracteres]
+
+
+def _texto_metadato(valor) -> str:
+    return " ".join(str(valor).split())[:200] if valor else None
+
+
+def generar_vista_previa(ruta_pdf: str, ruta_miniatura: str, ancho: int = ANCHO_MINIATURA) -> dict:
+    """Cantidad de páginas, metadatos y miniatura JPEG de la primera página
+
+    La miniatura se renderiza con PyMuPDF; si no está instalado (o la página
+    no se puede dibujar) se devuelven solo los metadatos, leídos con pypdf,
+    y "miniatura" queda en False. La imagen se escribe a un temporal y se
+    mueve con os.replace: nunca se sirve una miniatura a medio escribir.
+    """
+    from pypdf import PdfReader
+
+    lector = PdfReader(ruta_pdf)
+    info = lector.metadata or {}
+    primera = lector.pages[0].mediabox if lector.pages else None
+    metadatos = {
+        "paginas": len(lector.pages),
+        "titulo": _texto_metadato(info.get("/Title")),
+        "autor": _texto_metadato(info.get("/Author")),
+        "ancho_pt": round(float(primera.width)) if primera else None,
+        "alto_pt": round(float(primera.height)) if primera else None,
+        "miniatura": False,
+    }
+
+    try:
+        import pymupdf
+    except ImportError:
+        return metadatos
+
+    tmp = f"{ruta_miniatura}.{os.getpid()}.tmp"
+    try:
+        with pymupdf.open(ruta_pdf) as documento:
+            pagina = documento[0]
+            escala = ancho / pagina.rect.width
+            pixmap = pagina.get_pixmap(matrix=pymupdf.Matrix(escala, escala), alpha=False)
+            with open(tmp, "wb") as destino:
+                destino.write(pixmap.tobytes("jpeg", jpg_quality=CALIDAD_MINIATURA))
+        os.replace(tmp, ruta_miniatura)
+        metadatos["miniatura"] = True
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return metadatos
@@ -0,0 +1,226 @@
+# backend/app/services/busqueda_service.py
+"""
+Búsquedas de texto sobre los índices FTS5 creados por las migraciones.
+
+Usuarios (usuarios_busqueda, tokenizer trigram): cada término de la
+consulta se descompone en trigramas y se buscan con OR, así un error de
+tipeo solo pierde algunos trigramas en vez de descartar el resultado. FTS5
+devuelve pocos candidatos ordenados por bm25 y acá se re-rankean
+priorizando coincidencias exactas y de prefijo.
+
+Apuntes (apuntes_busqueda, por palabras): todos los términos como prefijo,
+ordenados por bm25 ajustado por la calificación promedio.
+
+En motores sin FTS5 ambas búsquedas caen a ILIKE.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import Session, aliased
+
+from app.models.models import ApunteCompartido, InscripcionMateria, Materia, Usuario
+
+CANDIDATOS_FTS = 50
+SIMILITUD_MINIMA = 0.3  # Mismo umbral por defecto que pg_trgm
+
+# Pesos bm25 por columna: nombre, apellido, legajo, email. Cada fila FTS se
+# une a su usuario por usuarios_busqueda_ids (0019): el rowid de usuarios no
+# es estable
+_SQL_USUARIOS = text("""
+    SELECT u.id, u.nombre, u.apellido, u.legajo, u.email, u.avatar_url,
+           u.promedio_general,
+           bm25(usuarios_busqueda, 4.0, 4.0, 3.0, 1.0) AS rango
+    FROM usuarios_busqueda
+    CROSS JOIN usuarios_busqueda_ids i ON i.fts_rowid = usuarios_busqueda.rowid
+    CROSS JOIN usuarios u ON u.id = i.usuario_id
+    WHERE usuarios_busqueda MATCH :expresion AND u.id != :excluir_id
+    ORDER BY rango
+    LIMIT :limite
+""")
+
+
+def _terminos(consulta: str) -> List[str]:
+    return [t for t in consulta.lower().split() if t]
+
+
+def _trigramas(texto: str) -> set:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _similitud(a: str, b: str) -> float:
+    """Similitud de trigramas con relleno de bordes (como pg_trgm)"""
+    ta, tb = _trigramas(f"  {a} "), _trigramas(f"  {b} ")
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def _expresion_match(terminos: List[str]) -> Optional[str]:
+    """OR de todos los trigramas de la consulta, cada uno como frase FTS5"""
+    trigramas = set()
+    for termino in terminos:
+        trigramas |= _trigramas(termino)
+    if not trigramas:
+        return None
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in sorted(trigramas))
+
+
+def _puntaje(terminos: List[str], fila) -> float:
+    """Promedio, por término, de la mejor coincidencia contra las palabras del usuario"""
+    palabras = " ".join([
+        fila.nombre or "", fila.apellido or "", fila.legajo or "",
+        (fila.email or "").split("@")[0]
+    ]).lower().split()
+
+    total = 0.0
+    for termino in terminos:
+        mejor = 0.0
+        for palabra in palabras:
+            if palabra == termino:
+                mejor = 1.0
+                break
+            if palabra.startswith(termino):
+                mejor = max(mejor, 0.9)
+            elif termino in palabra:
+                mejor = max(mejor, 0.7)
+            else:
+                mejor = max(mejor, _similitud(termino, palabra) * 0.8)
+        total += mejor
+    return total / len(terminos)
+
+
+def _buscar_con_ilike(db: Session, terminos: List[str], excluir_id: str, limite: int, prefijo: bool = False):
+    """Búsqueda sin FTS5: por subcadena (motores sin FTS5) o por prefijo (menos de 3 letras)"""
+    campos = [Usuario.nombre, Usuario.apellido, Usuario.legajo]
+    if not prefijo:
+        campos.append(Usuario.email)
+    filtros = [
+        campo.ilike(f"{termino}%" if prefijo else f"%{termino}%")
+        for termino in terminos for campo in campos
+    ]
+    return db.query(
+        Usuario.id, Usuario.nombre, Usuario.apellido, Usuario.legajo,
+        Usuario.email, Usuario.avatar_url, Usuario.promedio_general
+    ).filter(or_(*filtros), Usuario.id != excluir_id).limit(limite).all()
+
+
+def buscar_usuarios(db: Session, consulta: str, excluir_id: str, limite: int = 10) -> list:
+    """Usuarios que coinciden con la consulta, del más al menos relevante"""
+    terminos = _terminos(consulta)
+    if not terminos:
+        return []
+
+    expresion = _expresion_match(terminos)
+    if expresion is None:
+        # Términos de menos de 3 letras no tienen trigramas
+        return _buscar_con_ilike(db, terminos, excluir_id, limite, prefijo=True)
+    if db.get_bind().dialect.name != "sqlite":
+        return _buscar_con_ilike(db, terminos, excluir_id, limite)
+
+    candidatos = db.execute(_SQL_USUARIOS, {
+        "expresion": expresion,
+        "excluir_id": excluir_id,
+        "limite": CANDIDATOS_FTS
+    }).all()
+
+    puntuados = [(_puntaje(terminos, fila), orden, fila) for orden, fila in enumerate(candidatos)]
+    puntuados = [p for p in puntuados if p[0] >= SIMILITUD_MINIMA]
+    # Mayor puntaje primero; a igual puntaje, el orden de bm25
+    puntuados.sort(key=lambda p: (-p[0], p[1]))
+    return [fila for _, _, fila in puntuados[:limite]]
+
+
+def consulta_materias_comunes(usuario_id: str, candidatos_ids: List[str]):
+    """Materias que cada candidato comparte con el usuario, en una sola consulta agrupada"""
+    mias = aliased(InscripcionMateria)
+    suyas = aliased(InscripcionMateria)
+    return select(
+        suyas.usuario_id, Materia.nombre
+    ).join(
+        mias, mias.materia_id == suyas.materia_id
+    ).join(
+        Materia, Materia.id == suyas.materia_id
+    ).where(
+        mias.usuario_id == usuario_id,
+        suyas.usuario_id.in_(candidatos_ids)
+    ).group_by(suyas.usuario_id, Materia.id, Materia.nombre)
+
+
+def materias_comunes(db: Session, usuario_id: str, candidatos_ids: List[str]) -> Dict[str, List[str]]:
+    """{candidato_id: [nombres de materias compartidas]} (varios intentos cuentan una vez)"""
+    comunes = {c: [] for c in candidatos_ids}
+    if candidatos_ids:
+        for candidato_id, nombre in db.execute(consulta_materias_comunes(usuario_id, candidatos_ids)):
+            comunes[candidato_id].append(nombre)
+    return comunes
+
+
+# ==================== APUNTES ====================
+
+CANDIDATOS_APUNTES = 500
+
+# rank = bm25 con los pesos de la migración 0004. bm25 es negativo (menor es
+# mejor), así que multiplicar por (1 + calificación/5) sube los mejor valorados
+# hasta el doble. FTS5 corta los candidatos por rank con su índice y el ajuste
+# por calificación solo se calcula sobre esos, así el costo no crece con la
+# biblioteca. CROSS JOIN fija el orden: candidatos primero y cada apunte por
+# apuntes_busqueda_ids (0020) y su id (sin él SQLite puede recorrer
+# apuntes_compartidos entero).
+_SQL_APUNTES = text("""
+    SELECT a.id, c.fragmento,
+           c.rango * (1 + COALESCE(a.calificacion_promedio, 0) / 5.0) AS puntaje
+    FROM (
+        SELECT rowid AS fts_rowid, rank AS rango,
+               snippet(apuntes_busqueda, -1, '<mark>', '</mark>', '…', 16) AS fragmento
+        FROM apuntes_busqueda
+        WHERE apuntes_busqueda MATCH :expresion
+        ORDER BY rank
+        LIMIT :candidatos
+    ) c
+    CROSS JOIN apuntes_busqueda_ids i ON i.fts_rowid = c.fts_rowid
+    CROSS JOIN apuntes_compartidos a ON a.id = i.apunte_id
+    WHERE a.compartido_publicamente = 1 AND a.activo = 1
+      AND (:materia_id IS NULL OR a.materia_id = :materia_id)
+    ORDER BY puntaje
+    LIMIT :limite OFFSET :offset
+""")
+
+
+def _expresion_apuntes(consulta: str) -> Optional[str]:
+    """Todos los términos (AND), cada uno como prefijo: "parcial" "algeb"*"""
+    terminos = [t.replace('"', '""') for t in consulta.split() if t.strip('"')]
+    if not terminos:
+        return None
+    return " ".join(f'"{t}"*' for t in terminos)
+
+
+def _buscar_apuntes_con_ilike(db: Session, consulta: str, materia_id: Optional[str], limite: int, offset: int):
+    query = db.query(ApunteCompartido.id).filter(
+        ApunteCompartido.compartido_publicamente == True,
+        ApunteCompartido.activo == True,
+        *[or_(ApunteCompartido.titulo.ilike(f"%{t}%"), ApunteCompartido.descripcion.ilike(f"%{t}%"))
+          for t in consulta.split()]
+    )
+    if materia_id:
+        query = query.filter(ApunteCompartido.materia_id == materia_id)
+    filas = query.order_by(ApunteCompartido.calificacion_promedio.desc()).offset(offset).limit(limite).all()
+    return [(f.id, None) for f in filas]
+
+
+def buscar_apuntes(db: Session, consulta: str, materia_id: Optional[str] = None,
+                   limite: int = 20, offset: int = 0) -> List[Tuple[str, str]]:
+    """[(apunte_id, fragmento)] de los apuntes públicos que coinciden, del más relevante al menos"""
+    expresion = _expresion_apuntes(consulta)
+    if expresion is None:
+        return []
+    if db.get_bind().dialect.name != "sqlite":
+        return _buscar_apuntes_con_ilike(db, consulta, materia_id, limite, offset)
+
+    filas = db.execute(_SQL_APUNTES, {
+        "expresion": expresion,
+        "candidatos": CANDIDATOS_APUNTES,
+        "materia_id": materia_id,
+        "limite": limite,
+        "offset": offset
+    }).all()
+    return [(f.id, f.fragmento) for f in filas]
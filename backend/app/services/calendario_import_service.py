@@ -0,0 +1,285 @@
+# backend/app/services/calendario_import_service.py
+"""
+Importación asíncrona de calendarios académicos en PDF.
+
+El endpoint guarda el PDF en disco y registra una importación; el parseo se
+reparte por lotes de páginas en un pool de procesos y un hilo coordinador va
+actualizando el progreso y, al final, crea los eventos en un único INSERT.
+El estado de cada importación se guarda en importaciones_calendario, así el
+polling responde desde cualquier worker y no solo desde el que recibió el
+archivo. Las terminadas se borran a las HORAS_RETENCION horas.
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, update
+
+from app.database import SessionLocal
+from app.models.models import (
+    EventoPlanificacion, ImportacionCalendario, InscripcionMateria, Materia, Nota
+)
+from app.services import calendario_pdf_parser as parser
+from app.services import pool_procesos
+from app.services.logros_service import LogroService
+
+DIRECTORIO_CALENDARIOS = os.path.join("uploads", "calendarios")
+PAGINAS_POR_LOTE = 4
+HORAS_RETENCION = 6
+MAX_TAMANIO_CALENDARIO = int(os.getenv("MAX_TAMANIO_CALENDARIO_MB", "20")) * 1024 * 1024
+
+COLORES_TIPO = {
+    "clases": "#3b82f6",  # Azul, igual que los checkpoints
+    "examen": "#ef4444",  # Rojo para exámenes
+    "parcial": "#ef4444",
+    "final": "#ef4444",
+    "tp": "#f59e0b",
+}
+TIPOS_CON_NOTA = ["parcial", "tp", "final"]
+
+_pool_coordinadores = ThreadPoolExecutor(max_workers=2, thread_name_prefix="importar-calendario")
+
+
+def ruta_archivo(importacion_id: str) -> str:
+    return os.path.join(DIRECTORIO_CALENDARIOS, f"{importacion_id}.pdf")
+
+
+def _publico(imp: ImportacionCalendario) -> dict:
+    return {
+        "id": imp.id,
+        "archivo": imp.archivo,
+        "estado": imp.estado,
+        "paginas_totales": imp.paginas_totales,
+        "paginas_procesadas": imp.paginas_procesadas,
+        "progreso": imp.progreso,
+        "eventos_detectados": imp.eventos_detectados,
+        "eventos_creados": imp.eventos_creados,
+        "notas_creadas": imp.notas_creadas,
+        "error": imp.error,
+        "fecha_inicio": imp.fecha_inicio,
+        "fecha_fin": imp.fecha_fin,
+    }
+
+
+def _actualizar(importacion_id: str, **campos):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ImportacionCalendario).where(ImportacionCalendario.id == importacion_id).values(**campos)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def nueva_importacion(usuario_id: str, nombre_archivo: str) -> dict:
+    """Registrar una importación pendiente y devolver su estado inicial"""
+    os.makedirs(DIRECTORIO_CALENDARIOS, exist_ok=True)
+    importacion = ImportacionCalendario(
+        id=f"impcal_{uuid.uuid4().hex[:10]}",
+        usuario_id=usuario_id,
+        archivo=nombre_archivo[:255],
+        estado="pendiente",
+        fecha_inicio=datetime.now()
+    )
+    db = SessionLocal()
+    try:
+        _limpiar_terminadas(db)
+        db.add(importacion)
+        db.commit()
+        return _publico(importacion)
+    finally:
+        db.close()
+
+
+def descartar(importacion_id: str):
+    """Eliminar una importación que no llegó a iniciarse (archivo inválido, error al guardarlo)"""
+    db = SessionLocal()
+    try:
+        db.execute(delete(ImportacionCalendario).where(ImportacionCalendario.id == importacion_id))
+        db.commit()
+    finally:
+        db.close()
+    if os.path.exists(ruta_archivo(importacion_id)):
+        os.remove(ruta_archivo(importacion_id))
+
+
+def _limpiar_terminadas(db):
+    """Borrar importaciones finalizadas hace más de HORAS_RETENCION (sin commit)"""
+    limite = datetime.now() - timedelta(hours=HORAS_RETENCION)
+    db.execute(delete(ImportacionCalendario).where(ImportacionCalendario.fecha_fin < limite))
+    # Las que quedaron a medias (el worker se reinició) no van a terminar nunca
+    db.execute(
+        update(ImportacionCalendario).where(
+            ImportacionCalendario.fecha_fin.is_(None),
+            ImportacionCalendario.fecha_inicio < limite
+        ).values(estado="error", error="La importación se interrumpió", fecha_fin=datetime.now())
+    )
+
+
+def obtener_importacion(importacion_id: str, usuario_id: str) -> Optional[dict]:
+    """Estado público de una importación del usuario (None si no existe o es ajena)"""
+    db = SessionLocal()
+    try:
+        imp = db.get(ImportacionCalendario, importacion_id)
+        if not imp or imp.usuario_id != usuario_id:
+            return None
+        return _publico(imp)
+    finally:
+        db.close()
+
+
+def iniciar(importacion_id: str, usuario_id: str, anio: int):
+    """Encolar el procesamiento sin bloquear el hilo del request"""
+    _pool_coordinadores.submit(_procesar, importacion_id, usuario_id, anio)
+
+
+def _procesar(importacion_id: str, usuario_id: str, anio: int):
+    ruta = ruta_archivo(importacion_id)
+    try:
+        _actualizar(importacion_id, estado="procesando")
+        procesos = pool_procesos.obtener()
+
+        total = procesos.submit(parser.contar_paginas, ruta).result()
+        _actualizar(importacion_id, paginas_totales=total)
+
+        futuros = {
+            procesos.submit(parser.procesar_paginas, ruta, desde, desde + PAGINAS_POR_LOTE, anio):
+                min(PAGINAS_POR_LOTE, total - desde)
+            for desde in range(0, total, PAGINAS_POR_LOTE)
+        }
+
+        entradas = []
+        procesadas = 0
+        for futuro in as_completed(futuros):
+            entradas.extend(futuro.result())
+            procesadas += futuros[futuro]
+            _actualizar(
+                importacion_id,
+                paginas_procesadas=procesadas,
+                # El 100% se reserva para cuando los eventos ya están guardados
+                progreso=int(procesadas * 95 / total) if total else 95,
+                eventos_detectados=len(entradas)
+            )
+
+        entradas.sort(key=lambda e: (e["pagina"], e["fecha"]))
+        eventos_creados, notas_creadas = _guardar_eventos(usuario_id, entradas)
+
+        _actualizar(
+            importacion_id,
+            estado="completado",
+            progreso=100,
+            eventos_creados=eventos_creados,
+            notas_creadas=notas_creadas,
+            fecha_fin=datetime.now()
+        )
+    except Exception as e:
+        print(f"⚠️ Error importando calendario {importacion_id}: {e}")
+        _actualizar(importacion_id, estado="error", error=str(e), fecha_fin=datetime.now())
+    finally:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+
+def _materia_de_entrada(texto: str, materias: List[tuple]) -> Optional[tuple]:
+    """Buscar la materia cursada mencionada en el texto (nombre más largo primero)"""
+    for materia_id, nombre_normalizado, codigo_normalizado, inscripcion_id in materias:
+        if nombre_normalizado in texto or (codigo_normalizado and codigo_normalizado in texto.split()):
+            return materia_id, inscripcion_id
+    return None
+
+
+def _guardar_eventos(usuario_id: str, entradas: List[dict]):
+    """Crear EventoPlanificacion (y notas centinela) para las entradas nuevas en una transacción"""
+    if not entradas:
+        return 0, 0
+
+    db = SessionLocal()
+    try:
+        # Materias en curso del usuario, para asociar cada entrada y crear la nota centinela
+        cursadas = db.query(
+            Materia.id, Materia.nombre, Materia.codigo, InscripcionMateria.id
+        ).join(
+            InscripcionMateria, InscripcionMateria.materia_id == Materia.id
+        ).filter(
+            InscripcionMateria.usuario_id == usuario_id,
+            InscripcionMateria.estado.in_(['cursando', 'regular'])
+        ).all()
+        materias = sorted(
+            [(m_id, parser.normalizar(nombre), parser.normalizar(codigo or ""), insc_id)
+             for m_id, nombre, codigo, insc_id in cursadas],
+            key=lambda m: len(m[1]),
+            reverse=True
+        )
+
+        # Evitar duplicados si se importa dos veces el mismo calendario
+        fechas = [date.fromisoformat(e["fecha"]) for e in entradas]
+        existentes = set(db.query(EventoPlanificacion.fecha, EventoPlanificacion.titulo).filter(
+            EventoPlanificacion.usuario_id == usuario_id,
+            EventoPlanificacion.fecha >= min(fechas),
+            EventoPlanificacion.fecha <= max(fechas)
+        ).all())
+
+        ahora = datetime.now()
+        eventos, notas = [], []
+        for entrada, fecha in zip(entradas, fechas):
+            if (fecha, entrada["titulo"]) in existentes:
+                continue
+            existentes.add((fecha, entrada["titulo"]))
+
+            asociada = _materia_de_entrada(entrada["texto"], materias)
+            materia_id, inscripcion_id = asociada if asociada else (None, None)
+
+            eventos.append({
+                "usuario_id": usuario_id,
+                "titulo": entrada["titulo"],
+                "descripcion": f"Importado del calendario académico (página {entrada['pagina']})",
+                "fecha": fecha,
+                "tipo": entrada["tipo"],
+                "materia_id": materia_id,
+                "color": COLORES_TIPO.get(entrada["tipo"], "#f43f5e"),
+                "prioridad": 3 if entrada["tipo"] in TIPOS_CON_NOTA else 2,
+                "completado": False,
+                "fecha_creacion": ahora
+            })
+
+            # Igual que crear_evento: parcial/tp/final con materia generan la "Nota Vacía" (-1)
+            if entrada["tipo"] in TIPOS_CON_NOTA and inscripcion_id:
+                notas.append({
+                    "id": f"nota_{uuid.uuid4().hex[:10]}",
+                    "inscripcion_id": inscripcion_id,
+                    "usuario_id": usuario_id,
+                    "materia_id": materia_id,
+                    "tipo_evaluacion": entrada["tipo"],
+                    "titulo": f"{entrada['tipo'].upper()}: {entrada['titulo']}"[:200],
+                    "nota": -1.0,  # VALOR CENTINELA para el dashboard
+                    "fecha": fecha,
+                    "es_parcial": entrada["tipo"] == "parcial",
+                    "es_final": entrada["tipo"] == "final",
+                    "es_tp": entrada["tipo"] == "tp",
+                    "es_recuperatorio": False,
+                    "influye_promedio": False,  # No influye hasta tener nota real
+                    "aprobada": False,
+                    "fecha_creacion": ahora
+                })
+
+        if eventos:
+            db.execute(insert(EventoPlanificacion.__table__), eventos)
+        if notas:
+            db.execute(insert(Nota.__table__), notas)
+        db.commit()
+
+        if eventos:
+            try:
+                LogroService.verificar_y_desbloquear_logros(db, usuario_id)
+            except Exception as e:
+                print(f"⚠️ Error verificando logros: {e}")
+
+        return len(eventos), len(notas)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,132 @@
+# backend/app/services/calendario_pdf_parser.py
+"""
+Extracción de eventos de un calendario académico en PDF.
+
+Este módulo corre dentro de procesos worker (ProcessPoolExecutor), por eso
+no importa nada de la app: solo texto -> eventos. La lectura del PDF usa
+pypdf y se hace por rangos de páginas para poder reportar progreso.
+"""
+import re
+import unicodedata
+from datetime import date
+from typing import List, Optional
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+    "noviembre": 11, "diciembre": 12
+}
+
+# 15/03/2026, 15-03-26, 15/03
+_RE_FECHA_NUMERICA = re.compile(r"\b(\d{1,2})[/\-.](\d{1,2})(?:[/\-.](\d{2,4}))?\b")
+# 15 de marzo de 2026, 15 de marzo
+_RE_FECHA_TEXTO = re.compile(
+    r"\b(\d{1,2})\s+de\s+(" + "|".join(MESES) + r")(?:\s+(?:de|del)\s+(\d{4}))?\b"
+)
+
+# El orden importa: la primera regla que coincide define el tipo
+_REGLAS_TIPO = [
+    ("final", re.compile(r"\bfinal(es)?\b|\bmesas? de examen")),
+    ("parcial", re.compile(r"\bparcial(es)?\b|\brecuperatorio")),
+    ("tp", re.compile(r"\btps?\b|\btrabajo practico|\bentrega\b")),
+    ("examen", re.compile(r"\bexamen(es)?\b|\bevaluacion")),
+    ("clases", re.compile(r"\bclases?\b|\bcursada\b|\bteorico\b|\bpractica\b")),
+]
+
+
+def _sin_tilde(caracter: str) -> str:
+    base = unicodedata.normalize("NFKD", caracter)[:1]
+    return base if base and not unicodedata.combining(base) else caracter
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes, conservando la longitud (un carácter por carácter)"""
+    return "".join(_sin_tilde(c) for c in texto.lower())
+
+
+def _construir_fecha(dia: int, mes: int, anio: Optional[str], anio_default: int) -> Optional[date]:
+    if anio:
+        anio = int(anio)
+        if anio < 100:
+            anio += 2000
+    else:
+        anio = anio_default
+    try:
+        return date(anio, mes, dia)
+    except ValueError:
+        return None
+
+
+def _buscar_fecha(linea_normalizada: str, anio_default: int):
+    """Devolver (fecha, span) de la primera fecha reconocible de la línea"""
+    m = _RE_FECHA_TEXTO.search(linea_normalizada)
+    if m:
+        fecha = _construir_fecha(int(m.group(1)), MESES[m.group(2)], m.group(3), anio_default)
+        if fecha:
+            return fecha, m.span()
+
+    m = _RE_FECHA_NUMERICA.search(linea_normalizada)
+    if m:
+        fecha = _construir_fecha(int(m.group(1)), int(m.group(2)), m.group(3), anio_default)
+        if fecha:
+            return fecha, m.span()
+
+    return None, None
+
+
+def clasificar(linea_normalizada: str) -> Optional[str]:
+    """Tipo de evento según palabras clave, o None si no es examen ni clase"""
+    for tipo, regla in _REGLAS_TIPO:
+        if regla.search(linea_normalizada):
+            return tipo
+    return None
+
+
+def extraer_eventos_texto(texto: str, anio_default: int, pagina: int = 1) -> List[dict]:
+    """Extraer las entradas fechadas de exámenes y clases de un bloque de texto"""
+    eventos = []
+    for linea in texto.splitlines():
+        linea = " ".join(linea.split())
+        if len(linea) < 4:
+            continue
+
+        normalizada = normalizar(linea)
+        tipo = clasificar(normalizada)
+        if not tipo:
+            continue
+
+        fecha, span = _buscar_fecha(normalizada, anio_default)
+        if not fecha:
+            continue
+
+        # normalizar() conserva la longitud, así que el span sirve sobre el original
+        titulo = (linea[:span[0]] + linea[span[1]:]).strip(" -:–|,.")
+        titulo = " ".join(titulo.split()) or tipo.capitalize()
+
+        eventos.append({
+            "fecha": fecha.isoformat(),
+            "tipo": tipo,
+            "titulo": titulo[:200],
+            "texto": normalizada,
+            "pagina": pagina
+        })
+    return eventos
+
+
+def contar_paginas(ruta_pdf: str) -> int:
+    """Cantidad de páginas del PDF (se ejecuta en un proceso worker)"""
+    from pypdf import PdfReader
+
+    return len(PdfReader(ruta_pdf).pages)
+
+
+def procesar_paginas(ruta_pdf: str, desde: int, hasta: int, anio_default: int) -> List[dict]:
+    """Extraer eventos de las páginas [desde, hasta) (se ejecuta en un proceso worker)"""
+    from pypdf import PdfReader
+
+    lector = PdfReader(ruta_pdf)
+    eventos = []
+    for indice in range(desde, min(hasta, len(lector.pages))):
+        texto = lector.pages[indice].extract_text() or ""
+        eventos.extend(extraer_eventos_texto(texto, anio_default, pagina=indice + 1))
+    return eventos
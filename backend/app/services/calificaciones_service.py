@@ -0,0 +1,39 @@
+# backend/app/services/calificaciones_service.py
+"""
+Agregado incremental de las calificaciones de apuntes.
+
+apuntes_compartidos guarda total_calificaciones y suma_calificaciones; el
+promedio y el puntaje de ranking se derivan de esos dos campos en el mismo
+UPDATE que los incrementa. Es O(1) por calificación (no se releen las
+anteriores) y, al ser una sola sentencia que parte del valor actual de la
+fila, dos calificaciones simultáneas no se pisan.
+
+puntaje_ranking es el promedio bayesiano: se suman PESO_PRIOR votos
+ficticios de PRIOR_CALIFICACION estrellas. Un apunte con un único 5 queda
+por debajo de uno con cuarenta votos de 4.6, y con muchos votos el
+puntaje converge al promedio real. Las constantes están repetidas en la
+migración 0007, que recalcula los apuntes existentes.
+"""
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models.models import ApunteCompartido
+
+PRIOR_CALIFICACION = 3.0
+PESO_PRIOR = 5
+
+
+def sumar_calificacion(db: Session, apunte_id: str, calificacion: int):
+    """Sumar una calificación al agregado del apunte (sin commit)"""
+    total = ApunteCompartido.total_calificaciones
+    suma = ApunteCompartido.suma_calificaciones
+    # En SET las columnas valen lo que tenían antes del UPDATE
+    db.execute(
+        update(ApunteCompartido).where(ApunteCompartido.id == apunte_id).values({
+            total: total + 1,
+            suma: suma + calificacion,
+            ApunteCompartido.calificacion_promedio: func.round((suma + calificacion) * 1.0 / (total + 1), 2),
+            ApunteCompartido.puntaje_ranking:
+                (PESO_PRIOR * PRIOR_CALIFICACION + suma + calificacion) / (PESO_PRIOR + total + 1),
+        }).execution_options(synchronize_session=False)
+    )
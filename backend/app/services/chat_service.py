@@ -0,0 +1,266 @@
+# backend/app/services/chat_service.py
+"""
+Mensajes de grupo y privados: log de solo-agregado, escritura por lotes y
+entrega en vivo por Server-Sent Events.
+
+Los mensajes nunca se editan; el id autoincremental es el cursor de la
+paginación (antes/después de un id, usando el índice (grupo_id, id) o
+(conversacion, id)) y el Last-Event-ID con el que el navegador retoma el
+stream después de un corte.
+
+Los envíos no escriben uno por uno: se encolan y una tarea del event loop
+junta los que llegan dentro de VENTANA_LOTE (hasta MAX_LOTE) y los inserta
+en un solo executemany en el threadpool. Con el commit hecho se publican
+en pubsub y cada request recibe su mensaje con el id asignado.
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.core import pubsub
+from app.database import SessionLocal
+from app.models.models import GrupoEstudio, MensajeGrupo, MensajePrivado, Usuario
+from app.services import recomendaciones_service
+
+VENTANA_LOTE = 0.01  # segundos que se espera a que lleguen más mensajes
+MAX_LOTE = 200
+LIMITE_HISTORIAL = 50
+MAX_CONTENIDO = 4000  # caracteres: el mensaje viaja entero en una línea del pubsub
+MAX_RECURSO_URL = 500  # largo de la columna
+INTERVALO_PING = 15  # segundos: mantiene viva la conexión a través de proxies
+
+# Tarea escritora, atada al event loop en que se creó
+_loop = None
+_cola: Optional[asyncio.Queue] = None
+_tarea: Optional[asyncio.Task] = None
+
+
+def canal_grupo(grupo_id: str) -> str:
+    return f"grupo:{grupo_id}"
+
+
+def conversacion(usuario_a: str, usuario_b: str) -> str:
+    return "|".join(sorted((usuario_a, usuario_b)))
+
+
+def canal_privado(conversacion_id: str) -> str:
+    return f"privado:{conversacion_id}"
+
+
+def _nombre(usuario: Usuario) -> str:
+    return f"{usuario.nombre} {usuario.apellido}"
+
+
+# ==================== ESCRITURA ====================
+
+async def enviar_a_grupo(grupo_id: str, usuario: Usuario, contenido: str,
+                         tipo: str = "texto", recurso_url: Optional[str] = None) -> dict:
+    fila = {
+        "grupo_id": grupo_id, "usuario_id": usuario.id, "contenido": contenido,
+        "tipo": tipo, "recurso_url": recurso_url, "fecha": datetime.now(),
+    }
+    return await _encolar(MensajeGrupo, fila, canal_grupo(grupo_id), {"usuario_nombre": _nombre(usuario)})
+
+
+async def enviar_privado(usuario: Usuario, receptor_id: str, contenido: str) -> dict:
+    conversacion_id = conversacion(usuario.id, receptor_id)
+    fila = {
+        "conversacion": conversacion_id, "usuario_id": usuario.id, "receptor_id": receptor_id,
+        "contenido": contenido, "fecha": datetime.now(),
+    }
+    return await _encolar(MensajePrivado, fila, canal_privado(conversacion_id), {"usuario_nombre": _nombre(usuario)})
+
+
+async def _encolar(modelo, fila: dict, canal: str, extra: dict) -> dict:
+    global _loop, _cola, _tarea
+    loop = asyncio.get_running_loop()
+    if _loop is not loop or _tarea.done():
+        _loop, _cola = loop, asyncio.Queue()
+        _tarea = loop.create_task(_escritor(_cola))
+    futuro = loop.create_future()
+    _cola.put_nowait((modelo, fila, canal, extra, futuro))
+    return await futuro
+
+
+async def _escritor(cola: asyncio.Queue):
+    while True:
+        lote = [await cola.get()]
+        limite = asyncio.get_running_loop().time() + VENTANA_LOTE
+        while len(lote) < MAX_LOTE:
+            restante = limite - asyncio.get_running_loop().time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(cola.get(), restante))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            ids = await run_in_threadpool(_insertar, lote)
+        except Exception as e:
+            for *_, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            continue
+
+        for (modelo, fila, canal, extra, futuro), mensaje_id in zip(lote, ids):
+            mensaje = _serializar({**fila, "id": mensaje_id, **extra})
+            await pubsub.publicar(canal, mensaje)
+            if not futuro.done():
+                futuro.set_result(mensaje)
+
+
+def _insertar(lote: list) -> List[int]:
+    """Un executemany por tabla en una sola transacción -> ids en el orden del lote"""
+    db = SessionLocal()
+    try:
+        ids = {}
+        for modelo in (MensajeGrupo, MensajePrivado):
+            filas = [(i, fila) for i, (m, fila, *_) in enumerate(lote) if m is modelo]
+            if not filas:
+                continue
+            resultado = db.execute(
+                insert(modelo).returning(modelo.id, sort_by_parameter_order=True),
+                [fila for _, fila in filas]
+            ).scalars().all()
+            ids.update({i: mensaje_id for (i, _), mensaje_id in zip(filas, resultado)})
+
+        # Última actividad de cada grupo: un UPDATE por lote, no por mensaje
+        grupos = {fila["grupo_id"] for m, fila, *_ in lote if m is MensajeGrupo}
+        if grupos:
+            db.execute(
+                update(GrupoEstudio).where(GrupoEstudio.id.in_(grupos))
+                .values(fecha_actualizacion=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        for grupo_id in grupos:
+            recomendaciones_service.invalidar_grupo(grupo_id)  # Actividad reciente
+        return [ids[i] for i in range(len(lote))]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ==================== LECTURA ====================
+
+def _serializar(mensaje: dict) -> dict:
+    if isinstance(mensaje.get("fecha"), datetime):
+        mensaje["fecha"] = mensaje["fecha"].isoformat()
+    return mensaje
+
+
+def _historial(db: Session, modelo, filtro, antes: Optional[int], despues: Optional[int],
+               limite: int) -> List[dict]:
+    query = db.query(modelo, Usuario.nombre, Usuario.apellido).join(
+        Usuario, Usuario.id == modelo.usuario_id
+    ).filter(filtro)
+
+    if despues is not None:
+        # Ponerse al día después de un corte: los siguientes, en orden
+        filas = query.filter(modelo.id > despues).order_by(modelo.id).limit(limite).all()
+    else:
+        # Página hacia atrás desde el más nuevo (o desde el cursor)
+        if antes is not None:
+            query = query.filter(modelo.id < antes)
+        filas = list(reversed(query.order_by(modelo.id.desc()).limit(limite).all()))
+
+    columnas = [c.key for c in modelo.__table__.columns]
+    return [
+        _serializar({
+            **{c: getattr(mensaje, c) for c in columnas},
+            "usuario_nombre": f"{nombre} {apellido}",
+        })
+        for mensaje, nombre, apellido in filas
+    ]
+
+
+def historial_grupo(db: Session, grupo_id: str, antes: Optional[int] = None,
+                    despues: Optional[int] = None, limite: int = LIMITE_HISTORIAL) -> List[dict]:
+    """Mensajes del grupo en orden cronológico, paginados por id"""
+    return _historial(db, MensajeGrupo, MensajeGrupo.grupo_id == grupo_id, antes, despues, limite)
+
+
+def historial_privado(db: Session, conversacion_id: str, antes: Optional[int] = None,
+                      despues: Optional[int] = None, limite: int = LIMITE_HISTORIAL) -> List[dict]:
+    return _historial(db, MensajePrivado, MensajePrivado.conversacion == conversacion_id, antes, despues, limite)
+
+
+def ultimo_id_grupo(db: Session, grupo_id: str) -> int:
+    """Cursor del mensaje más nuevo (0 si no hay): de ahí arranca un stream sin Last-Event-ID"""
+    return db.query(func.max(MensajeGrupo.id)).filter(MensajeGrupo.grupo_id == grupo_id).scalar() or 0
+
+
+def ultimo_id_privado(db: Session, conversacion_id: str) -> int:
+    return db.query(func.max(MensajePrivado.id)).filter(
+        MensajePrivado.conversacion == conversacion_id
+    ).scalar() or 0
+
+
+# ==================== SERVER-SENT EVENTS ====================
+
+def _evento_sse(mensaje: dict) -> str:
+    return f"id: {mensaje['id']}\nevent: mensaje\ndata: {json.dumps(mensaje, ensure_ascii=False)}\n\n"
+
+
+def evento_efimero(evento: dict) -> str:
+    """Evento sin id (presencia, escribiendo): no se guarda ni se recupera al reconectar"""
+    return f"event: {evento['evento']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+
+async def transmitir(canal: str, ultimo_id: int,
+                     pendientes: Callable[[Session, int], List[dict]],
+                     inicio: Optional[Callable[[], List[dict]]] = None) -> AsyncIterator[str]:
+    """Stream SSE de un canal: primero lo guardado después de ultimo_id, después en vivo
+
+    La suscripción se abre antes de leer la base, así ningún mensaje queda
+    entre la lectura y el primer evento en vivo; los repetidos se descartan
+    por id. pendientes(db, despues) lee de la base con su propia sesión: el
+    stream no retiene una conexión mientras espera. inicio() devuelve los
+    eventos efímeros que se mandan al conectar (el estado de presencia).
+    Los eventos del canal que no son mensajes (tienen "evento") pasan tal cual.
+    """
+    def leer(despues: int) -> List[dict]:
+        db = SessionLocal()
+        try:
+            return pendientes(db, despues)
+        finally:
+            db.close()
+
+    async with pubsub.suscribir(canal) as cola:
+        yield "retry: 3000\n\n"
+        for evento in (inicio() if inicio else []):
+            yield evento_efimero(evento)
+        ultimo = ultimo_id
+        while True:
+            # Recuperar desde la base (al conectar y después de un desborde)
+            while True:
+                perdidos = await run_in_threadpool(leer, ultimo)
+                for mensaje in perdidos:
+                    yield _evento_sse(mensaje)
+                    ultimo = mensaje["id"]
+                if len(perdidos) < LIMITE_HISTORIAL:
+                    break
+
+            while True:
+                try:
+                    mensaje = await asyncio.wait_for(cola.get(), INTERVALO_PING)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if mensaje is pubsub.DESBORDE:
+                    break
+                if "evento" in mensaje:
+                    yield evento_efimero(mensaje)
+                    continue
+                if mensaje["id"] <= ultimo:
+                    continue
+                yield _evento_sse(mensaje)
+                ultimo = mensaje["id"]
@@ -0,0 +1,262 @@
+# backend/app/services/companeros_service.py
+"""
+Índice bipartito usuario <-> materia y búsqueda de compañeros de estudio.
+
+Guarda en memoria, para cada usuario, las materias que está cursando (de
+inscripciones) y, para cada materia, quiénes la cursan; además nombre,
+carrera y promedio_general de cada usuario. Se arma entero al iniciar y
+cada INTERVALO_RECONSTRUCCION segundos; entre medio, las rutas que cambian
+inscripciones llaman a invalidar_usuario y solo ese usuario se relee
+antes de la próxima consulta. version() cambia con cada invalidación:
+recomendaciones_service la usa para descartar sus cachés.
+
+Compañeros: se recorren las listas de usuarios de cada materia propia y
+se cuenta cuántas comparte cada candidato (intersección), sin comparar
+contra toda la carrera. El puntaje es el Jaccard de los dos conjuntos de
+materias más la cercanía de promedios, y se quedan los mejores con un heap.
+
+Cada worker arma su propio índice: invalidar_usuario llega también a los
+otros por pubsub.Invalidaciones (canal CANAL_INVALIDACIONES).
+"""
+import heapq
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import lider, pubsub
+from app.database import SessionLocal
+from app.models.models import InscripcionMateria, Materia, Usuario
+
+INTERVALO_RECONSTRUCCION = 30 * 60  # segundos
+CANAL_INVALIDACIONES = "indice_companeros"
+ESTADOS_ACTUALES = ("cursando",)
+
+PESO_JACCARD = 0.8
+PESO_PROMEDIO = 0.2
+ESCALA_PROMEDIO = 10.0  # Notas de 0 a 10
+
+_VACIO: FrozenSet[str] = frozenset()
+
+_lock = threading.Lock()
+_cargado = False
+_materias: Dict[str, FrozenSet[str]] = {}  # usuario -> materias que cursa
+_cursantes: Dict[str, Set[str]] = defaultdict(set)  # materia -> usuarios que la cursan
+_usuarios: Dict[str, dict] = {}  # usuario -> nombre, carrera, promedio
+_nombres_materia: Dict[str, str] = {}
+_pendientes: Set[str] = set()
+_versiones: Counter = Counter()
+
+
+
+# ==================== ÍNDICE ====================
+
+def _consulta_inscripciones():
+    return select(InscripcionMateria.usuario_id, InscripcionMateria.materia_id).where(
+        InscripcionMateria.estado.in_(ESTADOS_ACTUALES)
+    )
+
+
+def _consulta_usuarios():
+    return select(
+        Usuario.id, Usuario.nombre, Usuario.apellido, Usuario.avatar_url,
+        Usuario.carrera_id, Usuario.promedio_general
+    )
+
+
+def _datos_usuario(fila) -> dict:
+    return {
+        "nombre": fila.nombre,
+        "apellido": fila.apellido,
+        "avatar_url": fila.avatar_url,
+        "carrera_id": fila.carrera_id,
+        "promedio": fila.promedio_general,
+    }
+
+
+def _poner_materias(usuario_id: str, materias: FrozenSet[str]):
+    for materia_id in _materias.get(usuario_id, _VACIO) - materias:
+        _cursantes[materia_id].discard(usuario_id)
+    for materia_id in materias:
+        _cursantes[materia_id].add(usuario_id)
+    if materias:
+        _materias[usuario_id] = materias
+    else:
+        _materias.pop(usuario_id, None)
+
+
+def reconstruir():
+    """Armar el índice completo desde la base (startup y periódicamente)"""
+    global _cargado
+    with _lock:
+        # Lo que se invalide mientras se lee la base queda pendiente para después
+        _pendientes.clear()
+    db = SessionLocal()
+    try:
+        inscripciones = db.execute(_consulta_inscripciones()).all()
+        usuarios = db.execute(_consulta_usuarios()).all()
+        materias = db.execute(select(Materia.id, Materia.nombre)).all()
+    finally:
+        db.close()
+
+    por_usuario = defaultdict(set)
+    for usuario_id, materia_id in inscripciones:
+        por_usuario[usuario_id].add(materia_id)
+
+    with _lock:
+        _materias.clear()
+        _cursantes.clear()
+        for usuario_id, conjunto in por_usuario.items():
+            _poner_materias(usuario_id, frozenset(conjunto))
+        _usuarios.clear()
+        _usuarios.update({fila.id: _datos_usuario(fila) for fila in usuarios})
+        _nombres_materia.clear()
+        _nombres_materia.update(dict(materias))
+        _cargado = True
+
+
+def invalidar_usuario(usuario_id: str):
+    """Cambiaron las inscripciones (o el promedio) del usuario: se relee al próximo uso"""
+    _marcar_usuario(usuario_id)
+    _invalidaciones.difundir(usuario_id=usuario_id)
+
+
+def _marcar_usuario(usuario_id: str):
+    with _lock:
+        _pendientes.add(usuario_id)
+        _versiones[usuario_id] += 1
+
+
+def version(usuario_id: str) -> int:
+    return _versiones[usuario_id]
+
+
+def aplicar_pendientes(db: Session):
+    """Releer solo los usuarios invalidados (y armar el índice si todavía no existe)"""
+    if not _cargado:
+        reconstruir()
+    with _lock:
+        usuarios = list(_pendientes)
+        _pendientes.clear()
+    if not usuarios:
+        return
+
+    materias = defaultdict(set)
+    for usuario_id, materia_id in db.execute(
+        _consulta_inscripciones().where(InscripcionMateria.usuario_id.in_(usuarios))
+    ):
+        materias[usuario_id].add(materia_id)
+    filas = db.execute(_consulta_usuarios().where(Usuario.id.in_(usuarios))).all()
+
+    with _lock:
+        for usuario_id in usuarios:
+            _poner_materias(usuario_id, frozenset(materias[usuario_id]))
+        for fila in filas:
+            _usuarios[fila.id] = _datos_usuario(fila)
+
+
+def materias(usuario_id: str) -> FrozenSet[str]:
+    return _materias.get(usuario_id, _VACIO)
+
+
+def vectores(usuarios: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+    """Materias de varios usuarios de una vez (vectores ralos usuario x materia)"""
+    with _lock:
+        return {u: _materias.get(u, _VACIO) for u in usuarios}
+
+
+# ==================== COMPAÑEROS ====================
+
+def _cercania_promedio(a: Optional[float], b: Optional[float]) -> float:
+    if not a or not b:
+        return 0.5  # Sin promedio no suma ni resta
+    return max(0.0, 1 - abs(a - b) / ESCALA_PROMEDIO)
+
+
+def buscar(db: Session, usuario_id: str, limite: int = 10, misma_carrera: bool = True,
+           materia_id: Optional[str] = None) -> List[dict]:
+    """Los mejores compañeros de estudio para el usuario (opcionalmente de una materia)"""
+    aplicar_pendientes(db)
+
+    with _lock:
+        mias = _materias.get(usuario_id, _VACIO)
+        yo = _usuarios.get(usuario_id, {})
+
+        # Intersección con cada candidato contando sobre las listas de las
+        # materias propias: solo se tocan usuarios que comparten alguna
+        comunes = Counter()
+        for m in mias:
+            comunes.update(_cursantes.get(m, ()))
+        if materia_id is not None:
+            # Solo quienes cursan esa materia (aunque el usuario no la curse)
+            comunes = Counter({
+                otro: comunes[otro] for otro in _cursantes.get(materia_id, ())
+            })
+        comunes.pop(usuario_id, None)
+
+        candidatos = []
+        for otro, interseccion in comunes.items():
+            suyo = _usuarios.get(otro)
+            if suyo is None:
+                continue
+            if misma_carrera and suyo["carrera_id"] != yo.get("carrera_id"):
+                continue
+            union = len(mias) + len(_materias[otro]) - interseccion
+            jaccard = interseccion / union if union else 0.0
+            puntaje = (
+                PESO_JACCARD * jaccard
+                + PESO_PROMEDIO * _cercania_promedio(yo.get("promedio"), suyo["promedio"])
+            )
+            candidatos.append((puntaje, jaccard, otro))
+
+        mejores = heapq.nlargest(limite, candidatos)
+        return [
+            {
+                "id": otro,
+                "nombre": _usuarios[otro]["nombre"],
+                "apellido": _usuarios[otro]["apellido"],
+                "avatar_url": _usuarios[otro]["avatar_url"],
+                "promedio": _usuarios[otro]["promedio"],
+                "materias_comunes": sorted(
+                    _nombres_materia.get(m, m) for m in mias & _materias[otro]
+                ),
+                "jaccard": round(jaccard, 4),
+                "puntaje": round(puntaje, 4),
+            }
+            for puntaje, jaccard, otro in mejores
+        ]
+
+
+# ==================== RECONSTRUCCIÓN PERIÓDICA ====================
+
+_reconstruccion = lider.TareaPeriodica(
+    "indice-companeros", reconstruir, INTERVALO_RECONSTRUCCION,
+    "Error armando el índice de compañeros"
+)
+
+
+def iniciar():
+    """Arrancar la reconstrucción periódica (startup del servidor); la primera es inmediata"""
+    _reconstruccion.iniciar()
+
+
+def _descartar_indice():
+    global _cargado
+    _cargado = False  # Se rearma entero en el próximo uso
+
+
+_invalidaciones = pubsub.Invalidaciones(
+    CANAL_INVALIDACIONES, lambda evento: _marcar_usuario(evento["usuario_id"]), _descartar_indice
+)
+
+
+async def escuchar_invalidaciones():
+    """Aplicar las invalidaciones de los otros workers (startup, después de pubsub.iniciar)"""
+    await _invalidaciones.escuchar()
+
+
+def detener():
+    _reconstruccion.detener()
+    _invalidaciones.detener()
@@ -0,0 +1,88 @@
+# backend/app/services/contadores_service.py
+"""
+Contadores de descargas acumulados en memoria y volcados por lotes.
+
+Cada descarga solo incrementa un diccionario; un hilo en segundo plano
+escribe los totales cada INTERVALO_VOLCADO segundos con un único UPDATE
+por lotes (executemany), en vez de una escritura por request. Al apagar
+el servidor se vuelca lo pendiente.
+
+En el mismo volcado se suman a apuntes_descargas_diarias (un upsert por
+apunte y día), la serie que usa tendencias_service.
+"""
+import threading
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import bindparam, func, update
+
+from app.core import lider
+from app.database import SessionLocal, insertar_con_conflicto
+from app.models.models import ApunteCompartido, DescargaDiaria
+
+INTERVALO_VOLCADO = 10  # segundos
+
+_pendientes: Counter = Counter()
+_lock = threading.Lock()
+
+
+def registrar_descarga(apunte_id: str):
+    with _lock:
+        _pendientes[apunte_id] += 1
+    _volcado.iniciar()
+
+
+def volcar() -> int:
+    """Escribir los incrementos pendientes; devuelve cuántos apuntes se actualizaron"""
+    global _pendientes
+    with _lock:
+        lote, _pendientes = _pendientes, Counter()
+    if not lote:
+        return 0
+
+    db = SessionLocal()
+    try:
+        tabla = ApunteCompartido.__table__
+        db.execute(
+            update(tabla)
+            .where(tabla.c.id == bindparam("b_id"))
+            .values(veces_descargado=func.coalesce(tabla.c.veces_descargado, 0) + bindparam("b_cantidad")),
+            [{"b_id": apunte_id, "b_cantidad": cantidad} for apunte_id, cantidad in lote.items()]
+        )
+        _sumar_diarias(db, lote)
+        db.commit()
+        return len(lote)
+    except Exception:
+        db.rollback()
+        # No perder las descargas: vuelven a la cola para el próximo volcado
+        with _lock:
+            _pendientes.update(lote)
+        raise
+    finally:
+        db.close()
+
+
+def _sumar_diarias(db, lote: Counter):
+    """INSERT ... ON CONFLICT DO UPDATE: la fila del día se crea o se incrementa"""
+    insert = insertar_con_conflicto(db)
+    sentencia = insert(DescargaDiaria.__table__)
+    db.execute(
+        sentencia.on_conflict_do_update(
+            index_elements=["apunte_id", "fecha"],
+            set_={"cantidad": DescargaDiaria.__table__.c.cantidad + sentencia.excluded.cantidad}
+        ),
+        [{"apunte_id": apunte_id, "fecha": date.today(), "cantidad": cantidad}
+         for apunte_id, cantidad in lote.items()]
+    )
+
+
+_volcado = lider.TareaPeriodica(
+    "volcar-contadores", volcar, INTERVALO_VOLCADO,
+    "Error volcando contadores de descargas", inmediata=False
+)
+
+
+def detener():
+    """Cortar el hilo y volcar lo que quede (shutdown del servidor)"""
+    _volcado.detener()
+    volcar()
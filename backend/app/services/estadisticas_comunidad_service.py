@@ -0,0 +1,176 @@
+# backend/app/services/estadisticas_comunidad_service.py
+"""
+Estadísticas de la comunidad (usuarios, grupos, apuntes, tutorías,
+agradecimientos), en total y por carrera.
+
+Un hilo del worker líder (core/lider) las calcula cada INTERVALO_CALCULO
+segundos con una consulta agrupada por carrera para cada tabla y las
+guarda en estadisticas_comunidad: una fila por carrera y día, más la fila
+TODAS con la suma (incluye lo que no tiene carrera, como grupos sin
+materia). La fila del día se reescribe en cada cálculo y la de los días anteriores
+queda como estaba, así la tabla es a la vez la foto actual y la serie
+histórica para los gráficos, sin tareas de limpieza: son unas pocas filas
+por día.
+
+Los requests solo leen esa tabla (un rango de la PK (carrera_id, fecha)):
+nadie vuelve a contar usuarios ni apuntes. Grupos, apuntes y tutorías
+cuentan para la carrera de su materia; usuarios y agradecimientos
+recibidos, para la carrera del usuario.
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core import lider
+from app.database import SessionLocal, insertar_con_conflicto
+from app.models.models import (
+    Agradecimiento, ApunteCompartido, Carrera, EstadisticaComunidad, GrupoEstudio, Materia,
+    Tutoria, Usuario
+)
+
+INTERVALO_CALCULO = 15 * 60  # segundos
+DIAS_ACTIVO = 7  # login en los últimos días para contar como activo
+
+TODAS = "todas"
+METRICAS = (
+    "usuarios", "usuarios_activos", "grupos", "grupos_activos", "apuntes", "tutorias",
+    "agradecimientos",
+)
+
+
+
+def _si(condicion):
+    return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+
+def calcular(db: Session, ahora: datetime = None) -> Dict[Optional[str], Counter]:
+    """Métricas por carrera_id (None: lo que no tiene carrera)"""
+    ahora = ahora or datetime.now()
+    por_carrera: Dict[Optional[str], Counter] = defaultdict(Counter)
+
+    for carrera_id, usuarios, activos in db.execute(
+        select(Usuario.carrera_id, func.count(), _si(Usuario.ultimo_login >= ahora - timedelta(days=DIAS_ACTIVO)))
+        .group_by(Usuario.carrera_id)
+    ):
+        por_carrera[carrera_id].update(usuarios=usuarios, usuarios_activos=activos)
+
+    for carrera_id, grupos, activos in db.execute(
+        select(Materia.carrera_id, func.count(), _si(GrupoEstudio.activo == True))
+        .select_from(GrupoEstudio).outerjoin(Materia, Materia.id == GrupoEstudio.materia_id)
+        .group_by(Materia.carrera_id)
+    ):
+        por_carrera[carrera_id].update(grupos=grupos, grupos_activos=activos)
+
+    for carrera_id, apuntes in db.execute(
+        select(Materia.carrera_id, func.count())
+        .select_from(ApunteCompartido).outerjoin(Materia, Materia.id == ApunteCompartido.materia_id)
+        .where(ApunteCompartido.compartido_publicamente == True)
+        .group_by(Materia.carrera_id)
+    ):
+        por_carrera[carrera_id]["apuntes"] += apuntes
+
+    for carrera_id, tutorias in db.execute(
+        select(Materia.carrera_id, func.count())
+        .select_from(Tutoria).outerjoin(Materia, Materia.id == Tutoria.materia_id)
+        .where(Tutoria.estado == "completada")
+        .group_by(Materia.carrera_id)
+    ):
+        por_carrera[carrera_id]["tutorias"] += tutorias
+
+    for carrera_id, agradecimientos in db.execute(
+        select(Usuario.carrera_id, func.count())
+        .select_from(Agradecimiento).join(Usuario, Usuario.id == Agradecimiento.receptor_id)
+        .group_by(Usuario.carrera_id)
+    ):
+        por_carrera[carrera_id]["agradecimientos"] += agradecimientos
+
+    return por_carrera
+
+
+def recalcular(ahora: datetime = None) -> int:
+    """Calcular y escribir la foto del día; devuelve cuántas filas"""
+    ahora = ahora or datetime.now()
+    db = SessionLocal()
+    try:
+        por_carrera = calcular(db, ahora)
+        total = sum(por_carrera.values(), Counter())
+        filas = [
+            {"carrera_id": carrera_id, "fecha": ahora.date(), "fecha_calculo": ahora,
+             **{m: metricas[m] for m in METRICAS}}
+            for carrera_id, metricas in [*por_carrera.items(), (TODAS, total)]
+            if carrera_id is not None
+        ]
+
+        tabla = EstadisticaComunidad.__table__
+        insert = insertar_con_conflicto(db)
+        sentencia = insert(tabla)
+        db.execute(
+            sentencia.on_conflict_do_update(
+                index_elements=["carrera_id", "fecha"],
+                set_={c: sentencia.excluded[c] for c in (*METRICAS, "fecha_calculo")}
+            ),
+            filas
+        )
+        db.commit()
+        return len(filas)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _fila(e: EstadisticaComunidad) -> dict:
+    return {"fecha": e.fecha, **{m: getattr(e, m) for m in METRICAS}}
+
+
+def obtener(db: Session) -> Optional[dict]:
+    """La última foto: totales, desglose por carrera y cuándo se calculó (None si no hay)"""
+    total = db.query(EstadisticaComunidad).filter(
+        EstadisticaComunidad.carrera_id == TODAS
+    ).order_by(EstadisticaComunidad.fecha.desc()).first()
+    if not total:
+        return None
+
+    carreras = db.query(EstadisticaComunidad, Carrera.nombre).outerjoin(
+        Carrera, Carrera.id == EstadisticaComunidad.carrera_id
+    ).filter(
+        EstadisticaComunidad.fecha == total.fecha,
+        EstadisticaComunidad.carrera_id != TODAS
+    ).order_by(EstadisticaComunidad.usuarios.desc()).all()
+
+    return {
+        "total": _fila(total),
+        "por_carrera": [
+            {"carrera_id": e.carrera_id, "carrera": nombre, **_fila(e)} for e, nombre in carreras
+        ],
+        "fecha_calculo": total.fecha_calculo,
+    }
+
+
+def historial(db: Session, carrera_id: str, desde: date) -> List[dict]:
+    """Serie diaria de una carrera (o TODAS) desde la fecha, en orden"""
+    return [
+        _fila(e) for e in db.query(EstadisticaComunidad).filter(
+            EstadisticaComunidad.carrera_id == carrera_id,
+            EstadisticaComunidad.fecha >= desde
+        ).order_by(EstadisticaComunidad.fecha)
+    ]
+
+
+_calculo = lider.TareaPeriodica(
+    "estadisticas-comunidad", recalcular, INTERVALO_CALCULO,
+    "Error calculando estadísticas de la comunidad", solo_lider=True
+)
+
+
+def iniciar():
+    """Arrancar el cálculo periódico (startup del servidor); el primero es inmediato"""
+    _calculo.iniciar()
+
+
+def detener():
+    _calculo.detener()
@@ -0,0 +1,57 @@
+# backend/app/services/estadisticas_service.py
+"""
+Contadores por usuario en estadisticas_usuario.
+
+Las rutas que crean o borran algo contable (unirse a un grupo, compartir
+un apunte, organizar o asistir a una sesión, dar una tutoría) suman en la
+misma sesión y antes del commit, así el contador cambia en la misma
+transacción que la fila que cuenta. La suma es un único INSERT ... ON
+CONFLICT DO UPDATE SET x = x + excluded.x: atómica en la base, crea la fila
+si el usuario todavía no tiene y, para muchos usuarios, va en un solo
+executemany.
+
+Los logros sociales leen estos contadores (una fila por PK) en lugar de
+un COUNT por condición.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import insertar_con_conflicto
+from app.models.models import EstadisticaUsuario
+
+CONTADORES = (
+    "grupos_integrante", "apuntes_compartidos", "tutorias_dadas", "tutorias_exitosas",
+    "sesiones_grupo_organizadas", "sesiones_grupo_asistidas",
+)
+
+
+def sumar(db: Session, usuario_id: str, **incrementos: int):
+    """sumar(db, u, apuntes_compartidos=1): sin commit, va con la transacción del llamador"""
+    for contador, cantidad in incrementos.items():
+        sumar_a_varios(db, contador, {usuario_id: cantidad})
+
+
+def sumar_a_varios(db: Session, contador: str, cantidades: Dict[str, int]):
+    """Un contador, muchos usuarios: un solo executemany"""
+    if contador not in CONTADORES:
+        raise ValueError(f"Contador desconocido: {contador}")
+    cantidades = {u: n for u, n in cantidades.items() if n}
+    if not cantidades:
+        return
+
+    tabla = EstadisticaUsuario.__table__
+    insert = insertar_con_conflicto(db)
+    sentencia = insert(tabla)
+    db.execute(
+        sentencia.on_conflict_do_update(
+            index_elements=["usuario_id"],
+            set_={contador: tabla.c[contador] + sentencia.excluded[contador]}
+        ),
+        [{"usuario_id": usuario_id, contador: cantidad} for usuario_id, cantidad in cantidades.items()]
+    )
+
+
+def obtener(db: Session, usuario_id: str) -> Optional[EstadisticaUsuario]:
+    # populate_existing: las sumas van por Core y no refrescan una fila ya cargada
+    return db.get(EstadisticaUsuario, usuario_id, populate_existing=True)
@@ -0,0 +1,99 @@
+# backend/app/services/indexado_apuntes_service.py
+"""
+Indexado en segundo plano del texto de los PDF compartidos como apuntes.
+
+Al subir un PDF se encola su extracción: un hilo coordinador la manda al
+pool de procesos y guarda el texto en la columna texto_archivo de
+apuntes_busqueda. Cada archivo (por SHA-256) se procesa una sola vez; los
+apuntes que quedaron sin indexar (subidos antes del índice o durante una
+caída) se recuperan con indexar_apuntes.py.
+
+La fila FTS de cada apunte se encuentra por apuntes_busqueda_ids (0020):
+índice único de apunte_id y después rowid, sin recorrer el texto guardado.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.services import almacenamiento_service, apuntes_pdf, pool_procesos
+
+_pool_coordinador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indexar-apuntes")
+
+_SQL_GUARDAR = text("""
+    UPDATE apuntes_busqueda SET texto_archivo = :texto
+    WHERE rowid = (SELECT fts_rowid FROM apuntes_busqueda_ids WHERE apunte_id = :apunte_id)
+""")
+
+# CROSS JOIN fija el orden: primero los apuntes, después su fila FTS por rowid
+
+# Texto ya extraído de otro apunte con el mismo archivo
+_SQL_TEXTO_EXISTENTE = text("""
+    SELECT b.texto_archivo
+    FROM apuntes_compartidos a
+    CROSS JOIN apuntes_busqueda_ids i ON i.apunte_id = a.id
+    CROSS JOIN apuntes_busqueda b ON b.rowid = i.fts_rowid
+    WHERE a.archivo_sha256 = :sha256 AND a.id != :apunte_id AND b.texto_archivo IS NOT NULL
+    LIMIT 1
+""")
+
+_SQL_PENDIENTES = text("""
+    SELECT a.id, a.archivo_sha256, a.contenido
+    FROM apuntes_compartidos a
+    CROSS JOIN apuntes_busqueda_ids i ON i.apunte_id = a.id
+    CROSS JOIN apuntes_busqueda b ON b.rowid = i.fts_rowid
+    WHERE a.formato = 'pdf' AND a.contenido LIKE 'FILE:%' AND b.texto_archivo IS NULL
+""")
+
+
+def disponible() -> bool:
+    """El índice FTS5 solo existe en SQLite"""
+    return engine.dialect.name == "sqlite"
+
+
+def encolar(apunte_id: str, ruta_pdf: str, sha256: Optional[str] = None):
+    """Extraer e indexar el texto del PDF sin bloquear el request"""
+    if disponible():
+        _pool_coordinador.submit(_indexar, apunte_id, ruta_pdf, sha256)
+
+
+def _texto_existente(apunte_id: str, sha256: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        return db.execute(_SQL_TEXTO_EXISTENTE, {"sha256": sha256, "apunte_id": apunte_id}).scalar()
+    finally:
+        db.close()
+
+
+def _indexar(apunte_id: str, ruta_pdf: str, sha256: Optional[str]):
+    try:
+        # El mismo PDF subido por otro usuario no se vuelve a parsear
+        texto = _texto_existente(apunte_id, sha256) if sha256 else None
+        if texto is None:
+            texto = pool_procesos.obtener().submit(apuntes_pdf.extraer_texto, ruta_pdf).result()
+        guardar_texto(apunte_id, texto)
+    except Exception as e:
+        print(f"⚠️ Error indexando el PDF del apunte {apunte_id}: {e}")
+
+
+def guardar_texto(apunte_id: str, texto: str):
+    db = SessionLocal()
+    try:
+        # Cadena vacía (no NULL) para marcar como indexado un PDF sin texto
+        db.execute(_SQL_GUARDAR, {"texto": texto or "", "apunte_id": apunte_id})
+        db.commit()
+    finally:
+        db.close()
+
+
+def pendientes() -> List[Tuple[str, str]]:
+    """(apunte_id, ruta) de los PDF todavía sin texto indexado"""
+    db = SessionLocal()
+    try:
+        return [
+            (apunte_id, almacenamiento_service.ruta_archivo(sha256, contenido))
+            for apunte_id, sha256, contenido in db.execute(_SQL_PENDIENTES)
+        ]
+    finally:
+        db.close()
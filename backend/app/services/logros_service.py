@@ -2,9 +2,10 @@ from sqlalchemy.orm import Session
 from app.models.models import (
     Logro, Nota, InscripcionMateria, Materia, SesionEstudio, 
     LogroDesbloqueado, FlashCard, Usuario, ActividadDiaria,
-    LoginDiario, GrupoEstudio, SesionGrupo, ApunteCompartido,
-    Agradecimiento, Tutoria, AusenciaOlvido
+    LoginDiario, GrupoEstudio, ApunteCompartido,
+    AusenciaOlvido
 )
+from app.services import agradecimientos_service, estadisticas_service
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta, date
 import json
@@ -1929,22 +1930,16 @@ class LogroService:
         if not usuario_id:
             return False
         
-        tutorias = db.query(Tutoria).filter(
-            Tutoria.tutor_id == usuario_id
-        ).count()
-        
-        return tutorias >= 3
+        estadisticas = estadisticas_service.obtener(db, usuario_id)
+        return estadisticas is not None and estadisticas.tutorias_dadas >= 3
     
     @staticmethod
     def _condicion_mejor_companero(db: Session, usuario_id: str) -> bool:
         if not usuario_id:
             return False
         
-        agradecimientos = db.query(Agradecimiento).filter(
-            Agradecimiento.receptor_id == usuario_id
-        ).count()
-        
-        return agradecimientos >= 5
+        recibidos = agradecimientos_service.total(db, usuario_id, agradecimientos_service.RECIBIDOS)
+        return recibidos >= 5
     
     @staticmethod
     def _condicion_lider_equipo(db: Session, usuario_id: str) -> bool:
@@ -1973,54 +1968,43 @@ class LogroService:
         if not usuario_id:
             return False
         
-        agradecimientos = db.query(Agradecimiento).filter(
-            Agradecimiento.emisor_id == usuario_id,
-            Agradecimiento.tipo == 'explicacion'
-        ).count()
-        
-        return agradecimientos >= 10
+        explicaciones = agradecimientos_service.total(
+            db, usuario_id, agradecimientos_service.ENVIADOS, tipo='explicacion'
+        )
+        return explicaciones >= 10
     
     @staticmethod
     def _condicion_organizador(db: Session, usuario_id: str) -> bool:
         if not usuario_id:
             return False
         
-        sesiones = db.query(SesionGrupo).join(GrupoEstudio).filter(
-            GrupoEstudio.creador_id == usuario_id
-        ).count()
-        
-        return sesiones >= 5
+        estadisticas = estadisticas_service.obtener(db, usuario_id)
+        return estadisticas is not None and estadisticas.sesiones_grupo_organizadas >= 5
     
     @staticmethod
     def _condicion_comunidad(db: Session, usuario_id: str) -> bool:
         if not usuario_id:
             return False
         
-        grupos = db.query(GrupoEstudio).filter(
-            GrupoEstudio.integrantes.any(id=usuario_id)
-        ).count()
-        
-        apuntes = db.query(ApunteCompartido).filter(
-            ApunteCompartido.usuario_id == usuario_id
-        ).count()
-        
-        tutorias = db.query(Tutoria).filter(
-            Tutoria.tutor_id == usuario_id
-        ).count()
-        
-        return grupos >= 2 and apuntes >= 3 and tutorias >= 1
+        estadisticas = estadisticas_service.obtener(db, usuario_id)
+        if estadisticas is None:
+            return False
+        # "Participar en 50 sesiones grupales": la asistencia que registra el admin del grupo
+        if estadisticas.sesiones_grupo_asistidas >= 50:
+            return True
+        return (
+            estadisticas.grupos_integrante >= 2
+            and estadisticas.apuntes_compartidos >= 3
+            and estadisticas.tutorias_dadas >= 1
+        )
     
     @staticmethod
     def _condicion_mentor_senior(db: Session, usuario_id: str) -> bool:
         if not usuario_id:
             return False
         
-        tutorias = db.query(Tutoria).filter(
-            Tutoria.tutor_id == usuario_id,
-            Tutoria.exito == True
-        ).count()
-        
-        return tutorias >= 10
+        estadisticas = estadisticas_service.obtener(db, usuario_id)
+        return estadisticas is not None and estadisticas.tutorias_exitosas >= 10
     
     # ===== CONDICIONES CURIOSOS Y DIVERTIDOS =====
     
@@ -2400,10 +2384,12 @@ class LogroService:
     # ===== FUNCIONES DE DESBLOQUEO Y VERIFICACIÓN MASIVA =====
     
     @staticmethod
-    def desbloquear_logro(logro_id: str, db: Session, usuario_id: str, contexto: dict = None) -> bool:
+    def desbloquear_logro(logro_id: str, db: Session, usuario_id: str, contexto: dict = None,
+                          commit: bool = True) -> bool:
         """
         Crea un registro de logro desbloqueado si no existe previamente.
         Soporta el guardado de datos de contexto (evidencia).
+        Con commit=False lo confirma el llamador.
         """
         # Verificamos si ya fue desbloqueado para no duplicar
         existe = db.query(LogroDesbloqueado).filter(
@@ -2421,7 +2407,8 @@ class LogroService:
                 datos_contexto=json.dumps(contexto) if contexto else None #
             )
             db.add(nuevo_desbloqueo)
-            db.commit()
+            if commit:
+                db.commit()
             print(f"🏆 LOGRO DESBLOQUEADO: {logro_id} para el usuario {usuario_id}")
             return True
         return False
@@ -2447,7 +2434,11 @@ class LogroService:
                 continue
             
             if LogroService.verificar_logro(logro.id, notas, inscripciones, materias, sesiones, db, usuario_id):
-                LogroService.desbloquear_logro(logro.id, db, usuario_id)
+                # Un commit por logro expiraría las notas ya cargadas y las condiciones
+                # siguientes las releerían de a una fila: se confirma todo al final
+                LogroService.desbloquear_logro(logro.id, db, usuario_id, commit=False)
                 logros_nuevos_desbloqueados.append(logro.id)
         
+        if logros_nuevos_desbloqueados:
+            db.commit()
         return logros_nuevos_desbloqueados
\ No newline at end of file
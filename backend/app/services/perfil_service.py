@@ -0,0 +1,230 @@
+# backend/app/services/perfil_service.py
+"""
+Tarjeta de perfil público precalculada (perfiles_publicos).
+
+Ver el perfil de otro usuario desde la comunidad es leer una fila por PK:
+el JSON ya armado y su ETag. La tarjeta junta datos del usuario, totales
+reales (materias aprobadas y cursando, horas de estudio, apuntes públicos,
+logros, agradecimientos, tutorías), los últimos logros y los mejores
+apuntes, y se calcula con unas pocas consultas solo cuando cambia.
+
+Cada fila tiene version y version_calculada. Las escrituras que tocan el
+perfil llaman a invalidar(), que sube version en la transacción del
+llamador (un upsert, sin leer la tarjeta). Quien lee una tarjeta vieja o
+inexistente la recalcula y la guarda con la version que leyó: si otra
+escritura llegó mientras tanto, version ya es mayor y la tarjeta sigue
+marcada como vieja. Además el worker líder (core/lider) recalcula cada
+INTERVALO_REFRESCO las tarjetas invalidadas y las que tienen más de
+EDAD_MAXIMA, para lo que no pasa por invalidar() (último login, cambios
+hechos por otras vías).
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import desc, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import lider
+from app.database import SessionLocal, insertar_con_conflicto
+from app.models.models import (
+    ApunteCompartido, Carrera, EstadisticaUsuario, InscripcionMateria, Logro, LogroDesbloqueado,
+    Materia, PerfilPublico, SesionEstudio, Usuario
+)
+from app.services import agradecimientos_service
+
+INTERVALO_REFRESCO = 5 * 60  # segundos
+EDAD_MAXIMA = timedelta(hours=6)
+LOTE_REFRESCO = 200
+DESTACADOS = 5
+
+
+
+# ==================== INVALIDAR ====================
+
+def invalidar(db: Session, usuario_id: str):
+    """Marcar la tarjeta como vieja (sin commit, va con la escritura que la cambia)"""
+    tabla = PerfilPublico.__table__
+    db.execute(
+        insertar_con_conflicto(db)(tabla).values(usuario_id=usuario_id, version=1)
+        .on_conflict_do_update(index_elements=["usuario_id"], set_={"version": tabla.c.version + 1})
+    )
+
+
+# ==================== CALCULAR ====================
+
+def calcular(db: Session, usuario_id: str) -> Optional[dict]:
+    """La tarjeta desde las tablas (None si el usuario no existe)"""
+    fila = db.execute(
+        select(Usuario, Carrera.nombre)
+        .outerjoin(Carrera, Carrera.id == Usuario.carrera_id)
+        .where(Usuario.id == usuario_id)
+    ).first()
+    if not fila:
+        return None
+    usuario, carrera = fila
+
+    por_estado = dict(db.execute(
+        select(InscripcionMateria.estado, func.count())
+        .where(InscripcionMateria.usuario_id == usuario_id)
+        .group_by(InscripcionMateria.estado)
+    ).all())
+    minutos_estudio = db.execute(
+        select(func.coalesce(func.sum(SesionEstudio.duracion_minutos), 0))
+        .where(SesionEstudio.usuario_id == usuario_id)
+    ).scalar()
+
+    total_logros = db.execute(
+        select(func.count()).select_from(LogroDesbloqueado)
+        .where(LogroDesbloqueado.usuario_id == usuario_id)
+    ).scalar()
+    logros = db.execute(
+        select(Logro.id, Logro.nombre, Logro.icono, Logro.rareza, LogroDesbloqueado.fecha_desbloqueo)
+        .join(Logro, Logro.id == LogroDesbloqueado.logro_id)
+        .where(LogroDesbloqueado.usuario_id == usuario_id)
+        .order_by(desc(LogroDesbloqueado.fecha_desbloqueo)).limit(DESTACADOS)
+    ).all()
+
+    publicos = (
+        ApunteCompartido.usuario_id == usuario_id,
+        ApunteCompartido.compartido_publicamente == True,
+        ApunteCompartido.activo == True
+    )
+    total_apuntes = db.execute(
+        select(func.count()).select_from(ApunteCompartido).where(*publicos)
+    ).scalar()
+    apuntes = db.execute(
+        select(
+            ApunteCompartido.id, ApunteCompartido.titulo, ApunteCompartido.descripcion,
+            ApunteCompartido.materia_id, Materia.nombre.label("materia_nombre"),
+            ApunteCompartido.formato, ApunteCompartido.tiene_miniatura,
+            ApunteCompartido.calificacion_promedio, ApunteCompartido.total_calificaciones,
+            ApunteCompartido.veces_descargado, ApunteCompartido.fecha_compartido
+        ).outerjoin(Materia, Materia.id == ApunteCompartido.materia_id)
+        .where(*publicos)
+        .order_by(desc(ApunteCompartido.puntaje_ranking), desc(ApunteCompartido.veces_descargado))
+        .limit(DESTACADOS)
+    ).mappings().all()
+
+    agradecimientos = agradecimientos_service.contadores(db, usuario_id)
+    estadisticas = db.get(EstadisticaUsuario, usuario_id, populate_existing=True)
+
+    return {
+        "usuario": {
+            "id": usuario.id,
+            "nombre": usuario.nombre,
+            "apellido": usuario.apellido,
+            "legajo": usuario.legajo,
+            "carrera": carrera,
+            "avatar_url": usuario.avatar_url,
+            "promedio_general": usuario.promedio_general,
+            "creditos_aprobados": usuario.creditos_aprobados,
+            "fecha_ingreso": usuario.fecha_ingreso,
+            "ultimo_login": usuario.ultimo_login
+        },
+        "estadisticas": {
+            "materias_aprobadas": por_estado.get("aprobada", 0),
+            "materias_cursando": por_estado.get("cursando", 0),
+            "total_horas_estudio": round(minutos_estudio / 60, 1),
+            "total_apuntes_compartidos": total_apuntes,
+            "total_logros": total_logros
+        },
+        "agradecimientos": {
+            "recibidos": sum(c[agradecimientos_service.RECIBIDOS] for c in agradecimientos.values()),
+            "enviados": sum(c[agradecimientos_service.ENVIADOS] for c in agradecimientos.values()),
+            "por_tipo": agradecimientos
+        },
+        "tutorias": {
+            "dadas": estadisticas.tutorias_dadas if estadisticas else 0,
+            "calificaciones": estadisticas.tutorias_calificadas if estadisticas else 0,
+            "reputacion": round(estadisticas.reputacion_tutor, 2) if estadisticas else None
+        },
+        "logros_destacados": [
+            {"id": l.id, "nombre": l.nombre, "icono": l.icono, "rareza": l.rareza, "fecha": l.fecha_desbloqueo}
+            for l in logros
+        ],
+        "apuntes_destacados": [dict(a) for a in apuntes]
+    }
+
+
+def reconstruir(db: Session, usuario_id: str, version: int) -> Optional[Tuple[str, str]]:
+    """Calcular y guardar la tarjeta como de la version leída; (json, etag) o None"""
+    datos = calcular(db, usuario_id)
+    if datos is None:
+        return None
+    contenido = json.dumps(jsonable_encoder(datos), ensure_ascii=False, separators=(",", ":"))
+    etag = hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+    tabla = PerfilPublico.__table__
+    sentencia = insertar_con_conflicto(db)(tabla).values(
+        usuario_id=usuario_id, datos=contenido, etag=etag, version=version,
+        version_calculada=version, fecha_calculo=datetime.now()
+    )
+    db.execute(sentencia.on_conflict_do_update(
+        index_elements=["usuario_id"],
+        set_={
+            "datos": sentencia.excluded.datos,
+            "etag": sentencia.excluded.etag,
+            "version_calculada": sentencia.excluded.version_calculada,
+            "fecha_calculo": sentencia.excluded.fecha_calculo,
+        },
+        # Un cálculo más viejo que terminó tarde no pisa uno más nuevo
+        where=tabla.c.version_calculada <= sentencia.excluded.version_calculada
+    ))
+    db.commit()
+    return contenido, etag
+
+
+def obtener(db: Session, usuario_id: str) -> Optional[Tuple[str, str]]:
+    """(json, etag) de la tarjeta; una lectura por PK si está al día"""
+    fila = db.get(PerfilPublico, usuario_id, populate_existing=True)
+    if fila and fila.datos is not None and fila.version_calculada == fila.version:
+        return fila.datos, fila.etag
+    return reconstruir(db, usuario_id, fila.version if fila else 0)
+
+
+# ==================== REFRESCO PERIÓDICO ====================
+
+def refrescar_pendientes(ahora: datetime = None) -> int:
+    """Recalcular las tarjetas invalidadas o viejas; devuelve cuántas"""
+    ahora = ahora or datetime.now()
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            pendientes = db.execute(
+                select(PerfilPublico.usuario_id, PerfilPublico.version).where(or_(
+                    PerfilPublico.version_calculada != PerfilPublico.version,
+                    PerfilPublico.fecha_calculo < ahora - EDAD_MAXIMA
+                )).limit(LOTE_REFRESCO)
+            ).all()
+            for usuario_id, version in pendientes:
+                if reconstruir(db, usuario_id, version) is None:
+                    # Usuario borrado: la tarjeta no se vuelve a mirar
+                    db.query(PerfilPublico).filter(PerfilPublico.usuario_id == usuario_id).delete()
+                    db.commit()
+            total += len(pendientes)
+            if len(pendientes) < LOTE_REFRESCO or _detener.is_set():
+                return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+_refresco = lider.TareaPeriodica(
+    "refrescar-perfiles", refrescar_pendientes, INTERVALO_REFRESCO,
+    "Error refrescando perfiles", solo_lider=True, inmediata=False
+)
+
+
+def iniciar():
+    """Arrancar el refresco periódico de tarjetas (startup del servidor)"""
+    _refresco.iniciar()
+
+
+def detener():
+    _refresco.detener()
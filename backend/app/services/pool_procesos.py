@@ -0,0 +1,30 @@
+# backend/app/services/pool_procesos.py
+"""
+Pool de procesos compartido para el trabajo pesado de CPU (parseo de PDFs).
+
+Se crea a demanda con contexto spawn: los workers no heredan conexiones a
+la base ni hilos del servidor, por eso las funciones que se ejecutan ahí
+viven en módulos que no importan nada de la app.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+MAX_PROCESOS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def obtener() -> ProcessPoolExecutor:
+    """Pool de procesos del servidor (se crea en el primer uso)"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_PROCESOS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
@@ -0,0 +1,193 @@
+# backend/app/services/presencia_service.py
+"""
+Presencia ("en línea") e indicador de escritura en los grupos de estudio.
+
+Todo vive en memoria, sin escribir en la base. Un usuario está en línea en
+un grupo mientras tenga abierto el stream del chat. Cada proceso lleva
+la cuenta de sus conexiones (un usuario puede tener varias pestañas) y
+publica en el canal CANAL_PRESENCIA solo los cambios:
+
+    {"evento": "presencia", "worker", "grupo_id", "usuario_id", "nombre", "en_linea"}
+
+Además, una única tarea por proceso manda cada INTERVALO_LATIDO un latido
+con todas sus conexiones, en lotes de hasta MAX_LATIDO, y no un timer por
+socket. Todos los procesos arman con esos eventos el mismo registro
+(grupo -> usuario -> worker -> vencimiento): un usuario sigue en línea
+mientras algún worker lo tenga conectado. Si un worker muere sin avisar,
+sus conexiones vencen a los TTL_PRESENCIA segundos del último latido.
+
+Los cambios del registro se entregan solo a los suscriptores locales del
+canal del grupo (cada proceso avisa a los suyos), así que cada cliente
+recibe cada cambio una vez. "Escribiendo..." es un evento efímero que va
+directo al canal del grupo por el broker.
+"""
+import asyncio
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+from app.core import pubsub
+from app.services.chat_service import canal_grupo
+
+CANAL_PRESENCIA = "presencia"
+INTERVALO_LATIDO = 20  # segundos
+TTL_PRESENCIA = 3 * INTERVALO_LATIDO  # tolera perder dos latidos
+MAX_LATIDO = 100  # conexiones por evento: cada lote entra holgado en una línea del pubsub
+
+_WORKER = uuid.uuid4().hex[:12]
+
+# Registro compartido: grupo -> usuario -> [nombre, {worker: vencimiento (monotonic)}]
+_en_linea: Dict[str, Dict[str, list]] = defaultdict(dict)
+# Conexiones de este proceso: (grupo, usuario) -> cantidad, y su nombre
+_conexiones: Counter = Counter()
+_locales: Dict[tuple, str] = {}
+_tareas: List[asyncio.Task] = []
+
+
+# ==================== CONEXIONES LOCALES ====================
+
+@contextmanager
+def presente(grupo_id: str, usuario_id: str, nombre: str):
+    """Marcar al usuario en línea en el grupo mientras dure el bloque (el stream)"""
+    clave = (grupo_id, usuario_id)
+    _conexiones[clave] += 1
+    _locales[clave] = nombre
+    if _conexiones[clave] == 1:
+        _anunciar(grupo_id, usuario_id, nombre, True)
+    try:
+        yield
+    finally:
+        # Puede correr durante la cancelación del stream: no se espera nada acá
+        _conexiones[clave] -= 1
+        if _conexiones[clave] <= 0:
+            del _conexiones[clave]
+            _locales.pop(clave, None)
+            _anunciar(grupo_id, usuario_id, nombre, False)
+
+
+def _anunciar(grupo_id: str, usuario_id: str, nombre: str, en_linea: bool):
+    evento = {
+        "evento": "presencia", "worker": _WORKER, "grupo_id": grupo_id,
+        "usuario_id": usuario_id, "nombre": nombre, "en_linea": en_linea,
+    }
+    asyncio.get_running_loop().create_task(pubsub.publicar(CANAL_PRESENCIA, evento))
+
+
+async def escribiendo(grupo_id: str, usuario_id: str, nombre: str):
+    await pubsub.publicar(canal_grupo(grupo_id), {
+        "evento": "escribiendo", "grupo_id": grupo_id, "usuario_id": usuario_id, "nombre": nombre,
+    })
+
+
+# ==================== REGISTRO ====================
+
+def en_linea(grupo_id: str) -> List[dict]:
+    """Usuarios en línea en el grupo según el registro de este proceso"""
+    ahora = time.monotonic()
+    return [
+        {"usuario_id": usuario_id, "nombre": nombre}
+        for usuario_id, (nombre, workers) in _en_linea.get(grupo_id, {}).items()
+        if max(workers.values()) > ahora
+    ]
+
+
+def _marcar(grupo_id: str, usuario_id: str, nombre: str, worker: str, vence: float):
+    usuarios = _en_linea[grupo_id]
+    nuevo = usuario_id not in usuarios
+    if nuevo:
+        usuarios[usuario_id] = [nombre, {}]
+    usuarios[usuario_id][1][worker] = vence
+    if nuevo:
+        _avisar(grupo_id, usuario_id, nombre, True)
+
+
+def _desmarcar(grupo_id: str, usuario_id: str, worker: str):
+    usuarios = _en_linea.get(grupo_id)
+    if not usuarios or usuario_id not in usuarios:
+        return
+    nombre, workers = usuarios[usuario_id]
+    workers.pop(worker, None)
+    if not workers:
+        del usuarios[usuario_id]
+        if not usuarios:
+            del _en_linea[grupo_id]
+        _avisar(grupo_id, usuario_id, nombre, False)
+
+
+def _avisar(grupo_id: str, usuario_id: str, nombre: str, en_linea: bool):
+    pubsub.publicar_local(canal_grupo(grupo_id), {
+        "evento": "presencia", "grupo_id": grupo_id, "usuario_id": usuario_id,
+        "nombre": nombre, "en_linea": en_linea,
+    })
+
+
+def _aplicar(evento: dict):
+    vence = time.monotonic() + TTL_PRESENCIA
+    worker = evento["worker"]
+    if evento["evento"] == "latido":
+        for grupo_id, usuario_id, nombre in evento["conexiones"]:
+            _marcar(grupo_id, usuario_id, nombre, worker, vence)
+    elif evento["en_linea"]:
+        _marcar(evento["grupo_id"], evento["usuario_id"], evento["nombre"], worker, vence)
+    else:
+        _desmarcar(evento["grupo_id"], evento["usuario_id"], worker)
+
+
+def _vencer():
+    ahora = time.monotonic()
+    vencidos = [
+        (grupo_id, usuario_id, worker)
+        for grupo_id, usuarios in _en_linea.items()
+        for usuario_id, (_, workers) in usuarios.items()
+        for worker, vence in workers.items()
+        if vence <= ahora
+    ]
+    for grupo_id, usuario_id, worker in vencidos:
+        _desmarcar(grupo_id, usuario_id, worker)
+
+
+# ==================== TAREAS ====================
+
+async def iniciar():
+    """Escuchar el canal de presencia y latir (startup del servidor)"""
+    if not _tareas:
+        loop = asyncio.get_running_loop()
+        listo = asyncio.Event()
+        _tareas.append(loop.create_task(_escuchar(listo)))
+        _tareas.append(loop.create_task(_latir()))
+        await listo.wait()
+
+
+def detener():
+    for tarea in _tareas:
+        tarea.cancel()
+    _tareas.clear()
+
+
+async def _escuchar(listo: asyncio.Event):
+    async with pubsub.suscribir(CANAL_PRESENCIA) as cola:
+        listo.set()
+        while True:
+            evento = await cola.get()
+            if evento is pubsub.DESBORDE:
+                continue  # Lo perdido se corrige con el próximo latido
+            try:
+                _aplicar(evento)
+            except Exception as e:
+                print(f"⚠️ Evento de presencia inválido: {e}")
+
+
+async def _latir():
+    while True:
+        await asyncio.sleep(INTERVALO_LATIDO)
+        try:
+            conexiones = [[g, u, nombre] for (g, u), nombre in _locales.items()]
+            for i in range(0, len(conexiones), MAX_LATIDO):
+                await pubsub.publicar(CANAL_PRESENCIA, {
+                    "evento": "latido", "worker": _WORKER, "conexiones": conexiones[i:i + MAX_LATIDO]
+                })
+            _vencer()
+        except Exception as e:
+            print(f"⚠️ Error en el latido de presencia: {e}")
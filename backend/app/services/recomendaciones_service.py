@@ -0,0 +1,287 @@
+# backend/app/services/recomendaciones_service.py
+"""
+Recomendación de grupos de estudio para un usuario.
+
+Trabaja sobre un índice en memoria:
+    - integrantes de cada grupo y grupos de cada usuario
+    - datos de cada grupo abierto, y los grupos de cada materia
+Las materias que cursa cada usuario (vector ralo usuario x materia) salen
+del índice de companeros_service.
+
+El índice se arma entero al iniciar y cada INTERVALO_RECONSTRUCCION
+segundos. Entre medio se actualiza de a poco: las rutas que cambian
+integrantes solo marcan el grupo con invalidar_grupo, y antes de
+recomendar se releen solo los marcados.
+
+El puntaje de un grupo combina:
+    - que el usuario curse la materia del grupo (PESO_MATERIA)
+    - la similitud coseno entre sus materias y las de los integrantes (PESO_SIMILITUD)
+    - integrantes con los que ya comparte otros grupos (PESO_COMPANEROS, satura)
+    - la actividad reciente, con decaimiento de VIDA_MEDIA_HORAS (PESO_ACTIVIDAD)
+
+Solo se consideran grupos activos, públicos, con lugar y de los que el
+usuario no es integrante. Cada resultado queda TTL_CACHE segundos en caché
+por usuario; sus propios cambios (grupos o inscripciones) lo invalidan antes.
+
+Como el de compañeros, el índice es por worker e invalidar_grupo se
+replica en los demás con pubsub.Invalidaciones.
+"""
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import lider, pubsub
+from app.database import SessionLocal
+from app.models.models import GrupoEstudio, Materia, Usuario, usuarios_grupos
+from app.services import companeros_service
+
+INTERVALO_RECONSTRUCCION = 30 * 60  # segundos
+CANAL_INVALIDACIONES = "indice_grupos"
+TTL_CACHE = 60  # segundos
+VIDA_MEDIA_HORAS = 72
+
+PESO_MATERIA = 3.0
+PESO_SIMILITUD = 1.5
+PESO_COMPANEROS = 2.0
+PESO_ACTIVIDAD = 1.0
+
+_lock = threading.Lock()
+_cargado = False
+_integrantes: Dict[str, Set[str]] = defaultdict(set)
+_grupos_usuario: Dict[str, Set[str]] = defaultdict(set)
+_grupos: Dict[str, dict] = {}
+_grupos_materia: Dict[str, Set[str]] = defaultdict(set)
+
+_grupos_pendientes: Set[str] = set()
+_cache: Dict[str, tuple] = {}  # usuario -> (vence, versión de sus materias, recomendaciones)
+
+
+
+# ==================== CARGA DEL ÍNDICE ====================
+
+def _consulta_grupos():
+    return select(
+        GrupoEstudio.id, GrupoEstudio.nombre, GrupoEstudio.descripcion, GrupoEstudio.materia_id,
+        Materia.nombre.label("materia_nombre"), Usuario.nombre.label("creador_nombre"),
+        Usuario.apellido.label("creador_apellido"), GrupoEstudio.integrantes_actuales,
+        GrupoEstudio.max_integrantes, GrupoEstudio.privado, GrupoEstudio.activo,
+        GrupoEstudio.fecha_actualizacion
+    ).outerjoin(Materia, Materia.id == GrupoEstudio.materia_id).join(
+        Usuario, Usuario.id == GrupoEstudio.creador_id
+    )
+
+
+def _poner_grupo(fila):
+    anterior = _grupos.pop(fila.id, None)
+    if anterior:
+        _grupos_materia[anterior["materia_id"]].discard(fila.id)
+    _grupos[fila.id] = {
+        "id": fila.id,
+        "nombre": fila.nombre,
+        "descripcion": fila.descripcion,
+        "materia_id": fila.materia_id,
+        "materia_nombre": fila.materia_nombre,
+        "creador_nombre": f"{fila.creador_nombre} {fila.creador_apellido}",
+        "integrantes_count": fila.integrantes_actuales or 0,
+        "max_integrantes": fila.max_integrantes or 0,
+        "activo": bool(fila.activo),
+        "abierto": bool(fila.activo) and not fila.privado,
+        "ultima_actividad": fila.fecha_actualizacion,
+    }
+    _grupos_materia[fila.materia_id].add(fila.id)
+
+
+def _quitar_grupo(grupo_id: str):
+    anterior = _grupos.pop(grupo_id, None)
+    if anterior:
+        _grupos_materia[anterior["materia_id"]].discard(grupo_id)
+    for usuario_id in _integrantes.pop(grupo_id, set()):
+        _grupos_usuario[usuario_id].discard(grupo_id)
+
+
+def reconstruir():
+    """Armar el índice completo desde la base (startup y periódicamente)"""
+    global _cargado
+    with _lock:
+        # Lo que se marque mientras se lee la base queda pendiente para después
+        _grupos_pendientes.clear()
+    db = SessionLocal()
+    try:
+        grupos = db.execute(_consulta_grupos()).all()
+        integrantes = db.execute(select(usuarios_grupos.c.grupo_id, usuarios_grupos.c.usuario_id)).all()
+    finally:
+        db.close()
+
+    with _lock:
+        _grupos.clear()
+        _grupos_materia.clear()
+        _integrantes.clear()
+        _grupos_usuario.clear()
+        for fila in grupos:
+            _poner_grupo(fila)
+        for grupo_id, usuario_id in integrantes:
+            _integrantes[grupo_id].add(usuario_id)
+            _grupos_usuario[usuario_id].add(grupo_id)
+        _cache.clear()
+        _cargado = True
+
+
+def invalidar_grupo(grupo_id: str, usuario_id: Optional[str] = None):
+    """Cambió el grupo o sus integrantes (usuario_id: quien entró o salió)"""
+    _marcar_grupo(grupo_id, usuario_id)
+    _invalidaciones.difundir(grupo_id=grupo_id, usuario_id=usuario_id)
+
+
+def _marcar_grupo(grupo_id: str, usuario_id: Optional[str]):
+    with _lock:
+        _grupos_pendientes.add(grupo_id)
+        if usuario_id:
+            _cache.pop(usuario_id, None)
+
+
+def _aplicar_pendientes(db: Session):
+    with _lock:
+        grupos = list(_grupos_pendientes)
+        _grupos_pendientes.clear()
+    if not grupos:
+        return
+
+    filas_grupos = db.execute(_consulta_grupos().where(GrupoEstudio.id.in_(grupos))).all()
+    integrantes = defaultdict(set)
+    for grupo_id, usuario_id in db.execute(
+        select(usuarios_grupos.c.grupo_id, usuarios_grupos.c.usuario_id)
+        .where(usuarios_grupos.c.grupo_id.in_(grupos))
+    ):
+        integrantes[grupo_id].add(usuario_id)
+
+    with _lock:
+        existentes = {fila.id for fila in filas_grupos}
+        for grupo_id in grupos:
+            if grupo_id not in existentes:
+                _quitar_grupo(grupo_id)
+        for fila in filas_grupos:
+            _poner_grupo(fila)
+            for usuario_id in _integrantes.get(fila.id, set()) - integrantes[fila.id]:
+                _grupos_usuario[usuario_id].discard(fila.id)
+            for usuario_id in integrantes[fila.id]:
+                _grupos_usuario[usuario_id].add(fila.id)
+            _integrantes[fila.id] = integrantes[fila.id]
+
+
+# ==================== PUNTAJE ====================
+
+def _similitud(materias: FrozenSet[str], integrantes: Iterable[str]) -> float:
+    """Coseno entre el vector del usuario y la suma de los de los integrantes"""
+    vector = Counter()
+    for materias_integrante in companeros_service.vectores(integrantes).values():
+        vector.update(materias_integrante)
+    if not materias or not vector:
+        return 0.0
+    producto = sum(vector[m] for m in materias)
+    return producto / (math.sqrt(len(materias)) * math.sqrt(sum(v * v for v in vector.values())))
+
+
+def _calcular(usuario_id: str, ahora: datetime) -> List[dict]:
+    materias = companeros_service.materias(usuario_id)
+    mis_grupos = _grupos_usuario.get(usuario_id, set())
+    companeros = {
+        otro for grupo_id in mis_grupos for otro in _integrantes.get(grupo_id, ())
+    } - {usuario_id}
+
+    candidatos = {g for materia_id in materias for g in _grupos_materia.get(materia_id, ())}
+    candidatos |= {g for otro in companeros for g in _grupos_usuario.get(otro, ())}
+
+    resultado = []
+    for grupo_id in candidatos - mis_grupos:
+        grupo = _grupos.get(grupo_id)
+        if not grupo or not grupo["abierto"] or grupo["integrantes_count"] >= grupo["max_integrantes"]:
+            continue
+        integrantes = _integrantes.get(grupo_id, set())
+        cursa = grupo["materia_id"] in materias
+        conocidos = len(integrantes & companeros)
+        actividad = 0.0
+        if grupo["ultima_actividad"]:
+            horas = max(0.0, (ahora - grupo["ultima_actividad"]).total_seconds() / 3600)
+            actividad = 0.5 ** (horas / VIDA_MEDIA_HORAS)
+
+        puntaje = (
+            PESO_MATERIA * cursa
+            + PESO_SIMILITUD * _similitud(materias, integrantes)
+            + PESO_COMPANEROS * conocidos / (conocidos + 1)
+            + PESO_ACTIVIDAD * actividad
+        )
+        motivos = []
+        if cursa:
+            motivos.append(f"Cursás {grupo['materia_nombre']}")
+        if conocidos:
+            motivos.append(f"{conocidos} compañero{'s' if conocidos > 1 else ''} de otros grupos")
+        resultado.append({
+            **{k: v for k, v in grupo.items() if k != "abierto"},
+            "eres_miembro": False,
+            "puntaje": round(puntaje, 4),
+            "motivos": motivos,
+        })
+
+    resultado.sort(key=lambda g: g["puntaje"], reverse=True)
+    return resultado
+
+
+def recomendar(db: Session, usuario_id: str, limite: int = 10) -> List[dict]:
+    """Grupos recomendados para el usuario, de mayor a menor puntaje"""
+    ahora = time.monotonic()
+    version = companeros_service.version(usuario_id)
+    with _lock:
+        guardado = _cache.get(usuario_id)
+        if guardado and guardado[0] > ahora and guardado[1] == version and _cargado:
+            return guardado[2][:limite]
+
+    if not _cargado:
+        reconstruir()
+    _aplicar_pendientes(db)
+    companeros_service.aplicar_pendientes(db)
+
+    with _lock:
+        recomendaciones = _calcular(usuario_id, datetime.now())
+        _cache[usuario_id] = (ahora + TTL_CACHE, version, recomendaciones)
+    return recomendaciones[:limite]
+
+
+# ==================== RECONSTRUCCIÓN PERIÓDICA ====================
+
+_reconstruccion = lider.TareaPeriodica(
+    "recomendaciones-grupos", reconstruir, INTERVALO_RECONSTRUCCION,
+    "Error armando el índice de recomendaciones"
+)
+
+
+def iniciar():
+    """Arrancar la reconstrucción periódica (startup del servidor); la primera es inmediata"""
+    _reconstruccion.iniciar()
+
+
+def _descartar_indice():
+    global _cargado
+    _cargado = False  # Se rearma entero en el próximo uso
+
+
+_invalidaciones = pubsub.Invalidaciones(
+    CANAL_INVALIDACIONES,
+    lambda evento: _marcar_grupo(evento["grupo_id"], evento.get("usuario_id")),
+    _descartar_indice
+)
+
+
+async def escuchar_invalidaciones():
+    """Aplicar las invalidaciones de los otros workers (startup, después de pubsub.iniciar)"""
+    await _invalidaciones.escuchar()
+
+
+def detener():
+    _reconstruccion.detener()
+    _invalidaciones.detener()
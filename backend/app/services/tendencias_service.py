@@ -0,0 +1,222 @@
+# backend/app/services/tendencias_service.py
+"""
+Rankings de la comunidad: tendencias de apuntes, materias y tags, y los
+rankings generales (materias con más apuntes, usuario más activo).
+
+Un hilo del worker líder (core/lider) recalcula todo cada
+INTERVALO_CALCULO segundos y reemplaza la tabla tendencias, que guarda
+solo los primeros TOP_POR_TIPO de cada tipo. Los requests leen esa tabla
+a través de un caché en memoria que vence a los TTL_CACHE segundos: el
+feed no vuelve a agrupar apuntes_compartidos.
+
+El puntaje de tendencia suma los eventos de los últimos VENTANA_DIAS con
+decaimiento exponencial (pierden la mitad del peso cada VIDA_MEDIA_HORAS):
+publicar un apunte, cada calificación (ponderada por las estrellas) y
+cada descarga (de apuntes_descargas_diarias). Una materia o un tag suman
+los puntajes de sus apuntes. Los tags son los #hashtags del título y la
+descripción.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from app.core import lider
+from app.database import SessionLocal
+from app.models.models import (
+    ApunteCompartido, DescargaDiaria, Materia, Tendencia, Usuario, apuntes_calificaciones
+)
+
+INTERVALO_CALCULO = 15 * 60  # segundos
+TTL_CACHE = 60  # segundos
+TOP_POR_TIPO = 50
+VENTANA_DIAS = 30
+VIDA_MEDIA_HORAS = 72
+
+PESO_PUBLICACION = 3.0
+PESO_CALIFICACION = 2.0  # Por una calificación de 5 estrellas
+PESO_DESCARGA = 1.0
+
+TIPOS = ("apunte", "materia", "tag", "materia_popular", "usuario_activo")
+
+_RE_TAG = re.compile(r"#(\w{2,50})")
+
+_cache: Dict[str, List[dict]] = {}
+_cache_vence = 0.0
+_cache_lock = threading.Lock()
+
+
+def _peso(fecha: datetime, ahora: datetime) -> float:
+    horas = max(0.0, (ahora - fecha).total_seconds() / 3600)
+    return 0.5 ** (horas / VIDA_MEDIA_HORAS)
+
+
+def _tags(*textos: str) -> set:
+    return {f"#{t}" for texto in textos if texto for t in _RE_TAG.findall(texto)}
+
+
+def _top(puntajes: Dict[str, float]) -> List[str]:
+    return sorted(puntajes, key=puntajes.get, reverse=True)[:TOP_POR_TIPO]
+
+
+def calcular(db: Session, ahora: datetime = None) -> Dict[str, List[dict]]:
+    """Rankings actuales por tipo: [{clave, etiqueta, puntaje, cantidad}]"""
+    ahora = ahora or datetime.now()
+    desde = ahora - timedelta(days=VENTANA_DIAS)
+
+    # Eventos de la ventana, cada uno con su peso ya decaído
+    puntaje_apunte: Dict[str, float] = defaultdict(float)
+    for apunte_id, fecha in db.execute(
+        select(ApunteCompartido.id, ApunteCompartido.fecha_compartido)
+        .where(ApunteCompartido.fecha_compartido >= desde)
+    ):
+        puntaje_apunte[apunte_id] += PESO_PUBLICACION * _peso(fecha, ahora)
+
+    c = apuntes_calificaciones.c
+    for apunte_id, calificacion, fecha in db.execute(
+        select(c.apunte_id, c.calificacion, c.fecha).where(c.fecha >= desde)
+    ):
+        puntaje_apunte[apunte_id] += PESO_CALIFICACION * calificacion / 5 * _peso(fecha, ahora)
+
+    for apunte_id, fecha, cantidad in db.execute(
+        select(DescargaDiaria.apunte_id, DescargaDiaria.fecha, DescargaDiaria.cantidad)
+        .where(DescargaDiaria.fecha >= desde.date())
+    ):
+        # Las descargas se agrupan por día: se toman a mediodía
+        mediodia = datetime.combine(fecha, datetime.min.time()) + timedelta(hours=12)
+        puntaje_apunte[apunte_id] += PESO_DESCARGA * cantidad * _peso(min(mediodia, ahora), ahora)
+
+    # Solo cuentan los apuntes visibles en el muro
+    datos = {}
+    ids = list(puntaje_apunte)
+    for i in range(0, len(ids), 500):
+        for fila in db.execute(
+            select(
+                ApunteCompartido.id, ApunteCompartido.titulo, ApunteCompartido.descripcion,
+                ApunteCompartido.materia_id, Materia.nombre
+            ).join(Materia, Materia.id == ApunteCompartido.materia_id).where(
+                ApunteCompartido.id.in_(ids[i:i + 500]),
+                ApunteCompartido.compartido_publicamente == True,
+                ApunteCompartido.activo == True
+            )
+        ):
+            datos[fila.id] = fila
+
+    puntaje_materia: Dict[str, float] = defaultdict(float)
+    apuntes_materia: Counter = Counter()
+    nombre_materia = {}
+    puntaje_tag: Dict[str, float] = defaultdict(float)
+    apuntes_tag: Counter = Counter()
+    nombre_tag = {}
+    for apunte_id, fila in datos.items():
+        puntaje = puntaje_apunte[apunte_id]
+        puntaje_materia[fila.materia_id] += puntaje
+        apuntes_materia[fila.materia_id] += 1
+        nombre_materia[fila.materia_id] = fila.nombre
+        # #Parcial y #parcial son el mismo tag; se muestra como se escribió primero
+        for tag in _tags(fila.titulo, fila.descripcion):
+            clave = tag.lower()
+            puntaje_tag[clave] += puntaje
+            apuntes_tag[clave] += 1
+            nombre_tag.setdefault(clave, tag)
+
+    rankings = {
+        "apunte": [
+            {"clave": a, "etiqueta": datos[a].titulo, "puntaje": puntaje_apunte[a], "cantidad": 1}
+            for a in _top({a: puntaje_apunte[a] for a in datos})
+        ],
+        "materia": [
+            {"clave": m, "etiqueta": nombre_materia[m], "puntaje": puntaje_materia[m],
+             "cantidad": apuntes_materia[m]}
+            for m in _top(puntaje_materia)
+        ],
+        "tag": [
+            {"clave": t, "etiqueta": nombre_tag[t], "puntaje": puntaje_tag[t], "cantidad": apuntes_tag[t]}
+            for t in _top(puntaje_tag)
+        ],
+    }
+
+    # Rankings históricos: antes se agrupaban en cada request del feed
+    total = func.count(ApunteCompartido.id).label("total")
+    rankings["materia_popular"] = [
+        {"clave": materia_id, "etiqueta": nombre, "puntaje": cantidad, "cantidad": cantidad}
+        for materia_id, nombre, cantidad in db.execute(
+            select(Materia.id, Materia.nombre, total)
+            .join(ApunteCompartido, Materia.id == ApunteCompartido.materia_id)
+            .where(ApunteCompartido.compartido_publicamente == True)
+            .group_by(Materia.id, Materia.nombre).order_by(desc(total)).limit(TOP_POR_TIPO)
+        )
+    ]
+    rankings["usuario_activo"] = [
+        {"clave": usuario_id, "etiqueta": f"{nombre} {apellido}", "puntaje": cantidad, "cantidad": cantidad}
+        for usuario_id, nombre, apellido, cantidad in db.execute(
+            select(Usuario.id, Usuario.nombre, Usuario.apellido, total)
+            .join(ApunteCompartido, Usuario.id == ApunteCompartido.usuario_id)
+            .group_by(Usuario.id, Usuario.nombre, Usuario.apellido).order_by(desc(total)).limit(TOP_POR_TIPO)
+        )
+    ]
+    return rankings
+
+
+def recalcular() -> Dict[str, List[dict]]:
+    """Calcular los rankings y reemplazar la tabla en una transacción"""
+    global _cache, _cache_vence
+    db = SessionLocal()
+    try:
+        ahora = datetime.now()
+        rankings = calcular(db, ahora)
+        db.query(Tendencia).delete(synchronize_session=False)
+        db.bulk_insert_mappings(Tendencia, [
+            {**fila, "tipo": tipo, "fecha_calculo": ahora}
+            for tipo, filas in rankings.items() for fila in filas
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    with _cache_lock:
+        _cache, _cache_vence = rankings, time.monotonic() + TTL_CACHE
+    return rankings
+
+
+def obtener(db: Session) -> Dict[str, List[dict]]:
+    """Rankings por tipo desde el caché en memoria (la tabla se relee al vencer)"""
+    global _cache, _cache_vence
+    with _cache_lock:
+        if time.monotonic() < _cache_vence:
+            return _cache
+
+    rankings = {tipo: [] for tipo in TIPOS}
+    for fila in db.query(Tendencia).order_by(Tendencia.tipo, desc(Tendencia.puntaje)):
+        rankings.setdefault(fila.tipo, []).append({
+            "clave": fila.clave,
+            "etiqueta": fila.etiqueta,
+            "puntaje": fila.puntaje,
+            "cantidad": fila.cantidad,
+        })
+    with _cache_lock:
+        _cache, _cache_vence = rankings, time.monotonic() + TTL_CACHE
+    return rankings
+
+
+_recalculo = lider.TareaPeriodica(
+    "recalcular-tendencias", recalcular, INTERVALO_CALCULO,
+    "Error recalculando tendencias", solo_lider=True
+)
+
+
+def iniciar():
+    """Arrancar el recálculo periódico (startup del servidor); el primero es inmediato"""
+    _recalculo.iniciar()
+
+
+def detener():
+    _recalculo.detener()
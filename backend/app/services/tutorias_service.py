@@ -0,0 +1,165 @@
+# backend/app/services/tutorias_service.py
+"""
+Tutorías entre estudiantes: publicación, toma, cierre y reputación del tutor.
+
+Ciclo de una tutoría:
+    disponible  -> el tutor la publicó (estudiante_id NULL)
+    programada  -> un estudiante la tomó
+    completada  -> el tutor la cerró (exito, feedback)
+    cancelada
+
+Cada cambio de estado es un único UPDATE condicionado al estado actual:
+si dos estudiantes toman la misma tutoría a la vez, uno solo la consigue
+(el otro ve 0 filas afectadas), sin leer antes la fila.
+
+La reputación del tutor vive precalculada en estadisticas_usuario
+(tutorias_calificadas, suma_calificaciones_tutor, reputacion_tutor) y se
+actualiza en la misma sentencia que suma cada calificación, igual que el
+ranking de apuntes: promedio bayesiano con PESO_PRIOR calificaciones
+ficticias de PRIOR_REPUTACION. La búsqueda filtra por el índice
+(materia_id, estado, fecha) y ordena por esa columna, sin agregar nada.
+Las constantes están repetidas en la migración 0013.
+"""
+from datetime import date, datetime, time
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import insertar_con_conflicto
+from app.models.models import EstadisticaUsuario, Materia, Tutoria, Usuario
+from app.services import estadisticas_service
+
+PRIOR_REPUTACION = 3.0
+PESO_PRIOR = 5
+
+DISPONIBLE = "disponible"
+PROGRAMADA = "programada"
+COMPLETADA = "completada"
+CANCELADA = "cancelada"
+
+
+# ==================== CAMBIOS DE ESTADO ====================
+
+def _cambiar_estado(db: Session, tutoria_id: str, condiciones: list, valores: dict) -> int:
+    return db.execute(
+        update(Tutoria).where(Tutoria.id == tutoria_id, *condiciones)
+        .values(fecha_actualizacion=datetime.now(), **valores)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def tomar(db: Session, tutoria_id: str, estudiante_id: str) -> bool:
+    """El estudiante toma una tutoría disponible (sin commit)"""
+    return bool(_cambiar_estado(
+        db, tutoria_id,
+        [Tutoria.estado == DISPONIBLE, Tutoria.tutor_id != estudiante_id],
+        {"estado": PROGRAMADA, "estudiante_id": estudiante_id}
+    ))
+
+
+def completar(db: Session, tutoria_id: str, tutor_id: str, exito: bool,
+              calificacion_estudiante: Optional[int], feedback: Optional[str]) -> bool:
+    """El tutor cierra una tutoría programada y suma a sus contadores (sin commit)"""
+    completada = _cambiar_estado(
+        db, tutoria_id,
+        [Tutoria.estado == PROGRAMADA, Tutoria.tutor_id == tutor_id],
+        {"estado": COMPLETADA, "exito": exito,
+         "calificacion_estudiante": calificacion_estudiante, "feedback_tutor": feedback}
+    )
+    if completada:
+        estadisticas_service.sumar(db, tutor_id, tutorias_dadas=1, tutorias_exitosas=int(exito))
+    return bool(completada)
+
+
+def cancelar(db: Session, tutoria_id: str, usuario_id: str) -> bool:
+    """El tutor (o el estudiante que la tomó) cancela una tutoría que no terminó"""
+    return bool(_cambiar_estado(
+        db, tutoria_id,
+        [
+            Tutoria.estado.in_((DISPONIBLE, PROGRAMADA)),
+            (Tutoria.tutor_id == usuario_id) | (Tutoria.estudiante_id == usuario_id)
+        ],
+        {"estado": CANCELADA}
+    ))
+
+
+def calificar(db: Session, tutoria_id: str, estudiante_id: str, calificacion: int,
+              feedback: Optional[str]) -> Optional[str]:
+    """El estudiante califica al tutor (una vez); devuelve el tutor o None (sin commit)"""
+    tutor_id = db.execute(
+        update(Tutoria).where(
+            Tutoria.id == tutoria_id,
+            Tutoria.estudiante_id == estudiante_id,
+            Tutoria.estado == COMPLETADA,
+            Tutoria.calificacion_tutor.is_(None)
+        ).values(
+            calificacion_tutor=calificacion, feedback_estudiante=feedback,
+            fecha_actualizacion=datetime.now()
+        ).returning(Tutoria.tutor_id).execution_options(synchronize_session=False)
+    ).scalar()
+    if tutor_id:
+        _sumar_calificacion(db, tutor_id, calificacion)
+    return tutor_id
+
+
+def _sumar_calificacion(db: Session, tutor_id: str, calificacion: int):
+    """Upsert que suma la calificación y recalcula la reputación en la misma sentencia"""
+    tabla = EstadisticaUsuario.__table__
+    insert = insertar_con_conflicto(db)
+    sentencia = insert(tabla).values(
+        usuario_id=tutor_id,
+        tutorias_calificadas=1,
+        suma_calificaciones_tutor=calificacion,
+        reputacion_tutor=(PESO_PRIOR * PRIOR_REPUTACION + calificacion) / (PESO_PRIOR + 1),
+    )
+    # En SET las columnas valen lo que tenían antes del UPDATE
+    suma = tabla.c.suma_calificaciones_tutor + calificacion
+    total = tabla.c.tutorias_calificadas + 1
+    db.execute(sentencia.on_conflict_do_update(
+        index_elements=["usuario_id"],
+        set_={
+            "tutorias_calificadas": total,
+            "suma_calificaciones_tutor": suma,
+            "reputacion_tutor": (PESO_PRIOR * PRIOR_REPUTACION + suma) / (PESO_PRIOR + total),
+        }
+    ))
+
+
+# ==================== BÚSQUEDA ====================
+
+def consulta_disponibles(materia_id: str, desde: date, hasta: date,
+                         hora_desde: Optional[time] = None, hora_hasta: Optional[time] = None,
+                         modalidad: Optional[str] = None, excluir_tutor: Optional[str] = None):
+    """Tutorías disponibles de la materia en el rango, de los tutores mejor calificados primero"""
+    reputacion = func.coalesce(EstadisticaUsuario.reputacion_tutor, PRIOR_REPUTACION)
+    consulta = select(
+        Tutoria.id, Tutoria.titulo, Tutoria.descripcion, Tutoria.fecha, Tutoria.hora_inicio,
+        Tutoria.hora_fin, Tutoria.duracion_minutos, Tutoria.modalidad, Tutoria.lugar,
+        Tutoria.remunerada, Tutoria.monto, Tutoria.materia_id,
+        Materia.nombre.label("materia_nombre"),
+        Tutoria.tutor_id, Usuario.nombre.label("tutor_nombre"),
+        Usuario.apellido.label("tutor_apellido"), Usuario.avatar_url.label("tutor_avatar_url"),
+        reputacion.label("reputacion"),
+        func.coalesce(EstadisticaUsuario.tutorias_calificadas, 0).label("calificaciones"),
+        func.coalesce(EstadisticaUsuario.tutorias_dadas, 0).label("tutorias_dadas"),
+    ).join(
+        Usuario, Usuario.id == Tutoria.tutor_id
+    ).join(
+        Materia, Materia.id == Tutoria.materia_id
+    ).outerjoin(
+        EstadisticaUsuario, EstadisticaUsuario.usuario_id == Tutoria.tutor_id
+    ).where(
+        Tutoria.materia_id == materia_id,
+        Tutoria.estado == DISPONIBLE,
+        Tutoria.fecha.between(desde, hasta)
+    )
+    if hora_desde is not None:
+        consulta = consulta.where(Tutoria.hora_inicio >= hora_desde)
+    if hora_hasta is not None:
+        consulta = consulta.where(Tutoria.hora_inicio <= hora_hasta)
+    if modalidad:
+        consulta = consulta.where(Tutoria.modalidad == modalidad)
+    if excluir_tutor:
+        consulta = consulta.where(Tutoria.tutor_id != excluir_tutor)
+    return consulta.order_by(reputacion.desc(), Tutoria.fecha, Tutoria.hora_inicio, Tutoria.id)
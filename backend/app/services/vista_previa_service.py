@@ -0,0 +1,113 @@
+# backend/app/services/vista_previa_service.py
+"""
+Vistas previas de los PDF compartidos como apuntes.
+
+Al subir un PDF se encola su vista previa: un hilo coordinador manda a
+pool_procesos el render de la primera página y la lectura de metadatos, y
+el resultado queda en disco junto al blob:
+
+    uploads/blobs/ab/cd/<sha256>.miniatura.jpg
+    uploads/blobs/ab/cd/<sha256>.meta.json
+
+Como dependen solo del contenido, los apuntes que comparten archivo
+comparten vista previa y nunca cambian (se sirven con caché inmutable).
+La cantidad de páginas y si hay miniatura se copian a apuntes_compartidos
+para que listar el muro no lea archivos. almacenamiento_service.liberar
+las borra junto con el blob. Los PDF pendientes se recuperan
+con generar_vistas_previas.py.
+"""
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from app.database import SessionLocal
+from app.models.models import ApunteCompartido
+from app.services import almacenamiento_service, apuntes_pdf, pool_procesos
+
+# Un hilo por proceso worker: cada uno espera el render de un PDF
+_pool_coordinador = ThreadPoolExecutor(
+    max_workers=pool_procesos.MAX_PROCESOS, thread_name_prefix="vista-previa"
+)
+
+
+def ruta_miniatura(sha256: str) -> str:
+    return almacenamiento_service.ruta_blob(sha256) + ".miniatura.jpg"
+
+
+def ruta_metadatos(sha256: str) -> str:
+    return almacenamiento_service.ruta_blob(sha256) + ".meta.json"
+
+
+def leer_metadatos(sha256: str) -> Optional[dict]:
+    """Metadatos ya generados del PDF (None si todavía no hay)"""
+    try:
+        with open(ruta_metadatos(sha256), encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return None
+
+
+def encolar(sha256: str):
+    """Generar la vista previa del blob sin bloquear el request"""
+    _pool_coordinador.submit(_generar, sha256)
+
+
+def generar(sha256: str) -> dict:
+    """Metadatos del PDF, renderizando la vista previa solo si no existe"""
+    metadatos = leer_metadatos(sha256)
+    if metadatos is None:
+        metadatos = pool_procesos.obtener().submit(
+            apuntes_pdf.generar_vista_previa,
+            almacenamiento_service.ruta_blob(sha256),
+            ruta_miniatura(sha256)
+        ).result()
+        _escribir_metadatos(sha256, metadatos)
+    guardar(sha256, metadatos)
+    return metadatos
+
+
+def _generar(sha256: str):
+    try:
+        generar(sha256)
+    except Exception as e:
+        print(f"⚠️ Error generando la vista previa de {sha256[:12]}: {e}")
+
+
+def _escribir_metadatos(sha256: str, metadatos: dict):
+    ruta = ruta_metadatos(sha256)
+    tmp = f"{ruta}.{uuid.uuid4().hex}.tmp"  # Dos subidas del mismo PDF pueden llegar juntas
+    with open(tmp, "w", encoding="utf-8") as archivo:
+        json.dump(metadatos, archivo, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+
+def guardar(sha256: str, metadatos: dict):
+    """Copiar páginas y miniatura a todos los apuntes con este archivo"""
+    db = SessionLocal()
+    try:
+        db.query(ApunteCompartido).filter(
+            ApunteCompartido.archivo_sha256 == sha256
+        ).update({
+            ApunteCompartido.paginas: metadatos["paginas"],
+            ApunteCompartido.tiene_miniatura: metadatos["miniatura"],
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def pendientes() -> List[str]:
+    """SHA-256 de los PDF que todavía no tienen vista previa"""
+    db = SessionLocal()
+    try:
+        return [
+            sha256 for (sha256,) in db.query(ApunteCompartido.archivo_sha256).filter(
+                ApunteCompartido.formato == "pdf",
+                ApunteCompartido.archivo_sha256.isnot(None),
+                ApunteCompartido.paginas.is_(None)
+            ).distinct()
+        ]
+    finally:
+        db.close()
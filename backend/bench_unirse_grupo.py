@@ -0,0 +1,135 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from alembic import command
+from alembic.config import Config
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app.models.models import GrupoEstudio, InscripcionMateria, Materia, Usuario, usuarios_grupos
+from app.routes.social import unirse_grupo
+
+USUARIOS = 300
+CUPO = 25
+HILOS = 32
+GRUPO = "grupo_bench"
+
+
+def preparar(db):
+    """Un grupo con CUPO lugares (el creador ocupa uno) y USUARIOS inscriptos a su materia"""
+    db.add(Materia(id="materia_bench", codigo="BENCH", nombre="Materia de prueba"))
+    for i in range(USUARIOS + 1):
+        db.add(Usuario(
+            id=f"u{i}", legajo=f"L{i}", carrera_id="carrera_bench", nombre="Usuario",
+            apellido=str(i), email=f"u{i}@bench"
+        ))
+        db.add(InscripcionMateria(
+            id=f"i{i}", usuario_id=f"u{i}", materia_id="materia_bench",
+            materia_codigo="BENCH", carrera_id="carrera_bench", estado="cursando"
+        ))
+    db.add(GrupoEstudio(
+        id=GRUPO, nombre="Grupo de prueba", creador_id="u0", materia_id="materia_bench",
+        max_integrantes=CUPO, integrantes_actuales=1
+    ))
+    db.flush()
+    db.execute(usuarios_grupos.insert().values(grupo_id=GRUPO, usuario_id="u0", rol="admin"))
+    db.commit()
+
+
+def unirse_leyendo_primero(db, grupo_id: str, usuario: Usuario):
+    """La versión anterior: leer el grupo, chequear en Python, insertar e incrementar"""
+    grupo = db.query(GrupoEstudio).filter(GrupoEstudio.id == grupo_id).first()
+    ya_es_miembro = db.execute(usuarios_grupos.select().where(
+        usuarios_grupos.c.grupo_id == grupo_id,
+        usuarios_grupos.c.usuario_id == usuario.id
+    )).first()
+    if ya_es_miembro:
+        raise HTTPException(status_code=400, detail="Ya eres miembro de este grupo")
+    if grupo.integrantes_actuales >= grupo.max_integrantes:
+        raise HTTPException(status_code=400, detail="El grupo está lleno")
+    db.query(InscripcionMateria).filter(
+        InscripcionMateria.usuario_id == usuario.id,
+        InscripcionMateria.materia_id == grupo.materia_id
+    ).first()
+    db.execute(usuarios_grupos.insert().values(grupo_id=grupo_id, usuario_id=usuario.id))
+    grupo.integrantes_actuales += 1
+    grupo.fecha_actualizacion = datetime.now()
+    db.commit()
+
+
+def correr(nombre: str, Sesion, unirse) -> bool:
+    resultados = Counter()
+    largada = threading.Barrier(HILOS)
+
+    def intento(i: int):
+        if i < HILOS:
+            largada.wait()  # Los primeros HILOS arrancan a la vez
+        db = Sesion()
+        try:
+            # Cada usuario intenta dos veces: la segunda debe chocar con la clave primaria
+            unirse(db, f"u{i % USUARIOS + 1}")
+            resultados["unido"] += 1
+        except HTTPException as e:
+            resultados[e.detail] += 1
+        except Exception as e:
+            resultados[f"error: {type(e).__name__}"] += 1
+            db.rollback()
+        finally:
+            db.close()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(HILOS) as pool:
+        list(pool.map(intento, range(2 * USUARIOS)))
+    segundos = time.perf_counter() - inicio
+
+    db = Sesion()
+    contador = db.query(GrupoEstudio.integrantes_actuales).filter(GrupoEstudio.id == GRUPO).scalar()
+    filas = db.execute(
+        select(func.count()).select_from(usuarios_grupos).where(usuarios_grupos.c.grupo_id == GRUPO)
+    ).scalar()
+    db.close()
+
+    correcto = contador == filas <= CUPO
+    print(f"\n{nombre}: {2 * USUARIOS} intentos con {HILOS} hilos en {segundos:.2f} s "
+          f"({2 * USUARIOS / segundos:.0f} intentos/s)")
+    for resultado, cantidad in resultados.most_common():
+        print(f"   {cantidad:4d}  {resultado}")
+    print(f"   {'✅' if correcto else '❌'} contador={contador} integrantes={filas} cupo={CUPO}")
+    return correcto
+
+
+def base_nueva(directorio: str, nombre: str):
+    url = f"sqlite:///{os.path.join(directorio, nombre)}"
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    Sesion = sessionmaker(bind=create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=HILOS, max_overflow=0
+    ))
+    db = Sesion()
+    preparar(db)
+    db.close()
+    return Sesion
+
+
+def main() -> int:
+    # Mide la unión concurrente a un grupo: sin sobrecupo y con el contador igual a las filas
+    directorio = tempfile.mkdtemp()
+
+    Sesion = base_nueva(directorio, "anterior.db")
+    correr("Leer, chequear e insertar (anterior)", Sesion,
+           lambda db, u: unirse_leyendo_primero(db, GRUPO, db.get(Usuario, u)))
+
+    Sesion = base_nueva(directorio, "atomica.db")
+    correcto = correr("UPDATE condicional + INSERT (unirse_grupo)", Sesion,
+                      lambda db, u: unirse_grupo(GRUPO, None, db=db, current_user=db.get(Usuario, u)))
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import String, and_, create_engine, desc, exists, literal, or_
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.models import (
+    Nota, InscripcionMateria, Clase, EventoPlanificacion, SesionEstudio,
+    FlashCard, LogroDesbloqueado, LogroProgreso, ApunteCompartido, DescargaDiaria,
+    MensajeGrupo, MensajePrivado, GrupoEstudio, EstadisticaComunidad, PerfilPublico,
+    apuntes_calificaciones, usuarios_grupos
+)
+from app.routes.materias import _consulta_eventos_calendario
+from app.services.agenda_grupo_service import _consulta_ocupacion
+from app.services.agradecimientos_service import consulta_feed
+from app.services.busqueda_service import consulta_materias_comunes
+from app.services.tutorias_service import consulta_disponibles
+
+USUARIO = "usuario_001"
+
+
+def consultas_calientes(db):
+    """Las consultas de las rutas más usadas, armadas igual que en app/routes"""
+    return {
+        # GET /dashboard-stats
+        "dashboard: notas que influyen en el promedio": db.query(Nota).filter(
+            Nota.usuario_id == USUARIO,
+            Nota.influye_promedio == True,
+            Nota.nota >= 0
+        ),
+        "dashboard: inscripciones del usuario": db.query(InscripcionMateria).filter(
+            InscripcionMateria.usuario_id == USUARIO
+        ),
+        # GET /notas
+        "notas del usuario por fecha": db.query(Nota).filter(
+            Nota.usuario_id == USUARIO
+        ).order_by(Nota.fecha.desc()),
+        # DELETE /inscripciones/{id}
+        "notas de una inscripción": db.query(Nota).filter(Nota.inscripcion_id == "insc_x"),
+        # POST /planificacion/eventos y POST /social/grupos
+        "inscripción activa por materia": db.query(InscripcionMateria).filter(
+            InscripcionMateria.usuario_id == USUARIO,
+            InscripcionMateria.materia_id == "materia_x",
+            InscripcionMateria.estado.in_(['cursando', 'regular'])
+        ),
+        # GET /calendario/eventos (UNION ALL de las tres fuentes)
+        "calendario por rango": _consulta_eventos_calendario(USUARIO, date(2026, 3, 1), date(2026, 7, 31)),
+        # GET /clases
+        "checkpoints de una inscripción": db.query(Clase).filter(
+            Clase.inscripcion_id == "insc_x",
+            Clase.es_checkpoint == True
+        ),
+        # GET /planificacion/eventos
+        "eventos de planificación": db.query(EventoPlanificacion).filter(
+            EventoPlanificacion.usuario_id == USUARIO
+        ).order_by(EventoPlanificacion.fecha.asc()),
+        # GET /sesiones
+        "sesiones de un día": db.query(SesionEstudio).filter(
+            SesionEstudio.usuario_id == USUARIO,
+            SesionEstudio.fecha == date(2026, 4, 1)
+        ),
+        # GET /flashcards
+        "flashcards por revisar": db.query(FlashCard).filter(
+            FlashCard.usuario_id == USUARIO
+        ).order_by(FlashCard.proxima_revision.asc()),
+        # GET /logros y LogroService.verificar_y_desbloquear_logros
+        "logros desbloqueados del usuario": db.query(LogroDesbloqueado.logro_id).filter(
+            LogroDesbloqueado.usuario_id == USUARIO
+        ),
+        "desbloqueo de un logro": db.query(LogroDesbloqueado).filter(
+            LogroDesbloqueado.logro_id == "logro_x",
+            LogroDesbloqueado.usuario_id == USUARIO
+        ),
+        "progreso de un logro": db.query(LogroProgreso).filter(
+            LogroProgreso.logro_id == "logro_x",
+            LogroProgreso.usuario_id == USUARIO
+        ),
+        "sesiones del usuario (logros)": db.query(SesionEstudio).filter(
+            SesionEstudio.usuario_id == USUARIO
+        ),
+        # GET /social/apuntes (escaneo del índice en orden, sin ordenar en memoria)
+        "muro de apuntes por ranking": db.query(ApunteCompartido).filter(
+            ApunteCompartido.compartido_publicamente == True
+        ).order_by(
+            desc(ApunteCompartido.puntaje_ranking), desc(ApunteCompartido.veces_descargado)
+        ).limit(20),
+        "muro de apuntes de una materia": db.query(ApunteCompartido).filter(
+            ApunteCompartido.compartido_publicamente == True,
+            ApunteCompartido.materia_id == "materia_x"
+        ).order_by(
+            desc(ApunteCompartido.puntaje_ranking), desc(ApunteCompartido.veces_descargado)
+        ).limit(20),
+        # tendencias_service.calcular (ventana reciente)
+        "calificaciones recientes": db.query(apuntes_calificaciones).filter(
+            apuntes_calificaciones.c.fecha >= datetime(2026, 3, 1)
+        ),
+        "descargas diarias recientes": db.query(DescargaDiaria).filter(
+            DescargaDiaria.fecha >= date(2026, 3, 1)
+        ),
+        # GET /social/grupos (keyset por última actividad)
+        "grupos por actividad, página siguiente": db.query(
+            GrupoEstudio,
+            exists().where(
+                usuarios_grupos.c.grupo_id == GrupoEstudio.id,
+                usuarios_grupos.c.usuario_id == USUARIO
+            )
+        ).filter(or_(
+            GrupoEstudio.fecha_actualizacion < literal("2026-03-01 10:00:00", String),
+            and_(
+                GrupoEstudio.fecha_actualizacion == literal("2026-03-01 10:00:00", String),
+                GrupoEstudio.id < "grupo_x"
+            )
+        )).order_by(desc(GrupoEstudio.fecha_actualizacion), desc(GrupoEstudio.id)).limit(21),
+        "grupos de una materia por actividad": db.query(GrupoEstudio).filter(
+            GrupoEstudio.materia_id == "materia_x"
+        ).order_by(desc(GrupoEstudio.fecha_actualizacion), desc(GrupoEstudio.id)).limit(21),
+        "grupos de un usuario": db.query(usuarios_grupos).filter(
+            usuarios_grupos.c.usuario_id == USUARIO
+        ),
+        # GET /social/grupos/{id}/mensajes y su stream (cursor por id)
+        "historial de un grupo": db.query(MensajeGrupo).filter(
+            MensajeGrupo.grupo_id == "grupo_x",
+            MensajeGrupo.id < 500
+        ).order_by(desc(MensajeGrupo.id)).limit(50),
+        "mensajes de un grupo después del cursor": db.query(MensajeGrupo).filter(
+            MensajeGrupo.grupo_id == "grupo_x",
+            MensajeGrupo.id > 500
+        ).order_by(MensajeGrupo.id).limit(50),
+        "historial de una conversación privada": db.query(MensajePrivado).filter(
+            MensajePrivado.conversacion == "u1|u2"
+        ).order_by(desc(MensajePrivado.id)).limit(50),
+        # GET /social/usuarios/buscar
+        "materias en común con los resultados": consulta_materias_comunes(USUARIO, ["u1", "u2", "u3"]),
+        # GET /social/grupos/{id}/sesiones/sugerencias
+        "ocupación de los integrantes de un grupo": _consulta_ocupacion(
+            [USUARIO, "u1", "u2"], date(2026, 3, 1), date(2026, 3, 31)
+        ),
+        # GET /social/tutorias/buscar
+        "tutorías disponibles de una materia": consulta_disponibles(
+            "m1", date(2026, 3, 1), date(2026, 3, 31), excluir_tutor=USUARIO
+        ).limit(20),
+        # GET /social/usuarios/{id}/perfil
+        "tarjeta de perfil público": db.query(PerfilPublico).filter(PerfilPublico.usuario_id == USUARIO),
+        # GET /social/estadisticas/comunidad y su historial
+        "última foto de la comunidad": db.query(EstadisticaComunidad).filter(
+            EstadisticaComunidad.carrera_id == "todas"
+        ).order_by(desc(EstadisticaComunidad.fecha)).limit(1),
+        "serie diaria de una carrera": db.query(EstadisticaComunidad).filter(
+            EstadisticaComunidad.carrera_id == "c1", EstadisticaComunidad.fecha >= date(2026, 3, 1)
+        ).order_by(EstadisticaComunidad.fecha),
+        # GET /social/agradecimientos
+        "agradecimientos recibidos": consulta_feed(USUARIO, "recibidos").limit(21),
+        "agradecimientos enviados después del cursor": consulta_feed(
+            USUARIO, "enviados", "2026-03-01 10:00:00|agra_1"
+        ).limit(21),
+    }
+
+
+def escaneos_completos(conn, sql: str, tablas: set) -> list:
+    """Filas de EXPLAIN QUERY PLAN que recorren una tabla entera"""
+    filas = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    escaneos = []
+    for fila in filas:
+        detalle = fila[-1]
+        # "SCAN notas" o "SCAN notas USING COVERING INDEX ..." recorren todo
+        if detalle.startswith("SCAN ") and detalle.split()[1] in tablas:
+            escaneos.append(detalle)
+    return escaneos
+
+
+def main() -> int:
+    # El esquema se arma con las migraciones, igual que en producción
+    directorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directorio, 'planes.db')}"
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    tablas = set(Base.metadata.tables)
+
+    fallas = 0
+    with engine.connect() as conn:
+        for nombre, consulta in consultas_calientes(db).items():
+            sentencia = getattr(consulta, "statement", consulta)
+            sql = str(sentencia.compile(engine, compile_kwargs={"literal_binds": True}))
+            escaneos = escaneos_completos(conn, sql, tablas)
+            if escaneos:
+                fallas += 1
+                print(f"❌ {nombre}: {'; '.join(escaneos)}")
+            else:
+                print(f"✅ {nombre}")
+
+    db.close()
+    if fallas:
+        print(f"\n{fallas} consulta(s) caen en un escaneo completo de tabla.")
+        return 1
+    print("\nTodas las consultas calientes usan índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from app.services import almacenamiento_service, pool_procesos, vista_previa_service
+
+
+def generar():
+    """Miniatura y metadatos de los PDF de apuntes que todavía no tienen vista previa"""
+    pendientes = vista_previa_service.pendientes()
+    if not pendientes:
+        print("ℹ️ No hay PDFs pendientes de vista previa.")
+        return
+
+    existentes = []
+    for sha256 in pendientes:
+        if os.path.exists(almacenamiento_service.ruta_blob(sha256)):
+            existentes.append(sha256)
+        else:
+            print(f"⚠️ {sha256[:12]}: no existe el blob")
+
+    def procesar(sha256):
+        try:
+            return vista_previa_service.generar(sha256)
+        except Exception as e:
+            print(f"⚠️ {sha256[:12]}: {e}")
+
+    # Un hilo por worker del pool de procesos: cada uno espera un render
+    with ThreadPoolExecutor(max_workers=pool_procesos.MAX_PROCESOS) as hilos:
+        resultados = list(hilos.map(procesar, existentes))
+
+    generadas = sum(1 for r in resultados if r is not None)
+    con_miniatura = sum(1 for r in resultados if r and r["miniatura"])
+    print(f"✅ Vistas previas generadas: {generadas}/{len(pendientes)} ({con_miniatura} con miniatura)")
+
+
+if __name__ == "__main__":
+    generar()
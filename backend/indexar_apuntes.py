@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import as_completed
+from app.services import apuntes_pdf, indexado_apuntes_service, pool_procesos
+
+
+def indexar():
+    """Extraer el texto de los PDF de apuntes que todavía no están en el índice de búsqueda"""
+    if not indexado_apuntes_service.disponible():
+        print("ℹ️ El índice de apuntes solo existe en SQLite.")
+        return
+
+    pendientes = indexado_apuntes_service.pendientes()
+    if not pendientes:
+        print("ℹ️ No hay PDFs pendientes de indexar.")
+        return
+
+    procesos = pool_procesos.obtener()
+    futuros = {}
+    for apunte_id, ruta in pendientes:
+        if not os.path.exists(ruta):
+            print(f"⚠️ {apunte_id}: no existe {ruta}")
+            continue
+        futuros[procesos.submit(apuntes_pdf.extraer_texto, ruta)] = apunte_id
+
+    indexados = 0
+    for futuro in as_completed(futuros):
+        apunte_id = futuros[futuro]
+        try:
+            indexado_apuntes_service.guardar_texto(apunte_id, futuro.result())
+            indexados += 1
+        except Exception as e:
+            print(f"⚠️ {apunte_id}: {e}")
+
+    print(f"✅ PDFs indexados: {indexados}/{len(pendientes)}")
+
+
+if __name__ == "__main__":
+    indexar()
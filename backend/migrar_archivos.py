@@ -0,0 +1,51 @@
+import os
+from app.database import SessionLocal
+from app.models.models import ApunteCompartido
+from app.services import almacenamiento_service
+
+
+def migrar(borrar_originales: bool = True):
+    """Pasar los archivos de uploads/{nombre} al almacenamiento por contenido (uploads/blobs)"""
+    db = SessionLocal()
+    try:
+        apuntes = db.query(ApunteCompartido).filter(
+            ApunteCompartido.contenido.like("FILE:%"),
+            ApunteCompartido.archivo_sha256 == None
+        ).all()
+        if not apuntes:
+            print("ℹ️ No hay archivos para migrar.")
+            return
+
+        migrados, faltantes, originales = 0, 0, set()
+        for apunte in apuntes:
+            ruta = almacenamiento_service.ruta_archivo(None, apunte.contenido)
+            if not os.path.exists(ruta):
+                print(f"⚠️ {apunte.id}: no existe {ruta}")
+                faltantes += 1
+                continue
+
+            with open(ruta, "rb") as origen:
+                apunte.archivo_sha256, apunte.archivo_tamanio = almacenamiento_service.guardar(origen)
+            originales.add(ruta)
+            migrados += 1
+
+        db.commit()
+
+        # Recién con las referencias guardadas se borran los archivos viejos
+        if borrar_originales:
+            for ruta in originales:
+                os.remove(ruta)
+
+        blobs = db.query(ApunteCompartido.archivo_sha256).filter(
+            ApunteCompartido.archivo_sha256 != None
+        ).distinct().count()
+        print(f"✅ Archivos migrados: {migrados} (faltantes: {faltantes}). Blobs en uso: {blobs}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrar()
@@ -0,0 +1,64 @@
+# backend/migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.database import Base, SQLALCHEMY_DATABASE_URL
+import app.models.models  # noqa: F401  (registra las tablas en Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Permite apuntar a otra base: alembic -x url=sqlite:///./otra.db upgrade head
+url = context.get_x_argument(as_dictionary=True).get("url") or config.get_main_option("sqlalchemy.url")
+config.set_main_option("sqlalchemy.url", url or SQLALCHEMY_DATABASE_URL)
+
+target_metadata = Base.metadata
+
+# Tablas virtuales FTS5 (y sus tablas internas) creadas a mano en las
+# migraciones: no están en los modelos y autogenerate no debe borrarlas
+TABLAS_FTS = ("usuarios_busqueda", "apuntes_busqueda")
+
+
+def incluir_nombre(nombre, tipo, padres) -> bool:
+    return not (tipo == "table" and nombre.startswith(TABLAS_FTS))
+
+
+def run_migrations_offline() -> None:
+    """Generar el SQL sin conectarse (alembic upgrade head --sql)"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=incluir_nombre,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite no soporta la mayoría de los ALTER TABLE: se recrea la tabla
+            render_as_batch=True,
+            include_name=incluir_nombre,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
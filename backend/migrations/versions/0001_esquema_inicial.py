@@ -0,0 +1,665 @@
+"""esquema inicial
+
+Tablas e índices tal como los creaba Base.metadata.create_all() antes de
+adoptar Alembic. Una base creada por esa vía (ej: academica.db) ya tiene
+este esquema: la revisión no hace nada y solo queda registrada.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 17:38:17.371511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Base legacy creada con create_all(): el esquema inicial ya existe
+    if sa.inspect(op.get_bind()).has_table('usuarios'):
+        return
+
+    op.create_table('carreras',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('codigo', sa.String(length=20), nullable=False),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('duracion_anios', sa.Integer(), nullable=True),
+    sa.Column('creditos_totales', sa.Integer(), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('icono', sa.String(length=100), nullable=True),
+    sa.Column('activa', sa.Boolean(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo')
+    )
+    op.create_table('categorias_logros',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=False),
+    sa.Column('icono', sa.String(length=100), nullable=False),
+    sa.Column('orden', sa.Integer(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('profesores',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('apellido', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('telefono', sa.String(length=20), nullable=True),
+    sa.Column('materia_codigo', sa.String(length=20), nullable=True),
+    sa.Column('rareza', sa.String(length=50), nullable=True),
+    sa.Column('es_jefe_catedra', sa.Boolean(), nullable=True),
+    sa.Column('desbloqueado', sa.Boolean(), nullable=True),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('frase', sa.Text(), nullable=True),
+    sa.Column('especialidad', sa.String(length=100), nullable=True),
+    sa.Column('calificacion', sa.Float(), nullable=True),
+    sa.Column('total_calificaciones', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('logros',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('icono', sa.String(length=100), nullable=False),
+    sa.Column('categoria_id', sa.String(length=50), nullable=False),
+    sa.Column('rareza', sa.String(length=50), nullable=True),
+    sa.Column('puntos', sa.Integer(), nullable=True),
+    sa.Column('desbloqueado', sa.Boolean(), nullable=True),
+    sa.Column('fecha_desbloqueo', sa.DateTime(), nullable=True),
+    sa.Column('progreso_actual', sa.Integer(), nullable=True),
+    sa.Column('progreso_requerido', sa.Integer(), nullable=True),
+    sa.Column('tipo_condicion', sa.String(length=50), nullable=True),
+    sa.Column('datos_extra', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_modificacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['categoria_id'], ['categorias_logros.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('logros', schema=None) as batch_op:
+        batch_op.create_index('idx_logros_categoria', ['categoria_id'], unique=False)
+
+    op.create_table('materias',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('codigo', sa.String(length=20), nullable=False),
+    sa.Column('carrera_id', sa.String(length=50), nullable=True),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('nivel', sa.Integer(), nullable=True),
+    sa.Column('cuatrimestre', sa.Integer(), nullable=True),
+    sa.Column('modalidad', sa.String(length=50), nullable=True),
+    sa.Column('carga_horaria', sa.Integer(), nullable=True),
+    sa.Column('creditos', sa.Integer(), nullable=True),
+    sa.Column('departamento', sa.String(length=100), nullable=True),
+    sa.Column('es_obligatoria', sa.Boolean(), nullable=True),
+    sa.Column('es_electiva', sa.Boolean(), nullable=True),
+    sa.Column('es_integradora', sa.Boolean(), nullable=True),
+    sa.Column('es_proyecto_final', sa.Boolean(), nullable=True),
+    sa.Column('es_basica', sa.Boolean(), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('icono', sa.String(length=100), nullable=True),
+    sa.Column('orden', sa.Integer(), nullable=True),
+    sa.Column('activa', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['carrera_id'], ['carreras.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo')
+    )
+    with op.batch_alter_table('materias', schema=None) as batch_op:
+        batch_op.create_index('idx_materias_carrera', ['carrera_id'], unique=False)
+        batch_op.create_index('idx_materias_nivel', ['nivel'], unique=False)
+
+    op.create_table('usuarios',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('legajo', sa.String(length=50), nullable=False),
+    sa.Column('carrera_id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('apellido', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=True),
+    sa.Column('fecha_nacimiento', sa.Date(), nullable=True),
+    sa.Column('telefono', sa.String(length=20), nullable=True),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('fecha_ingreso', sa.Date(), nullable=True),
+    sa.Column('fecha_egreso', sa.Date(), nullable=True),
+    sa.Column('estado', sa.String(length=50), nullable=True),
+    sa.Column('promedio_general', sa.Float(), nullable=True),
+    sa.Column('creditos_aprobados', sa.Integer(), nullable=True),
+    sa.Column('ultimo_login', sa.DateTime(), nullable=True),
+    sa.Column('fecha_registro', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['carrera_id'], ['carreras.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('legajo', 'carrera_id', name='uq_usuario_legajo_carrera')
+    )
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index('idx_usuarios_carrera', ['carrera_id'], unique=False)
+        batch_op.create_index('idx_usuarios_legajo', ['legajo'], unique=False)
+
+    op.create_table('actividad_diaria',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('minutos_estudiados', sa.Integer(), nullable=True),
+    sa.Column('sesiones_completadas', sa.Integer(), nullable=True),
+    sa.Column('flashcards_revisadas', sa.Integer(), nullable=True),
+    sa.Column('clases_asistidas', sa.Integer(), nullable=True),
+    sa.Column('notas_creadas', sa.Integer(), nullable=True),
+    sa.Column('logros_desbloqueados', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('usuario_id', 'fecha', name='uq_actividad_usuario_fecha')
+    )
+    op.create_table('agradecimientos',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('emisor_id', sa.String(length=50), nullable=False),
+    sa.Column('receptor_id', sa.String(length=50), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=True),
+    sa.Column('fecha', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['emisor_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['receptor_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('apuntes_compartidos',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('contenido', sa.Text(), nullable=True),
+    sa.Column('formato', sa.String(length=50), nullable=True),
+    sa.Column('url_archivo', sa.String(length=500), nullable=True),
+    sa.Column('compartido_publicamente', sa.Boolean(), nullable=True),
+    sa.Column('veces_descargado', sa.Integer(), nullable=True),
+    sa.Column('veces_visto', sa.Integer(), nullable=True),
+    sa.Column('calificacion_promedio', sa.Float(), nullable=True),
+    sa.Column('total_calificaciones', sa.Integer(), nullable=True),
+    sa.Column('fecha_compartido', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('apuntes_compartidos', schema=None) as batch_op:
+        batch_op.create_index('idx_apuntes_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('ausencias_olvidos',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('razon', sa.String(length=100), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=True),
+    sa.Column('materia_id', sa.String(length=50), nullable=True),
+    sa.Column('evaluacion_id', sa.String(length=50), nullable=True),
+    sa.Column('examen_importante', sa.Boolean(), nullable=True),
+    sa.Column('evaluacion_importante', sa.Boolean(), nullable=True),
+    sa.Column('justificado', sa.Boolean(), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('fecha_registro', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('configuracion_usuario',
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('notificaciones_email', sa.Boolean(), nullable=True),
+    sa.Column('notificaciones_push', sa.Boolean(), nullable=True),
+    sa.Column('tema', sa.String(length=50), nullable=True),
+    sa.Column('idioma', sa.String(length=10), nullable=True),
+    sa.Column('privacidad_perfil', sa.String(length=20), nullable=True),
+    sa.Column('hora_inicio_estudio', sa.Time(), nullable=True),
+    sa.Column('hora_fin_estudio', sa.Time(), nullable=True),
+    sa.Column('duracion_pomodoro', sa.Integer(), nullable=True),
+    sa.Column('descanso_corto', sa.Integer(), nullable=True),
+    sa.Column('descanso_largo', sa.Integer(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+    op.create_table('correlatividades',
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('correlativa_id', sa.String(length=50), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('obligatoria', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['correlativa_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.PrimaryKeyConstraint('materia_id', 'correlativa_id')
+    )
+    op.create_table('estadisticas_usuario',
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('total_horas_estudio', sa.Integer(), nullable=True),
+    sa.Column('total_sesiones', sa.Integer(), nullable=True),
+    sa.Column('total_pomodoros', sa.Integer(), nullable=True),
+    sa.Column('total_notas', sa.Integer(), nullable=True),
+    sa.Column('total_materias_aprobadas', sa.Integer(), nullable=True),
+    sa.Column('total_logros_desbloqueados', sa.Integer(), nullable=True),
+    sa.Column('promedio_general', sa.Float(), nullable=True),
+    sa.Column('mejor_promedio_cuatri', sa.Float(), nullable=True),
+    sa.Column('racha_actual_dias', sa.Integer(), nullable=True),
+    sa.Column('mejor_racha_dias', sa.Integer(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+    op.create_table('grupos_estudio',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('creador_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=True),
+    sa.Column('max_integrantes', sa.Integer(), nullable=True),
+    sa.Column('integrantes_actuales', sa.Integer(), nullable=True),
+    sa.Column('privado', sa.Boolean(), nullable=True),
+    sa.Column('codigo_invitacion', sa.String(length=50), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['creador_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo_invitacion')
+    )
+    with op.batch_alter_table('grupos_estudio', schema=None) as batch_op:
+        batch_op.create_index('idx_grupos_creador', ['creador_id'], unique=False)
+
+    op.create_table('inscripciones',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_codigo', sa.String(length=20), nullable=False),
+    sa.Column('carrera_id', sa.String(length=50), nullable=False),
+    sa.Column('estado', sa.String(length=50), nullable=True),
+    sa.Column('intento', sa.Integer(), nullable=True),
+    sa.Column('recursada', sa.Boolean(), nullable=True),
+    sa.Column('fecha_inscripcion', sa.Date(), nullable=True),
+    sa.Column('fecha_inicio_cursada', sa.Date(), nullable=True),
+    sa.Column('fecha_regularizacion', sa.Date(), nullable=True),
+    sa.Column('fecha_aprobacion', sa.Date(), nullable=True),
+    sa.Column('cuatrimestre', sa.String(length=20), nullable=True),
+    sa.Column('ano_academico', sa.Integer(), nullable=True),
+    sa.Column('promocionada', sa.Boolean(), nullable=True),
+    sa.Column('nota_final', sa.Float(), nullable=True),
+    sa.Column('estado_final', sa.String(length=50), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('progreso_clases', sa.Integer(), nullable=True),
+    sa.Column('total_clases', sa.Integer(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['carrera_id'], ['carreras.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('usuario_id', 'materia_id', 'intento', name='uq_inscripcion_usuario_materia_intento')
+    )
+    with op.batch_alter_table('inscripciones', schema=None) as batch_op:
+        batch_op.create_index('idx_inscripciones_estado', ['estado'], unique=False)
+        batch_op.create_index('idx_inscripciones_materia', ['materia_id'], unique=False)
+        batch_op.create_index('idx_inscripciones_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('logins_diarios',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=True),
+    sa.Column('dispositivo', sa.String(length=100), nullable=True),
+    sa.Column('ip_address', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('usuario_id', 'fecha', name='uq_login_usuario_fecha')
+    )
+    with op.batch_alter_table('logins_diarios', schema=None) as batch_op:
+        batch_op.create_index('idx_logins_diarios_fecha', ['fecha'], unique=False)
+        batch_op.create_index('idx_logins_diarios_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('logros_desbloqueados',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('logro_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('fecha_desbloqueo', sa.DateTime(), nullable=True),
+    sa.Column('datos_contexto', sa.Text(), nullable=True),
+    sa.Column('notificado', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['logro_id'], ['logros.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('logro_id', 'usuario_id', name='uq_logro_usuario')
+    )
+    with op.batch_alter_table('logros_desbloqueados', schema=None) as batch_op:
+        batch_op.create_index('idx_logros_desbloqueados_logro', ['logro_id'], unique=False)
+        batch_op.create_index('idx_logros_desbloqueados_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('logros_progreso',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('logro_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('progreso_actual', sa.Integer(), nullable=True),
+    sa.Column('progreso_requerido', sa.Integer(), nullable=True),
+    sa.Column('completado', sa.Boolean(), nullable=True),
+    sa.Column('fecha_inicio', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['logro_id'], ['logros.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('logro_id', 'usuario_id', name='uq_logro_progreso_usuario')
+    )
+    op.create_table('mazos_flashcards',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('icono', sa.String(length=100), nullable=True),
+    sa.Column('total_cards', sa.Integer(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('planificacion_eventos',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=True),
+    sa.Column('hora_fin', sa.Time(), nullable=True),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('prioridad', sa.Integer(), nullable=True),
+    sa.Column('completado', sa.Boolean(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('profesores_materias',
+    sa.Column('profesor_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('cargo', sa.String(length=50), nullable=True),
+    sa.Column('cuatrimestre', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['profesor_id'], ['profesores.id'], ),
+    sa.PrimaryKeyConstraint('profesor_id', 'materia_id')
+    )
+    op.create_table('tutorias',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('tutor_id', sa.String(length=50), nullable=False),
+    sa.Column('estudiante_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=False),
+    sa.Column('hora_fin', sa.Time(), nullable=True),
+    sa.Column('duracion_minutos', sa.Integer(), nullable=True),
+    sa.Column('modalidad', sa.String(length=50), nullable=True),
+    sa.Column('lugar', sa.String(length=200), nullable=True),
+    sa.Column('remunerada', sa.Boolean(), nullable=True),
+    sa.Column('monto', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('estado', sa.String(length=50), nullable=True),
+    sa.Column('exito', sa.Boolean(), nullable=True),
+    sa.Column('calificacion_tutor', sa.Integer(), nullable=True),
+    sa.Column('calificacion_estudiante', sa.Integer(), nullable=True),
+    sa.Column('feedback_tutor', sa.Text(), nullable=True),
+    sa.Column('feedback_estudiante', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['estudiante_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['tutor_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tutorias', schema=None) as batch_op:
+        batch_op.create_index('idx_tutorias_estudiante', ['estudiante_id'], unique=False)
+        batch_op.create_index('idx_tutorias_tutor', ['tutor_id'], unique=False)
+
+    op.create_table('apuntes_calificaciones',
+    sa.Column('apunte_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('calificacion', sa.Integer(), nullable=False),
+    sa.Column('comentario', sa.Text(), nullable=True),
+    sa.Column('fecha', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['apunte_id'], ['apuntes_compartidos.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('apunte_id', 'usuario_id')
+    )
+    op.create_table('clases',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('inscripcion_id', sa.String(length=50), nullable=False),
+    sa.Column('numero_clase', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=True),
+    sa.Column('hora_fin', sa.Time(), nullable=True),
+    sa.Column('duracion_minutos', sa.Integer(), nullable=True),
+    sa.Column('es_checkpoint', sa.Boolean(), nullable=True),
+    sa.Column('tipo_checkpoint', sa.String(length=50), nullable=True),
+    sa.Column('asistio', sa.Boolean(), nullable=True),
+    sa.Column('participacion', sa.Integer(), nullable=True),
+    sa.Column('completada', sa.Boolean(), nullable=True),
+    sa.Column('resumen', sa.Text(), nullable=True),
+    sa.Column('notas', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inscripcion_id'], ['inscripciones.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('inscripcion_id', 'numero_clase', name='uq_clase_inscripcion_numero')
+    )
+    op.create_table('flashcards',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('mazo_id', sa.String(length=50), nullable=True),
+    sa.Column('pregunta', sa.Text(), nullable=False),
+    sa.Column('respuesta', sa.Text(), nullable=False),
+    sa.Column('dificultad', sa.Integer(), nullable=True),
+    sa.Column('etiquetas', sa.Text(), nullable=True),
+    sa.Column('intervalo_dias', sa.Integer(), nullable=True),
+    sa.Column('proxima_revision', sa.Date(), nullable=True),
+    sa.Column('veces_correcta', sa.Integer(), nullable=True),
+    sa.Column('veces_incorrecta', sa.Integer(), nullable=True),
+    sa.Column('veces_revisada', sa.Integer(), nullable=True),
+    sa.Column('ultima_revision', sa.Date(), nullable=True),
+    sa.Column('estado', sa.String(length=50), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['mazo_id'], ['mazos_flashcards.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('grupos_estudio_integrantes',
+    sa.Column('grupo_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('rol', sa.String(length=50), nullable=True),
+    sa.Column('fecha_union', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['grupo_id'], ['grupos_estudio.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('grupo_id', 'usuario_id')
+    )
+    op.create_table('historial_estados_inscripcion',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('inscripcion_id', sa.String(length=50), nullable=False),
+    sa.Column('estado_anterior', sa.String(length=50), nullable=True),
+    sa.Column('estado_nuevo', sa.String(length=50), nullable=False),
+    sa.Column('motivo', sa.String(length=200), nullable=True),
+    sa.Column('fecha_cambio', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inscripcion_id'], ['inscripciones.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('notas',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('inscripcion_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=False),
+    sa.Column('tipo_evaluacion', sa.String(length=50), nullable=False),
+    sa.Column('numero_evaluacion', sa.Integer(), nullable=True),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('nota', sa.Float(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=True),
+    sa.Column('es_parcial', sa.Boolean(), nullable=True),
+    sa.Column('es_final', sa.Boolean(), nullable=True),
+    sa.Column('es_tp', sa.Boolean(), nullable=True),
+    sa.Column('es_recuperatorio', sa.Boolean(), nullable=True),
+    sa.Column('influye_promedio', sa.Boolean(), nullable=True),
+    sa.Column('aprobada', sa.Boolean(), nullable=True),
+    sa.Column('cuatrimestre', sa.String(length=20), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inscripcion_id'], ['inscripciones.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notas', schema=None) as batch_op:
+        batch_op.create_index('idx_notas_fecha', ['fecha'], unique=False)
+        batch_op.create_index('idx_notas_materia', ['materia_id'], unique=False)
+        batch_op.create_index('idx_notas_tipo', ['tipo_evaluacion'], unique=False)
+        batch_op.create_index('idx_notas_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('sesiones_estudio',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('materia_id', sa.String(length=50), nullable=True),
+    sa.Column('inscripcion_id', sa.String(length=50), nullable=True),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=False),
+    sa.Column('hora_fin', sa.Time(), nullable=True),
+    sa.Column('duracion_minutos', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=True),
+    sa.Column('pomodoros_completados', sa.Integer(), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('eficiencia', sa.Integer(), nullable=True),
+    sa.Column('estado_animo', sa.String(length=50), nullable=True),
+    sa.Column('lugar', sa.String(length=100), nullable=True),
+    sa.Column('recursos', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inscripcion_id'], ['inscripciones.id'], ),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sesiones_estudio', schema=None) as batch_op:
+        batch_op.create_index('idx_sesiones_fecha', ['fecha'], unique=False)
+        batch_op.create_index('idx_sesiones_usuario', ['usuario_id'], unique=False)
+
+    op.create_table('sesiones_grupo',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('grupo_id', sa.String(length=50), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora_inicio', sa.Time(), nullable=False),
+    sa.Column('hora_fin', sa.Time(), nullable=True),
+    sa.Column('duracion_minutos', sa.Integer(), nullable=True),
+    sa.Column('tema', sa.String(length=200), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('lugar', sa.String(length=100), nullable=True),
+    sa.Column('asistentes', sa.Integer(), nullable=True),
+    sa.Column('satisfaccion', sa.Integer(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['grupo_id'], ['grupos_estudio.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sesiones_grupo_asistentes',
+    sa.Column('sesion_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('asistio', sa.Boolean(), nullable=True),
+    sa.Column('puntual', sa.Boolean(), nullable=True),
+    sa.Column('participacion', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['sesion_id'], ['sesiones_grupo.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('sesion_id', 'usuario_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sesiones_grupo_asistentes')
+    op.drop_table('sesiones_grupo')
+    with op.batch_alter_table('sesiones_estudio', schema=None) as batch_op:
+        batch_op.drop_index('idx_sesiones_usuario')
+        batch_op.drop_index('idx_sesiones_fecha')
+
+    op.drop_table('sesiones_estudio')
+    with op.batch_alter_table('notas', schema=None) as batch_op:
+        batch_op.drop_index('idx_notas_usuario')
+        batch_op.drop_index('idx_notas_tipo')
+        batch_op.drop_index('idx_notas_materia')
+        batch_op.drop_index('idx_notas_fecha')
+
+    op.drop_table('notas')
+    op.drop_table('historial_estados_inscripcion')
+    op.drop_table('grupos_estudio_integrantes')
+    op.drop_table('flashcards')
+    op.drop_table('clases')
+    op.drop_table('apuntes_calificaciones')
+    with op.batch_alter_table('tutorias', schema=None) as batch_op:
+        batch_op.drop_index('idx_tutorias_tutor')
+        batch_op.drop_index('idx_tutorias_estudiante')
+
+    op.drop_table('tutorias')
+    op.drop_table('profesores_materias')
+    op.drop_table('planificacion_eventos')
+    op.drop_table('mazos_flashcards')
+    op.drop_table('logros_progreso')
+    with op.batch_alter_table('logros_desbloqueados', schema=None) as batch_op:
+        batch_op.drop_index('idx_logros_desbloqueados_usuario')
+        batch_op.drop_index('idx_logros_desbloqueados_logro')
+
+    op.drop_table('logros_desbloqueados')
+    with op.batch_alter_table('logins_diarios', schema=None) as batch_op:
+        batch_op.drop_index('idx_logins_diarios_usuario')
+        batch_op.drop_index('idx_logins_diarios_fecha')
+
+    op.drop_table('logins_diarios')
+    with op.batch_alter_table('inscripciones', schema=None) as batch_op:
+        batch_op.drop_index('idx_inscripciones_usuario')
+        batch_op.drop_index('idx_inscripciones_materia')
+        batch_op.drop_index('idx_inscripciones_estado')
+
+    op.drop_table('inscripciones')
+    with op.batch_alter_table('grupos_estudio', schema=None) as batch_op:
+        batch_op.drop_index('idx_grupos_creador')
+
+    op.drop_table('grupos_estudio')
+    op.drop_table('estadisticas_usuario')
+    op.drop_table('correlatividades')
+    op.drop_table('configuracion_usuario')
+    op.drop_table('ausencias_olvidos')
+    with op.batch_alter_table('apuntes_compartidos', schema=None) as batch_op:
+        batch_op.drop_index('idx_apuntes_usuario')
+
+    op.drop_table('apuntes_compartidos')
+    op.drop_table('agradecimientos')
+    op.drop_table('actividad_diaria')
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index('idx_usuarios_legajo')
+        batch_op.drop_index('idx_usuarios_carrera')
+
+    op.drop_table('usuarios')
+    with op.batch_alter_table('materias', schema=None) as batch_op:
+        batch_op.drop_index('idx_materias_nivel')
+        batch_op.drop_index('idx_materias_carrera')
+
+    op.drop_table('materias')
+    with op.batch_alter_table('logros', schema=None) as batch_op:
+        batch_op.drop_index('idx_logros_categoria')
+
+    op.drop_table('logros')
+    op.drop_table('profesores')
+    op.drop_table('categorias_logros')
+    op.drop_table('carreras')
@@ -0,0 +1,69 @@
+"""índices compuestos para las consultas calientes
+
+Reemplaza los índices de una columna sobre usuario_id por índices
+compuestos que cubren los filtros reales de las rutas (ver
+check_query_plans.py). Los índices se crean fuera de la transacción de la
+migración y con CONCURRENTLY en PostgreSQL, para no bloquear escrituras
+mientras se construyen; en SQLite el CREATE INDEX es corto igual.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 17:45:02.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDICES_NUEVOS = [
+    ('idx_inscripciones_usuario_materia_estado', 'inscripciones', ['usuario_id', 'materia_id', 'estado']),
+    ('idx_notas_inscripcion', 'notas', ['inscripcion_id']),
+    ('idx_notas_usuario_fecha', 'notas', ['usuario_id', 'fecha']),
+    ('idx_notas_usuario_promedio', 'notas', ['usuario_id', 'influye_promedio', 'nota']),
+    ('idx_sesiones_usuario_fecha', 'sesiones_estudio', ['usuario_id', 'fecha']),
+    ('idx_flashcards_usuario_revision', 'flashcards', ['usuario_id', 'proxima_revision']),
+    ('idx_clases_inscripcion_checkpoint_fecha', 'clases', ['inscripcion_id', 'es_checkpoint', 'fecha']),
+    ('idx_eventos_usuario_fecha', 'planificacion_eventos', ['usuario_id', 'fecha']),
+    ('idx_logros_desbloqueados_usuario_logro', 'logros_desbloqueados', ['usuario_id', 'logro_id']),
+]
+
+# Índices de una sola columna que quedan cubiertos como prefijo de los nuevos
+INDICES_RETIRADOS = [
+    ('idx_notas_usuario', 'notas', ['usuario_id']),
+    ('idx_inscripciones_usuario', 'inscripciones', ['usuario_id']),
+    ('idx_sesiones_usuario', 'sesiones_estudio', ['usuario_id']),
+    ('idx_logros_desbloqueados_usuario', 'logros_desbloqueados', ['usuario_id']),
+    ('idx_logros_desbloqueados_logro', 'logros_desbloqueados', ['logro_id']),
+]
+
+
+def _crear(indices):
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in indices:
+            op.create_index(nombre, tabla, columnas, if_not_exists=True, postgresql_concurrently=True)
+
+
+def _borrar(indices):
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _ in indices:
+            op.drop_index(nombre, table_name=tabla, if_exists=True, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # Primero los nuevos: las consultas nunca quedan sin índice durante el rollout
+    _crear(INDICES_NUEVOS)
+    _borrar(INDICES_RETIRADOS)
+
+    # Estadísticas frescas para que el planificador elija bien entre índices
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(sa.text('ANALYZE'))
+
+
+def downgrade() -> None:
+    _crear(INDICES_RETIRADOS)
+    _borrar(INDICES_NUEVOS)
@@ -0,0 +1,73 @@
+"""índice de texto completo para la búsqueda de usuarios
+
+Tabla virtual FTS5 con tokenizer trigram sobre nombre, apellido, legajo y
+email de usuarios (external content: no duplica los datos, solo el
+índice). Los triggers la mantienen sincronizada con cada INSERT, UPDATE y
+DELETE. Solo aplica a SQLite; en otros motores la búsqueda usa ILIKE.
+
+Ojo: un batch_alter_table sobre usuarios recrea la tabla y borra los
+triggers; la migración que lo haga debe volver a crearlos y reconstruir el
+índice con _reconstruir().
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 18:20:44.502113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+COLUMNAS = "nombre, apellido, legajo, email"
+VALORES_NUEVOS = "new.nombre, new.apellido, new.legajo, new.email"
+VALORES_VIEJOS = "old.nombre, old.apellido, old.legajo, old.email"
+
+
+def _reconstruir():
+    op.execute("INSERT INTO usuarios_busqueda(usuarios_busqueda) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(f"""
+        CREATE VIRTUAL TABLE usuarios_busqueda USING fts5(
+            {COLUMNAS},
+            content='usuarios', content_rowid='rowid', tokenize='trigram'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ai AFTER INSERT ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(rowid, {COLUMNAS}) VALUES (new.rowid, {VALORES_NUEVOS});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ad AFTER DELETE ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(usuarios_busqueda, rowid, {COLUMNAS})
+            VALUES ('delete', old.rowid, {VALORES_VIEJOS});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_au AFTER UPDATE OF {COLUMNAS} ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(usuarios_busqueda, rowid, {COLUMNAS})
+            VALUES ('delete', old.rowid, {VALORES_VIEJOS});
+            INSERT INTO usuarios_busqueda(rowid, {COLUMNAS}) VALUES (new.rowid, {VALORES_NUEVOS});
+        END
+    """)
+    # Indexar los usuarios que ya existen
+    _reconstruir()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for trigger in ('usuarios_busqueda_ai', 'usuarios_busqueda_ad', 'usuarios_busqueda_au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS usuarios_busqueda")
@@ -0,0 +1,76 @@
+"""índice de texto completo para los apuntes compartidos
+
+Tabla virtual FTS5 con titulo, descripcion, contenido (solo si es texto,
+no la referencia FILE:) y texto_archivo, que completa un worker en segundo
+plano con el texto extraído del PDF subido. La fila de la tabla virtual
+usa el mismo rowid que apuntes_compartidos.
+
+El ranking por defecto (rank) es bm25 con más peso en el título.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 19:05:12.930417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+CONTENIDO_NUEVO = "CASE WHEN new.contenido LIKE 'FILE:%' THEN NULL ELSE new.contenido END"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE apuntes_busqueda USING fts5(
+            titulo, descripcion, contenido, texto_archivo,
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        INSERT INTO apuntes_busqueda(apuntes_busqueda, rank)
+        VALUES ('rank', 'bm25(10.0, 4.0, 1.0, 1.0)')
+    """)
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_ai AFTER INSERT ON apuntes_compartidos BEGIN
+            INSERT INTO apuntes_busqueda(rowid, titulo, descripcion, contenido)
+            VALUES (new.rowid, new.titulo, new.descripcion, {CONTENIDO_NUEVO});
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER apuntes_busqueda_ad AFTER DELETE ON apuntes_compartidos BEGIN
+            DELETE FROM apuntes_busqueda WHERE rowid = old.rowid;
+        END
+    """)
+    # texto_archivo no se toca: lo escribe el worker
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_au AFTER UPDATE OF titulo, descripcion, contenido
+        ON apuntes_compartidos BEGIN
+            UPDATE apuntes_busqueda
+            SET titulo = new.titulo, descripcion = new.descripcion, contenido = {CONTENIDO_NUEVO}
+            WHERE rowid = old.rowid;
+        END
+    """)
+    # Apuntes existentes; el texto de sus PDF lo agrega indexar_apuntes.py
+    op.execute("""
+        INSERT INTO apuntes_busqueda(rowid, titulo, descripcion, contenido)
+        SELECT rowid, titulo, descripcion,
+               CASE WHEN contenido LIKE 'FILE:%' THEN NULL ELSE contenido END
+        FROM apuntes_compartidos
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for trigger in ('apuntes_busqueda_ai', 'apuntes_busqueda_ad', 'apuntes_busqueda_au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS apuntes_busqueda")
@@ -0,0 +1,35 @@
+"""almacenamiento por contenido
+
+Columnas del blob (SHA-256 y tamaño) en apuntes_compartidos. El índice
+por hash sirve para contar referencias al liberar un blob. Los archivos
+que ya estaban en uploads/ se pasan a blobs con migrar_archivos.py.
+
+ADD COLUMN directo (sin batch): recrear la tabla borraría los triggers
+de apuntes_busqueda. Por lo mismo el downgrade usa DROP COLUMN (SQLite
+3.35 o posterior), después de borrar el índice de la columna.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 19:41:06.366967
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('apuntes_compartidos', sa.Column('archivo_sha256', sa.String(length=64), nullable=True))
+    op.add_column('apuntes_compartidos', sa.Column('archivo_tamanio', sa.Integer(), nullable=True))
+    op.create_index('idx_apuntes_archivo_sha256', 'apuntes_compartidos', ['archivo_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_apuntes_archivo_sha256', table_name='apuntes_compartidos')
+    op.drop_column('apuntes_compartidos', 'archivo_tamanio')
+    op.drop_column('apuntes_compartidos', 'archivo_sha256')
@@ -0,0 +1,32 @@
+"""vista previa de apuntes
+
+Cantidad de páginas y si hay miniatura de la primera página para los
+apuntes PDF. Las miniaturas y los metadatos viven en disco junto al blob;
+estas columnas solo evitan leerlos al listar el muro. Los PDF ya subidos
+se procesan con generar_vistas_previas.py.
+
+ADD COLUMN y DROP COLUMN directos (sin batch), igual que en 0005.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 20:03:17.512846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('apuntes_compartidos', sa.Column('paginas', sa.Integer(), nullable=True))
+    op.add_column('apuntes_compartidos', sa.Column('tiene_miniatura', sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('apuntes_compartidos', 'tiene_miniatura')
+    op.drop_column('apuntes_compartidos', 'paginas')
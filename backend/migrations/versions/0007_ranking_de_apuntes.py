@@ -0,0 +1,60 @@
+"""ranking de apuntes
+
+Agregado incremental de calificaciones (suma_calificaciones junto al
+total ya existente) y puntaje_ranking, el promedio bayesiano con el que
+se ordena el muro. Los agregados se recalculan desde
+apuntes_calificaciones, lo que además corrige promedios que quedaron mal
+por calificaciones simultáneas. Índices para el orden del muro, general y
+por materia.
+
+ADD COLUMN y DROP COLUMN directos (sin batch), igual que en 0005.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 20:31:52.204718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Mismos valores que calificaciones_service (la migración no importa la app)
+PRIOR_CALIFICACION = 3.0
+PESO_PRIOR = 5
+
+
+def upgrade() -> None:
+    op.add_column('apuntes_compartidos', sa.Column('suma_calificaciones', sa.Integer(), nullable=True))
+    op.add_column('apuntes_compartidos', sa.Column('puntaje_ranking', sa.Float(), nullable=True))
+
+    op.execute("""
+        UPDATE apuntes_compartidos SET
+            total_calificaciones = (SELECT COUNT(*) FROM apuntes_calificaciones c
+                                    WHERE c.apunte_id = apuntes_compartidos.id),
+            suma_calificaciones = (SELECT COALESCE(SUM(c.calificacion), 0) FROM apuntes_calificaciones c
+                                   WHERE c.apunte_id = apuntes_compartidos.id)
+    """)
+    op.execute(f"""
+        UPDATE apuntes_compartidos SET
+            calificacion_promedio = CASE WHEN total_calificaciones > 0
+                THEN ROUND(suma_calificaciones * 1.0 / total_calificaciones, 2) ELSE 0 END,
+            puntaje_ranking = ({PESO_PRIOR} * {PRIOR_CALIFICACION} + suma_calificaciones)
+                              / ({PESO_PRIOR} + total_calificaciones)
+    """)
+
+    op.create_index('idx_apuntes_ranking', 'apuntes_compartidos',
+                    ['compartido_publicamente', 'puntaje_ranking', 'veces_descargado'], unique=False)
+    op.create_index('idx_apuntes_materia_ranking', 'apuntes_compartidos',
+                    ['materia_id', 'compartido_publicamente', 'puntaje_ranking', 'veces_descargado'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_apuntes_materia_ranking', table_name='apuntes_compartidos')
+    op.drop_index('idx_apuntes_ranking', table_name='apuntes_compartidos')
+    op.drop_column('apuntes_compartidos', 'puntaje_ranking')
+    op.drop_column('apuntes_compartidos', 'suma_calificaciones')
@@ -0,0 +1,48 @@
+"""tendencias
+
+Tabla tendencias (rankings precalculados por tendencias_service) y
+apuntes_descargas_diarias, la serie de descargas por día que alimenta el
+decaimiento temporal. Índice por fecha en apuntes_calificaciones para
+leer solo la ventana reciente.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 20:58:40.731052
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tendencias',
+    sa.Column('tipo', sa.String(length=20), nullable=False),
+    sa.Column('clave', sa.String(length=100), nullable=False),
+    sa.Column('etiqueta', sa.String(length=200), nullable=True),
+    sa.Column('puntaje', sa.Float(), nullable=False),
+    sa.Column('cantidad', sa.Integer(), nullable=True),
+    sa.Column('fecha_calculo', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('tipo', 'clave')
+    )
+    op.create_table('apuntes_descargas_diarias',
+    sa.Column('apunte_id', sa.String(length=50), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('cantidad', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['apunte_id'], ['apuntes_compartidos.id'], ),
+    sa.PrimaryKeyConstraint('apunte_id', 'fecha')
+    )
+    op.create_index('idx_descargas_diarias_fecha', 'apuntes_descargas_diarias', ['fecha'], unique=False)
+    op.create_index('idx_calificaciones_fecha', 'apuntes_calificaciones', ['fecha'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_calificaciones_fecha', table_name='apuntes_calificaciones')
+    op.drop_index('idx_descargas_diarias_fecha', table_name='apuntes_descargas_diarias')
+    op.drop_table('apuntes_descargas_diarias')
+    op.drop_table('tendencias')
@@ -0,0 +1,55 @@
+"""mensajes
+
+Chat de grupos y privado: mensajes_grupo y mensajes_privados, de solo
+agregado. El id autoincremental es el cursor del historial y del stream,
+con índices (grupo_id, id) y (conversacion, id).
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 21:27:13.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('mensajes_grupo',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('grupo_id', sa.String(length=50), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('contenido', sa.Text(), nullable=False),
+    sa.Column('tipo', sa.String(length=20), nullable=True),
+    sa.Column('recurso_url', sa.String(length=500), nullable=True),
+    sa.Column('fecha', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['grupo_id'], ['grupos_estudio.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_mensajes_grupo_grupo_id', 'mensajes_grupo', ['grupo_id', 'id'], unique=False)
+
+    op.create_table('mensajes_privados',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('conversacion', sa.String(length=101), nullable=False),
+    sa.Column('usuario_id', sa.String(length=50), nullable=False),
+    sa.Column('receptor_id', sa.String(length=50), nullable=False),
+    sa.Column('contenido', sa.Text(), nullable=False),
+    sa.Column('fecha', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['receptor_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_mensajes_privados_conversacion_id', 'mensajes_privados', ['conversacion', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_mensajes_privados_conversacion_id', table_name='mensajes_privados')
+    op.drop_table('mensajes_privados')
+    op.drop_index('idx_mensajes_grupo_grupo_id', table_name='mensajes_grupo')
+    op.drop_table('mensajes_grupo')
@@ -0,0 +1,31 @@
+"""indices grupos
+
+Listado de grupos con paginación keyset por última actividad
+(fecha_actualizacion, id), general y por materia, e índice por usuario en
+grupos_estudio_integrantes para "mis grupos" sin recorrer la tabla.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 21:54:06.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_grupos_actividad', 'grupos_estudio', ['fecha_actualizacion', 'id'], unique=False)
+    op.create_index('idx_grupos_materia_actividad', 'grupos_estudio', ['materia_id', 'fecha_actualizacion', 'id'], unique=False)
+    op.create_index('idx_grupos_integrantes_usuario', 'grupos_estudio_integrantes', ['usuario_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_grupos_integrantes_usuario', table_name='grupos_estudio_integrantes')
+    op.drop_index('idx_grupos_materia_actividad', table_name='grupos_estudio')
+    op.drop_index('idx_grupos_actividad', table_name='grupos_estudio')
@@ -0,0 +1,27 @@
+"""agenda grupos
+
+Índice (grupo_id, fecha) en sesiones_grupo: las sugerencias de horario
+leen las sesiones de todos los grupos de los integrantes dentro de la
+ventana pedida.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 22:21:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_sesiones_grupo_grupo_fecha', 'sesiones_grupo', ['grupo_id', 'fecha'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sesiones_grupo_grupo_fecha', table_name='sesiones_grupo')
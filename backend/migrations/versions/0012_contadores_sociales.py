@@ -0,0 +1,65 @@
+"""contadores sociales
+
+Contadores por usuario en estadisticas_usuario (grupos, apuntes, tutorías,
+sesiones de grupo organizadas y asistidas) para los logros sociales, y el
+recuento inicial desde las tablas. sesiones_grupo.asistentes pasa a ser la
+cantidad de asistencias marcadas.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 22:48:12.806135
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+CONTADORES = (
+    'grupos_integrante', 'apuntes_compartidos', 'tutorias_dadas',
+    'sesiones_grupo_organizadas', 'sesiones_grupo_asistidas',
+)
+
+
+def upgrade() -> None:
+    for columna in CONTADORES:
+        op.add_column('estadisticas_usuario', sa.Column(columna, sa.Integer(), server_default='0', nullable=False))
+
+    # Una fila por usuario y los valores actuales
+    op.execute(
+        "INSERT INTO estadisticas_usuario (usuario_id) "
+        "SELECT id FROM usuarios WHERE id NOT IN (SELECT usuario_id FROM estadisticas_usuario)"
+    )
+    op.execute("""
+        UPDATE estadisticas_usuario SET
+            grupos_integrante = (
+                SELECT COUNT(*) FROM grupos_estudio_integrantes i
+                WHERE i.usuario_id = estadisticas_usuario.usuario_id),
+            apuntes_compartidos = (
+                SELECT COUNT(*) FROM apuntes_compartidos a
+                WHERE a.usuario_id = estadisticas_usuario.usuario_id),
+            tutorias_dadas = (
+                SELECT COUNT(*) FROM tutorias t
+                WHERE t.tutor_id = estadisticas_usuario.usuario_id),
+            sesiones_grupo_organizadas = (
+                SELECT COUNT(*) FROM sesiones_grupo s JOIN grupos_estudio g ON g.id = s.grupo_id
+                WHERE g.creador_id = estadisticas_usuario.usuario_id),
+            sesiones_grupo_asistidas = (
+                SELECT COUNT(*) FROM sesiones_grupo_asistentes a
+                WHERE a.usuario_id = estadisticas_usuario.usuario_id AND a.asistio = 1)
+    """)
+    op.execute("""
+        UPDATE sesiones_grupo SET asistentes = (
+            SELECT COUNT(*) FROM sesiones_grupo_asistentes a
+            WHERE a.sesion_id = sesiones_grupo.id AND a.asistio = 1)
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('estadisticas_usuario') as batch_op:
+        for columna in reversed(CONTADORES):
+            batch_op.drop_column(columna)
@@ -0,0 +1,67 @@
+"""tutorias
+
+Tutorías publicadas sin estudiante (estudiante_id pasa a admitir NULL) e
+índice (materia_id, estado, fecha) para buscarlas. En
+estadisticas_usuario: tutorías exitosas y la reputación precalculada del
+tutor (promedio bayesiano de sus calificaciones). tutorias_dadas pasa a
+contar solo las completadas; se recalcula junto con lo demás.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 23:14:40.662913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+# Mismos valores que tutorias_service (la migración no importa la app)
+PRIOR_REPUTACION = 3.0
+PESO_PRIOR = 5
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tutorias') as batch_op:
+        batch_op.alter_column('estudiante_id', existing_type=sa.String(length=50), nullable=True)
+    op.create_index('idx_tutorias_materia_estado_fecha', 'tutorias', ['materia_id', 'estado', 'fecha'], unique=False)
+
+    op.add_column('estadisticas_usuario', sa.Column('tutorias_exitosas', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('estadisticas_usuario', sa.Column('tutorias_calificadas', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('estadisticas_usuario', sa.Column('suma_calificaciones_tutor', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('estadisticas_usuario', sa.Column('reputacion_tutor', sa.Float(), server_default=str(PRIOR_REPUTACION), nullable=False))
+
+    op.execute("""
+        UPDATE estadisticas_usuario SET
+            tutorias_dadas = (
+                SELECT COUNT(*) FROM tutorias t
+                WHERE t.tutor_id = estadisticas_usuario.usuario_id AND t.estado = 'completada'),
+            tutorias_exitosas = (
+                SELECT COUNT(*) FROM tutorias t
+                WHERE t.tutor_id = estadisticas_usuario.usuario_id AND t.estado = 'completada' AND t.exito = 1),
+            tutorias_calificadas = (
+                SELECT COUNT(t.calificacion_tutor) FROM tutorias t
+                WHERE t.tutor_id = estadisticas_usuario.usuario_id),
+            suma_calificaciones_tutor = (
+                SELECT COALESCE(SUM(t.calificacion_tutor), 0) FROM tutorias t
+                WHERE t.tutor_id = estadisticas_usuario.usuario_id)
+    """)
+    op.execute(f"""
+        UPDATE estadisticas_usuario SET reputacion_tutor =
+            ({PESO_PRIOR} * {PRIOR_REPUTACION} + suma_calificaciones_tutor) / ({PESO_PRIOR} + tutorias_calificadas)
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('estadisticas_usuario') as batch_op:
+        batch_op.drop_column('reputacion_tutor')
+        batch_op.drop_column('suma_calificaciones_tutor')
+        batch_op.drop_column('tutorias_calificadas')
+        batch_op.drop_column('tutorias_exitosas')
+    op.drop_index('idx_tutorias_materia_estado_fecha', table_name='tutorias')
+    with op.batch_alter_table('tutorias') as batch_op:
+        batch_op.alter_column('estudiante_id', existing_type=sa.String(length=50), nullable=False)
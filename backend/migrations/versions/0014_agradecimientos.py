@@ -0,0 +1,49 @@
+"""agradecimientos
+
+Contadores de agradecimientos recibidos y enviados por usuario y tipo
+(agradecimientos_contadores) con el recuento inicial, e índices
+(receptor_id, fecha, id) y (emisor_id, fecha, id) para los feeds con
+paginación keyset.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 23:41:27.519308
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'agradecimientos_contadores',
+        sa.Column('usuario_id', sa.String(length=50), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('recibidos', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('enviados', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('usuario_id', 'tipo')
+    )
+    op.create_index('idx_agradecimientos_receptor_fecha', 'agradecimientos', ['receptor_id', 'fecha', 'id'], unique=False)
+    op.create_index('idx_agradecimientos_emisor_fecha', 'agradecimientos', ['emisor_id', 'fecha', 'id'], unique=False)
+
+    op.execute("""
+        INSERT INTO agradecimientos_contadores (usuario_id, tipo, recibidos, enviados)
+        SELECT usuario_id, tipo, SUM(recibidos), SUM(enviados) FROM (
+            SELECT receptor_id AS usuario_id, tipo, 1 AS recibidos, 0 AS enviados FROM agradecimientos
+            UNION ALL
+            SELECT emisor_id, tipo, 0, 1 FROM agradecimientos
+        ) GROUP BY usuario_id, tipo
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_agradecimientos_emisor_fecha', table_name='agradecimientos')
+    op.drop_index('idx_agradecimientos_receptor_fecha', table_name='agradecimientos')
+    op.drop_table('agradecimientos_contadores')
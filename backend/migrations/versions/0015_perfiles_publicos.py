@@ -0,0 +1,38 @@
+"""perfiles publicos
+
+Tarjeta de perfil público precalculada por usuario (perfiles_publicos):
+el JSON listo para responder, su ETag y el par version /
+version_calculada con el que las escrituras la invalidan. Las tarjetas se
+calculan al primer pedido; no hace falta recuento inicial.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-20 00:08:51.130472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'perfiles_publicos',
+        sa.Column('usuario_id', sa.String(length=50), nullable=False),
+        sa.Column('datos', sa.Text(), nullable=True),
+        sa.Column('etag', sa.String(length=40), nullable=True),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('version_calculada', sa.Integer(), server_default='-1', nullable=False),
+        sa.Column('fecha_calculo', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('usuario_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('perfiles_publicos')
@@ -0,0 +1,42 @@
+"""estadisticas comunidad
+
+Foto diaria de las estadísticas de la comunidad por carrera
+(estadisticas_comunidad): usuarios y activos, grupos y activos, apuntes
+públicos, tutorías completadas y agradecimientos. La PK (carrera_id,
+fecha) sirve tanto la última foto como la serie histórica. La primera foto
+la calcula el servidor al arrancar.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-20 00:37:05.884126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'estadisticas_comunidad',
+        sa.Column('carrera_id', sa.String(length=50), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('usuarios', sa.Integer(), nullable=False),
+        sa.Column('usuarios_activos', sa.Integer(), nullable=False),
+        sa.Column('grupos', sa.Integer(), nullable=False),
+        sa.Column('grupos_activos', sa.Integer(), nullable=False),
+        sa.Column('apuntes', sa.Integer(), nullable=False),
+        sa.Column('tutorias', sa.Integer(), nullable=False),
+        sa.Column('agradecimientos', sa.Integer(), nullable=False),
+        sa.Column('fecha_calculo', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('carrera_id', 'fecha')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('estadisticas_comunidad')
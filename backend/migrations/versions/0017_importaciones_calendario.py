@@ -0,0 +1,46 @@
+"""importaciones calendario
+
+Estado de las importaciones de calendario en PDF en la base
+(importaciones_calendario) en lugar de la memoria del proceso: el polling
+de progreso responde desde cualquier worker.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-20 01:12:43.507219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'importaciones_calendario',
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('usuario_id', sa.String(length=50), nullable=False),
+        sa.Column('archivo', sa.String(length=255), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('paginas_totales', sa.Integer(), nullable=False),
+        sa.Column('paginas_procesadas', sa.Integer(), nullable=False),
+        sa.Column('progreso', sa.Integer(), nullable=False),
+        sa.Column('eventos_detectados', sa.Integer(), nullable=False),
+        sa.Column('eventos_creados', sa.Integer(), nullable=False),
+        sa.Column('notas_creadas', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=False),
+        sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_importaciones_calendario_fecha_fin', 'importaciones_calendario', ['fecha_fin'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_importaciones_calendario_fecha_fin', table_name='importaciones_calendario')
+    op.drop_table('importaciones_calendario')
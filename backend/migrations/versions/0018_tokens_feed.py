@@ -0,0 +1,39 @@
+"""tokens feed
+
+Tokens propios para suscribirse al calendario .ics (tokens_feed): uno por
+usuario y alcance, guardado como sha256, revocable y sin vencimiento. El
+token de sesión deja de viajar en la URL.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-20 01:44:18.902361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0018'
+down_revision = '0017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tokens_feed',
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('usuario_id', sa.String(length=50), nullable=False),
+        sa.Column('alcance', sa.String(length=20), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=False),
+        sa.Column('ultimo_uso', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token_hash'),
+        sa.UniqueConstraint('usuario_id', 'alcance', name='uq_token_feed_usuario_alcance')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tokens_feed')
@@ -0,0 +1,119 @@
+"""búsqueda de usuarios por id
+
+El índice FTS5 de 0003 se unía a usuarios por el rowid implícito, que no
+es estable en una tabla con PK de texto: un VACUUM o una tabla recreada lo
+renumera y la búsqueda devuelve otros usuarios. Ahora cada usuario tiene su
+rowid propio en usuarios_busqueda_ids (INTEGER PRIMARY KEY, que no se
+renumera) y la fila FTS lleva ese rowid: los triggers y la consulta llegan
+a ella por el índice único de usuario_id y después por rowid, sin recorrer
+la tabla FTS.
+
+Deja de ser external content (el contenido externo exige un rowid
+entero en la tabla de origen): guarda su copia de los cuatro campos.
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-20 02:13:37.640218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0019'
+down_revision = '0018'
+branch_labels = None
+depends_on = None
+
+COLUMNAS = "nombre, apellido, legajo, email"
+TRIGGERS = ('usuarios_busqueda_ai', 'usuarios_busqueda_ad', 'usuarios_busqueda_au')
+FTS_ROWID = "(SELECT fts_rowid FROM usuarios_busqueda_ids WHERE usuario_id = {})"
+
+
+def _borrar_triggers():
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _borrar_triggers()
+    op.execute("DROP TABLE IF EXISTS usuarios_busqueda")
+    op.execute("""
+        CREATE TABLE usuarios_busqueda_ids (
+            fts_rowid INTEGER PRIMARY KEY,
+            usuario_id VARCHAR(50) NOT NULL UNIQUE
+        )
+    """)
+    op.execute(f"""
+        CREATE VIRTUAL TABLE usuarios_busqueda USING fts5(
+            {COLUMNAS}, tokenize='trigram'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ai AFTER INSERT ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda_ids(usuario_id) VALUES (new.id);
+            INSERT INTO usuarios_busqueda(rowid, {COLUMNAS})
+            VALUES ({FTS_ROWID.format('new.id')}, new.nombre, new.apellido, new.legajo, new.email);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ad AFTER DELETE ON usuarios BEGIN
+            DELETE FROM usuarios_busqueda WHERE rowid = {FTS_ROWID.format('old.id')};
+            DELETE FROM usuarios_busqueda_ids WHERE usuario_id = old.id;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_au AFTER UPDATE OF id, {COLUMNAS} ON usuarios BEGIN
+            UPDATE usuarios_busqueda_ids SET usuario_id = new.id WHERE usuario_id = old.id;
+            UPDATE usuarios_busqueda
+            SET nombre = new.nombre, apellido = new.apellido, legajo = new.legajo, email = new.email
+            WHERE rowid = {FTS_ROWID.format('new.id')};
+        END
+    """)
+    # Indexar los usuarios que ya existen
+    op.execute("INSERT INTO usuarios_busqueda_ids(usuario_id) SELECT id FROM usuarios")
+    op.execute(f"""
+        INSERT INTO usuarios_busqueda(rowid, {COLUMNAS})
+        SELECT i.fts_rowid, u.nombre, u.apellido, u.legajo, u.email
+        FROM usuarios_busqueda_ids i JOIN usuarios u ON u.id = i.usuario_id
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # Vuelta al índice external content por rowid de 0003
+    _borrar_triggers()
+    op.execute("DROP TABLE IF EXISTS usuarios_busqueda")
+    op.execute("DROP TABLE IF EXISTS usuarios_busqueda_ids")
+    op.execute(f"""
+        CREATE VIRTUAL TABLE usuarios_busqueda USING fts5(
+            {COLUMNAS},
+            content='usuarios', content_rowid='rowid', tokenize='trigram'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ai AFTER INSERT ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(rowid, {COLUMNAS})
+            VALUES (new.rowid, new.nombre, new.apellido, new.legajo, new.email);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_ad AFTER DELETE ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(usuarios_busqueda, rowid, {COLUMNAS})
+            VALUES ('delete', old.rowid, old.nombre, old.apellido, old.legajo, old.email);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER usuarios_busqueda_au AFTER UPDATE OF {COLUMNAS} ON usuarios BEGIN
+            INSERT INTO usuarios_busqueda(usuarios_busqueda, rowid, {COLUMNAS})
+            VALUES ('delete', old.rowid, old.nombre, old.apellido, old.legajo, old.email);
+            INSERT INTO usuarios_busqueda(rowid, {COLUMNAS})
+            VALUES (new.rowid, new.nombre, new.apellido, new.legajo, new.email);
+        END
+    """)
+    op.execute("INSERT INTO usuarios_busqueda(usuarios_busqueda) VALUES ('rebuild')")
@@ -0,0 +1,124 @@
+"""búsqueda de apuntes por id
+
+El índice FTS5 de 0004 usaba el mismo rowid que apuntes_compartidos, que
+no es estable en una tabla con PK de texto (VACUUM, tabla recreada). Igual
+que usuarios en 0019, cada apunte pasa a tener su rowid propio en
+apuntes_busqueda_ids (INTEGER PRIMARY KEY, que no se renumera): los
+triggers, la búsqueda y el indexado de PDF llegan a la fila FTS por el
+índice único de apunte_id y después por rowid, sin recorrer el texto.
+
+Hoy los rowid todavía coinciden, así que el mapeo arranca con ellos y las
+filas FTS (con el texto_archivo ya extraído) quedan como están.
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-20 02:31:05.117492
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0020'
+down_revision = '0019'
+branch_labels = None
+depends_on = None
+
+COLUMNAS = "titulo, descripcion, contenido, texto_archivo"
+CONTENIDO = "CASE WHEN a.contenido LIKE 'FILE:%' THEN NULL ELSE a.contenido END"
+CONTENIDO_NUEVO = "CASE WHEN new.contenido LIKE 'FILE:%' THEN NULL ELSE new.contenido END"
+TRIGGERS = ('apuntes_busqueda_ai', 'apuntes_busqueda_ad', 'apuntes_busqueda_au')
+FTS_ROWID = "(SELECT fts_rowid FROM apuntes_busqueda_ids WHERE apunte_id = {})"
+
+
+def _borrar_triggers():
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _borrar_triggers()
+    op.execute("""
+        CREATE TABLE apuntes_busqueda_ids (
+            fts_rowid INTEGER PRIMARY KEY,
+            apunte_id VARCHAR(50) NOT NULL UNIQUE
+        )
+    """)
+    # Es la última vez que se usa el rowid de apuntes_compartidos
+    op.execute("""
+        INSERT INTO apuntes_busqueda_ids(fts_rowid, apunte_id)
+        SELECT rowid, id FROM apuntes_compartidos
+    """)
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_ai AFTER INSERT ON apuntes_compartidos BEGIN
+            INSERT INTO apuntes_busqueda_ids(apunte_id) VALUES (new.id);
+            INSERT INTO apuntes_busqueda(rowid, titulo, descripcion, contenido)
+            VALUES ({FTS_ROWID.format('new.id')}, new.titulo, new.descripcion, {CONTENIDO_NUEVO});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_ad AFTER DELETE ON apuntes_compartidos BEGIN
+            DELETE FROM apuntes_busqueda WHERE rowid = {FTS_ROWID.format('old.id')};
+            DELETE FROM apuntes_busqueda_ids WHERE apunte_id = old.id;
+        END
+    """)
+    # texto_archivo no se toca: lo escribe el worker
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_au AFTER UPDATE OF id, titulo, descripcion, contenido
+        ON apuntes_compartidos BEGIN
+            UPDATE apuntes_busqueda_ids SET apunte_id = new.id WHERE apunte_id = old.id;
+            UPDATE apuntes_busqueda
+            SET titulo = new.titulo, descripcion = new.descripcion, contenido = {CONTENIDO_NUEVO}
+            WHERE rowid = {FTS_ROWID.format('new.id')};
+        END
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # Vuelta al índice por rowid de 0004, con el texto de los PDF ya extraído
+    _borrar_triggers()
+    op.execute(f"""
+        CREATE VIRTUAL TABLE apuntes_busqueda_nueva USING fts5(
+            {COLUMNAS},
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO apuntes_busqueda_nueva(rowid, {COLUMNAS})
+        SELECT a.rowid, a.titulo, a.descripcion, {CONTENIDO}, b.texto_archivo
+        FROM apuntes_compartidos a
+        LEFT JOIN apuntes_busqueda_ids i ON i.apunte_id = a.id
+        LEFT JOIN apuntes_busqueda b ON b.rowid = i.fts_rowid
+    """)
+    op.execute("DROP TABLE apuntes_busqueda")
+    op.execute("DROP TABLE apuntes_busqueda_ids")
+    op.execute("ALTER TABLE apuntes_busqueda_nueva RENAME TO apuntes_busqueda")
+    op.execute("""
+        INSERT INTO apuntes_busqueda(apuntes_busqueda, rank)
+        VALUES ('rank', 'bm25(10.0, 4.0, 1.0, 1.0)')
+    """)
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_ai AFTER INSERT ON apuntes_compartidos BEGIN
+            INSERT INTO apuntes_busqueda(rowid, titulo, descripcion, contenido)
+            VALUES (new.rowid, new.titulo, new.descripcion, {CONTENIDO_NUEVO});
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER apuntes_busqueda_ad AFTER DELETE ON apuntes_compartidos BEGIN
+            DELETE FROM apuntes_busqueda WHERE rowid = old.rowid;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER apuntes_busqueda_au AFTER UPDATE OF titulo, descripcion, contenido
+        ON apuntes_compartidos BEGIN
+            UPDATE apuntes_busqueda
+            SET titulo = new.titulo, descripcion = new.descripcion, contenido = {CONTENIDO_NUEVO}
+            WHERE rowid = old.rowid;
+        END
+    """)
@@ -112,6 +112,10 @@ export const apiClient = {
     clases: {
         list: (params) => api.get('/clases', { params }).then(res => res.data),
         create: (data) => api.post('/clases', data).then(res => res.data),
+        bulk: (data) => api.post('/clases/bulk', data).then(res => res.data),
+        bulkCSV: (formData) => api.post('/clases/bulk/csv', formData, {
+            headers: { 'Content-Type': 'multipart/form-data' }
+        }).then(res => res.data),
         update: (id, data) => api.patch(`/clases/${id}`, data).then(res => res.data),
         delete: (id) => api.delete(`/clases/${id}`).then(res => res.data),
     },
@@ -120,6 +124,10 @@ export const apiClient = {
     notas: {
         list: (params) => api.get('/notas', { params }).then(res => res.data),
         create: (data) => api.post('/notas', data).then(res => res.data),
+        bulk: (data) => api.post('/notas/bulk', data).then(res => res.data),
+        bulkCSV: (formData) => api.post('/notas/bulk/csv', formData, {
+            headers: { 'Content-Type': 'multipart/form-data' }
+        }).then(res => res.data),
         update: (id, data) => api.patch(`/notas/${id}`, data).then(res => res.data),
         delete: (id) => api.delete(`/notas/${id}`).then(res => res.data),
     },
@@ -148,6 +156,10 @@ export const apiClient = {
         importarPDF: (formData) => api.post('/calendario/importar-pdf', formData, {
             headers: { 'Content-Type': 'multipart/form-data' }
         }).then(res => res.data),
+        estadoImportacion: (id) => api.get(`/calendario/importar-pdf/${id}`).then(res => res.data),
+        // Suscripción .ics: { token, url } nuevo (revoca el anterior); se muestra una sola vez
+        crearFeed: () => api.post('/calendario/feed-token').then(res => res.data),
+        revocarFeed: () => api.delete('/calendario/feed-token').then(res => res.data),
     },
     
     // Planificación
@@ -169,17 +181,22 @@ export const apiClient = {
         // Grupos de Estudio
         grupos: {
             list: (params) => api.get('/social/grupos', { params }).then(res => res.data),
+            recomendados: (params) => api.get('/social/grupos/recomendados', { params }).then(res => res.data),
             get: (id) => api.get(`/social/grupos/${id}`).then(res => res.data),
             create: (data) => api.post('/social/grupos', data).then(res => res.data),
             unirse: (id, codigo) => api.post(`/social/grupos/${id}/unirse`, { codigo_invitacion: codigo }).then(res => res.data),
             sesiones: {
                 crear: (grupoId, data) => api.post(`/social/grupos/${grupoId}/sesiones`, data).then(res => res.data),
+                sugerencias: (grupoId, params) => api.get(`/social/grupos/${grupoId}/sesiones/sugerencias`, { params }).then(res => res.data),
+                asistencia: (grupoId, sesionId) => api.get(`/social/grupos/${grupoId}/sesiones/${sesionId}/asistencia`).then(res => res.data),
+                registrarAsistencia: (grupoId, sesionId, asistencias) => api.put(`/social/grupos/${grupoId}/sesiones/${sesionId}/asistencia`, { asistencias }).then(res => res.data),
             }
         },
         
         // Muro de Apuntes Compartidos
         apuntes: {
             list: (params) => api.get('/social/apuntes', { params }).then(res => res.data),
+            buscar: (params) => api.get('/social/apuntes/buscar', { params }).then(res => res.data),
             create: (data) => {
                 // Si la data es FormData (para archivos), Axios ajusta el Content-Type solo
                 const isFormData = data instanceof FormData;
@@ -188,22 +205,60 @@ export const apiClient = {
                 }).then(res => res.data);
             },
             calificar: (apunteId, data) => api.post(`/social/apuntes/${apunteId}/calificar`, data).then(res => res.data),
+            // URL directa para <img>: la miniatura se sirve sin auth y con caché inmutable
+            miniaturaUrl: (apunteId) => `${api.defaults.baseURL}/social/apuntes/${apunteId}/miniatura`,
         },
         
         // Búsqueda de Usuarios (Materia, Legajo, Email, Nombre)
         usuarios: {
             buscar: (params) => api.get('/social/usuarios/buscar', { params }).then(res => res.data),
+            companeros: (params) => api.get('/social/usuarios/companeros', { params }).then(res => res.data),
             perfil: (id) => api.get(`/social/usuarios/${id}/perfil`).then(res => res.data),
         },
 
         // Mensajería en tiempo real (Chat de Grupo)
         mensajes: {
-            list: (grupoId) => api.get(`/social/grupos/${grupoId}/mensajes`).then(res => res.data),
+            // params: { antes, despues, limit } -> cursores por id de mensaje
+            list: (grupoId, params) => api.get(`/social/grupos/${grupoId}/mensajes`, { params }).then(res => res.data),
             send: (grupoId, data) => api.post(`/social/grupos/${grupoId}/mensajes`, data).then(res => res.data),
+            // EventSource no manda headers: la URL lleva un token corto que solo abre streams
+            tokenStream: () => api.post('/social/mensajes/token-stream').then(res => res.data.token),
+            streamUrl: (grupoId) => apiClient.social.mensajes.tokenStream().then(token =>
+                `${api.defaults.baseURL}/social/grupos/${grupoId}/mensajes/stream?token=${token}`),
+            presencia: (grupoId) => api.get(`/social/grupos/${grupoId}/presencia`).then(res => res.data),
+            escribiendo: (grupoId) => api.post(`/social/grupos/${grupoId}/escribiendo`),
+            // Chat privado entre dos usuarios
+            privados: {
+                list: (usuarioId, params) => api.get(`/social/mensajes/privados/${usuarioId}`, { params }).then(res => res.data),
+                send: (usuarioId, data) => api.post(`/social/mensajes/privados/${usuarioId}`, data).then(res => res.data),
+                streamUrl: (usuarioId) => apiClient.social.mensajes.tokenStream().then(token =>
+                    `${api.defaults.baseURL}/social/mensajes/privados/${usuarioId}/stream?token=${token}`),
+            },
         },
         
+        // Tutorías entre estudiantes
+        tutorias: {
+            crear: (data) => api.post('/social/tutorias', data).then(res => res.data),
+            // params: { materia_id, desde, hasta, hora_desde, hora_hasta, modalidad, limit }
+            buscar: (params) => api.get('/social/tutorias/buscar', { params }).then(res => res.data),
+            mias: (params) => api.get('/social/tutorias/mias', { params }).then(res => res.data),
+            aceptar: (id) => api.post(`/social/tutorias/${id}/aceptar`).then(res => res.data),
+            completar: (id, data) => api.post(`/social/tutorias/${id}/completar`, data).then(res => res.data),
+            cancelar: (id) => api.post(`/social/tutorias/${id}/cancelar`).then(res => res.data),
+            calificar: (id, data) => api.post(`/social/tutorias/${id}/calificar`, data).then(res => res.data),
+        },
+
+        // Agradecimientos (kudos)
+        agradecimientos: {
+            // params: { rol: 'recibidos' | 'enviados', usuario_id, tipo, cursor, limit }
+            list: (params) => api.get('/social/agradecimientos', { params }).then(res => res.data),
+            send: (data) => api.post('/social/agradecimientos', data).then(res => res.data),
+        },
+
         // Estadísticas Globales del Hub
         estadisticas: () => api.get('/social/estadisticas/comunidad').then(res => res.data),
+        // Serie diaria para gráficos; params: { dias, carrera_id }
+        historialEstadisticas: (params) => api.get('/social/estadisticas/comunidad/historial', { params }).then(res => res.data),
         
         // Tendencias (Generado por el Engine de Python)
         tendencias: () => api.get('/social/tendencias').then(res => res.data),
@@ -19,6 +19,9 @@ export default function GroupCard({ grupo, mine }) {
                     <div>
                         <h4 className="text-lg font-black text-white uppercase tracking-tight leading-none mb-1">{grupo.nombre}</h4>
                         <p className="text-slate-500 text-[10px] font-black uppercase tracking-[0.2em]">{grupo.materia_nombre || 'General'}</p>
+                        {grupo.motivos?.length > 0 && (
+                            <p className="text-cyan-500/80 text-[9px] font-bold uppercase tracking-widest mt-1">{grupo.motivos.join(' • ')}</p>
+                        )}
                     </div>
                 </div>
                 {/* El punto de actividad ahora es dinámico si el grupo está activo */}
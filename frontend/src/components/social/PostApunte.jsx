@@ -10,6 +10,7 @@ import {
 } from "lucide-react";
 import { formatDistanceToNow } from 'date-fns';
 import { es } from 'date-fns/locale';
+import { apiClient } from '@/api/apiClient';
 
 export default function PostApunte({ apunte, onLike }) {
     // 1. Lógica de detección de archivo
@@ -54,12 +55,27 @@ export default function PostApunte({ apunte, onLike }) {
                 {esArchivo ? (
                     <div className="bg-slate-950/50 border border-white/5 rounded-2xl p-5 flex items-center justify-between group/file hover:bg-slate-900/50 transition-colors">
                         <div className="flex items-center gap-4">
-                            <div className="p-3 bg-slate-900 rounded-xl shadow-inner group-hover/file:scale-110 transition-transform">
-                                {getFileIcon(apunte.formato)}
-                            </div>
+                            {apunte.tiene_miniatura ? (
+                                // Primera página en ~10 KB: el PDF solo se baja al abrirlo
+                                <img
+                                    src={apiClient.social.apuntes.miniaturaUrl(apunte.id)}
+                                    alt={`Vista previa de ${apunte.titulo}`}
+                                    loading="lazy"
+                                    decoding="async"
+                                    width={80}
+                                    height={113}
+                                    className="w-20 h-[113px] object-cover object-top rounded-xl shadow-inner bg-white group-hover/file:scale-105 transition-transform"
+                                />
+                            ) : (
+                                <div className="p-3 bg-slate-900 rounded-xl shadow-inner group-hover/file:scale-110 transition-transform">
+                                    {getFileIcon(apunte.formato)}
+                                </div>
+                            )}
                             <div className="min-w-0">
                                 <p className="text-sm font-black text-slate-200 truncate max-w-[300px] uppercase tracking-tight">{nombreArchivo}</p>
-                                <p className="text-[10px] text-slate-500 font-bold uppercase mt-1">Recurso {apunte.formato} • Verificado</p>
+                                <p className="text-[10px] text-slate-500 font-bold uppercase mt-1">
+                                    Recurso {apunte.formato}{apunte.paginas ? ` • ${apunte.paginas} ${apunte.paginas === 1 ? 'página' : 'páginas'}` : ''} • Verificado
+                                </p>
                             </div>
                         </div>
                         <div className="flex gap-2">
@@ -84,6 +100,17 @@ export default function PostApunte({ apunte, onLike }) {
                 ) : (
                     <p className="text-slate-400 text-sm leading-relaxed pl-2 border-l-2 border-slate-800">{apunte.descripcion}</p>
                 )}
+
+                {/* Coincidencia de la búsqueda (el texto viene sin HTML: solo se resaltan los <mark>) */}
+                {apunte.fragmento && (
+                    <p className="text-slate-500 text-xs italic leading-relaxed pl-2">
+                        {apunte.fragmento.split(/<mark>|<\/mark>/).map((parte, i) =>
+                            i % 2 === 1
+                                ? <mark key={i} className="bg-cyan-500/20 text-cyan-300 not-italic rounded px-0.5">{parte}</mark>
+                                : <span key={i}>{parte}</span>
+                        )}
+                    </p>
+                )}
             </div>
 
             {/* Footer de Interacción */}
@@ -0,0 +1,73 @@
+import { useEffect, useRef } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+
+const ESPERA_RECONEXION = 3000; // ms
+
+// Agrega al caché de react-query (queryKey) los mensajes que llegan por el
+// stream SSE. Se conecta cuando el historial ya cargó y pide desde el último
+// id que tiene; si la conexión se corta, EventSource reconecta solo y manda
+// Last-Event-ID, así que no se pierden mensajes ni hace falta polling.
+// obtenerStreamUrl devuelve una promesa con la URL: lleva un token corto
+// que solo sirve para abrir el stream, así que cuando el servidor lo
+// rechaza (vencido) se pide otro y se vuelve a conectar desde el último id.
+// manejadores recibe los eventos efímeros del stream por nombre
+// (en_linea, presencia, escribiendo).
+export default function useMensajesEnVivo(queryKey, obtenerStreamUrl, enabled = true, manejadores = {}) {
+    const queryClient = useQueryClient();
+    const clave = JSON.stringify(queryKey);
+    const manejadoresRef = useRef(manejadores);
+    manejadoresRef.current = manejadores;
+    const obtenerStreamUrlRef = useRef(obtenerStreamUrl);
+    obtenerStreamUrlRef.current = obtenerStreamUrl;
+
+    useEffect(() => {
+        if (!enabled) return;
+
+        let fuente = null;
+        let reintento = null;
+        let cerrado = false;
+
+        const conectar = async () => {
+            let streamUrl;
+            try {
+                streamUrl = await obtenerStreamUrlRef.current();
+            } catch {
+                if (!cerrado) reintento = setTimeout(conectar, ESPERA_RECONEXION);
+                return;
+            }
+            if (cerrado) return;
+
+            const actuales = queryClient.getQueryData(queryKey) || [];
+            const ultimoId = actuales.length ? actuales[actuales.length - 1].id : null;
+            const url = ultimoId != null ? `${streamUrl}&despues=${ultimoId}` : streamUrl;
+
+            fuente = new EventSource(url);
+            fuente.addEventListener('mensaje', (evento) => {
+                const mensaje = JSON.parse(evento.data);
+                queryClient.setQueryData(queryKey, (anteriores = []) =>
+                    // El mismo mensaje puede llegar por el POST y por el stream
+                    anteriores.some(m => m.id === mensaje.id) ? anteriores : [...anteriores, mensaje]
+                );
+            });
+            ['en_linea', 'presencia', 'escribiendo'].forEach((nombre) => {
+                fuente.addEventListener(nombre, (evento) => {
+                    manejadoresRef.current[nombre]?.(JSON.parse(evento.data));
+                });
+            });
+            fuente.onerror = () => {
+                // CLOSED: el servidor rechazó la reconexión (token vencido), EventSource no reintenta
+                if (fuente.readyState === EventSource.CLOSED && !cerrado) {
+                    reintento = setTimeout(conectar, ESPERA_RECONEXION);
+                }
+            };
+        };
+        conectar();
+
+        return () => {
+            cerrado = true;
+            clearTimeout(reintento);
+            fuente?.close();
+        };
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [clave, enabled]);
+}
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { apiClient } from '@/api/apiClient';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -34,15 +34,37 @@ export default function Calendario() {
         queryFn: () => apiClient.calendario.eventos()
     });
 
+    const [importacionId, setImportacionId] = useState(null);
+
     const importarMutation = useMutation({
         mutationFn: (file) => {
             const formData = new FormData();
             formData.append('file', file);
             return apiClient.calendario.importarPDF(formData);
         },
-        onSuccess: () => queryClient.invalidateQueries(['eventos-calendario'])
+        // El PDF se procesa en segundo plano: guardamos el id para consultar el progreso
+        onSuccess: (data) => setImportacionId(data.id)
+    });
+
+    const { data: importacion } = useQuery({
+        queryKey: ['importacion-calendario', importacionId],
+        queryFn: () => apiClient.calendario.estadoImportacion(importacionId),
+        enabled: !!importacionId,
+        refetchInterval: (query) => {
+            const estado = query.state.data?.estado;
+            return estado === 'completado' || estado === 'error' ? false : 1000;
+        }
     });
 
+    useEffect(() => {
+        if (importacion?.estado === 'completado' || importacion?.estado === 'error') {
+            queryClient.invalidateQueries(['eventos-calendario']);
+            setImportacionId(null);
+        }
+    }, [importacion?.estado, queryClient]);
+
+    const importando = importarMutation.isPending || !!importacionId;
+
     const meses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
     
     const getDias = () => {
@@ -67,8 +89,8 @@ export default function Calendario() {
                     <div className="flex gap-4">
                         <label className="flex items-center gap-2 bg-slate-900 border border-slate-700 px-4 py-2 rounded-md cursor-pointer hover:bg-slate-800 transition-all">
                             <Upload className="w-4 h-4 text-cyan-400" />
-                            <span className="text-xs font-semibold">IMPORTAR PDF</span>
-                            <input type="file" className="hidden" accept=".pdf" onChange={(e) => importarMutation.mutate(e.target.files[0])} />
+                            <span className="text-xs font-semibold">{importando ? `IMPORTANDO ${importacion?.progreso ?? 0}%` : 'IMPORTAR PDF'}</span>
+                            <input type="file" className="hidden" accept=".pdf" disabled={importando} onChange={(e) => importarMutation.mutate(e.target.files[0])} />
                         </label>
                     </div>
                 </div>
@@ -15,6 +15,7 @@ import ChatBubble from './../components/social/ChatBubble';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/ui/dialog";
 import { Label } from "@/components/ui/label";
 import ParticipantSearch from '../components/social/ParticipantSearch';
+import useMensajesEnVivo from '@/hooks/useMensajesEnVivo';
 
 export default function ChatGrupo() {
     const { id } = useParams();
@@ -33,6 +34,11 @@ export default function ChatGrupo() {
     const [selectedFile, setSelectedFile] = useState(null);
     const [fileTitle, setFileTitle] = useState("");
 
+    // Presencia en vivo: quién tiene el chat abierto y quién está escribiendo
+    const [enLinea, setEnLinea] = useState({});
+    const [escribiendo, setEscribiendo] = useState({});
+    const ultimoAvisoRef = useRef(0);
+
     // 1. Datos del Grupo y Recursos
     const { data: info, isLoading: loadingInfo } = useQuery({
         queryKey: ['grupo-detalle', id],
@@ -40,20 +46,51 @@ export default function ChatGrupo() {
         enabled: !!id && id !== 'undefined'
     });
 
-    // 2. Mensajes
-    const { data: mensajes = [] } = useQuery({
+    // 2. Mensajes: historial reciente + los nuevos en vivo por SSE
+    const { data: mensajes = [], isSuccess: mensajesCargados } = useQuery({
         queryKey: ['grupo-mensajes', id],
         queryFn: () => apiClient.social.mensajes.list(id),
         enabled: !!id,
-        refetchInterval: 3000 
+        staleTime: Infinity
+    });
+    useMensajesEnVivo(['grupo-mensajes', id], () => apiClient.social.mensajes.streamUrl(id), mensajesCargados, {
+        en_linea: ({ usuarios }) => setEnLinea(Object.fromEntries(usuarios.map(u => [u.usuario_id, u.nombre]))),
+        presencia: ({ usuario_id, nombre, en_linea }) => setEnLinea(prev => {
+            const { [usuario_id]: _, ...resto } = prev;
+            return en_linea ? { ...resto, [usuario_id]: nombre } : resto;
+        }),
+        escribiendo: ({ usuario_id, nombre }) => {
+            if (usuario_id === user?.id) return;
+            setEscribiendo(prev => ({ ...prev, [usuario_id]: { nombre, hasta: Date.now() + 4000 } }));
+        }
     });
 
+    // Los avisos de "escribiendo" se apagan solos si no se repiten
+    useEffect(() => {
+        const timer = setInterval(() => setEscribiendo(prev => {
+            const vigentes = Object.entries(prev).filter(([, e]) => e.hasta > Date.now());
+            return vigentes.length === Object.keys(prev).length ? prev : Object.fromEntries(vigentes);
+        }), 1000);
+        return () => clearInterval(timer);
+    }, []);
+
+    const handleEscribir = (texto) => {
+        setMsg(texto);
+        // Como mucho un aviso cada 3 segundos mientras se escribe
+        if (texto && Date.now() - ultimoAvisoRef.current > 3000) {
+            ultimoAvisoRef.current = Date.now();
+            apiClient.social.mensajes.escribiendo(id).catch(() => {});
+        }
+    };
+
     // Mutación para enviar mensajes
     const sendMutation = useMutation({
         mutationFn: (text) => apiClient.social.mensajes.send(id, { contenido: text }),
-        onSuccess: () => {
+        onSuccess: (mensaje) => {
             setMsg("");
-            queryClient.invalidateQueries(['grupo-mensajes', id]);
+            queryClient.setQueryData(['grupo-mensajes', id], (anteriores = []) =>
+                anteriores.some(m => m.id === mensaje.id) ? anteriores : [...anteriores, mensaje]
+            );
         }
     });
 
@@ -114,6 +151,13 @@ export default function ChatGrupo() {
                         >
                             <UserPlus className="w-3.5 h-3.5 mr-2" /> Invitar Colega
                         </Button>
+                        <div className="space-y-2">
+                            {Object.entries(enLinea).map(([usuarioId, nombre]) => (
+                                <div key={usuarioId} className="flex items-center gap-2 text-[10px] font-bold text-slate-400 uppercase">
+                                    <span className="h-1.5 w-1.5 rounded-full bg-emerald-500 animate-pulse" /> {nombre}
+                                </div>
+                            ))}
+                        </div>
                     </div>
                 </div>
             </aside>
@@ -125,23 +169,31 @@ export default function ChatGrupo() {
                         <div className="p-3 bg-purple-600 rounded-2xl shadow-2xl shadow-purple-900/40"><Hash className="w-5 h-5 text-white" /></div>
                         <div>
                             <h3 className="font-black text-sm uppercase tracking-widest">{grupo.nombre}</h3>
-                            <p className="text-[10px] text-cyan-400 font-black uppercase tracking-widest">{grupo.materia_nombre}</p>
+                            <p className="text-[10px] text-cyan-400 font-black uppercase tracking-widest">
+                                {grupo.materia_nombre} • <span className="text-emerald-500">{Object.keys(enLinea).length} en línea</span>
+                            </p>
                         </div>
                     </div>
                     <Button variant="ghost" size="icon" className="text-slate-500 hover:text-white"><MoreVertical className="w-5 h-5" /></Button>
                 </header>
 
                 <div ref={scrollRef} className="flex-1 overflow-y-auto p-10 space-y-6 custom-scrollbar">
-                    {mensajes.map((m, idx) => (
-                        <ChatBubble key={idx} mensaje={m} esMio={m.usuario_id === user?.id} />
+                    {mensajes.map((m) => (
+                        <ChatBubble key={m.id} mensaje={m} esMio={m.usuario_id === user?.id} />
                     ))}
                 </div>
 
                 <footer className="p-8">
+                    {Object.keys(escribiendo).length > 0 && (
+                        <p className="max-w-4xl mx-auto mb-2 text-[10px] text-slate-500 font-bold uppercase tracking-widest">
+                            {Object.values(escribiendo).map(e => e.nombre).join(", ")} escribiendo...
+                        </p>
+                    )}
                     <form onSubmit={(e) => { e.preventDefault(); if(msg.trim()) sendMutation.mutate(msg); }} className="max-w-4xl mx-auto relative group">
                         <Input 
                             value={msg}
-                            onChange={(e) => setMsg(e.target.value)}
+                            maxLength={4000}
+                            onChange={(e) => handleEscribir(e.target.value)}
                             placeholder="Escribe una consulta técnica..." 
                             className="bg-slate-900/90 border-slate-800 h-16 rounded-2xl pl-8 pr-20 text-sm focus:border-purple-500/50 transition-all shadow-2xl"
                         />
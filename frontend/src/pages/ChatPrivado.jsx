@@ -7,6 +7,7 @@ import { Input } from "@/components/ui/input";
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { ArrowLeft, Send, MoreVertical, ShieldCheck, Loader2 } from "lucide-react";
 import ChatBubble from './../components/social/ChatBubble';
+import useMensajesEnVivo from '@/hooks/useMensajesEnVivo';
 
 export default function ChatPrivado() {
     const { id: targetId } = useParams();
@@ -21,19 +22,22 @@ export default function ChatPrivado() {
         queryFn: () => apiClient.social.usuarios.perfil(targetId)
     });
 
-    // 2. Obtener historial de mensajes (asumimos endpoint de chat privado)
-    const { data: mensajes = [], isLoading } = useQuery({
+    // 2. Historial de la conversación; los mensajes nuevos llegan por SSE
+    const { data: mensajes = [], isLoading, isSuccess: mensajesCargados } = useQuery({
         queryKey: ['chat-privado', targetId],
-        queryFn: () => apiClient.social.mensajes.list(targetId),
-        refetchInterval: 3000 // Polling cada 3 segundos para simular tiempo real
+        queryFn: () => apiClient.social.mensajes.privados.list(targetId),
+        staleTime: Infinity
     });
+    useMensajesEnVivo(['chat-privado', targetId], () => apiClient.social.mensajes.privados.streamUrl(targetId), mensajesCargados);
 
     // 3. Enviar mensaje
     const mutation = useMutation({
-        mutationFn: (msg) => apiClient.social.mensajes.send(targetId, { contenido: msg }),
-        onSuccess: () => {
+        mutationFn: (msg) => apiClient.social.mensajes.privados.send(targetId, { contenido: msg }),
+        onSuccess: (mensaje) => {
             setNuevoMensaje("");
-            queryClient.invalidateQueries(['chat-privado', targetId]);
+            queryClient.setQueryData(['chat-privado', targetId], (anteriores = []) =>
+                anteriores.some(m => m.id === mensaje.id) ? anteriores : [...anteriores, mensaje]
+            );
         }
     });
 
@@ -93,9 +97,9 @@ export default function ChatPrivado() {
                 {isLoading ? (
                     <div className="h-full flex items-center justify-center"><Loader2 className="w-8 h-8 text-purple-500 animate-spin" /></div>
                 ) : mensajes.length > 0 ? (
-                    mensajes.map((msg, idx) => (
+                    mensajes.map((msg) => (
                         <ChatBubble 
-                            key={idx} 
+                            key={msg.id} 
                             mensaje={msg} 
                             esMio={msg.usuario_id !== targetId} 
                         />
@@ -117,6 +121,7 @@ export default function ChatPrivado() {
                         placeholder="Escribe un mensaje técnico..." 
                         className="bg-slate-900/50 border-slate-800 h-14 rounded-2xl pl-6 pr-16 text-sm focus:ring-purple-500/20 transition-all"
                         value={nuevoMensaje}
+                        maxLength={4000}
                         onChange={(e) => setNuevoMensaje(e.target.value)}
                     />
                     <Button 
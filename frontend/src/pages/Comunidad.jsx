@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { apiClient } from '@/api/apiClient';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { apiClient, authHelper } from '@/api/apiClient';
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -43,16 +43,31 @@ export default function Comunidad() {
     const [nuevoGrupo, setNuevoGrupo] = useState({ nombre: '', descripcion: '', materia_id: '', max_integrantes: 10, privado: false });
 
     // --- DATA FETCHING ---
-    const { data: grupos = [], isLoading: loadingGrupos } = useQuery({ 
-        queryKey: ['social-grupos'], 
-        queryFn: () => apiClient.social.grupos.list(),
+    // Grupos paginados por cursor (última actividad primero): los míos y el resto para descubrir
+    const user = authHelper.getUser();
+    const paginarGrupos = (params) => ({
+        queryFn: ({ pageParam }) => apiClient.social.grupos.list({ ...params, cursor: pageParam }),
+        initialPageParam: undefined,
+        getNextPageParam: (ultima) => ultima.paginacion.cursor ?? undefined,
         refetchOnWindowFocus: true
     });
+    const misGruposQuery = useInfiniteQuery({ queryKey: ['social-grupos', 'mios'], ...paginarGrupos({ usuario_id: user?.id }) });
+    const loadingGrupos = misGruposQuery.isLoading;
+    // Descubrir: grupos abiertos rankeados para el usuario (materias que cursa, compañeros, actividad)
+    const { data: recomendados, isLoading: loadingRecomendados } = useQuery({
+        queryKey: ['social-grupos', 'recomendados'],
+        queryFn: () => apiClient.social.grupos.recomendados({ limit: 20 }),
+        staleTime: 60_000
+    });
 
     const { data: inscripciones = [] } = useQuery({ queryKey: ['inscripciones'], queryFn: () => apiClient.inscripciones.list() });
     const { data: materias = [] } = useQuery({ queryKey: ['materias'], queryFn: () => apiClient.materias.list() });
     const { data: estadisticas, isLoading: loadingStats } = useQuery({ queryKey: ['social-estadisticas'], queryFn: () => apiClient.social.estadisticas() });
-    const { data: tendencias = [] } = useQuery({ queryKey: ['social-tendencias'], queryFn: () => apiClient.social.tendencias() });
+    const { data: tendencias } = useQuery({ queryKey: ['social-tendencias'], queryFn: () => apiClient.social.tendencias(), staleTime: 60_000 });
+    // Sin #tags en los apuntes recientes se muestran las materias en tendencia
+    const tagsTendencia = tendencias?.tags?.length
+        ? tendencias.tags
+        : (tendencias?.materias || []).map(m => ({ tag: `#${m.materia.replace(/\s+/g, '_')}`, posts: m.posts }));
 
    
     const crearGrupoMutation = useMutation({
@@ -90,18 +105,24 @@ export default function Comunidad() {
     };
 
     // --- LÓGICA DE FILTRADO ---
-    const misGrupos = grupos.filter(g => g.eres_miembro);
-    const materiasCursandoIds = inscripciones.filter(i => i.estado === 'cursando').map(i => String(i.materia_id));
-    const gruposSugeridos = grupos.filter(g => materiasCursandoIds.includes(String(g.materia_id)) && !g.eres_miembro);
+    const misGrupos = misGruposQuery.data?.pages.flatMap(p => p.grupos) ?? [];
+    const gruposSugeridos = recomendados?.grupos ?? [];
 
-    const renderGroupGrid = (items) => (
-        <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-            {items.map((grupo, idx) => (
-                <motion.div key={grupo.id} initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ delay: idx * 0.05 }}>
-                    <GroupCard grupo={grupo} mine={grupo.eres_miembro} />
-                </motion.div>
-            ))}
-        </div>
+    const renderGroupGrid = (items, query) => (
+        <>
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+                {items.map((grupo, idx) => (
+                    <motion.div key={grupo.id} initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ delay: (idx % 20) * 0.05 }}>
+                        <GroupCard grupo={grupo} mine={grupo.eres_miembro} />
+                    </motion.div>
+                ))}
+            </div>
+            {query?.hasNextPage && (
+                <Button variant="ghost" onClick={() => query.fetchNextPage()} disabled={query.isFetchingNextPage} className="w-full mt-6 text-slate-500 hover:text-white text-xs font-black uppercase tracking-[0.2em]">
+                    {query.isFetchingNextPage ? <Loader2 className="w-4 h-4 animate-spin" /> : "Ver más grupos"}
+                </Button>
+            )}
+        </>
     );
 
     const materiasHabilitadas = materias.filter(m => 
@@ -166,12 +187,13 @@ export default function Comunidad() {
 
                             <TabsContent value="mis-grupos">
                                 {loadingGrupos ? <Loader2 className="w-10 h-10 animate-spin text-purple-500 mx-auto py-20" /> : 
-                                 misGrupos.length > 0 ? renderGroupGrid(misGrupos) : 
+                                 misGrupos.length > 0 ? renderGroupGrid(misGrupos, misGruposQuery) : 
                                  <div className="py-20 text-center bg-slate-900/20 border-2 border-dashed border-slate-800 rounded-[3rem] text-slate-500 font-bold uppercase tracking-widest">No perteneces a grupos todavía</div>}
                             </TabsContent>
 
                             <TabsContent value="descubrir">
-                                {gruposSugeridos.length > 0 ? renderGroupGrid(gruposSugeridos) : 
+                                {loadingRecomendados ? <Loader2 className="w-10 h-10 animate-spin text-cyan-500 mx-auto py-20" /> :
+                                 gruposSugeridos.length > 0 ? renderGroupGrid(gruposSugeridos) : 
                                  <div className="py-20 text-center bg-slate-900/20 border-2 border-dashed border-slate-800 rounded-[3rem] text-slate-500 font-bold uppercase tracking-widest">No hay sugerencias nuevas</div>}
                             </TabsContent>
                         </Tabs>
@@ -182,7 +204,7 @@ export default function Comunidad() {
                         <Card className="bg-gradient-to-b from-slate-900/60 to-slate-950/60 border-white/5 rounded-[2.5rem] shadow-2xl overflow-hidden">
                             <CardHeader className="p-8 border-b border-white/5"><CardTitle className="text-xs font-black uppercase tracking-[0.3em] flex items-center gap-2"><TrendingUp className="text-rose-500 w-4 h-4" /> Tendencias UTN</CardTitle></CardHeader>
                             <CardContent className="p-8 space-y-6">
-                                {tendencias.map((trend, i) => (
+                                {tagsTendencia.slice(0, 5).map((trend, i) => (
                                     <div key={trend.tag} className="flex justify-between items-center group cursor-pointer hover:translate-x-2 transition-transform">
                                         <div className="flex items-center gap-3">
                                             <span className="text-slate-800 font-black italic text-xl">#{i+1}</span>
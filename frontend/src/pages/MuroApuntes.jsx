@@ -1,4 +1,4 @@
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { apiClient } from '@/api/apiClient';
 import { Card } from "@/components/ui/card";
@@ -24,6 +24,7 @@ export default function MuroApuntes() {
     const fileInputRef = useRef(null);
     const [filtroMateria, setFiltroMateria] = useState("todas");
     const [busqueda, setBusqueda] = useState("");
+    const [busquedaDebounced, setBusquedaDebounced] = useState("");
     const [showModal, setShowModal] = useState(false);
     const [file, setFile] = useState(null); // Estado para el archivo físico
 
@@ -37,12 +38,22 @@ export default function MuroApuntes() {
         etiquetas: ''
     });
 
+    // Debounce de la búsqueda para no consultar en cada tecla
+    useEffect(() => {
+        const timer = setTimeout(() => setBusquedaDebounced(busqueda.trim()), 300);
+        return () => clearTimeout(timer);
+    }, [busqueda]);
+
     // --- DATA FETCHING ---
+    const buscando = busquedaDebounced.length >= 2;
     const { data: res, isLoading } = useQuery({
-        queryKey: ['social-apuntes', filtroMateria],
-        queryFn: () => apiClient.social.apuntes.list({ 
-            materia_id: filtroMateria === "todas" ? undefined : filtroMateria 
-        })
+        queryKey: ['social-apuntes', filtroMateria, buscando ? busquedaDebounced : null],
+        queryFn: () => {
+            const materia_id = filtroMateria === "todas" ? undefined : filtroMateria;
+            return buscando
+                ? apiClient.social.apuntes.buscar({ q: busquedaDebounced, materia_id })
+                : apiClient.social.apuntes.list({ materia_id });
+        }
     });
 
     const { data: materias = [] } = useQuery({ 
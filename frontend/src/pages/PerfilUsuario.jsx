@@ -101,7 +101,7 @@ export default function PerfilUsuario() {
                     <div className="lg:col-span-2 space-y-6">
                         <div className="flex items-center justify-between px-2">
                             <h3 className="text-xs font-black uppercase tracking-[0.3em] text-slate-500">Vitrina de Logros</h3>
-                            <Badge variant="outline" className="text-[9px] border-slate-800 text-slate-600 font-black">{logros_destacados.length} DESBLOQUEADOS</Badge>
+                            <Badge variant="outline" className="text-[9px] border-slate-800 text-slate-600 font-black">{estadisticas.total_logros ?? logros_destacados.length} DESBLOQUEADOS</Badge>
                         </div>
 
                         <div className="grid grid-cols-2 sm:grid-cols-3 gap-4">